@@ -6,6 +6,9 @@ from .conversation import (
     MessageRole,
     ConversationManager
 )
+from .conversation_store import (
+    ConversationStore
+)
 from .agent_chat_message import (
     AgentMessage
 )
@@ -25,6 +28,7 @@ __all__ = [
     'Message',
     'MessageRole',
     'ConversationManager',
+    'ConversationStore',
     'AgentMessage',
     'MessageType',
     'ContentType',
@@ -1,7 +1,7 @@
 """Conversation management for agent interactions."""
 
 import os
-import json
+import threading
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from dataclasses import dataclass, asdict
@@ -9,6 +9,7 @@ from enum import Enum
 import logging
 
 from utils.yaml_utils import load_yaml, save_yaml
+from .conversation_store import ConversationStore
 
 # Import LangChain message types only when needed to avoid circular dependencies
 def _get_langchain_types():
@@ -79,6 +80,8 @@ class Conversation:
     updated_at: str
     messages: List[Message]
     metadata: Optional[Dict[str, Any]] = None
+    # Index of messages[0] in the stored conversation (> 0 when only the last messages were loaded)
+    message_offset: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert conversation to dictionary."""
@@ -104,6 +107,16 @@ class Conversation:
             metadata=data.get('metadata')
         )
 
+    def to_header(self) -> Dict[str, Any]:
+        """Get the stored header of the conversation (everything but the messages)."""
+        return {
+            'conversation_id': self.conversation_id,
+            'title': self.title,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'metadata': self.metadata or {}
+        }
+
     def add_message(self, message: Message):
         """Add a message to the conversation."""
         self.messages.append(message)
@@ -196,6 +209,8 @@ class ConversationManager:
             return
 
         self._initialized = True
+        # Serializes header read-modify-write cycles of concurrent writers
+        self._lock = threading.RLock()
 
     def _get_paths_for_project(self, project_path: str) -> tuple:
         """
@@ -216,6 +231,11 @@ class ConversationManager:
 
         return agent_path, conversations_path, index_path
 
+    def _get_store(self, project_path: str) -> ConversationStore:
+        """Get the conversation store of a project."""
+        _, conversations_path, _ = self._get_paths_for_project(project_path)
+        return ConversationStore(conversations_path)
+
     def _load_index(self, project_path: str) -> Dict[str, Any]:
         """
         Load conversations index for a specific project.
@@ -282,31 +302,73 @@ class ConversationManager:
 
         return conversation
 
-    def get_conversation(self, project_path: str, conversation_id: str) -> Optional[Conversation]:
+    def get_conversation(
+        self,
+        project_path: str,
+        conversation_id: str,
+        limit: Optional[int] = None
+    ) -> Optional[Conversation]:
         """
         Get a conversation by ID.
 
         Args:
             project_path: Path to the project directory
             conversation_id: Conversation ID
+            limit: Load only the last ``limit`` messages (None: all messages);
+                ``message_offset`` of the result is the index of the first one
 
         Returns:
             Conversation object or None if not found
         """
-        _, conversations_path, _ = self._get_paths_for_project(project_path)
-        conversation_file = os.path.join(conversations_path, f"{conversation_id}.json")
-        if not os.path.exists(conversation_file):
+        store = self._get_store(project_path)
+        header = store.read_header(conversation_id)
+        if header is None:
             return None
 
-        with open(conversation_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        messages, offset = store.read_messages(header, limit=limit)
+        return Conversation(
+            conversation_id=header['conversation_id'],
+            title=header['title'],
+            created_at=header['created_at'],
+            updated_at=header['updated_at'],
+            messages=[Message.from_dict(msg) for msg in messages],
+            metadata=header.get('metadata'),
+            message_offset=offset
+        )
+
+    def get_messages(
+        self,
+        project_path: str,
+        conversation_id: str,
+        limit: int,
+        before: Optional[int] = None
+    ) -> List[Message]:
+        """
+        Get a page of messages, e.g. older messages of a partially loaded conversation.
+
+        Args:
+            project_path: Path to the project directory
+            conversation_id: Conversation ID
+            limit: Maximum number of messages
+            before: Return the messages preceding this index (None: the last messages)
 
-        return Conversation.from_dict(data)
+        Returns:
+            List of messages in conversation order (empty if not found)
+        """
+        store = self._get_store(project_path)
+        header = store.read_header(conversation_id)
+        if header is None:
+            return []
+        messages, _ = store.read_messages(header, limit=limit, before=before)
+        return [Message.from_dict(msg) for msg in messages]
 
     def save_conversation(self, project_path: str, conversation: Conversation):
         """
         Save a conversation.
 
+        A conversation loaded with a message limit cannot rewrite the messages
+        it did not load: its header is saved and only its new messages are appended.
+
         Args:
             project_path: Path to the project directory
             conversation: Conversation object to save
@@ -324,10 +386,17 @@ class ConversationManager:
 
     def _save_conversation(self, project_path: str, conversation: Conversation):
         """Internal method to save conversation to file."""
-        _, conversations_path, _ = self._get_paths_for_project(project_path)
-        conversation_file = os.path.join(conversations_path, f"{conversation.conversation_id}.json")
-        with open(conversation_file, 'w', encoding='utf-8') as f:
-            json.dump(conversation.to_dict(), f, ensure_ascii=False, indent=2)
+        store = self._get_store(project_path)
+        with self._lock:
+            header = conversation.to_header()
+            if conversation.message_offset == 0:
+                store.write_messages(header, [msg.to_dict() for msg in conversation.messages])
+                return
+            stored = store.read_header(conversation.conversation_id) or {}
+            header['message_count'] = stored.get('message_count', 0)
+            header['size'] = stored.get('size', 0)
+            new_messages = conversation.messages[header['message_count'] - conversation.message_offset:]
+            store.append_messages(header, [msg.to_dict() for msg in new_messages])
 
     def list_conversations(self, project_path: str) -> List[Dict[str, Any]]:
         """
@@ -340,6 +409,14 @@ class ConversationManager:
             List of conversation metadata (id, title, timestamps)
         """
         index = self._load_index(project_path)
+        # add_message only updates the conversation header, not the index
+        store = self._get_store(project_path)
+        for conv_info in index['conversations']:
+            header_path = store.header_path(conv_info['conversation_id'])
+            if os.path.exists(header_path):
+                header = store.read_header(conv_info['conversation_id'])
+                conv_info['title'] = header.get('title', conv_info.get('title'))
+                conv_info['updated_at'] = header.get('updated_at', conv_info.get('updated_at'))
         return sorted(
             index['conversations'],
             key=lambda x: x['updated_at'],
@@ -357,14 +434,10 @@ class ConversationManager:
         Returns:
             True if deleted, False if not found
         """
-        _, conversations_path, _ = self._get_paths_for_project(project_path)
-        conversation_file = os.path.join(conversations_path, f"{conversation_id}.json")
-        if not os.path.exists(conversation_file):
+        # Remove files
+        if not self._get_store(project_path).delete(conversation_id):
             return False
 
-        # Remove file
-        os.remove(conversation_file)
-
         # Remove from index
         index = self._load_index(project_path)
         index['conversations'] = [
@@ -379,6 +452,9 @@ class ConversationManager:
         """
         Add a message to a conversation.
 
+        Appends the message to the conversation's message file and updates
+        its header; the cost does not depend on the length of the conversation.
+
         Args:
             project_path: Path to the project directory
             conversation_id: Conversation ID
@@ -387,12 +463,14 @@ class ConversationManager:
         Returns:
             True if successful, False if conversation not found
         """
-        conversation = self.get_conversation(project_path, conversation_id)
-        if not conversation:
-            return False
-
-        conversation.add_message(message)
-        self.save_conversation(project_path, conversation)
+        store = self._get_store(project_path)
+        with self._lock:
+            header = store.read_header(conversation_id)
+            if header is None:
+                return False
+
+            header['updated_at'] = datetime.now().isoformat()
+            store.append_messages(header, [message.to_dict()])
         return True
 
     def get_or_create_default_conversation(self, project_path: str) -> Conversation:
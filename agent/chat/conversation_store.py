@@ -0,0 +1,232 @@
+"""
+Conversation Store
+
+Conversations are stored in the project's ``agent/chats`` directory as
+
+- ``<id>.jsonl``: the messages, one JSON object per line, append-only
+- ``<id>.header.json``: a small header (title, timestamps, metadata,
+  message count and the committed size of the message file), rewritten
+  atomically on every change
+
+Adding a message appends one line and rewrites the header, so its cost
+does not depend on the length of the conversation. The header is the
+commit record: bytes past its ``size`` (a crash between the append and the
+header update) are ignored and overwritten by the next append. The last
+messages of a conversation are read by scanning the message file
+backwards, without parsing the rest.
+
+Conversations saved by older versions as a single ``<id>.json`` file are
+migrated the first time they are accessed.
+"""
+
+import os
+import json
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEADER_SUFFIX = ".header.json"
+MESSAGES_SUFFIX = ".jsonl"
+LEGACY_SUFFIX = ".json"
+
+FORMAT_VERSION = 1
+
+# Block size used when reading the message file backwards
+READ_BLOCK_SIZE = 64 * 1024
+
+
+def _encode_message(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write a file atomically (temporary file + rename)."""
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_name, path)
+    except Exception:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+
+class ConversationStore:
+    """Reads and writes the conversations of one ``chats`` directory."""
+
+    def __init__(self, conversations_path: str):
+        """
+        Initialize the store.
+
+        Args:
+            conversations_path: Directory holding the conversation files
+        """
+        self.conversations_path = conversations_path
+
+    def header_path(self, conversation_id: str) -> str:
+        return os.path.join(self.conversations_path, f"{conversation_id}{HEADER_SUFFIX}")
+
+    def messages_path(self, conversation_id: str) -> str:
+        return os.path.join(self.conversations_path, f"{conversation_id}{MESSAGES_SUFFIX}")
+
+    def legacy_path(self, conversation_id: str) -> str:
+        return os.path.join(self.conversations_path, f"{conversation_id}{LEGACY_SUFFIX}")
+
+    def exists(self, conversation_id: str) -> bool:
+        """Check whether a conversation exists (in either format)."""
+        return os.path.exists(self.header_path(conversation_id)) or \
+            os.path.exists(self.legacy_path(conversation_id))
+
+    # Header
+
+    def read_header(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the header of a conversation, migrating a legacy conversation first.
+
+        Args:
+            conversation_id: Conversation ID
+
+        Returns:
+            The header, or None if the conversation does not exist
+        """
+        header_path = self.header_path(conversation_id)
+        if not os.path.exists(header_path):
+            if not os.path.exists(self.legacy_path(conversation_id)):
+                return None
+            self._migrate(conversation_id)
+        with open(header_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_header(self, header: Dict[str, Any]) -> None:
+        """Write a conversation header atomically."""
+        header['format_version'] = FORMAT_VERSION
+        data = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        _write_atomic(self.header_path(header['conversation_id']), data)
+
+    # Messages
+
+    def write_messages(self, header: Dict[str, Any], messages: List[Dict[str, Any]]) -> None:
+        """
+        Replace all messages of a conversation and write its header.
+
+        Args:
+            header: Conversation header; ``message_count`` and ``size`` are updated
+            messages: Messages as dictionaries
+        """
+        data = b''.join(_encode_message(m) for m in messages)
+        _write_atomic(self.messages_path(header['conversation_id']), data)
+        header['message_count'] = len(messages)
+        header['size'] = len(data)
+        self.write_header(header)
+
+    def append_messages(self, header: Dict[str, Any], messages: List[Dict[str, Any]]) -> None:
+        """
+        Append messages to a conversation and write its header.
+
+        Args:
+            header: Conversation header; ``message_count`` and ``size`` are updated
+            messages: Messages as dictionaries
+        """
+        data = b''.join(_encode_message(m) for m in messages)
+        size = header.get('size', 0)
+        messages_path = self.messages_path(header['conversation_id'])
+        with open(messages_path, 'r+b' if os.path.exists(messages_path) else 'w+b') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() != size:
+                # Drop data not committed by the header (interrupted append)
+                f.truncate(size)
+                f.seek(size)
+            f.write(data)
+        header['message_count'] = header.get('message_count', 0) + len(messages)
+        header['size'] = size + len(data)
+        self.write_header(header)
+
+    def read_messages(
+        self,
+        header: Dict[str, Any],
+        limit: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read a page of messages, counted from the end of the conversation.
+
+        Args:
+            header: Conversation header
+            limit: Maximum number of messages to read (None: all)
+            before: Read messages with an index lower than this (None: up to the last message)
+
+        Returns:
+            Tuple of (messages as dictionaries, index of the first returned message)
+        """
+        count = header.get('message_count', 0)
+        end = count if before is None else max(0, min(before, count))
+        start = 0 if limit is None else max(0, end - limit)
+        if start >= end:
+            return [], end
+        if start == 0 and end == count:
+            lines = self._read_all_lines(header)
+        else:
+            lines = self._read_last_lines(header, count - start)[:end - start]
+        return [json.loads(line) for line in lines], start
+
+    def _read_all_lines(self, header: Dict[str, Any]) -> List[bytes]:
+        with open(self.messages_path(header['conversation_id']), 'rb') as f:
+            data = f.read(header.get('size', 0))
+        return data.splitlines()
+
+    def _read_last_lines(self, header: Dict[str, Any], count: int) -> List[bytes]:
+        """Read the last ``count`` committed lines by scanning the file backwards."""
+        position = header.get('size', 0)
+        lines: List[bytes] = []
+        remainder = b''
+        with open(self.messages_path(header['conversation_id']), 'rb') as f:
+            while position > 0 and len(lines) < count:
+                read_size = min(READ_BLOCK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                block = f.read(read_size) + remainder
+                parts = block.split(b'\n')
+                # The first part may be the end of a line in an earlier block
+                remainder = parts[0] if position > 0 else b''
+                complete = parts[1:] if position > 0 else parts
+                lines[:0] = [line for line in complete if line]
+        return lines[-count:]
+
+    # Lifecycle
+
+    def create(self, header: Dict[str, Any], messages: List[Dict[str, Any]]) -> None:
+        """Create a conversation with the given messages."""
+        self.write_messages(header, messages)
+
+    def delete(self, conversation_id: str) -> bool:
+        """
+        Delete all files of a conversation.
+
+        Returns:
+            True if the conversation existed
+        """
+        deleted = False
+        for path in (self.header_path(conversation_id), self.messages_path(conversation_id),
+                     self.legacy_path(conversation_id)):
+            if os.path.exists(path):
+                os.remove(path)
+                deleted = True
+        return deleted
+
+    def _migrate(self, conversation_id: str) -> None:
+        """Convert a legacy ``<id>.json`` conversation to the append-only format."""
+        legacy_path = self.legacy_path(conversation_id)
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        messages = data.pop('messages', [])
+        header = dict(data)
+        header.setdefault('conversation_id', conversation_id)
+        header.setdefault('metadata', {})
+        # The header is written last: the legacy file is only removed once the
+        # new files are complete, so an interrupted migration is simply redone.
+        self.write_messages(header, messages)
+        os.remove(legacy_path)
+        logger.info(f"Migrated conversation {conversation_id} ({len(messages)} messages) to append-only storage")
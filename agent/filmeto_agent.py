@@ -11,6 +11,7 @@ from agent.chat.agent_chat_message import AgentMessage, StructureContent
 from agent.chat.agent_chat_types import ContentType, MessageType
 from agent.chat.agent_chat_signals import AgentChatSignals
 from agent.llm.llm_service import LlmService
+from agent.plan.executor import PlanExecutor
 from agent.plan.models import Plan, PlanInstance, PlanTask, TaskStatus
 from agent.plan.service import PlanService
 from agent.crew.crew_member import CrewMember
@@ -66,6 +67,7 @@ class FilmetoAgent:
         llm_service: Optional[LlmService] = None,
         crew_member_service: Optional[CrewService] = None,
         plan_service: Optional[PlanService] = None,
+        max_parallel_tasks: int = PlanExecutor.DEFAULT_MAX_CONCURRENCY,
     ):
         """Initialize the FilmetoAgent instance."""
         self.workspace = workspace
@@ -73,6 +75,7 @@ class FilmetoAgent:
         self.model = model
         self.temperature = temperature
         self.streaming = streaming
+        self.max_parallel_tasks = max_parallel_tasks
         self.members: Dict[str, CrewMember] = {}
         self.conversation_history: List[AgentMessage] = []
         self.current_session: Optional[AgentStreamSession] = None
@@ -277,21 +280,29 @@ class FilmetoAgent:
         lowered = response.lower()
         return "llm service is not configured" in lowered or "error calling llm" in lowered
 
-    def _dependencies_satisfied(self, plan_instance: PlanInstance, task: PlanTask) -> bool:
+    def _dependencies_satisfied(
+        self,
+        plan_instance: PlanInstance,
+        task: PlanTask,
+        tasks_by_id: Optional[Dict[str, PlanTask]] = None,
+    ) -> bool:
         if not task.needs:
             return True
+        if tasks_by_id is None:
+            tasks_by_id = {t.id: t for t in plan_instance.tasks}
         for dependency_id in task.needs:
-            dependency = next((t for t in plan_instance.tasks if t.id == dependency_id), None)
+            dependency = tasks_by_id.get(dependency_id)
             if not dependency or dependency.status != TaskStatus.COMPLETED:
                 return False
         return True
 
     def _get_ready_tasks(self, plan_instance: PlanInstance) -> List[PlanTask]:
         ready = []
+        tasks_by_id = {t.id: t for t in plan_instance.tasks}
         for task in plan_instance.tasks:
             if task.status not in {TaskStatus.CREATED, TaskStatus.READY}:
                 continue
-            if self._dependencies_satisfied(plan_instance, task):
+            if self._dependencies_satisfied(plan_instance, task, tasks_by_id):
                 ready.append(task)
         return ready
 
@@ -337,7 +348,7 @@ class FilmetoAgent:
         session_id: str,
         metadata: Optional[Dict[str, Any]] = None,
     ) -> AsyncGenerator["AgentEvent", None]:
-        from agent.react import AgentEventType
+        from agent.react import AgentEvent, AgentEventType
 
         # Set the current message ID on the crew member for skill tracking
         crew_member._current_message_id = str(uuid.uuid4())
@@ -629,60 +640,94 @@ class FilmetoAgent:
     ) -> AsyncGenerator["AgentEvent", None]:
         plan_instance = self.plan_service.create_plan_instance(plan)
         self.plan_service.start_plan_execution(plan_instance)
+        plan_mtime = self.plan_service.get_plan_mtime(plan.project_name, plan.id)
+
+        def refresh_plan(instance: PlanInstance, task: PlanTask) -> Optional[PlanInstance]:
+            # Crew members may extend the plan with plan_update; reload it only when it changed
+            nonlocal plan_mtime
+            mtime = self.plan_service.get_plan_mtime(plan.project_name, plan.id)
+            if mtime == plan_mtime:
+                return None
+            plan_mtime = mtime
+            updated_plan = self.plan_service.load_plan(plan.project_name, plan.id)
+            if not updated_plan:
+                return None
+            return self.plan_service.sync_plan_instance(instance, updated_plan)
+
+        executor = PlanExecutor(
+            run_task=lambda task: self._run_plan_task(plan, plan_instance, task, session_id),
+            get_ready_tasks=self._get_ready_tasks,
+            max_concurrency=self.max_parallel_tasks,
+            # A crew member handles one task at a time
+            exclusive_key=lambda task: task.title.lower(),
+            on_task_finished=refresh_plan,
+        )
+        async for task, event in executor.run(plan_instance):
+            event.payload.setdefault("task_id", task.id)
+            yield event
 
-        while True:
-            ready_tasks = self._get_ready_tasks(plan_instance)
-            if not ready_tasks:
-                if self._has_incomplete_tasks(plan_instance):
-                    async for event in self._stream_error_message(
-                        "Plan execution blocked by unmet dependencies or missing agents.",
-                        session_id,
-                    ):
-                        yield event
-                break
-
-            for task in ready_tasks:
-                self.plan_service.mark_task_running(plan_instance, task.id)
-                await self._emit_system_event(
-                    "plan_update",
-                    session_id,
-                    plan_id=plan.id,
-                    task_id=task.id,
-                    task_status="running",
-                )
-                target_agent = self._crew_member_lookup.get(task.title.lower())
-                if not target_agent:
-                    error_message = f"Crew member '{task.title}' not found for task {task.id}."
-                    self.plan_service.mark_task_failed(plan_instance, task.id, error_message)
-                    async for event in self._stream_error_message(
-                        error_message,
-                        session_id,
-                    ):
-                        yield event
-                    continue
+        if self._has_incomplete_tasks(plan_instance):
+            async for event in self._stream_error_message(
+                "Plan execution blocked by unmet dependencies or missing agents.",
+                session_id,
+            ):
+                yield event
 
-                task_message = self._build_task_message(task, plan.id)
-                async for event in self._stream_crew_member(
-                    target_agent,
-                    task_message,
-                    plan_id=plan.id,
-                    session_id=session_id,
-                    metadata={"plan_id": plan.id, "task_id": task.id},
-                ):
-                    yield event
+    async def _run_plan_task(
+        self,
+        plan: Plan,
+        plan_instance: PlanInstance,
+        task: PlanTask,
+        session_id: str,
+    ) -> AsyncGenerator["AgentEvent", None]:
+        """Run one plan task on its crew member and record its status."""
+        self.plan_service.mark_task_running(plan_instance, task.id)
+        await self._emit_system_event(
+            "plan_update",
+            session_id,
+            plan_id=plan.id,
+            task_id=task.id,
+            task_status="running",
+        )
+        target_agent = self._crew_member_lookup.get(task.title.lower())
+        if not target_agent:
+            error_message = f"Crew member '{task.title}' not found for task {task.id}."
+            self.plan_service.mark_task_failed(plan_instance, task.id, error_message)
+            async for event in self._stream_error_message(
+                error_message,
+                session_id,
+            ):
+                yield event
+            return
 
-                self.plan_service.mark_task_completed(plan_instance, task.id)
-                await self._emit_system_event(
-                    "plan_update",
-                    session_id,
-                    plan_id=plan.id,
-                    task_id=task.id,
-                    task_status="completed",
-                )
+        task_message = self._build_task_message(task, plan.id)
+        try:
+            async for event in self._stream_crew_member(
+                target_agent,
+                task_message,
+                plan_id=plan.id,
+                session_id=session_id,
+                metadata={"plan_id": plan.id, "task_id": task.id},
+            ):
+                yield event
+        except Exception as e:
+            logger.error(f"Plan task {task.id} failed: {e}", exc_info=True)
+            self.plan_service.mark_task_failed(plan_instance, task.id, str(e))
+            async for event in self._stream_error_message(
+                f"Task {task.id} failed: {e}",
+                session_id,
+            ):
+                yield event
+            return
 
-            updated_plan = self.plan_service.load_plan(plan.project_name, plan.id)
-            if updated_plan:
-                plan_instance = self.plan_service.sync_plan_instance(plan_instance, updated_plan)
+        self.plan_service.mark_task_completed(plan_instance, task.id)
+        await self._emit_system_event(
+            "plan_update",
+            session_id,
+            plan_id=plan.id,
+            task_id=task.id,
+            task_status="completed",
+        )
 
     async def _select_responding_agent(self, message: AgentMessage) -> Optional[CrewMember]:
         """
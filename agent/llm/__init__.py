@@ -5,7 +5,10 @@ This package contains the LlmService class which wraps LiteLLM functionality
 and integrates with the system settings service to manage AI model configurations.
 """
 from .llm_service import LlmService
+from .response_cache import ResponseCache, LlmCacheMissError
 
 __all__ = [
-    "LlmService"
+    "LlmService",
+    "ResponseCache",
+    "LlmCacheMissError"
 ]
\ No newline at end of file
@@ -5,10 +5,16 @@ Implements the LlmService class to wrap LiteLLM functionality and integrate with
 the system settings service to manage AI model configurations.
 """
 import os
-from typing import Optional, Dict, Any, AsyncIterator
+import logging
+from typing import Optional, Dict, Any, AsyncIterator, List, Union
 import litellm
 from app.data.settings import Settings
 from utils.i18n_utils import translation_manager
+from .response_cache import (
+    MODE_OFF, MODE_OFFLINE, LlmCacheMissError, RecordingStream, ResponseCache, get_shared_cache
+)
+
+logger = logging.getLogger(__name__)
 
 
 class LlmService:
@@ -22,18 +28,21 @@ class LlmService:
     - Supporting special handling for different AI service providers like DashScope
     """
     
-    def __init__(self, workspace=None):
+    def __init__(self, workspace=None, response_cache: Optional[ResponseCache] = None):
         """
         Initialize the LlmService.
 
         Args:
             workspace: Workspace instance containing settings. If not provided, will use environment variables.
+            response_cache: Response cache to use. If not provided, it is configured by the
+                FILMETO_LLM_CACHE environment variable or the ai_services.response_cache setting.
         """
         self.workspace = workspace
         self.settings = getattr(workspace, 'settings', None) if workspace else None
         self.api_key = None
         self.api_base = None
         self.default_model = 'gpt-4o-mini'
+        self.embedding_model = 'text-embedding-3-small'
         self.temperature = 0.7
         self.language_prompts = {
             'zh_CN': '请使用中文回答。',
@@ -47,6 +56,7 @@ class LlmService:
 
         # Initialize the service
         self._initialize_from_settings()
+        self.response_cache = response_cache or self._create_response_cache()
     
     def _detect_provider_from_base_url(self, base_url: str) -> str:
         """Detect the provider type from the base URL."""
@@ -133,6 +143,7 @@ class LlmService:
                            os.getenv('DASHSCOPE_API_KEY'))
             self.api_base = self.settings.get('ai_services.openai_host', os.getenv('OPENAI_BASE_URL'))
             self.default_model = self.settings.get('ai_services.default_model', 'gpt-4o-mini')
+            self.embedding_model = self.settings.get('ai_services.embedding_model') or 'text-embedding-3-small'
 
             # Detect provider from base URL
             self.provider = self._detect_provider_from_base_url(self.api_base)
@@ -157,6 +168,7 @@ class LlmService:
             self.api_key = os.getenv('OPENAI_API_KEY') or os.getenv('DASHSCOPE_API_KEY')
             self.api_base = os.getenv('OPENAI_BASE_URL', os.getenv('OPENAI_HOST'))
             self.default_model = os.getenv('DEFAULT_MODEL', 'gpt-4o-mini')
+            self.embedding_model = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
 
             # Detect provider from base URL
             self.provider = self._detect_provider_from_base_url(self.api_base)
@@ -177,6 +189,55 @@ class LlmService:
                 else:
                     litellm.api_base = self.api_base
 
+    def _create_response_cache(self) -> Optional[ResponseCache]:
+        """Create the response cache configured by environment or settings (None when disabled)."""
+        mode = os.getenv('FILMETO_LLM_CACHE') or (
+            self.settings.get('ai_services.response_cache') if self.settings else None
+        ) or MODE_OFF
+        if mode == MODE_OFF:
+            return None
+        path = os.getenv('FILMETO_LLM_CACHE_PATH')
+        if not path:
+            workspace_path = getattr(self.workspace, 'workspace_path', None)
+            cache_dir = os.path.join(workspace_path, 'cache') if workspace_path else \
+                os.path.join(os.path.expanduser('~'), '.filmeto', 'cache')
+            path = os.path.join(cache_dir, 'llm_responses.sqlite')
+        try:
+            return get_shared_cache(path, mode)
+        except (ValueError, OSError) as e:
+            logger.warning(f"LLM response cache disabled: {e}")
+            return None
+
+    def _cache_lookup(self, model: str, messages: list, kwargs: Dict[str, Any]):
+        """
+        Look up a request in the response cache.
+
+        Returns:
+            (cache key, cached record); the key is None when the request is not cached
+
+        Raises:
+            LlmCacheMissError: In offline mode, if the response is not cached
+        """
+        cache = self.response_cache
+        if cache is None or not cache.is_cacheable(kwargs.get('temperature'), kwargs):
+            return None, None
+        key = cache.fingerprint(model, messages, kwargs.get('temperature'), kwargs)
+        record = cache.get(key)
+        if record is None and cache.mode == MODE_OFFLINE:
+            raise LlmCacheMissError(f"No cached response for request to {model} (offline mode)")
+        return key, record
+
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """
+        Get the response cache metrics.
+
+        Returns:
+            Hits, misses, hit rate and saved tokens, or {"mode": "off"} without a cache
+        """
+        if self.response_cache is None:
+            return {"mode": MODE_OFF}
+        return self.response_cache.get_metrics()
+
     def get_current_language(self) -> str:
         """
         Get the current language from the translation manager.
@@ -298,13 +359,22 @@ class LlmService:
         # Map the model to provider-specific model if needed
         model = self._map_model_for_provider(model, self.provider)
 
+        cache_key, cached = self._cache_lookup(model, messages, kwargs)
+        if cached is not None:
+            return ResponseCache.replay_stream(cached) if stream else ResponseCache.to_response(cached)
+
         # Call LiteLLM's acompletion normally - it will handle provider-specific logic internally
-        return await litellm.acompletion(
+        response = await litellm.acompletion(
             model=model,
             messages=messages,
             stream=stream,
             **kwargs
         )
+        if cache_key is not None:
+            if stream:
+                return RecordingStream(response, self.response_cache, cache_key, model, messages)
+            self.response_cache.put(cache_key, ResponseCache.record_from_response(response, model, messages))
+        return response
     
     def completion(self,
                    model: Optional[str] = None,
@@ -340,22 +410,30 @@ class LlmService:
         # Map the model to provider-specific model if needed
         model = self._map_model_for_provider(model, self.provider)
 
+        # Streamed sync responses are not cached
+        cache_key, cached = (None, None) if kwargs.get('stream') else self._cache_lookup(model, messages, kwargs)
+        if cached is not None:
+            return ResponseCache.to_response(cached)
+
         # Call LiteLLM's completion normally - it will handle provider-specific logic internally
-        return litellm.completion(
+        response = litellm.completion(
             model=model,
             messages=messages,
             **kwargs
         )
+        if cache_key is not None:
+            self.response_cache.put(cache_key, ResponseCache.record_from_response(response, model, messages))
+        return response
     
     async def aembedding(self,
                         model: str,
-                        input_text: str) -> Any:
+                        input_text: Union[str, List[str]]) -> Any:
         """
         Async embedding method that wraps LiteLLM's aembedding function.
 
         Args:
             model: Model to use for embeddings
-            input_text: Text to generate embeddings for
+            input_text: Text, or batch of texts, to generate embeddings for
 
         Returns:
             Embedding response from LiteLLM
@@ -464,7 +542,8 @@ class LlmService:
             'api_key_set': bool(self.api_key),
             'api_base': self.api_base,
             'default_model': self.default_model,
-            'temperature': self.temperature
+            'temperature': self.temperature,
+            'response_cache': self.response_cache.mode if self.response_cache else MODE_OFF
         }
 
     @staticmethod
@@ -502,4 +581,25 @@ class LlmService:
                     return str(text)
 
         # Fallback: convert to string
-        return str(response) if response else ""
\ No newline at end of file
+        return str(response) if response else ""
+
+    @staticmethod
+    def extract_delta(chunk: Any) -> str:
+        """
+        Extract the text delta from a streamed LLM response chunk.
+
+        Args:
+            chunk: One chunk from a litellm streaming response (ModelResponseStream)
+
+        Returns:
+            The new content in the chunk, or empty string if it carries none
+            (role-only, reasoning or usage chunks).
+        """
+        choices = getattr(chunk, 'choices', None)
+        if not choices:
+            return ""
+        delta = getattr(choices[0], 'delta', None)
+        if delta is None:
+            return ""
+        content = getattr(delta, 'content', None)
+        return str(content) if content else ""
@@ -0,0 +1,433 @@
+"""
+LLM Response Cache
+
+Opt-in cache of LLM completions, used by LlmService. A request is
+identified by a fingerprint of the model, the messages (after the language
+prompt was injected), the temperature, the tools and the other parameters
+that change the output. Responses are kept in an in-memory LRU and in a
+SQLite file with a time-to-live, and can be replayed as a stream.
+
+Modes:
+- ``deterministic``: cache only requests with temperature 0 (or a seed)
+- ``record``: cache every request
+- ``offline``: answer every request from the cache and never call the
+  provider; a request that is not cached raises LlmCacheMissError. Test
+  suites record once and then run deterministically without network.
+
+The cache is enabled by the ``FILMETO_LLM_CACHE`` environment variable
+(``FILMETO_LLM_CACHE_PATH`` sets the SQLite file) or by the
+``ai_services.response_cache`` setting.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import litellm
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"
+MODE_DETERMINISTIC = "deterministic"
+MODE_RECORD = "record"
+MODE_OFFLINE = "offline"
+MODES = (MODE_OFF, MODE_DETERMINISTIC, MODE_RECORD, MODE_OFFLINE)
+
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+# Request parameters that change the response and are part of the fingerprint
+FINGERPRINT_PARAMS = (
+    "tools", "tool_choice", "functions", "function_call", "response_format",
+    "max_tokens", "max_completion_tokens", "top_p", "stop", "seed", "n",
+    "presence_penalty", "frequency_penalty", "logit_bias", "reasoning_effort",
+)
+MESSAGE_KEYS = ("role", "content", "name", "tool_calls", "tool_call_id", "function_call")
+
+# Characters per chunk when a response cached without chunks is streamed
+REPLAY_CHUNK_CHARS = 32
+
+
+class LlmCacheMissError(RuntimeError):
+    """Raised in offline mode for a request that is not cached."""
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) cache of LLM responses."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        mode: str = MODE_DETERMINISTIC,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite file of the disk tier (None: memory only)
+            mode: "deterministic", "record" or "offline"
+            max_memory_entries: Entries kept in the memory tier
+            ttl_seconds: Age after which disk entries expire (None: never)
+        """
+        if mode not in MODES or mode == MODE_OFF:
+            raise ValueError(f"Invalid response cache mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_prompt_tokens = 0
+        self.saved_completion_tokens = 0
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, created_at REAL NOT NULL, record TEXT NOT NULL)"
+        )
+        self.purge_expired()
+
+    # Fingerprinting
+
+    @staticmethod
+    def fingerprint(model: str, messages: List[Dict[str, Any]], temperature: Optional[float],
+                    params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Compute the cache key of a request.
+
+        Args:
+            model: Provider model name
+            messages: Messages as sent (after language prompt injection)
+            temperature: Sampling temperature
+            params: Other request parameters; only those in FINGERPRINT_PARAMS count
+
+        Returns:
+            Hex digest identifying the request
+        """
+        normalized_messages = [
+            {key: message[key] for key in MESSAGE_KEYS if message.get(key) is not None}
+            for message in messages
+        ]
+        relevant = {key: value for key, value in (params or {}).items()
+                    if key in FINGERPRINT_PARAMS and value is not None}
+        payload = json.dumps(
+            {"model": model, "messages": normalized_messages, "temperature": temperature, "params": relevant},
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, temperature: Optional[float], params: Optional[Dict[str, Any]] = None) -> bool:
+        """Check whether a request is served from / stored in the cache in this mode."""
+        if self.mode == MODE_DETERMINISTIC:
+            return temperature == 0 or (params or {}).get("seed") is not None
+        return True
+
+    # Lookup and storage
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a response and count the hit or miss.
+
+        Returns:
+            The cached record, or None
+        """
+        with self._lock:
+            record = self._memory.get(key)
+            if record is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+            elif self._db is not None:
+                record = self._read_disk(key)
+                if record is not None:
+                    self._remember(key, record)
+                    self.disk_hits += 1
+            if record is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            usage = record.get("usage") or {}
+            self.saved_prompt_tokens += usage.get("prompt_tokens") or 0
+            self.saved_completion_tokens += usage.get("completion_tokens") or 0
+            return record
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute("SELECT created_at, record FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        created_at, data = row
+        if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+        return json.loads(data)
+
+    def _remember(self, key: str, record: Dict[str, Any]):
+        self._memory[key] = record
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def put(self, key: str, record: Dict[str, Any]):
+        """
+        Store a response.
+
+        Args:
+            key: Request fingerprint
+            record: {"content", "chunks", "response", "usage", "model"}
+        """
+        with self._lock:
+            self._remember(key, record)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, created_at, record) VALUES (?, ?, ?, ?)",
+                    (key, record.get("model"), time.time(), json.dumps(record, ensure_ascii=False, default=str)),
+                )
+
+    def purge_expired(self) -> int:
+        """Delete expired disk entries; returns how many were deleted."""
+        if self._db is None or self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM responses WHERE created_at < ?",
+                                      (time.time() - self.ttl_seconds,))
+            return cursor.rowcount
+
+    def clear(self):
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get hit-rate and saved-token metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_prompt_tokens": self.saved_prompt_tokens,
+            "saved_completion_tokens": self.saved_completion_tokens,
+            "memory_entries": len(self._memory),
+        }
+
+    # Records and replay
+
+    @staticmethod
+    def record_from_response(response: Any, model: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build a cache record from a (non-streamed) litellm ModelResponse."""
+        data = response.model_dump() if hasattr(response, "model_dump") else dict(response)
+        usage = data.get("usage") or {}
+        content = ""
+        choices = data.get("choices") or []
+        if choices:
+            content = ((choices[0].get("message") or {}).get("content")) or ""
+        return {
+            "model": model,
+            "content": content,
+            "chunks": None,
+            "response": data,
+            "usage": {
+                "prompt_tokens": usage.get("prompt_tokens") or _count_tokens(model, messages=messages),
+                "completion_tokens": usage.get("completion_tokens") or _count_tokens(model, text=content),
+            },
+        }
+
+    @staticmethod
+    def record_from_chunks(chunks: List[str], model: str, messages: List[Dict[str, Any]],
+                           usage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build a cache record from the text deltas of a completed stream."""
+        content = "".join(chunks)
+        usage = usage or {}
+        return {
+            "model": model,
+            "content": content,
+            "chunks": chunks,
+            "response": None,
+            "usage": {
+                "prompt_tokens": usage.get("prompt_tokens") or _count_tokens(model, messages=messages),
+                "completion_tokens": usage.get("completion_tokens") or _count_tokens(model, text=content),
+            },
+        }
+
+    @staticmethod
+    def to_response(record: Dict[str, Any]) -> Any:
+        """Rebuild a litellm ModelResponse from a record."""
+        if record.get("response"):
+            return litellm.ModelResponse(**record["response"])
+        return litellm.ModelResponse(
+            model=record.get("model"),
+            choices=[{"index": 0, "finish_reason": "stop",
+                      "message": {"role": "assistant", "content": record.get("content", "")}}],
+            usage=dict(record.get("usage") or {}),
+        )
+
+    @staticmethod
+    async def replay_stream(record: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Replay a record as a stream of litellm chunks."""
+        from litellm.types.utils import Delta, ModelResponseStream, StreamingChoices
+
+        chunks = record.get("chunks")
+        if chunks is None:
+            content = record.get("content", "")
+            chunks = [content[i:i + REPLAY_CHUNK_CHARS] for i in range(0, len(content), REPLAY_CHUNK_CHARS)]
+        for chunk in chunks:
+            yield ModelResponseStream(model=record.get("model"),
+                                      choices=[StreamingChoices(delta=Delta(content=chunk))])
+
+
+def _count_tokens(model: str, messages: Optional[List[Dict[str, Any]]] = None, text: Optional[str] = None) -> int:
+    """Estimate token usage when the provider did not report it."""
+    try:
+        if messages is not None:
+            return litellm.token_counter(model=model, messages=messages)
+        return litellm.token_counter(model=model, text=text or "")
+    except Exception:
+        if messages is not None:
+            return sum(len(str(m.get("content") or "")) for m in messages) // 4
+        return len(text or "") // 4
+
+
+class RecordingStream:
+    """
+    Wraps a provider stream and stores the response once it completed.
+
+    Consumers may stop reading early (React stops once the action JSON is
+    complete); ``aclose`` then returns at once and the rest of the response,
+    usually a few tokens, is read by a background task so that the complete
+    response can be cached without delaying the consumer.
+    """
+
+    # Longest time the background task waits for the rest of a response
+    DRAIN_TIMEOUT = 60.0
+
+    def __init__(self, stream: Any, cache: ResponseCache, key: str, model: str,
+                 messages: List[Dict[str, Any]]):
+        self._stream = stream
+        self._iterator = stream.__aiter__()
+        self._cache = cache
+        self._key = key
+        self._model = model
+        self._messages = messages
+        self._chunks: List[str] = []
+        self._usage: Optional[Dict[str, Any]] = None
+        self._replayable = True
+        self._done = False
+        self._recording: Optional[asyncio.Task] = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self._iterator.__anext__()
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        self._observe(chunk)
+        return chunk
+
+    def _observe(self, chunk: Any):
+        usage = getattr(chunk, "usage", None)
+        if usage:
+            self._usage = usage.model_dump() if hasattr(usage, "model_dump") else dict(usage)
+        choices = getattr(chunk, "choices", None)
+        if not choices:
+            return
+        delta = getattr(choices[0], "delta", None)
+        if delta is None:
+            return
+        if getattr(delta, "tool_calls", None) or getattr(delta, "function_call", None):
+            # Streamed tool calls are not replayed
+            self._replayable = False
+        content = getattr(delta, "content", None)
+        if content:
+            self._chunks.append(str(content))
+
+    def _finish(self):
+        if self._done:
+            return
+        self._done = True
+        if self._replayable and self._chunks:
+            self._cache.put(self._key, ResponseCache.record_from_chunks(
+                self._chunks, self._model, self._messages, self._usage))
+
+    async def aclose(self):
+        if self._done or self._recording is not None:
+            if self._recording is None:
+                await self._close_stream()
+            return
+        self._recording = asyncio.create_task(self._record_rest())
+        _recordings.add(self._recording)
+        self._recording.add_done_callback(_recordings.discard)
+
+    async def _record_rest(self):
+        try:
+            await asyncio.wait_for(self._drain(), self.DRAIN_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"Could not complete stream for the response cache: {e}")
+            self._done = True
+        finally:
+            await self._close_stream()
+
+    async def _drain(self):
+        async for chunk in self._iterator:
+            self._observe(chunk)
+        self._finish()
+
+    async def _close_stream(self):
+        close = getattr(self._stream, "aclose", None)
+        if close is not None:
+            try:
+                await close()
+            except Exception as e:
+                logger.debug(f"Failed to close LLM stream: {e}")
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+# Keeps the background recordings of closed streams alive until they finish
+_recordings: Set[asyncio.Task] = set()
+
+_shared_caches: Dict[str, ResponseCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache(path: Optional[str], mode: str, ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS) -> ResponseCache:
+    """Get the process-wide cache of a SQLite file, so all LlmService instances share hits."""
+    key = f"{os.path.abspath(path) if path else ''}|{mode}"
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = ResponseCache(path, mode=mode, ttl_seconds=ttl_seconds)
+            _shared_caches[key] = cache
+        return cache
@@ -1,8 +1,10 @@
 from .service import PlanService
+from .executor import PlanExecutor
 from .models import Plan, PlanInstance, PlanTask, PlanStatus, TaskStatus
 
 __all__ = [
     'PlanService',
+    'PlanExecutor',
     'Plan',
     'PlanInstance',
     'PlanTask',
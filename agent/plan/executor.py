@@ -0,0 +1,111 @@
+"""
+Plan Executor
+
+Runs the tasks of a PlanInstance as a dependency graph. Every task whose
+``needs`` are completed starts immediately (up to a concurrency limit)
+instead of waiting for the rest of its wave, and the event streams of the
+running tasks are merged into a single stream of ``(task, event)`` pairs.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .models import PlanInstance, PlanTask
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class PlanExecutor:
+    """Concurrent DAG scheduler for plan tasks."""
+
+    DEFAULT_MAX_CONCURRENCY = 4
+
+    def __init__(
+        self,
+        run_task: Callable[[PlanTask], AsyncIterator[Any]],
+        get_ready_tasks: Callable[[PlanInstance], List[PlanTask]],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        exclusive_key: Optional[Callable[[PlanTask], Optional[str]]] = None,
+        on_task_finished: Optional[Callable[[PlanInstance, PlanTask], Optional[PlanInstance]]] = None,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            run_task: Returns the event stream of one task; it is responsible for
+                updating the task status (running/completed/failed)
+            get_ready_tasks: Returns the tasks whose dependencies are satisfied
+            max_concurrency: Maximum number of tasks running at the same time
+            exclusive_key: Tasks with the same key never run concurrently
+                (e.g. tasks handled by the same crew member)
+            on_task_finished: Called after each task; may return a refreshed plan instance
+        """
+        self.run_task = run_task
+        self.get_ready_tasks = get_ready_tasks
+        self.max_concurrency = max(1, max_concurrency)
+        self.exclusive_key = exclusive_key
+        self.on_task_finished = on_task_finished
+
+    async def run(self, plan_instance: PlanInstance) -> AsyncGenerator[Tuple[PlanTask, Any], None]:
+        """
+        Execute the plan until no task is running and none is ready.
+
+        Yields:
+            (task, event) pairs in the order the events were produced;
+            the events of one task keep their relative order
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        running: Dict[str, asyncio.Task] = {}
+        busy_keys: Dict[str, str] = {}  # exclusive key -> task id
+        started = set()
+
+        def start_ready_tasks():
+            for task in self.get_ready_tasks(plan_instance):
+                if len(running) >= self.max_concurrency:
+                    break
+                if task.id in started:
+                    continue
+                key = self.exclusive_key(task) if self.exclusive_key else None
+                if key is not None and key in busy_keys:
+                    continue
+                started.add(task.id)
+                logger.debug(f"Starting plan task {task.id} ({len(running) + 1} running)")
+                if key is not None:
+                    busy_keys[key] = task.id
+                running[task.id] = asyncio.create_task(self._pump(task, queue))
+
+        try:
+            start_ready_tasks()
+            while running:
+                task, event = await queue.get()
+                if event is not _DONE:
+                    yield task, event
+                    continue
+
+                runner = running.pop(task.id)
+                for key, task_id in list(busy_keys.items()):
+                    if task_id == task.id:
+                        del busy_keys[key]
+                # Re-raise unexpected errors from run_task
+                await runner
+
+                if self.on_task_finished:
+                    refreshed = self.on_task_finished(plan_instance, task)
+                    if refreshed is not None:
+                        plan_instance = refreshed
+                start_ready_tasks()
+        finally:
+            for runner in running.values():
+                runner.cancel()
+            if running:
+                await asyncio.gather(*running.values(), return_exceptions=True)
+
+    async def _pump(self, task: PlanTask, queue: asyncio.Queue):
+        try:
+            async for event in self.run_task(task):
+                await queue.put((task, event))
+        finally:
+            queue.put_nowait((task, _DONE))
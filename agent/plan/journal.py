@@ -0,0 +1,173 @@
+"""
+Plan Instance Journal
+
+Plan instances are stored as a YAML snapshot
+(``plan_instance_<id>.yml``) plus an append-only JSON Lines journal of the
+state transitions made since that snapshot
+(``plan_instance_<id>.journal.jsonl``). A status change appends one short
+line instead of re-serialising the whole instance; the journal is folded
+into a new snapshot once it grows past the size of the plan.
+
+All file writes run in order on a single background thread so that status
+updates made from the event loop do not block it.
+"""
+
+import os
+import json
+import logging
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+EVENT_TASK = "task"
+EVENT_PLAN = "plan"
+
+
+def journal_path_for(snapshot_path: Path) -> Path:
+    """Journal file belonging to a plan instance snapshot"""
+    return snapshot_path.with_name(snapshot_path.stem + JOURNAL_SUFFIX)
+
+
+def write_snapshot(snapshot_path: Path, data: Dict[str, Any]) -> None:
+    """Write a snapshot atomically and start a new, empty journal."""
+    fd, temp_name = tempfile.mkstemp(dir=str(snapshot_path.parent), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            yaml.dump(data, f, default_flow_style=False, allow_unicode=True)
+        os.replace(temp_name, snapshot_path)
+    except Exception:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+    # Every event up to data["journal_seq"] is now part of the snapshot
+    journal_path = journal_path_for(snapshot_path)
+    if journal_path.exists():
+        journal_path.unlink()
+
+
+def append_event(snapshot_path: Path, event: Dict[str, Any]) -> None:
+    """Append one event to the journal of a plan instance."""
+    line = (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8')
+    with open(journal_path_for(snapshot_path), 'a+b') as f:
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                # Terminate a line torn by a crash so the new event stays readable
+                line = b'\n' + line
+        f.write(line)
+
+
+def read_journal(snapshot_path: Path, after_seq: int = 0) -> List[Dict[str, Any]]:
+    """
+    Read the journal events newer than ``after_seq``.
+
+    A torn last line (crash during append) is ignored.
+    """
+    journal_path = journal_path_for(snapshot_path)
+    if not journal_path.exists():
+        return []
+    events = []
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping corrupt line in plan journal {journal_path}")
+                continue
+            if event.get("seq", 0) > after_seq:
+                events.append(event)
+    return events
+
+
+class JournalWriteError(Exception):
+    """Raised by ``JournalWriter.flush()`` when queued plan writes failed."""
+
+
+class JournalWriter:
+    """
+    Runs plan file writes in submission order on one background thread.
+
+    Writes are grouped by a key (the snapshot path of a plan instance) so
+    readers only wait for the instance they read. A failed write is logged,
+    reported by the next ``flush()`` and marks its instance as needing a new
+    snapshot, since its journal now has a gap.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plan-journal")
+        self._lock = threading.Lock()
+        # key -> number of queued writes and the last one queued
+        self._pending: Dict[str, int] = {}
+        self._last: Dict[str, Future] = {}
+        self._errors: List[str] = []
+        self._broken: Set[str] = set()
+
+    def submit(self, key: str, fn: Callable[..., None], *args: Any) -> Future:
+        """Queue a write belonging to ``key``; the future raises if the write fails."""
+        def run():
+            try:
+                fn(*args)
+            except Exception as e:
+                logger.error(f"Plan journal write failed for {key}: {e}")
+                with self._lock:
+                    self._errors.append(f"{key}: {e}")
+                    self._broken.add(key)
+                raise
+            finally:
+                with self._lock:
+                    self._pending[key] -= 1
+                    if not self._pending[key]:
+                        del self._pending[key]
+                        self._last.pop(key, None)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + 1
+            future = self._executor.submit(run)
+            self._last[key] = future
+            return future
+
+    def has_pending(self, key: str) -> bool:
+        """Whether writes of ``key`` are still queued"""
+        with self._lock:
+            return key in self._pending
+
+    def take_broken(self, key: str) -> bool:
+        """Whether a write of ``key`` failed since the last call (the instance needs a new snapshot)."""
+        with self._lock:
+            if key in self._broken:
+                self._broken.discard(key)
+                return True
+            return False
+
+    def wait(self, keys: Optional[Iterable[str]] = None, timeout: Optional[float] = None) -> None:
+        """Wait for the queued writes of ``keys`` (default: all), without raising their errors."""
+        with self._lock:
+            if keys is None:
+                futures = list(self._last.values())
+            else:
+                futures = [self._last[key] for key in keys if key in self._last]
+        if futures:
+            wait_futures(futures, timeout=timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until every queued write is on disk.
+
+        Raises:
+            JournalWriteError: If writes failed since the last flush
+        """
+        self.wait(timeout=timeout)
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise JournalWriteError(f"{len(errors)} plan write(s) failed: " + "; ".join(errors))
@@ -0,0 +1,141 @@
+"""
+Plan Index
+
+Per-project summary of the plans stored under ``projects/<project>/plans``.
+
+The index keeps the status, creation time and ``plan.yml`` modification
+time of every plan in memory and in ``plans/index.json``, so questions like
+"which is the latest active plan" do not need to parse every plan file.
+It is reconciled with the plans directory whenever the directory's mtime
+changes (plans added or removed by another process).
+"""
+
+import os
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+ACTIVE_STATUSES = ("created", "running")
+
+_UNKNOWN = object()
+
+
+class PlanIndex:
+    """Index of plan summaries for one project's plans directory."""
+
+    def __init__(self, plans_dir: Path, read_summary: Callable[[Path], Optional[Dict[str, Any]]]):
+        """
+        Initialize the index.
+
+        Args:
+            plans_dir: Directory holding one sub-directory per plan
+            read_summary: Reads {"status", "created_at"} from a plan.yml (used for
+                plans that are not indexed yet)
+        """
+        self.plans_dir = plans_dir
+        self.read_summary = read_summary
+        # plan id -> {"status": str, "created_at": str (ISO), "mtime": float}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dir_mtime: Optional[float] = None
+        self._latest_active: Any = _UNKNOWN
+        self._load()
+
+    @property
+    def index_path(self) -> Path:
+        return self.plans_dir / INDEX_FILE
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get("plans", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Rebuilding unreadable plan index {self.index_path}: {e}")
+            self.entries = {}
+
+    def _save(self):
+        try:
+            self.plans_dir.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=str(self.plans_dir), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"plans": self.entries}, f, ensure_ascii=False)
+            os.replace(temp_name, self.index_path)
+        except OSError as e:
+            logger.warning(f"Failed to write plan index {self.index_path}: {e}")
+
+    def refresh(self):
+        """Reconcile with the plans directory if plans were added or removed."""
+        try:
+            dir_mtime = self.plans_dir.stat().st_mtime
+        except OSError:
+            if self.entries:
+                self.entries = {}
+                self._latest_active = _UNKNOWN
+            return
+        if dir_mtime == self._dir_mtime:
+            return
+
+        # On the first refresh, also re-check plans edited while the index was not loaded
+        verify_all = self._dir_mtime is None
+        changed = False
+        plan_ids = {d.name for d in self.plans_dir.iterdir() if d.is_dir()}
+        for plan_id in list(self.entries):
+            if plan_id not in plan_ids:
+                del self.entries[plan_id]
+                changed = True
+        for plan_id in plan_ids:
+            if plan_id in self.entries and not verify_all:
+                continue
+            plan_path = self.plans_dir / plan_id / "plan.yml"
+            try:
+                mtime = plan_path.stat().st_mtime
+            except OSError:
+                continue
+            entry = self.entries.get(plan_id)
+            if entry is not None and entry.get("mtime") == mtime:
+                continue
+            summary = self.read_summary(plan_path)
+            if summary is not None:
+                self.entries[plan_id] = dict(summary, mtime=mtime)
+                changed = True
+        if changed:
+            self._latest_active = _UNKNOWN
+            self._save()
+        # Stat again: writing the index touches the directory
+        self._dir_mtime = self.plans_dir.stat().st_mtime
+
+    def update(self, plan_id: str, status: str, created_at: str, mtime: float):
+        """Record the summary of a plan that was just written."""
+        entry = {"status": status, "created_at": created_at, "mtime": mtime}
+        if self.entries.get(plan_id) == entry:
+            return
+        self.entries[plan_id] = entry
+        self._latest_active = _UNKNOWN
+        self._save()
+        try:
+            self._dir_mtime = self.plans_dir.stat().st_mtime
+        except OSError:
+            self._dir_mtime = None
+
+    def remove(self, plan_id: str):
+        """Forget a plan whose plan.yml is gone."""
+        if self.entries.pop(plan_id, None) is not None:
+            self._latest_active = _UNKNOWN
+            self._save()
+
+    def latest_active(self) -> Optional[str]:
+        """Id of the most recently created plan with an active status."""
+        if self._latest_active is _UNKNOWN:
+            active = [(entry["created_at"], plan_id) for plan_id, entry in self.entries.items()
+                      if entry["status"] in ACTIVE_STATUSES]
+            self._latest_active = max(active)[1] if active else None
+        return self._latest_active
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -1,4 +1,5 @@
 import os
+import copy
 import json
 import yaml
 import tempfile
@@ -10,6 +11,10 @@ from datetime import datetime
 import shutil
 
 from .models import Plan, PlanInstance, PlanTask, PlanStatus, TaskStatus
+from .plan_index import PlanIndex
+from .journal import (
+    EVENT_PLAN, EVENT_TASK, JournalWriter, append_event, read_journal, write_snapshot
+)
 from .signals import plan_signal_manager
 
 
@@ -23,6 +28,9 @@ class PlanService:
     _instance = None
     _lock = Lock()
 
+    # A journal is compacted into a new snapshot after max(this, 2 * tasks) events
+    JOURNAL_COMPACT_MIN_EVENTS = 64
+
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
@@ -35,6 +43,13 @@ class PlanService:
         if not self._initialized:
             # Default path for backward compatibility
             self.flow_storage_dir = Path("workspace/agent/plan/flow")
+            # plans directory -> PlanIndex
+            self._plan_indexes: Dict[str, PlanIndex] = {}
+            # plan.yml path -> (mtime, Plan)
+            self._plan_cache: Dict[str, Tuple[float, Plan]] = {}
+            self._journal_writer = JournalWriter()
+            # snapshot path -> {"seq": last journal seq, "pending": events since the snapshot}
+            self._journal_state: Dict[str, Dict[str, int]] = {}
             self._initialized = True
 
     def set_workspace(self, workspace):
@@ -56,6 +71,7 @@ class PlanService:
         2. All its dependencies (in the 'needs' list) are COMPLETED
         """
         ready_tasks = []
+        tasks_by_id = {t.id: t for t in plan_instance.tasks}
 
         for task in plan_instance.tasks:
             if task.status != TaskStatus.CREATED:
@@ -64,7 +80,7 @@ class PlanService:
             # Check if all dependencies are completed
             all_deps_satisfied = True
             for dep_task_id in task.needs:
-                dep_task = next((t for t in plan_instance.tasks if t.id == dep_task_id), None)
+                dep_task = tasks_by_id.get(dep_task_id)
                 if not dep_task or dep_task.status != TaskStatus.COMPLETED:
                     all_deps_satisfied = False
                     break
@@ -92,8 +108,15 @@ class PlanService:
         if error_message:
             task.error_message = error_message
 
-        # Save the updated instance
-        self._save_plan_instance(plan_instance)
+        # Record the transition in the instance journal
+        self._journal_event(plan_instance, {
+            "type": EVENT_TASK,
+            "task_id": task.id,
+            "status": task.status.value,
+            "started_at": task.started_at.isoformat() if task.started_at else None,
+            "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+            "error_message": task.error_message,
+        })
 
         # Emit signal for task status update
         plan_signal_manager.task_status_updated.emit(
@@ -115,8 +138,16 @@ class PlanService:
         elif new_status in [PlanStatus.COMPLETED, PlanStatus.FAILED, PlanStatus.CANCELLED]:
             plan_instance.completed_at = datetime.now()
 
-        # Save the updated instance
-        self._save_plan_instance(plan_instance)
+        if new_status in [PlanStatus.COMPLETED, PlanStatus.FAILED, PlanStatus.CANCELLED]:
+            # Finished instances are stored as a single snapshot
+            self._save_plan_instance(plan_instance)
+        else:
+            self._journal_event(plan_instance, {
+                "type": EVENT_PLAN,
+                "status": new_status.value,
+                "started_at": plan_instance.started_at.isoformat() if plan_instance.started_at else None,
+                "completed_at": None,
+            })
 
         # Emit signal for plan instance status update
         plan_signal_manager.plan_instance_status_updated.emit(
@@ -127,14 +158,8 @@ class PlanService:
 
         return True
     
-    def _get_flow_dir(self, project_name: str, plan_id: str) -> Path:
-        """Get the directory path for a specific plan.
-
-        Args:
-            project_name: Name of the project (used as identifier)
-            plan_id: Unique ID of the plan
-        """
-        # Create directory structure as workspace/projects/项目名/plans
+    def _get_project_plans_dir(self, project_name: str) -> Path:
+        """Get the plans directory of a project (workspace/projects/项目名/plans)."""
         # Find the workspace root directory by traversing up the path
         current_path = self.flow_storage_dir.resolve()
         workspace_path = None
@@ -152,9 +177,46 @@ class PlanService:
             # Fallback to the original approach if we can't find workspace
             project_plans_dir = self.flow_storage_dir.parent / "projects" / project_name / "plans"
 
+        return project_plans_dir
+
+    def _get_flow_dir(self, project_name: str, plan_id: str) -> Path:
+        """Get the directory path for a specific plan.
+
+        Args:
+            project_name: Name of the project (used as identifier)
+            plan_id: Unique ID of the plan
+        """
+        project_plans_dir = self._get_project_plans_dir(project_name)
         project_plans_dir.mkdir(parents=True, exist_ok=True)
         return project_plans_dir / plan_id
 
+    def _get_plan_index(self, project_name: str) -> PlanIndex:
+        """Get the (refreshed) plan index of a project."""
+        plans_dir = self._get_project_plans_dir(project_name)
+        index = self._plan_indexes.get(str(plans_dir))
+        if index is None:
+            index = PlanIndex(plans_dir, self._read_plan_summary)
+            self._plan_indexes[str(plans_dir)] = index
+        index.refresh()
+        return index
+
+    @staticmethod
+    def _read_plan_summary(plan_path: Path) -> Optional[Dict]:
+        try:
+            with open(plan_path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f)
+            return {"status": data.get('status', 'created'), "created_at": data['created_at']}
+        except Exception:
+            return None
+
+    def _remember_plan(self, plan: Plan, plan_path: Path) -> None:
+        """Cache a plan that was just read or written and update the project index."""
+        mtime = plan_path.stat().st_mtime
+        self._plan_cache[str(plan_path)] = (mtime, copy.deepcopy(plan))
+        index = self._plan_indexes.get(str(plan_path.parent.parent))
+        if index is not None:
+            index.update(plan.id, plan.status.value, plan.created_at.isoformat(), mtime)
+
     def _save_plan(self, plan: Plan) -> None:
         """Save a Plan to disk atomically."""
         plan_dir = self._get_flow_dir(plan.project_name, plan.id)
@@ -197,10 +259,18 @@ class PlanService:
                 os.remove(temp_file.name)
             raise
 
+        self._get_plan_index(plan.project_name)
+        self._remember_plan(plan, target_path)
+
+    def _get_plan_instance_path(self, project_name: str, plan_id: str, instance_id: str) -> Path:
+        # Use the instance_id as the filename to support multiple instances
+        return self._get_flow_dir(project_name, plan_id) / f"plan_instance_{instance_id}.yml"
+
     def _save_plan_instance(self, plan_instance: PlanInstance) -> None:
-        """Save a PlanInstance to disk atomically."""
+        """Write a snapshot of a PlanInstance (in the background) and reset its journal."""
         plan_dir = self._get_flow_dir(plan_instance.project_name, plan_instance.plan_id)
         plan_dir.mkdir(parents=True, exist_ok=True)
+        target_path = plan_dir / f"plan_instance_{plan_instance.instance_id}.yml"
 
         # Prepare data for serialization
         instance_data = asdict(plan_instance)
@@ -220,27 +290,41 @@ class PlanService:
             task_dict['status'] = task.status.value  # Convert enum to string
             instance_data['tasks'].append(task_dict)
 
-        # Write to temporary file first
-        temp_file = tempfile.NamedTemporaryFile(
-            mode='w',
-            delete=False,
-            dir=plan_dir,
-            suffix='.tmp'
+        state = self._journal_state.setdefault(str(target_path), {"seq": 0, "pending": 0})
+        instance_data['journal_seq'] = state["seq"]
+        state["pending"] = 0
+
+        # YAML serialisation and the atomic move happen on the writer thread
+        self._journal_writer.submit(str(target_path), write_snapshot, target_path, instance_data)
+
+    def _journal_event(self, plan_instance: PlanInstance, event: Dict) -> None:
+        """Append a state transition to the instance journal, compacting it when it grows too long."""
+        target_path = self._get_plan_instance_path(
+            plan_instance.project_name, plan_instance.plan_id, plan_instance.instance_id
         )
+        state = self._journal_state.get(str(target_path))
+        if state is None or self._journal_writer.take_broken(str(target_path)):
+            # Unknown journal position (e.g. instance created by another process) or a
+            # failed write left a gap in the journal: start over from a full snapshot
+            self._save_plan_instance(plan_instance)
+            return
 
-        try:
-            yaml.dump(instance_data, temp_file, default_flow_style=False, allow_unicode=True)
-            temp_file.close()
+        state["seq"] += 1
+        state["pending"] += 1
+        event = {"seq": state["seq"], "at": datetime.now().isoformat(), **event}
+        self._journal_writer.submit(str(target_path), append_event, target_path, event)
 
-            # Atomically move the temporary file to the target location
-            # Use the instance_id as the filename to support multiple instances
-            target_path = plan_dir / f"plan_instance_{plan_instance.instance_id}.yml"
-            shutil.move(temp_file.name, target_path)
-        except Exception:
-            # Clean up the temporary file if something went wrong
-            if os.path.exists(temp_file.name):
-                os.remove(temp_file.name)
-            raise
+        if state["pending"] >= max(self.JOURNAL_COMPACT_MIN_EVENTS, 2 * len(plan_instance.tasks)):
+            self._save_plan_instance(plan_instance)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until all pending plan instance writes are on disk.
+
+        Raises:
+            JournalWriteError: If plan instance writes failed since the last flush
+        """
+        self._journal_writer.flush(timeout)
 
     def start_plan_execution(self, plan_instance: PlanInstance) -> bool:
         """
@@ -283,12 +367,13 @@ class PlanService:
             return False
 
         # Check if there are any tasks that become ready due to this completion
+        tasks_by_id = {t.id: t for t in plan_instance.tasks}
         for task in plan_instance.tasks:
             if task.status == TaskStatus.CREATED:
                 # Check if all dependencies are now satisfied
                 all_deps_satisfied = True
                 for dep_task_id in task.needs:
-                    dep_task = next((t for t in plan_instance.tasks if t.id == dep_task_id), None)
+                    dep_task = tasks_by_id.get(dep_task_id)
                     if not dep_task or dep_task.status != TaskStatus.COMPLETED:
                         all_deps_satisfied = False
                         break
@@ -448,9 +533,17 @@ class PlanService:
         plan_dir = self._get_flow_dir(project_name, plan_id)
         plan_path = plan_dir / "plan.yml"
 
-        if not plan_path.exists():
+        try:
+            mtime = plan_path.stat().st_mtime
+        except OSError:
+            self._plan_cache.pop(str(plan_path), None)
             return None
 
+        cached = self._plan_cache.get(str(plan_path))
+        if cached and cached[0] == mtime:
+            # Callers may modify the plan; hand out a copy
+            return copy.deepcopy(cached[1])
+
         with open(plan_path, 'r', encoding='utf-8') as f:
             data = yaml.safe_load(f)
 
@@ -486,8 +579,17 @@ class PlanService:
             metadata=data.get('metadata', {})
         )
 
+        self._remember_plan(plan, plan_path)
         return plan
 
+    def get_plan_mtime(self, project_name: str, plan_id: str) -> Optional[float]:
+        """Get the modification time of a plan's plan.yml, or None if it does not exist."""
+        plan_path = self._get_flow_dir(project_name, plan_id) / "plan.yml"
+        try:
+            return plan_path.stat().st_mtime
+        except OSError:
+            return None
+
     def update_plan(
         self,
         project_name: str,
@@ -622,8 +724,10 @@ class PlanService:
             plan_id: ID of the plan
             instance_id: ID of the plan instance
         """
-        plan_dir = self._get_flow_dir(project_name, plan_id)
-        plan_instance_path = plan_dir / f"plan_instance_{instance_id}.yml"
+        plan_instance_path = self._get_plan_instance_path(project_name, plan_id, instance_id)
+
+        # Make sure queued writes of this instance are visible (no wait when there are none)
+        self._journal_writer.wait([str(plan_instance_path)])
 
         if not plan_instance_path.exists():
             return None
@@ -666,7 +770,36 @@ class PlanService:
             metadata=data.get('metadata', {})
         )
 
+        # Replay the transitions recorded after the snapshot
+        snapshot_seq = data.get('journal_seq', 0)
+        events = read_journal(plan_instance_path, snapshot_seq)
+        self._apply_journal(plan_instance, events)
+        self._journal_state[str(plan_instance_path)] = {
+            "seq": events[-1]["seq"] if events else snapshot_seq,
+            "pending": len(events),
+        }
+
         return plan_instance
+
+    @staticmethod
+    def _apply_journal(plan_instance: PlanInstance, events: List[Dict]) -> None:
+        def parse_time(value):
+            return datetime.fromisoformat(value) if value else None
+
+        tasks_by_id = {t.id: t for t in plan_instance.tasks}
+        for event in events:
+            if event.get("type") == EVENT_TASK:
+                task = tasks_by_id.get(event.get("task_id"))
+                if task is None:
+                    continue
+                task.status = TaskStatus(event["status"])
+                task.started_at = parse_time(event.get("started_at"))
+                task.completed_at = parse_time(event.get("completed_at"))
+                task.error_message = event.get("error_message")
+            elif event.get("type") == EVENT_PLAN:
+                plan_instance.status = PlanStatus(event["status"])
+                plan_instance.started_at = parse_time(event.get("started_at"))
+                plan_instance.completed_at = parse_time(event.get("completed_at"))
     
     def get_all_plans_for_project(self, project_name: str) -> List[Plan]:
         """Get all Plans for a specific project.
@@ -674,31 +807,10 @@ class PlanService:
         Args:
             project_name: Name of the project (used as identifier)
         """
-        # Use the project-specific plans directory
-        current_path = self.flow_storage_dir.resolve()
-        workspace_path = None
-
-        # Look for 'workspace' directory in the path hierarchy
-        for parent in current_path.parents:
-            if parent.name == 'workspace':
-                workspace_path = parent
-                break
-
-        if workspace_path:
-            project_plans_dir = workspace_path / "projects" / project_name / "plans"
-        else:
-            # Fallback to the original approach if we can't find workspace
-            project_plans_dir = self.flow_storage_dir.parent / "projects" / project_name / "plans"
-
-        if not project_plans_dir.exists():
-            return []
-
-        # Get all plan directories in the project's plans folder
-        plan_dirs = [d for d in project_plans_dir.iterdir() if d.is_dir()]
+        index = self._get_plan_index(project_name)
 
         plans = []
-        for plan_dir in plan_dirs:
-            plan_id = plan_dir.name  # Plan ID is now the directory name
+        for plan_id in list(index.entries):
             plan = self.load_plan(project_name, plan_id)
             if plan:
                 plans.append(plan)
@@ -713,6 +825,9 @@ class PlanService:
             plan_id: ID of the plan
         """
         plan_dir = self._get_flow_dir(project_name, plan_id)
+        # Wait for queued snapshots of new instances so their files can be found
+        prefix = str(plan_dir / "plan_instance_")
+        self._journal_writer.wait([path for path in self._journal_state if path.startswith(prefix)])
 
         instances = []
         if plan_dir.exists():
@@ -742,17 +857,21 @@ class PlanService:
         Returns:
             Plan if the most recent plan is active, otherwise None
         """
-        plans = self.get_all_plans_for_project(project_name)
-        if not plans:
-            return None
-
-        # Sort plans by creation date, most recent first
-        sorted_plans = sorted(plans, key=lambda p: p.created_at, reverse=True)
+        index = self._get_plan_index(project_name)
 
-        # Return the first plan that is in an active state (CREATED or RUNNING)
-        for plan in sorted_plans:
+        # The index tracks status and creation time of every plan, so only the
+        # candidate's plan.yml is read (and only if it changed since it was cached)
+        while True:
+            plan_id = index.latest_active()
+            if plan_id is None:
+                return None
+            plan = self.load_plan(project_name, plan_id)
+            if plan is None:
+                index.remove(plan_id)
+                continue
             if plan.status in [PlanStatus.CREATED, PlanStatus.RUNNING]:
                 return plan
+            # The entry was stale (plan changed outside this service)
+            entry = index.entries[plan_id]
+            index.update(plan_id, plan.status.value, plan.created_at.isoformat(), entry["mtime"])
 
-        # If no active plan is found, return None
-        return None
\ No newline at end of file
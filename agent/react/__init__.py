@@ -11,6 +11,7 @@ from .types import (
     ActionType,
     ReactAction,
     ToolAction,
+    ToolCall,
     FinalAction,
     ErrorAction,
     ReactActionParser,
@@ -30,6 +31,7 @@ __all__ = [
     "ActionType",
     "ReactAction",
     "ToolAction",
+    "ToolCall",
     "FinalAction",
     "ErrorAction",
     "ReactActionParser",
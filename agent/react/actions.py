@@ -2,7 +2,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 
 class ActionType(str, Enum):
@@ -68,21 +68,43 @@ class ReactAction(ABC):
         return "Processing action"
 
 
+@dataclass(frozen=True)
+class ToolCall:
+    """
+    One tool invocation requested by a tool action.
+
+    Attributes:
+        tool_name: Name of the tool to invoke
+        tool_args: Arguments to pass to the tool
+        call_id: Identifies the call in tool events and observations (assigned by React)
+    """
+    tool_name: str = ""
+    tool_args: Dict[str, Any] = None
+    call_id: str = ""
+
+    def __post_init__(self):
+        if self.tool_args is None:
+            object.__setattr__(self, 'tool_args', {})
+
+
 @dataclass(frozen=True)
 class ToolAction(ReactAction):
     """
-    Action that invokes a tool/function.
+    Action that invokes one or more tools/functions.
 
     Attributes:
         type: Action type (always TOOL)
-        tool_name: Name of the tool to invoke
+        tool_name: Name of the tool to invoke (the first call's when several are requested)
         tool_args: Arguments to pass to the tool
         thinking: The agent's thinking process
+        tool_calls: All tool calls of the step, executed concurrently (empty for
+            a single call given by tool_name/tool_args)
     """
     type: str = ActionType.TOOL.value
     tool_name: str = ""
     tool_args: Dict[str, Any] = None
     thinking: Optional[str] = None
+    tool_calls: Tuple[ToolCall, ...] = ()
 
     def __post_init__(self):
         if self.tool_args is None:
@@ -91,6 +113,12 @@ class ToolAction(ReactAction):
     def get_thinking(self) -> Optional[str]:
         return self.thinking
 
+    def get_tool_calls(self) -> Tuple[ToolCall, ...]:
+        """Get the tool calls of this action."""
+        if self.tool_calls:
+            return self.tool_calls
+        return (ToolCall(tool_name=self.tool_name, tool_args=self.tool_args),)
+
     def to_event_payload(self, **kwargs) -> Dict[str, Any]:
         """Build event payload for tool action."""
         payload = super().to_event_payload(**kwargs)
@@ -102,32 +130,52 @@ class ToolAction(ReactAction):
 
     def get_summary(self) -> str:
         """Get summary for tool action."""
+        if len(self.tool_calls) > 1:
+            return f"Executing tools: {', '.join(call.tool_name for call in self.tool_calls)}"
         if self.tool_name:
             return f"Executing tool: {self.tool_name}"
         return "Executing tool"
 
-    def to_start_payload(self) -> Dict[str, Any]:
-        """Build payload for tool start event."""
-        return self.to_event_payload()
+    def to_start_payload(self, call: Optional[ToolCall] = None) -> Dict[str, Any]:
+        """Build payload for tool start event (of one call if given)."""
+        payload = self.to_event_payload()
+        if call is not None:
+            payload.update({
+                "tool_name": call.tool_name,
+                "tool_args": call.tool_args,
+                "call_id": call.call_id,
+            })
+        return payload
 
-    def to_end_payload(self, result: Any = None, ok: bool = True, error: Optional[str] = None) -> Dict[str, Any]:
-        """Build payload for tool end event."""
+    def to_end_payload(
+        self,
+        result: Any = None,
+        ok: bool = True,
+        error: Optional[str] = None,
+        call: Optional[ToolCall] = None,
+    ) -> Dict[str, Any]:
+        """Build payload for tool end event (of one call if given)."""
         payload = {
-            "tool_name": self.tool_name,
+            "tool_name": call.tool_name if call is not None else self.tool_name,
             "ok": ok,
         }
+        if call is not None:
+            payload["call_id"] = call.call_id
         if ok and result is not None:
             payload["result"] = result
         if not ok and error:
             payload["error"] = error
         return payload
 
-    def to_progress_payload(self, progress: Any) -> Dict[str, Any]:
-        """Build payload for tool progress event."""
-        return {
-            "tool_name": self.tool_name,
+    def to_progress_payload(self, progress: Any, call: Optional[ToolCall] = None) -> Dict[str, Any]:
+        """Build payload for tool progress event (of one call if given)."""
+        payload = {
+            "tool_name": call.tool_name if call is not None else self.tool_name,
             "progress": progress,
         }
+        if call is not None:
+            payload["call_id"] = call.call_id
+        return payload
 
 
 @dataclass(frozen=True)
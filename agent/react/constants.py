@@ -20,3 +20,7 @@ class ReactConfig:
     DEFAULT_MAX_INSTANCES = 100
     DEFAULT_TEMPERATURE = 0.7
     DEFAULT_TIMEOUT_SECONDS = 300  # 5 minutes
+    DEFAULT_MAX_CONTEXT_TOKENS = 32000
+    DEFAULT_COMPACT_TARGET_RATIO = 0.75
+    DEFAULT_KEEP_RECENT_STEPS = 4
+    DEFAULT_COMPACTED_OBSERVATION_CHARS = 400
@@ -0,0 +1,236 @@
+"""
+Context management for ReAct runs.
+
+Keeps the prompt of a long ReAct run bounded and cache friendly:
+
+- The prompt prefix (tool catalogue + ``react_global_template``) is rendered
+  once per tool set and language and reused verbatim by every run, so
+  providers with prompt-prefix caching only process it once.
+- Every message is counted against a token budget.
+- When the budget is exceeded, old observations are truncated (and, if that
+  is not enough, old steps are dropped) until the context is back under a
+  lower watermark. Compacting below the budget means it happens rarely, so
+  the prompt stays stable between compactions.
+"""
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import litellm
+
+from .constants import ReactConfig
+
+logger = logging.getLogger(__name__)
+
+OBSERVATION_PREFIX = "Observation: "
+ERROR_PREFIX = "Error: "
+COMPACTED_MARKER = "[compacted]"
+DROPPED_STEPS_TEMPLATE = "[{count} earlier messages were removed to fit the context window]"
+
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class ReactContext:
+    """Builds the ReAct prompt prefix and keeps a run's messages within a token budget."""
+
+    # (tool names, language) -> rendered prompt prefix
+    _prefix_cache: Dict[Tuple[Tuple[str, ...], str], str] = {}
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        max_tokens: int = ReactConfig.DEFAULT_MAX_CONTEXT_TOKENS,
+        target_ratio: float = ReactConfig.DEFAULT_COMPACT_TARGET_RATIO,
+        keep_recent_steps: int = ReactConfig.DEFAULT_KEEP_RECENT_STEPS,
+        observation_chars: int = ReactConfig.DEFAULT_COMPACTED_OBSERVATION_CHARS,
+    ):
+        """
+        Initialize the context manager.
+
+        Args:
+            model: Model used to count tokens (falls back to an estimate)
+            max_tokens: Token budget of the messages sent to the LLM
+            target_ratio: Fraction of the budget to compact down to
+            keep_recent_steps: Number of most recent steps never compacted
+            observation_chars: Characters kept of a compacted observation
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+        self.target_tokens = int(max_tokens * target_ratio)
+        self.keep_recent_steps = keep_recent_steps
+        self.observation_chars = observation_chars
+        self.compactions = 0
+        self.last_prompt_tokens = 0
+        self._token_cache: Dict[str, int] = {}
+
+    @classmethod
+    def get_prompt_prefix(cls, tool_service, tool_names: List[str], language: str) -> Optional[str]:
+        """
+        Get the rendered tool catalogue and response format instructions.
+
+        Args:
+            tool_service: ToolService providing tool metadata
+            tool_names: Names of the tools available to the run
+            language: Prompt language
+
+        Returns:
+            The prompt prefix, or None if the template is missing
+        """
+        key = (tuple(tool_names), language)
+        prefix = cls._prefix_cache.get(key)
+        if prefix is None:
+            from agent.prompt.prompt_service import prompt_service
+            prefix = prompt_service.render_prompt(
+                name="react_global_template",
+                language=language,
+                tools_formatted=cls._format_tools(tool_service, tool_names),
+            )
+            if prefix is None:
+                return None
+            prefix = prefix.strip()
+            cls._prefix_cache[key] = prefix
+        return prefix
+
+    @classmethod
+    def clear_prefix_cache(cls):
+        """Forget rendered prefixes (after tools or templates changed)."""
+        cls._prefix_cache.clear()
+
+    @staticmethod
+    def _format_tools(tool_service, tool_names: List[str]) -> str:
+        """Format tool metadata as markdown with JSON argument schemas."""
+        tools_formatted = ""
+        for tool_name in tool_names:
+            metadata = tool_service.get_tool_metadata(tool_name)
+            tools_formatted += f"### {metadata.name}\n"
+            tools_formatted += f"**Description**: {metadata.description}\n\n"
+
+            if metadata.parameters:
+                tools_formatted += "**Arguments**:\n"
+                tools_formatted += "```json\n"
+                args_schema = {
+                    "type": "object",
+                    "properties": {
+                        p.name: {
+                            "type": p.param_type,
+                            "description": p.description
+                        } for p in metadata.parameters
+                    },
+                    "required": [p.name for p in metadata.parameters if p.required]
+                }
+                tools_formatted += json.dumps(args_schema, indent=2)
+                tools_formatted += "\n```\n\n"
+        return tools_formatted
+
+    def reset(self):
+        """Start tracking a new run."""
+        self._token_cache.clear()
+        self.compactions = 0
+        self.last_prompt_tokens = 0
+
+    def count_tokens(self, message: Dict[str, str]) -> int:
+        """Count the tokens of one message (memoized by content)."""
+        content = message.get("content") or ""
+        tokens = self._token_cache.get(content)
+        if tokens is None:
+            if self.model:
+                try:
+                    tokens = litellm.token_counter(model=self.model, text=content)
+                except Exception as e:
+                    logger.debug(f"Token counting failed for model {self.model}: {e}")
+            if tokens is None:
+                tokens = len(content) // 4 + 1
+            self._token_cache[content] = tokens
+        return tokens + MESSAGE_OVERHEAD_TOKENS
+
+    def total_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """Count the tokens of a message list."""
+        return sum(self.count_tokens(m) for m in messages)
+
+    @staticmethod
+    def is_observation(message: Dict[str, str]) -> bool:
+        """Check whether a message is a tool observation (not real user input)."""
+        content = message.get("content") or ""
+        return message.get("role") == "user" and (
+            content.startswith(OBSERVATION_PREFIX) or content.startswith(ERROR_PREFIX)
+        )
+
+    def prepare(self, messages: List[Dict[str, str]]) -> int:
+        """
+        Compact messages in place if they exceed the budget.
+
+        Call before every LLM request.
+
+        Args:
+            messages: The run's messages; the first (the prompt) is never compacted
+
+        Returns:
+            Number of prompt tokens after compaction
+        """
+        total = self.total_tokens(messages)
+        if total > self.max_tokens:
+            before = total
+            total = self._compact(messages, total)
+            self.compactions += 1
+            logger.info(f"Compacted ReAct context from {before} to {total} tokens")
+        self.last_prompt_tokens = total
+        return total
+
+    def _compact(self, messages: List[Dict[str, str]], total: int) -> int:
+        # Steps are assistant + observation pairs; keep the most recent ones intact
+        protected_from = max(1, len(messages) - 2 * self.keep_recent_steps)
+
+        # Pass 1: truncate old observations, oldest first
+        for idx in range(1, protected_from):
+            if total <= self.target_tokens:
+                return total
+            message = messages[idx]
+            if not self.is_observation(message) or message["content"].endswith(COMPACTED_MARKER):
+                continue
+            content = message["content"]
+            if len(content) <= self.observation_chars:
+                continue
+            before = self.count_tokens(message)
+            omitted = len(content) - self.observation_chars
+            messages[idx] = {
+                "role": message["role"],
+                "content": f"{content[:self.observation_chars]}... ({omitted} characters omitted) {COMPACTED_MARKER}",
+            }
+            total += self.count_tokens(messages[idx]) - before
+        if total <= self.target_tokens:
+            return total
+
+        # Pass 2: drop the oldest steps, keeping real user messages
+        dropped = 0
+        idx = 1
+        if idx < len(messages) and self._dropped_count(messages[idx]) is not None:
+            dropped = self._dropped_count(messages[idx])
+            total -= self.count_tokens(messages[idx])
+            del messages[idx]
+            protected_from -= 1
+        while total > self.target_tokens and idx < protected_from:
+            message = messages[idx]
+            if message.get("role") == "assistant" or self.is_observation(message):
+                total -= self.count_tokens(message)
+                del messages[idx]
+                protected_from -= 1
+                dropped += 1
+            else:
+                idx += 1
+        if dropped:
+            marker = {"role": "user", "content": DROPPED_STEPS_TEMPLATE.format(count=dropped)}
+            messages.insert(1, marker)
+            total += self.count_tokens(marker)
+        return total
+
+    @staticmethod
+    def _dropped_count(message: Dict[str, str]) -> Optional[int]:
+        """Number of dropped messages recorded by a marker message, or None."""
+        prefix, _, suffix = DROPPED_STEPS_TEMPLATE.partition("{count}")
+        content = message.get("content") or ""
+        if message.get("role") == "user" and content.startswith(prefix) and content.endswith(suffix):
+            count = content[len(prefix):len(content) - len(suffix)]
+            if count.isdigit():
+                return int(count)
+        return None
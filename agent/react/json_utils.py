@@ -1,7 +1,7 @@
 """JSON utility functions for extracting JSON from LLM responses."""
 import json
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 
 class JsonExtractor:
@@ -94,6 +94,70 @@ class JsonExtractor:
         return None
 
 
+class IncrementalJsonParser:
+    """
+    Finds JSON objects in text that arrives in pieces (streamed LLM output).
+
+    Each piece is scanned once; string literals and escapes are tracked so that
+    braces inside strings do not affect nesting. ``feed`` returns the parsed
+    object as soon as its closing brace arrives.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Scan the next piece of text.
+
+        Args:
+            text: Text following everything fed so far
+
+        Returns:
+            The first JSON object completed by this piece, or None. Text after
+            the returned object is not scanned.
+        """
+        start = 0
+        if self._depth == 0:
+            start = text.find("{")
+            if start == -1:
+                return None
+        for idx in range(start, len(text)):
+            ch = text[idx]
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._buffer = ["{"]
+                    start = idx + 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buffer.append(text[start:idx + 1])
+                    candidate = "".join(self._buffer)
+                    self._buffer = []
+                    payload = JsonExtractor.safe_json_load(candidate)
+                    if payload is not None:
+                        return payload
+        if self._depth > 0:
+            self._buffer.append(text[start:])
+        return None
+
+
 # Convenience function for backward compatibility
 def extract_json_payload(text: str) -> Optional[Dict[str, Any]]:
     """Extract JSON payload from text.
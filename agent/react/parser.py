@@ -1,7 +1,7 @@
 """Parser for converting LLM responses into ReactAction objects."""
 from typing import Any, Dict, Optional
 
-from .actions import ActionType, ReactAction, ToolAction, FinalAction, ErrorAction
+from .actions import ActionType, ReactAction, ToolAction, ToolCall, FinalAction, ErrorAction
 from .constants import StopReason, ReactConfig
 from .json_utils import JsonExtractor
 
@@ -17,6 +17,7 @@ class ReactActionParser:
     TYPE_ALIASES = ["type", "action"]
     TOOL_NAME_ALIASES = ["tool_name", "name", "tool"]
     TOOL_ARGS_ALIASES = ["tool_args", "arguments", "args", "input"]
+    TOOL_CALLS_ALIASES = ["tool_calls", "calls"]
     FINAL_ALIASES = ["final", "response", "answer", "output"]
     THINKING_ALIASES = ["thinking", "thought", "reasoning", "reasoning"]
 
@@ -113,20 +114,48 @@ class ReactActionParser:
             # Unknown or missing action type, default to final
             return cls._parse_final_action(payload, response_text, stop_reason=StopReason.UNKNOWN_TYPE.value)
 
+    @classmethod
+    def is_action_payload(cls, payload: Dict[str, Any]) -> bool:
+        """Check whether a JSON object carries an action type (and is not e.g. a tool argument example)."""
+        return cls._get_field(payload, cls.TYPE_ALIASES) is not None
+
     @classmethod
     def _parse_tool_action(cls, payload: Dict[str, Any]) -> ToolAction:
-        """Parse a tool action from the payload."""
+        """Parse a tool action (one call, or a list of calls) from the payload."""
+        thinking = cls._get_field(payload, cls.THINKING_ALIASES)
+        raw_calls = cls._get_field(payload, cls.TOOL_CALLS_ALIASES)
+
+        if isinstance(raw_calls, list):
+            tool_calls = tuple(
+                cls._parse_tool_call(raw_call) for raw_call in raw_calls if isinstance(raw_call, dict)
+            )
+            if tool_calls:
+                return ToolAction(
+                    tool_name=tool_calls[0].tool_name,
+                    tool_args=tool_calls[0].tool_args,
+                    thinking=thinking,
+                    tool_calls=tool_calls,
+                )
+
+        call = cls._parse_tool_call(payload)
+        return ToolAction(
+            tool_name=call.tool_name,
+            tool_args=call.tool_args,
+            thinking=thinking,
+        )
+
+    @classmethod
+    def _parse_tool_call(cls, payload: Dict[str, Any]) -> ToolCall:
+        """Parse one tool call from the payload."""
         tool_name = cls._get_field(payload, cls.TOOL_NAME_ALIASES, default="")
         tool_args = cls._get_field(payload, cls.TOOL_ARGS_ALIASES, default={})
-        thinking = cls._get_field(payload, cls.THINKING_ALIASES)
 
         if not isinstance(tool_args, dict):
             tool_args = {}
 
-        return ToolAction(
+        return ToolCall(
             tool_name=tool_name or "",
             tool_args=tool_args,
-            thinking=thinking,
         )
 
     @classmethod
@@ -3,11 +3,13 @@ import inspect
 import logging
 import time
 import uuid
-from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
+from dataclasses import replace
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
 
 from agent.llm.llm_service import LlmService
 from agent.tool.tool_service import ToolService
 from agent.tool.tool_context import ToolContext
+from utils.i18n_utils import translation_manager
 
 
 logger = logging.getLogger(__name__)
@@ -19,6 +21,7 @@ from .types import (
     CheckpointData,
     ReactAction,
     ToolAction,
+    ToolCall,
     FinalAction,
     ErrorAction,
     ReactActionParser,
@@ -26,6 +29,9 @@ from .types import (
     TodoState,
 )
 from .storage import ReactStorage
+from .json_utils import IncrementalJsonParser
+from .context import ReactContext
+from .constants import ReactConfig
 
 
 class React:
@@ -44,6 +50,8 @@ class React:
         llm_service: Optional[LlmService] = None,
         max_steps: int = 20,
         checkpoint_interval: int = 1,
+        max_context_tokens: int = ReactConfig.DEFAULT_MAX_CONTEXT_TOKENS,
+        tool_timeout: Optional[float] = None,
     ):
         self.workspace = workspace
         self.project_name = project_name
@@ -53,7 +61,12 @@ class React:
         self.llm_service = llm_service or LlmService(workspace)
         self.max_steps = max_steps
         self.checkpoint_interval = checkpoint_interval
+        self.tool_timeout = tool_timeout
         self.tool_service = ToolService()
+        self.context = ReactContext(
+            model=getattr(self.llm_service, "default_model", None),
+            max_tokens=max_context_tokens,
+        )
 
         if workspace and hasattr(workspace, "get_path"):
             self.workspace_root = workspace.get_path()
@@ -80,6 +93,10 @@ class React:
         self._total_tool_calls: int = 0
         self._llm_duration_ms: float = 0.0
         self._tool_duration_ms: float = 0.0
+        self._llm_ttft_ms: float = 0.0
+        self._llm_streamed_calls: int = 0
+        self._last_llm_ttft_ms: float = 0.0
+        self._last_llm_latency_ms: float = 0.0
 
         # TODO state
         self.todo_state = TodoState()
@@ -170,6 +187,10 @@ class React:
         self._total_tool_calls = 0
         self._llm_duration_ms = 0.0
         self._tool_duration_ms = 0.0
+        self._llm_ttft_ms = 0.0
+        self._llm_streamed_calls = 0
+        self._last_llm_ttft_ms = 0.0
+        self._last_llm_latency_ms = 0.0
 
         # Concatenate multiple user questions if present
         combined_question = "\n".join(user_questions) if user_questions else ""
@@ -177,161 +198,177 @@ class React:
         # Build the task context using the build_prompt_function
         task_context = self.build_prompt_function(combined_question)
 
-        # Format tools from ToolService for the prompt
-        import json
-        tools_formatted = ""
-        for tool_name in self.available_tool_names:
-            metadata = self.tool_service.get_tool_metadata(tool_name)
-            tools_formatted += f"### {metadata.name}\n"
-            tools_formatted += f"**Description**: {metadata.description}\n\n"
-
-            if metadata.parameters:
-                tools_formatted += "**Arguments**:\n"
-                tools_formatted += "```json\n"
-                args_schema = {
-                    "type": "object",
-                    "properties": {
-                        p.name: {
-                            "type": p.param_type,
-                            "description": p.description
-                        } for p in metadata.parameters
-                    },
-                    "required": [p.name for p in metadata.parameters if p.required]
-                }
-                tools_formatted += json.dumps(args_schema, indent=2)
-                tools_formatted += "\n```\n\n"
-
-        # Use the prompt service to render the template
-        from agent.prompt.prompt_service import prompt_service
-        user_prompt = prompt_service.render_prompt(
-            name="react_global_template",
-            tools_formatted=tools_formatted,
-            task_context=task_context
+        # The tool catalogue and response format come first and are identical
+        # for every run with the same tools and language (prefix caching)
+        prompt_prefix = ReactContext.get_prompt_prefix(
+            self.tool_service,
+            self.available_tool_names,
+            translation_manager.get_current_language(),
         )
-
-        if user_prompt is None:
+        if prompt_prefix is None:
             raise RuntimeError("Global ReAct prompt template 'react_global_template' not found. Please ensure the template exists in the prompt system.")
 
-        self.messages = [{"role": "user", "content": user_prompt}]
+        self.context.reset()
+        self.messages = [{"role": "user", "content": f"{prompt_prefix}\n\n{task_context}"}]
 
-    async def _call_llm(self, messages: List[Dict[str, str]]) -> str:
-        """Call LLM service with timing and metrics tracking.
+    async def _stream_llm(self, messages: List[Dict[str, str]]) -> AsyncGenerator[str, None]:
+        """Stream the LLM response as text deltas, with timing and metrics tracking.
 
-        Returns:
-            The content of the LLM response message.
+        Closing the generator early (once the action object is complete) closes
+        the underlying response stream.
+
+        Yields:
+            Pieces of the response content as they arrive.
+
+        Raises:
+            Exception: The LLM call failed, possibly after some pieces were yielded.
         """
         if not self.llm_service.validate_config():
             logger.warning("LLM service is not configured")
-            return '{"type": "final", "final": "LLM service is not configured."}'
+            yield '{"type": "final", "final": "LLM service is not configured."}'
+            return
 
-        loop = asyncio.get_event_loop()
         model_to_use = self.llm_service.default_model or "qwen-plus"
         temperature_to_use = getattr(self.llm_service, "temperature", 0.7)
 
         start_time = time.time()
+        first_token_time = None
+        response = None
         try:
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.llm_service.completion(
-                    model=model_to_use,
-                    messages=messages,
-                    temperature=temperature_to_use,
-                    stream=False,
-                ),
+            response = await self.llm_service.acompletion(
+                model=model_to_use,
+                messages=messages,
+                temperature=temperature_to_use,
+                stream=True,
             )
+            async for chunk in response:
+                delta = self.llm_service.extract_delta(chunk)
+                if not delta:
+                    continue
+                if first_token_time is None:
+                    first_token_time = time.time()
+                yield delta
+        except Exception as exc:
+            # Part of the response may already be out: fail the run instead of appending to it
+            logger.error(f"LLM call failed: {exc}", exc_info=True)
+            raise
+        finally:
+            if response is not None and hasattr(response, "aclose"):
+                try:
+                    await response.aclose()
+                except Exception as exc:
+                    logger.debug(f"Failed to close LLM stream: {exc}")
             duration_ms = (time.time() - start_time) * 1000
             self._total_llm_calls += 1
             self._llm_duration_ms += duration_ms
+            self._last_llm_latency_ms = duration_ms
+            if first_token_time is not None:
+                ttft_ms = (first_token_time - start_time) * 1000
+                self._llm_ttft_ms += ttft_ms
+                self._llm_streamed_calls += 1
+                self._last_llm_ttft_ms = ttft_ms
             logger.debug(f"LLM call completed in {duration_ms:.2f}ms")
 
-            # Extract content using LlmService's extract_content method
-            return self.llm_service.extract_content(response)
-        except Exception as exc:
-            logger.error(f"LLM call failed: {exc}", exc_info=True)
-            return f'{{"type": "final", "final": "LLM call failed: {str(exc)}"}}'
+    async def _call_llm(self, messages: List[Dict[str, str]]) -> str:
+        """Call LLM service and wait for the whole response.
+
+        Returns:
+            The content of the LLM response message.
+        """
+        return "".join([delta async for delta in self._stream_llm(messages)])
 
-    def _parse_action(self, response_text: str) -> ReactAction:
+    def _parse_action(self, response_text: str, payload: Optional[Dict[str, Any]] = None) -> ReactAction:
         """
         Parse LLM response into a ReactAction.
 
         Uses ReactActionParser for robust parsing with multiple fallback strategies.
         """
-        return ReactActionParser.parse(response_text)
-
-    async def _execute_tool(
+        return ReactActionParser.parse(response_text, payload)
+
+    def _prepare_tool_calls(self, action: ToolAction) -> List[ToolCall]:
+        """Get the calls of a tool action, giving each a call id unique within the run."""
+        return [
+            replace(call, call_id=f"call_{self.step_id}_{index}")
+            for index, call in enumerate(action.get_tool_calls())
+        ]
+
+    @staticmethod
+    def _format_observation(calls: List[ToolCall], results: Dict[str, Any]) -> str:
+        """Build the observation message for the results of one step, in call order."""
+        if len(calls) == 1:
+            return f"Observation: {results[calls[0].call_id]}"
+        lines = [f"Observation: results of {len(calls)} tool calls"]
+        for index, call in enumerate(calls, start=1):
+            lines.append(f"[{index}] {call.tool_name} ({call.call_id}): {results[call.call_id]}")
+        return "\n".join(lines)
+
+    async def _execute_tools(
         self,
-        tool_name: str,
-        tool_args: Dict[str, Any],
-    ) -> AsyncGenerator[Dict[str, Any], None]:
+        calls: List[ToolCall],
+    ) -> AsyncGenerator[Tuple[ToolCall, Dict[str, Any]], None]:
         """
-        Execute tool with timing and metrics tracking.
+        Execute the tool calls of one step concurrently, with timing and metrics tracking.
+
+        ToolService.execute_tools yields the ReactEvents of all calls as they
+        happen, which we process to extract results and progress updates.
 
-        ToolService.execute_tool now returns AsyncGenerator[ReactEvent, None],
-        which we process to extract results and progress updates.
+        Yields:
+            (call, item) where item has "progress", "result" or "error"; every
+            call gets exactly one "result" or "error" item.
         """
         start_time = time.time()
         tool_context = ToolContext(
             workspace=self.workspace,
             project_name=self.project_name,
             _react_instance=self,  # Pass reference to React instance for TodoWriteTool
+            llm_service=self.llm_service,
         )
+        calls_by_id = {call.call_id: call for call in calls}
+        pending = set(calls_by_id)
 
         try:
-            # ToolService.execute_tool now yields ReactEvent objects
-            final_result = None
-            has_error = False
-
-            async for event in self.tool_service.execute_tool(
-                tool_name,
-                tool_args,
+            async for event in self.tool_service.execute_tools(
+                [{"call_id": call.call_id, "tool_name": call.tool_name, "parameters": call.tool_args} for call in calls],
                 tool_context,
+                timeout=self.tool_timeout,
                 project_name=self.project_name,
                 react_type=self.react_type,
                 run_id=self.run_id,
                 step_id=self.step_id,
             ):
+                call = calls_by_id.get(event.payload.get("call_id"))
+                if call is None:
+                    continue
+                duration_ms = (time.time() - start_time) * 1000
+
                 # Process different event types from ToolService
                 if event.event_type == "tool_start":
-                    # Tool started - yield progress
-                    yield {"progress": f"Starting tool: {tool_name}"}
+                    yield call, {"progress": f"Starting tool: {call.tool_name}"}
 
                 elif event.event_type == "tool_progress":
-                    # Tool progress update
                     progress = event.payload.get("progress")
                     if progress:
-                        yield {"progress": progress}
+                        yield call, {"progress": progress}
 
                 elif event.event_type == "tool_end":
-                    # Tool completed successfully
-                    final_result = event.payload.get("result")
-                    duration_ms = (time.time() - start_time) * 1000
+                    pending.discard(call.call_id)
                     self._total_tool_calls += 1
                     self._tool_duration_ms += duration_ms
-                    logger.debug(f"Tool '{tool_name}' completed in {duration_ms:.2f}ms")
-                    yield {"result": final_result}
-                    return
+                    logger.debug(f"Tool '{call.tool_name}' completed in {duration_ms:.2f}ms")
+                    yield call, {"result": event.payload.get("result")}
 
                 elif event.event_type == "error":
-                    # Tool execution error
+                    pending.discard(call.call_id)
                     error_msg = event.payload.get("error", "Unknown error")
-                    duration_ms = (time.time() - start_time) * 1000
-                    logger.error(f"Tool '{tool_name}' failed after {duration_ms:.2f}ms: {error_msg}")
-                    yield {"error": error_msg}
-                    has_error = True
-                    return
-
-            # If we get here without a tool_end event, something went wrong
-            if not has_error:
-                duration_ms = (time.time() - start_time) * 1000
-                self._total_tool_calls += 1
-                self._tool_duration_ms += duration_ms
-                logger.debug(f"Tool '{tool_name}' completed in {duration_ms:.2f}ms (no final event)")
-                yield {"result": final_result}
+                    logger.error(f"Tool '{call.tool_name}' failed after {duration_ms:.2f}ms: {error_msg}")
+                    yield call, {"error": error_msg}
 
         except Exception as exc:
             duration_ms = (time.time() - start_time) * 1000
-            logger.error(f"Tool '{tool_name}' failed after {duration_ms:.2f}ms: {exc}", exc_info=True)
-            yield {"error": str(exc)}
+            logger.error(f"Tools failed after {duration_ms:.2f}ms: {exc}", exc_info=True)
+            for call_id in list(pending):
+                pending.discard(call_id)
+                yield calls_by_id[call_id], {"error": str(exc)}
 
     async def chat_stream(self, user_message: Optional[str]) -> AsyncGenerator[AgentEvent, None]:
         """Main ReAct loop with thread safety and iterative pending message processing."""
@@ -370,8 +407,24 @@ class React:
                     for msg in new_pending:
                         self.messages.append({"role": "user", "content": msg})
 
-                    response_text = await self._call_llm(self.messages)
-                    action = self._parse_action(response_text)
+                    self.context.prepare(self.messages)
+
+                    # Stream the response; stop reading once the action object is complete
+                    response_parts = []
+                    payload = None
+                    json_parser = IncrementalJsonParser()
+                    llm_stream = self._stream_llm(self.messages)
+                    try:
+                        async for delta in llm_stream:
+                            response_parts.append(delta)
+                            candidate = json_parser.feed(delta)
+                            if candidate is not None and ReactActionParser.is_action_payload(candidate):
+                                payload = candidate
+                                break
+                    finally:
+                        await llm_stream.aclose()
+                    response_text = "".join(response_parts)
+                    action = self._parse_action(response_text, payload)
                     thinking = ReactActionParser.get_thinking_message(action, step + 1, self.max_steps)
                     yield self._create_event(AgentEventType.LLM_THINKING, {
                         "message": thinking,
@@ -385,8 +438,8 @@ class React:
 
                     if action.is_tool():
                         assert isinstance(action, ToolAction), f"Expected ToolAction, got {type(action)}"
-                        # Validate tool_name before execution
-                        if not action.tool_name:
+                        # Validate tool names before execution
+                        if any(not call.tool_name for call in action.get_tool_calls()):
                             error_msg = "Tool name is empty - LLM returned a tool action without specifying which tool to use"
                             logger.warning(error_msg)
                             yield self._create_event(AgentEventType.ERROR, {
@@ -396,20 +449,23 @@ class React:
                             self.messages.append({"role": "assistant", "content": response_text})
                             self.messages.append({"role": "user", "content": f"Error: {error_msg}. Please specify a valid tool name."})
                             continue
-                        yield self._create_event(AgentEventType.TOOL_START, action.to_start_payload())
+                        calls = self._prepare_tool_calls(action)
+                        for call in calls:
+                            yield self._create_event(AgentEventType.TOOL_START, action.to_start_payload(call))
                         try:
-                            tool_result = None
-                            async for item in self._execute_tool(action.tool_name, action.tool_args):
+                            results = {}
+                            async for call, item in self._execute_tools(calls):
                                 if "progress" in item:
-                                    yield self._create_event(AgentEventType.TOOL_PROGRESS, action.to_progress_payload(item["progress"]))
-                                if "result" in item:
+                                    yield self._create_event(AgentEventType.TOOL_PROGRESS, action.to_progress_payload(item["progress"], call))
+                                elif "error" in item:
+                                    results[call.call_id] = item["error"]
+                                    yield self._create_event(AgentEventType.TOOL_END, action.to_end_payload(ok=False, error=item["error"], call=call))
+                                else:
                                     tool_result = item["result"]
-                                if "error" in item:
-                                    tool_result = item["error"]
-                                    break
-                            if tool_result is None:
-                                tool_result = "Tool execution completed"
-                            yield self._create_event(AgentEventType.TOOL_END, action.to_end_payload(result=tool_result, ok=True))
+                                    if tool_result is None:
+                                        tool_result = "Tool execution completed"
+                                    results[call.call_id] = tool_result
+                                    yield self._create_event(AgentEventType.TOOL_END, action.to_end_payload(result=tool_result, ok=True, call=call))
 
                             # Check for pending TODO update and emit event
                             if self._pending_todo_update:
@@ -417,7 +473,7 @@ class React:
                                 self._pending_todo_update = None
 
                             self.messages.append({"role": "assistant", "content": response_text})
-                            self.messages.append({"role": "user", "content": f"Observation: {tool_result}"})
+                            self.messages.append({"role": "user", "content": self._format_observation(calls, results)})
                         except Exception as exc:
                             logger.error(f"Tool execution error: {exc}", exc_info=True)
                             yield self._create_event(AgentEventType.TOOL_END, action.to_end_payload(ok=False, error=str(exc)))
@@ -506,6 +562,12 @@ class React:
             "total_tool_calls": self._total_tool_calls,
             "llm_duration_ms": round(self._llm_duration_ms, 2),
             "tool_duration_ms": round(self._tool_duration_ms, 2),
+            "llm_time_to_first_token_ms": round(self._last_llm_ttft_ms, 2),
+            "avg_llm_time_to_first_token_ms": round(self._llm_ttft_ms / self._llm_streamed_calls, 2) if self._llm_streamed_calls else 0.0,
+            "llm_latency_ms": round(self._last_llm_latency_ms, 2),
+            "avg_llm_latency_ms": round(self._llm_duration_ms / self._total_llm_calls, 2) if self._total_llm_calls else 0.0,
             "pending_messages": len(self.pending_user_messages),
             "message_count": len(self.messages),
+            "prompt_tokens": self.context.last_prompt_tokens,
+            "context_compactions": self.context.compactions,
         }
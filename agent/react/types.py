@@ -6,7 +6,7 @@ New code should import directly from the specific modules:
 - event: ReactEvent, ReactEventType
 - checkpoint: CheckpointData
 - status: ReactStatus
-- actions: ActionType, ReactAction, ToolAction, FinalAction, ErrorAction
+- actions: ActionType, ReactAction, ToolAction, ToolCall, FinalAction, ErrorAction
 - parser: ReactActionParser
 - todo: TodoItem, TodoPatch, TodoState, TodoStatus, TodoPatchType
 """
@@ -21,7 +21,7 @@ from .checkpoint import CheckpointData
 from .status import ReactStatus
 
 # Action types
-from .actions import ActionType, ReactAction, ToolAction, FinalAction, ErrorAction
+from .actions import ActionType, ReactAction, ToolAction, ToolCall, FinalAction, ErrorAction
 
 # Parser
 from .parser import ReactActionParser
@@ -45,6 +45,7 @@ __all__ = [
     "ActionType",
     "ReactAction",
     "ToolAction",
+    "ToolCall",
     "FinalAction",
     "ErrorAction",
     # Parser
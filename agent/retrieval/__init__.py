@@ -0,0 +1,15 @@
+from .embedder import Embedder
+from .semantic_index import SemanticIndex, SemanticIndexService, semantic_index_service
+from .sources import Document
+from .vector_index import NumpyVectorIndex, HnswVectorIndex, create_vector_index
+
+__all__ = [
+    'Embedder',
+    'SemanticIndex',
+    'SemanticIndexService',
+    'semantic_index_service',
+    'Document',
+    'NumpyVectorIndex',
+    'HnswVectorIndex',
+    'create_vector_index'
+]
@@ -0,0 +1,107 @@
+"""
+Embedder
+
+Turns texts into L2-normalised embedding vectors with
+``LlmService.aembedding``, sending the texts in batches rather than one
+request per text.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_CONCURRENCY = 4
+# Texts are cut to stay well within the input limit of embedding models
+DEFAULT_MAX_CHARS = 6000
+
+
+class Embedder:
+    """Batched embedding of texts."""
+
+    def __init__(
+        self,
+        llm_service,
+        model: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_chars: int = DEFAULT_MAX_CHARS,
+    ):
+        """
+        Initialize the embedder.
+
+        Args:
+            llm_service: LlmService used for the embedding requests
+            model: Embedding model (default: the service's embedding model)
+            batch_size: Maximum number of texts per request
+            concurrency: Maximum number of requests in flight
+            max_chars: Characters of a text that are embedded
+        """
+        self.llm_service = llm_service
+        self.model = model or llm_service.embedding_model
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_chars = max_chars
+        self.requests = 0
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dim) with L2-normalised rows
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        batches = sorted([batch async for batch in self.embed_batches(texts)], key=lambda batch: batch[0])
+        return np.concatenate([vectors for _, vectors in batches])
+
+    async def embed_batches(self, texts: List[str]) -> AsyncIterator[Tuple[int, np.ndarray]]:
+        """
+        Embed texts, yielding each batch as soon as its request completes.
+
+        Args:
+            texts: Texts to embed
+
+        Yields:
+            (position of the batch's first text, float32 array of its L2-normalised vectors)
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def embed_batch(start: int) -> Tuple[int, np.ndarray]:
+            async with semaphore:
+                self.requests += 1
+                response = await self.llm_service.aembedding(
+                    self.model, [text[:self.max_chars] or " " for text in texts[start:start + self.batch_size]]
+                )
+                vectors = np.asarray(self._extract_embeddings(response), dtype=np.float32)
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                return start, vectors / norms
+
+        tasks = [asyncio.ensure_future(embed_batch(start)) for start in range(0, len(texts), self.batch_size)]
+        try:
+            for next_batch in asyncio.as_completed(tasks):
+                yield await next_batch
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _extract_embeddings(response: Any) -> List[List[float]]:
+        """Get the embeddings of a LiteLLM embedding response, in input order."""
+        data = response["data"] if isinstance(response, dict) else response.data
+        items = []
+        for position, item in enumerate(data):
+            if isinstance(item, dict):
+                items.append((item.get("index", position), item["embedding"]))
+            else:
+                items.append((getattr(item, "index", position), item.embedding))
+        return [embedding for _, embedding in sorted(items, key=lambda pair: pair[0])]
@@ -0,0 +1,239 @@
+"""
+Semantic Index
+
+Per-project embedding index over conversation messages, screenplay scenes
+and resource metadata, stored under ``<project>/agent/index``.
+
+``sync()`` asks every source what changed since the previous sync and
+embeds only new or changed documents, in batches, saving the index after
+each batch; ``search()`` returns the top-k documents most similar to a
+query from what is already indexed and refreshes the index in the
+background, so agents can pull the relevant context instead of whole
+documents.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional
+
+from .embedder import Embedder
+from .sources import ConversationSource, Document, ResourceSource, SceneSource
+from .vector_index import create_vector_index
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "state.json"
+
+# Characters of a document kept in the index and returned by searches
+DEFAULT_SNIPPET_CHARS = 1500
+
+
+class SemanticIndex:
+    """Embedding index of one project."""
+
+    def __init__(
+        self,
+        project,
+        embedder: Embedder,
+        backend: str = "auto",
+        snippet_chars: int = DEFAULT_SNIPPET_CHARS,
+    ):
+        """
+        Open the index of a project.
+
+        Args:
+            project: Project whose content is indexed
+            embedder: Embedder creating the vectors
+            backend: Vector index backend ("auto", "numpy" or "hnsw")
+            snippet_chars: Characters of each document stored for search results
+        """
+        self.project = project
+        self.embedder = embedder
+        self.snippet_chars = snippet_chars
+        self.path = os.path.join(project.project_path, "agent", "index")
+        self.vectors = create_vector_index(self.path, backend)
+        self.sources = [ConversationSource(project), SceneSource(project), ResourceSource(project)]
+        self.state = self._load_state()
+        self._sync_lock: Optional[asyncio.Lock] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+        if self.state.get("model") != embedder.model:
+            # Vectors of different models are not comparable
+            self.vectors.reset()
+            self.state = {"model": embedder.model, "sources": {}}
+
+    def _load_state(self) -> Dict[str, Any]:
+        state_path = os.path.join(self.path, STATE_FILE)
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Semantic index state is unreadable, rebuilding the index: {e}")
+        return {}
+
+    def _save(self):
+        self.vectors.save()
+        fd, temp_name = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False)
+            os.replace(temp_name, os.path.join(self.path, STATE_FILE))
+        except Exception:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+
+    def _collect(self) -> Dict[str, Any]:
+        """Ask every source for its changes (blocking file I/O)."""
+        indexed_ids = self.vectors.doc_ids()
+        documents: List[Document] = []
+        removed: List[str] = []
+        states: Dict[str, Any] = {}
+        for source in self.sources:
+            try:
+                source_documents, source_removed, states[source.name] = source.collect(
+                    self.state["sources"].get(source.name, {}),
+                    [doc_id for doc_id in indexed_ids if doc_id.startswith(f"{source.name}:")],
+                )
+            except Exception as e:
+                logger.warning(f"Could not read {source.name} documents for the semantic index: {e}")
+                states[source.name] = self.state["sources"].get(source.name, {})
+                continue
+            documents.extend(source_documents)
+            removed.extend(source_removed)
+
+        # Unchanged content (e.g. a scene file that was only touched) is not embedded again
+        documents = [
+            document for document in documents
+            if (self.vectors.get_entry(document.doc_id) or {}).get("hash") != document.content_hash
+        ]
+        return {"documents": documents, "removed": removed, "states": states}
+
+    async def sync(self) -> int:
+        """
+        Embed new and changed documents and drop removed ones.
+
+        Returns:
+            Number of documents embedded
+        """
+        if self._sync_lock is None:
+            self._sync_lock = asyncio.Lock()
+        async with self._sync_lock:
+            loop = asyncio.get_running_loop()
+            changes = await loop.run_in_executor(None, self._collect)
+            documents: List[Document] = changes["documents"]
+
+            for doc_id in changes["removed"]:
+                self.vectors.remove(doc_id)
+            # Each batch is saved as it arrives: an interrupted sync keeps it and
+            # the next sync skips its documents (their content hash is indexed)
+            async for start, vectors in self.embedder.embed_batches([f"{d.title}\n{d.text}" for d in documents]):
+                for document, vector in zip(documents[start:], vectors):
+                    self.vectors.upsert(document.doc_id, vector, {
+                        "source": document.source,
+                        "title": document.title,
+                        "text": document.text[:self.snippet_chars],
+                        "hash": document.content_hash,
+                    })
+                await loop.run_in_executor(None, self._save)
+            self.state["sources"] = changes["states"]
+            await loop.run_in_executor(None, self._save)
+
+            if documents or changes["removed"]:
+                logger.info(f"Semantic index of {self.project.project_name}: embedded {len(documents)}, "
+                            f"removed {len(changes['removed'])}, {len(self.vectors)} documents")
+            return len(documents)
+
+    def refresh(self) -> asyncio.Task:
+        """
+        Sync in the background unless a background sync is already running.
+
+        Returns:
+            The background sync task
+        """
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.ensure_future(self._background_sync())
+        return self._sync_task
+
+    async def _background_sync(self):
+        try:
+            await self.sync()
+        except Exception as e:
+            logger.warning(f"Semantic index sync of {self.project.project_name} failed: {e}")
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        sources: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the documents most relevant to a query.
+
+        Args:
+            query: Natural language query
+            top_k: Maximum number of results
+            sources: Restrict results to these sources ("conversation", "scene", "resource")
+
+        Returns:
+            List of {"doc_id", "source", "title", "text", "score"}, best first
+        """
+        sync_task = self.refresh()
+        if not len(self.vectors):
+            # Nothing indexed yet: wait for the first sync
+            await asyncio.shield(sync_task)
+        if not len(self.vectors):
+            return []
+        query_vector = (await self.embedder.embed([query]))[0]
+        allowed = set(sources) if sources else None
+        results = self.vectors.search(
+            query_vector, top_k,
+            entry_filter=(lambda entry: entry["source"] in allowed) if allowed else None,
+        )
+        for result in results:
+            result.pop("hash", None)
+        return results
+
+
+class SemanticIndexService:
+    """Keeps one SemanticIndex per project. Singleton."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._indexes = {}
+        return cls._instance
+
+    def get_index(self, project, llm_service=None, backend: str = "auto") -> SemanticIndex:
+        """
+        Get the semantic index of a project.
+
+        Args:
+            project: The project
+            llm_service: LlmService for embeddings (default: a new LlmService)
+            backend: Vector index backend used when the index is first opened
+
+        Returns:
+            The project's SemanticIndex
+        """
+        index = self._indexes.get(project.project_path)
+        if index is None:
+            if llm_service is None:
+                from agent.llm.llm_service import LlmService
+                llm_service = LlmService()
+            index = SemanticIndex(project, Embedder(llm_service), backend=backend)
+            self._indexes[project.project_path] = index
+        return index
+
+    def clear(self):
+        """Forget the open indexes."""
+        self._indexes.clear()
+
+
+semantic_index_service = SemanticIndexService()
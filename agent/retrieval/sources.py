@@ -0,0 +1,166 @@
+"""
+Index Sources
+
+A source turns part of a project into documents for the semantic index and
+reports what changed since the last sync, so only changed documents are
+embedded again. Each source keeps a small JSON-serialisable state between
+syncs:
+
+- ``ConversationSource``: one document per user/assistant message. Messages
+  are append-only, so only messages past the indexed count are read.
+- ``SceneSource``: one document per screenplay scene; only scene files whose
+  modification time changed are read.
+- ``ResourceSource``: one document per resource, built from its name, type
+  and metadata (the resource index is already in memory).
+"""
+
+import os
+import json
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+SOURCE_CONVERSATION = "conversation"
+SOURCE_SCENE = "scene"
+SOURCE_RESOURCE = "resource"
+
+
+@dataclass
+class Document:
+    """A piece of project content to embed."""
+    doc_id: str
+    source: str
+    title: str
+    text: str
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha1(f"{self.title}\n{self.text}".encode('utf-8')).hexdigest()
+
+
+# (documents to embed, ids of documents to remove, new source state)
+Changes = Tuple[List[Document], List[str], Dict[str, Any]]
+
+
+class ConversationSource:
+    """Messages of the project's conversations."""
+
+    name = SOURCE_CONVERSATION
+    roles = ("user", "assistant")
+
+    def __init__(self, project):
+        self.project = project
+
+    def collect(self, state: Dict[str, Any], indexed_ids: List[str]) -> Changes:
+        manager = self.project.get_conversation_manager()
+        project_path = self.project.project_path
+        counts: Dict[str, int] = dict(state.get("counts", {}))
+        documents: List[Document] = []
+        removed: List[str] = []
+        current = set()
+
+        for info in manager.list_conversations(project_path):
+            conversation_id = info["conversation_id"]
+            current.add(conversation_id)
+            conversation = manager.get_conversation(project_path, conversation_id, limit=0)
+            if conversation is None:
+                continue
+            count = conversation.message_offset
+            indexed = counts.get(conversation_id, 0)
+            if count < indexed:
+                # The conversation was rewritten: index it again
+                removed.extend(self._ids_of(conversation_id, indexed_ids))
+                indexed = 0
+            if count > indexed:
+                messages = manager.get_messages(project_path, conversation_id, limit=count - indexed)
+                for position, message in enumerate(messages, start=indexed):
+                    role = getattr(message.role, "value", message.role)
+                    if role not in self.roles or not (message.content or "").strip():
+                        continue
+                    sender = (message.metadata or {}).get("sender_name") or role
+                    documents.append(Document(
+                        doc_id=f"{SOURCE_CONVERSATION}:{conversation_id}:{position}",
+                        source=self.name,
+                        title=f"{info.get('title', conversation_id)} - {sender}",
+                        text=message.content,
+                    ))
+            counts[conversation_id] = count
+
+        for conversation_id in set(counts) - current:
+            removed.extend(self._ids_of(conversation_id, indexed_ids))
+            del counts[conversation_id]
+        return documents, removed, {"counts": counts}
+
+    @staticmethod
+    def _ids_of(conversation_id: str, indexed_ids: List[str]) -> List[str]:
+        prefix = f"{SOURCE_CONVERSATION}:{conversation_id}:"
+        return [doc_id for doc_id in indexed_ids if doc_id.startswith(prefix)]
+
+
+class SceneSource:
+    """Screenplay scenes."""
+
+    name = SOURCE_SCENE
+
+    def __init__(self, project):
+        self.project = project
+
+    def collect(self, state: Dict[str, Any], indexed_ids: List[str]) -> Changes:
+        manager = self.project.get_screenplay_manager()
+        mtimes: Dict[str, int] = state.get("mtimes", {})
+        new_mtimes: Dict[str, int] = {}
+        documents: List[Document] = []
+
+        for entry in os.scandir(manager.screen_plays_dir):
+            if not entry.name.endswith(".md") or not entry.is_file():
+                continue
+            scene_id = entry.name[:-3]
+            mtime = entry.stat().st_mtime_ns
+            new_mtimes[scene_id] = mtime
+            if mtimes.get(scene_id) == mtime:
+                continue
+            scene = manager.get_scene(scene_id)
+            if scene is None:
+                continue
+            details = ", ".join(part for part in (
+                scene.location, scene.time_of_day, ", ".join(scene.characters or []), scene.logline
+            ) if part)
+            documents.append(Document(
+                doc_id=f"{SOURCE_SCENE}:{scene_id}",
+                source=self.name,
+                title=scene.title or scene_id,
+                text=f"{details}\n\n{scene.content}" if details else scene.content,
+            ))
+
+        removed = [f"{SOURCE_SCENE}:{scene_id}" for scene_id in set(mtimes) - set(new_mtimes)]
+        return documents, removed, {"mtimes": new_mtimes}
+
+
+class ResourceSource:
+    """Resource names, types and metadata."""
+
+    name = SOURCE_RESOURCE
+
+    def __init__(self, project):
+        self.project = project
+
+    def collect(self, state: Dict[str, Any], indexed_ids: List[str]) -> Changes:
+        manager = self.project.get_resource_manager()
+        hashes: Dict[str, str] = state.get("hashes", {})
+        new_hashes: Dict[str, str] = {}
+        documents: List[Document] = []
+
+        for resource in manager.get_all():
+            metadata = json.dumps(resource.metadata or {}, ensure_ascii=False, sort_keys=True, default=str)
+            document = Document(
+                doc_id=f"{SOURCE_RESOURCE}:{resource.resource_id}",
+                source=self.name,
+                title=resource.name,
+                text=f"{resource.media_type} {resource.source_type} {resource.original_name}\n{metadata}",
+            )
+            new_hashes[resource.resource_id] = document.content_hash
+            if hashes.get(resource.resource_id) != document.content_hash:
+                documents.append(document)
+
+        removed = [f"{SOURCE_RESOURCE}:{resource_id}" for resource_id in set(hashes) - set(new_hashes)]
+        return documents, removed, {"hashes": new_hashes}
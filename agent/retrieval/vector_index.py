@@ -0,0 +1,304 @@
+"""
+Vector Index
+
+Stores L2-normalised embedding vectors with their documents under a
+directory and answers top-k cosine similarity queries.
+
+- ``vectors.f32``: memory-mapped float32 matrix, one row per document. It
+  grows by doubling, so adding vectors never rewrites the existing ones,
+  and opening an index does not read it into memory.
+- ``entries.json``: per row, the document id, content hash and payload
+  (source, title, text) returned by searches. Rows of removed documents
+  are reused.
+
+``NumpyVectorIndex`` searches by brute force (one matrix-vector product),
+which is fast for the tens of thousands of vectors a project holds.
+``HnswVectorIndex`` adds an HNSW graph (optional ``hnswlib`` package) once
+an index is large enough to benefit from it.
+"""
+
+import os
+import json
+import logging
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.f32"
+ENTRIES_FILE = "entries.json"
+
+INITIAL_CAPACITY = 256
+
+EntryFilter = Callable[[Dict[str, Any]], bool]
+
+
+class NumpyVectorIndex:
+    """Brute-force vector index backed by a memory-mapped array."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the index stored in a directory.
+
+        Args:
+            path: Directory of the index files
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.dim: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        # Row -> entry (None for a free row)
+        self._entries: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._load()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, VECTORS_FILE)
+
+    @property
+    def _entries_path(self) -> str:
+        return os.path.join(self.path, ENTRIES_FILE)
+
+    def _load(self):
+        if not (os.path.exists(self._entries_path) and os.path.exists(self._vectors_path)):
+            return
+        try:
+            with open(self._entries_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.dim = data['dim']
+            self._entries = data['entries']
+            capacity = os.path.getsize(self._vectors_path) // (4 * self.dim)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+',
+                                      shape=(capacity, self.dim))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Vector index at {self.path} is unreadable, starting a new one: {e}")
+            self.reset()
+            return
+        for row, entry in enumerate(self._entries):
+            if entry is None:
+                self._free.append(row)
+            else:
+                self._rows[entry['doc_id']] = row
+
+    def reset(self, dim: Optional[int] = None):
+        """Remove all vectors (e.g. after the embedding model changed)."""
+        self._vectors = None
+        self._entries = []
+        self._rows = {}
+        self._free = []
+        self.dim = dim
+        if os.path.exists(self._vectors_path):
+            os.remove(self._vectors_path)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def doc_ids(self) -> List[str]:
+        """Get the ids of all indexed documents."""
+        return list(self._rows)
+
+    def get_entry(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Get the stored entry (doc_id, hash and payload) of a document."""
+        row = self._rows.get(doc_id)
+        return None if row is None else self._entries[row]
+
+    def _ensure_capacity(self, rows: int):
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= capacity:
+            return
+        new_capacity = max(INITIAL_CAPACITY, capacity * 2, rows)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, 'ab') as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+',
+                                  shape=(new_capacity, self.dim))
+
+    def upsert(self, doc_id: str, vector: np.ndarray, entry: Dict[str, Any]) -> int:
+        """
+        Add or replace the vector of a document.
+
+        Args:
+            doc_id: Document id
+            vector: L2-normalised embedding
+            entry: Stored with the vector and returned by searches
+
+        Returns:
+            The row of the document
+        """
+        if self.dim is None:
+            self.dim = int(vector.shape[0])
+        elif vector.shape[0] != self.dim:
+            raise ValueError(f"Vector dimension {vector.shape[0]} does not match index dimension {self.dim}")
+
+        row = self._rows.get(doc_id)
+        if row is None:
+            row = self._free.pop() if self._free else len(self._entries)
+            if row == len(self._entries):
+                self._entries.append(None)
+            self._ensure_capacity(row + 1)
+            self._rows[doc_id] = row
+        self._vectors[row] = vector
+        self._entries[row] = dict(entry, doc_id=doc_id)
+        return row
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove a document; returns False if it was not indexed."""
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        self._entries[row] = None
+        self._free.append(row)
+        return True
+
+    def search(self, vector: np.ndarray, top_k: int = 5,
+               entry_filter: Optional[EntryFilter] = None) -> List[Dict[str, Any]]:
+        """
+        Find the documents most similar to a vector.
+
+        Args:
+            vector: L2-normalised query embedding
+            top_k: Maximum number of results
+            entry_filter: Only consider entries for which this returns True
+
+        Returns:
+            Entries with an added ``score`` (cosine similarity), best first
+        """
+        if not self._rows or top_k <= 0:
+            return []
+        used = len(self._entries)
+        scores = np.asarray(self._vectors[:used] @ vector.astype(np.float32), dtype=np.float32)
+        for row, entry in enumerate(self._entries):
+            if entry is None or (entry_filter is not None and not entry_filter(entry)):
+                scores[row] = -np.inf
+        return self._top_rows(scores, top_k)
+
+    def _top_rows(self, scores: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        top_k = min(top_k, scores.shape[0])
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        results = []
+        for row in candidates[np.argsort(-scores[candidates])]:
+            if np.isneginf(scores[row]):
+                break
+            results.append(dict(self._entries[row], score=float(scores[row])))
+        return results
+
+    def save(self):
+        """Flush the vectors and write the entries atomically."""
+        if self._vectors is not None:
+            self._vectors.flush()
+        if self.dim is None:
+            return
+        data = json.dumps({'dim': self.dim, 'entries': self._entries}, ensure_ascii=False)
+        fd, temp_name = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_name, self._entries_path)
+        except Exception:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+
+
+class HnswVectorIndex(NumpyVectorIndex):
+    """
+    Vector index with an approximate HNSW search graph (requires ``hnswlib``).
+
+    The memory-mapped vectors remain the source of truth: the graph is
+    built from them in memory once the index holds ``min_graph_size``
+    vectors, and smaller indexes are searched by brute force.
+    """
+
+    def __init__(self, path: str, min_graph_size: int = 20000, ef_search: int = 64):
+        if hnswlib is None:
+            raise ImportError("hnswlib is required for the HNSW vector index. Please install it.")
+        self.min_graph_size = min_graph_size
+        self.ef_search = ef_search
+        self._graph = None
+        super().__init__(path)
+
+    def reset(self, dim: Optional[int] = None):
+        super().reset(dim)
+        self._graph = None
+
+    def _build_graph(self):
+        capacity = self._vectors.shape[0]
+        graph = hnswlib.Index(space='ip', dim=self.dim)
+        graph.init_index(max_elements=capacity, ef_construction=200, M=16)
+        rows = np.array(sorted(self._rows.values()), dtype=np.int64)
+        graph.add_items(np.asarray(self._vectors[rows]), rows)
+        graph.set_ef(self.ef_search)
+        self._graph = graph
+
+    def upsert(self, doc_id: str, vector: np.ndarray, entry: Dict[str, Any]) -> int:
+        row = super().upsert(doc_id, vector, entry)
+        if self._graph is not None:
+            if self._graph.get_max_elements() < self._vectors.shape[0]:
+                self._graph.resize_index(self._vectors.shape[0])
+            try:
+                self._graph.unmark_deleted(row)
+            except RuntimeError:
+                pass
+            self._graph.add_items(vector.reshape(1, -1), np.array([row]))
+        return row
+
+    def remove(self, doc_id: str) -> bool:
+        row = self._rows.get(doc_id)
+        removed = super().remove(doc_id)
+        if removed and self._graph is not None:
+            self._graph.mark_deleted(row)
+        return removed
+
+    def search(self, vector: np.ndarray, top_k: int = 5,
+               entry_filter: Optional[EntryFilter] = None) -> List[Dict[str, Any]]:
+        if len(self) < self.min_graph_size:
+            return super().search(vector, top_k, entry_filter)
+        if self._graph is None:
+            self._build_graph()
+        # Over-fetch so that filtered searches still find top_k matches
+        k = min(len(self), top_k * 4 if entry_filter else top_k)
+        labels, distances = self._graph.knn_query(vector.reshape(1, -1).astype(np.float32), k=k)
+        results = []
+        for row, distance in zip(labels[0], distances[0]):
+            entry = self._entries[row]
+            if entry is None or (entry_filter is not None and not entry_filter(entry)):
+                continue
+            # hnswlib's inner-product distance is 1 - similarity
+            results.append(dict(entry, score=float(1.0 - distance)))
+            if len(results) == top_k:
+                return results
+        # Too selective a filter for the graph: fall back to brute force
+        return super().search(vector, top_k, entry_filter)
+
+
+def create_vector_index(path: str, backend: str = "auto") -> NumpyVectorIndex:
+    """
+    Open a vector index.
+
+    Args:
+        path: Directory of the index files
+        backend: "numpy" (brute force), "hnsw" (requires hnswlib), or
+            "auto" (hnsw when hnswlib is installed, numpy otherwise)
+
+    Returns:
+        The vector index
+    """
+    if backend == "hnsw" or (backend == "auto" and hnswlib is not None):
+        return HnswVectorIndex(path)
+    if backend not in ("auto", "numpy"):
+        raise ValueError(f"Unknown vector index backend: {backend}")
+    return NumpyVectorIndex(path)
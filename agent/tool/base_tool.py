@@ -1,3 +1,4 @@
+import math
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, TYPE_CHECKING, AsyncGenerator
 from dataclasses import dataclass, field
@@ -64,12 +65,20 @@ class ToolMetadata:
         }
 
 
+# BaseTool.timeout of tools that must never be cut off (e.g. nested skill runs)
+NO_TIMEOUT = math.inf
+
+
 class BaseTool(ABC):
     """
     Abstract base class for all tools.
     All tools must inherit from this class and implement the execute method.
     """
 
+    # Maximum seconds one call may run in ToolService.execute_tools
+    # (None: the caller's timeout, NO_TIMEOUT: never cut off)
+    timeout: Optional[float] = None
+
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
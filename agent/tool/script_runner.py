@@ -0,0 +1,271 @@
+"""
+Script Runner
+
+Runs skill scripts off the event loop in a pool of worker processes
+(``script_worker.py``). Each script runs in its own process with its own
+stdout, ``sys.argv`` and ``sys.path``, so several scripts can run at once
+without interfering, and CPU-time and memory limits apply to the script
+only. Calls to ``execute_tool`` made by a script are sent back to the
+application and run on the caller's event loop.
+
+Blocking pipe I/O happens on the runner's own threads, so the event loop
+(asyncio or qasync) is never blocked while a script runs.
+"""
+import asyncio
+import atexit
+import logging
+import os
+import pickle
+import signal
+import subprocess
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .script_worker import read_frame, write_frame
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "script_worker.py")
+
+# Scripts spend much of their time waiting for tools, so do not tie this to the CPU count
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_CPU_SECONDS = 60
+DEFAULT_MEMORY_MB = 1024
+
+ToolCaller = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+class _WorkerProcess:
+    """One worker process and its protocol pipes."""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            close_fds=True,
+        )
+
+    def send(self, message: Dict[str, Any]):
+        write_frame(self.process.stdin, message)
+
+    def receive(self) -> Optional[Dict[str, Any]]:
+        return read_frame(self.process.stdout)
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def exit_reason(self) -> str:
+        """Describe why the worker ended while running a script."""
+        returncode = self.process.wait()
+        sigxcpu = getattr(signal, "SIGXCPU", None)
+        if sigxcpu is not None and returncode == -sigxcpu:
+            return "CPU time limit exceeded"
+        if returncode < 0:
+            return f"worker killed by signal {-returncode}"
+        return f"worker exited with status {returncode}"
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+
+
+class ScriptRunner:
+    """Pool of worker processes that execute skill scripts."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        cpu_seconds: Optional[float] = DEFAULT_CPU_SECONDS,
+        memory_mb: Optional[int] = DEFAULT_MEMORY_MB,
+    ):
+        """
+        Initialize the runner. Worker processes are started on demand.
+
+        Args:
+            max_workers: Maximum number of scripts running at once
+            cpu_seconds: CPU time a script may use (None: unlimited)
+            memory_mb: Address space a worker may use while running a script
+                (None: unlimited). Limits are not enforced on Windows.
+        """
+        self.max_workers = max_workers
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self._lock = threading.Lock()
+        self._idle: List[_WorkerProcess] = []
+        self._workers: List[_WorkerProcess] = []
+        self._starting = 0
+        # Scripts waiting for a worker: (event loop, future receiving the worker or None)
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        # Threads doing the blocking pipe I/O of running scripts
+        self._io = ThreadPoolExecutor(max_workers=2 * max_workers, thread_name_prefix="script-runner")
+
+    async def _acquire(self, loop: asyncio.AbstractEventLoop) -> _WorkerProcess:
+        """Take an idle worker, start a new one, or wait until one is released."""
+        while True:
+            worker = waiter = None
+            with self._lock:
+                if self._idle:
+                    worker = self._idle.pop()
+                elif len(self._workers) + self._starting < self.max_workers:
+                    self._starting += 1
+                else:
+                    waiter = loop.create_future()
+                    self._waiters.append((loop, waiter))
+
+            if waiter is not None:
+                # Resolves to a released worker, or None when a worker died and its slot is free
+                worker = await waiter
+                if worker is None:
+                    continue
+            elif worker is None:
+                try:
+                    worker = await loop.run_in_executor(self._io, _WorkerProcess)
+                finally:
+                    with self._lock:
+                        self._starting -= 1
+                with self._lock:
+                    self._workers.append(worker)
+
+            if worker.alive():
+                return worker
+            self._discard(worker)
+
+    def _release(self, worker: Optional[_WorkerProcess], healthy: bool = True):
+        """Return a worker to the pool (or replace a broken one) and wake a waiting script."""
+        if worker is not None and not (healthy and worker.alive()):
+            worker.kill()
+            self._discard(worker)
+            worker = None
+        with self._lock:
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                if not waiter.done() and not loop.is_closed():
+                    loop.call_soon_threadsafe(self._hand_over, waiter, worker)
+                    return
+            if worker is not None:
+                self._idle.append(worker)
+
+    def _hand_over(self, waiter: asyncio.Future, worker: Optional[_WorkerProcess]):
+        if waiter.done():
+            # The waiting script was cancelled meanwhile: pass it on
+            self._release(worker)
+        else:
+            waiter.set_result(worker)
+
+    def _discard(self, worker: _WorkerProcess):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    async def run(
+        self,
+        script_path: str,
+        argv: Optional[List[str]],
+        project_root: str,
+        context: Dict[str, Any],
+        call_tool: ToolCaller,
+        timeout: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Run a script in a worker process.
+
+        Args:
+            script_path: Path of the script file
+            argv: Command-line arguments (sys.argv[1:] of the script)
+            project_root: Directory added to the script's sys.path
+            context: Picklable ToolContext data for the script's ``tool_context``
+            call_tool: Coroutine function running a tool for the script's
+                ``execute_tool`` calls; called on the caller's event loop
+            timeout: Wall-clock seconds the script may run (None: no limit)
+
+        Returns:
+            The script's captured stdout (trailing whitespace removed), or None
+
+        Raises:
+            SyntaxError: The script does not compile
+            FileNotFoundError: The script does not exist
+            RuntimeError: The script failed or exceeded a limit
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+        worker = await self._acquire(loop)
+        healthy = False
+        try:
+            await loop.run_in_executor(self._io, worker.send, {
+                "type": "run",
+                "script_path": script_path,
+                "argv": list(argv or []),
+                "project_root": project_root,
+                "context": context,
+                "cpu_seconds": self.cpu_seconds,
+                "memory_mb": self.memory_mb,
+            })
+            while True:
+                receive = loop.run_in_executor(self._io, worker.receive)
+                try:
+                    remaining = None if deadline is None else max(0.0, deadline - loop.time())
+                    message = await asyncio.wait_for(receive, remaining)
+                except asyncio.TimeoutError:
+                    worker.kill()
+                    raise RuntimeError(f"Script timed out after {timeout}s")
+                if message is None:
+                    raise RuntimeError(worker.exit_reason())
+
+                if message["type"] == "tool_call":
+                    reply = await self._call_tool(call_tool, message["tool_name"], message["parameters"])
+                    await loop.run_in_executor(self._io, worker.send, reply)
+                    continue
+
+                healthy = True
+                if message["type"] == "result":
+                    return message["output"]
+                kind, error = message.get("kind"), message.get("message", "")
+                if kind == "syntax":
+                    raise SyntaxError(error)
+                if kind == "not_found":
+                    raise FileNotFoundError(error)
+                if kind == "memory":
+                    raise RuntimeError(f"memory limit of {self.memory_mb} MB exceeded")
+                raise RuntimeError(error)
+        finally:
+            self._release(worker, healthy)
+
+    @staticmethod
+    async def _call_tool(call_tool: ToolCaller, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            result = await call_tool(tool_name, parameters)
+        except Exception as e:
+            return {"type": "tool_error", "error": str(e)}
+        try:
+            pickle.dumps(result)
+        except Exception as e:
+            return {"type": "tool_error", "error": f"Result of tool '{tool_name}' cannot be passed to the script: {e}"}
+        return {"type": "tool_result", "result": result}
+
+    def shutdown(self):
+        """Stop all worker processes."""
+        with self._lock:
+            workers, self._workers, self._idle = self._workers, [], []
+        for worker in workers:
+            worker.close()
+        self._io.shutdown(wait=False)
+
+
+script_runner = ScriptRunner()
+atexit.register(script_runner.shutdown)
@@ -0,0 +1,163 @@
+"""
+Script worker process.
+
+Runs skill scripts for ScriptRunner in a separate Python process, one script
+at a time. The worker is started as ``python script_worker.py`` and talks to
+its runner over stdin/stdout with length-prefixed pickle frames:
+
+    runner -> worker   {"type": "run", "script_path", "argv", "project_root",
+                        "context", "cpu_seconds", "memory_mb"}
+    worker -> runner   {"type": "tool_call", "tool_name", "parameters"}
+    runner -> worker   {"type": "tool_result", "result"} | {"type": "tool_error", "error"}
+    worker -> runner   {"type": "result", "output"} | {"type": "error", "kind", "message"}
+
+This module must not import the ``agent`` package at module level: the
+worker starts with the standard library only, so it starts quickly.
+"""
+import contextlib
+import importlib.util
+import io
+import os
+import pickle
+import runpy
+import struct
+import sys
+from typing import Any, BinaryIO, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: limits are not enforced
+    resource = None
+
+_HEADER = struct.Struct(">I")
+
+
+def write_frame(stream: BinaryIO, message: Dict[str, Any]) -> None:
+    """Write one message."""
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def read_frame(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """Read one message; None when the other side closed the pipe."""
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    size, = _HEADER.unpack(header)
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return pickle.loads(data)
+
+
+def _load_tool_context_class():
+    """Load ToolContext from its file without importing the agent package."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tool_context.py")
+    spec = importlib.util.spec_from_file_location("_script_worker_tool_context", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ToolContext
+
+
+@contextlib.contextmanager
+def _limits(cpu_seconds: Optional[float], memory_mb: Optional[int]):
+    """Apply CPU-time and address-space limits for one script."""
+    if resource is None:
+        yield
+        return
+    cpu_limit = resource.getrlimit(resource.RLIMIT_CPU)
+    memory_limit = resource.getrlimit(resource.RLIMIT_AS)
+    if cpu_seconds:
+        # RLIMIT_CPU counts the whole process lifetime: allow cpu_seconds more
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, cpu_limit[1]))
+    if memory_mb:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024, memory_limit[1]))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, cpu_limit)
+        resource.setrlimit(resource.RLIMIT_AS, memory_limit)
+
+
+class Worker:
+    """Executes jobs received from the runner."""
+
+    def __init__(self, requests: BinaryIO, replies: BinaryIO):
+        self.requests = requests
+        self.replies = replies
+        self.tool_context_class = _load_tool_context_class()
+
+    def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Any:
+        """Run a tool in the main application and wait for its result."""
+        write_frame(self.replies, {"type": "tool_call", "tool_name": tool_name, "parameters": parameters})
+        reply = read_frame(self.requests)
+        if reply is None:
+            raise SystemExit(0)
+        if reply["type"] == "tool_error":
+            raise RuntimeError(reply["error"])
+        return reply["result"]
+
+    def run(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        script_globals = {
+            '__builtins__': __builtins__,
+            'execute_tool': self.execute_tool,
+            'tool_context': self.tool_context_class.from_dict(dict(job["context"])),
+        }
+        captured_output = io.StringIO()
+        original_path = sys.path[:]
+        original_argv = sys.argv[:]
+        sys.path.insert(0, job["project_root"])
+        sys.argv = [job["script_path"]] + list(job["argv"] or [])
+        try:
+            with _limits(job.get("cpu_seconds"), job.get("memory_mb")), \
+                    contextlib.redirect_stdout(captured_output):
+                runpy.run_path(job["script_path"], init_globals=script_globals, run_name="__main__")
+        except SyntaxError as e:
+            return {"type": "error", "kind": "syntax", "message": str(e)}
+        except FileNotFoundError as e:
+            return {"type": "error", "kind": "not_found", "message": str(e)}
+        except MemoryError:
+            return {"type": "error", "kind": "memory", "message": "out of memory"}
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                return {"type": "error", "kind": "exit", "message": f"exit status {e.code}",
+                        "output": captured_output.getvalue()}
+        except BaseException as e:
+            return {"type": "error", "kind": "error", "message": str(e)}
+        finally:
+            sys.path[:] = original_path
+            sys.argv = original_argv
+        output = captured_output.getvalue()
+        return {"type": "result", "output": output.rstrip() if output else None}
+
+    def serve(self):
+        while True:
+            job = read_frame(self.requests)
+            if job is None:
+                return
+            reply = self.run(job)
+            try:
+                write_frame(self.replies, reply)
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                write_frame(self.replies, {"type": "error", "kind": "error", "message": str(e)})
+
+
+def main():
+    # Keep the protocol pipes private: scripts (and their subprocesses) that
+    # write to fd 1 or read fd 0 must not corrupt the frames.
+    requests = os.fdopen(os.dup(0), 'rb')
+    replies = os.fdopen(os.dup(1), 'wb')
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(2, 1)
+    # Do not let modules next to this file shadow the scripts' imports
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        del sys.path[0]
+    Worker(requests, replies).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,5 +4,6 @@ from .execute_skill_script import ExecuteSkillScriptTool
 from .execute_generated_code import ExecuteGeneratedCodeTool
 from .execute_skill import ExecuteSkillTool
 from .todo_write import TodoWriteTool
+from .search_project_context import SearchProjectContextTool
 
-__all__ = ['GetProjectCrewMembersTool', 'CreatePlanTool', 'ExecuteSkillScriptTool', 'ExecuteGeneratedCodeTool', 'ExecuteSkillTool', 'TodoWriteTool']
+__all__ = ['GetProjectCrewMembersTool', 'CreatePlanTool', 'ExecuteSkillScriptTool', 'ExecuteGeneratedCodeTool', 'ExecuteSkillTool', 'TodoWriteTool', 'SearchProjectContextTool']
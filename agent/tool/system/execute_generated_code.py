@@ -1,5 +1,5 @@
 from typing import Any, Dict, Optional, TYPE_CHECKING, AsyncGenerator
-from ..base_tool import BaseTool, ToolMetadata, ToolParameter
+from ..base_tool import NO_TIMEOUT, BaseTool, ToolMetadata, ToolParameter
 
 if TYPE_CHECKING:
     from ...tool_context import ToolContext
@@ -11,6 +11,9 @@ class ExecuteGeneratedCodeTool(BaseTool):
     Tool to execute dynamically generated Python code.
     """
 
+    # Generated scripts may run for a long time; it is never cut off
+    timeout = NO_TIMEOUT
+
     def __init__(self):
         super().__init__(
             name="execute_generated_code",
@@ -1,5 +1,5 @@
 from typing import Any, Dict, Optional, TYPE_CHECKING, AsyncGenerator
-from ..base_tool import BaseTool, ToolMetadata, ToolParameter
+from ..base_tool import NO_TIMEOUT, BaseTool, ToolMetadata, ToolParameter
 
 if TYPE_CHECKING:
     from ...tool_context import ToolContext
@@ -12,6 +12,9 @@ class ExecuteSkillTool(BaseTool):
     This is a bridge tool that allows React to execute skills using ReAct.
     """
 
+    # A skill runs a whole nested ReAct loop; it is never cut off
+    timeout = NO_TIMEOUT
+
     def __init__(self):
         super().__init__(
             name="execute_skill",
@@ -1,6 +1,6 @@
 import os
 from typing import Any, Dict, Optional, TYPE_CHECKING, AsyncGenerator
-from ..base_tool import BaseTool, ToolMetadata, ToolParameter
+from ..base_tool import NO_TIMEOUT, BaseTool, ToolMetadata, ToolParameter
 
 if TYPE_CHECKING:
     from ...tool_context import ToolContext
@@ -12,6 +12,9 @@ class ExecuteSkillScriptTool(BaseTool):
     Tool to execute a pre-defined script from a skill.
     """
 
+    # Skill scripts may run for a long time; it is never cut off
+    timeout = NO_TIMEOUT
+
     def __init__(self):
         super().__init__(
             name="execute_skill_script",
@@ -0,0 +1,162 @@
+from ..base_tool import BaseTool, ToolMetadata, ToolParameter
+from typing import Any, Dict, Optional, TYPE_CHECKING, AsyncGenerator
+
+if TYPE_CHECKING:
+    from ...tool_context import ToolContext
+    from agent.event.agent_event import AgentEvent
+
+
+class SearchProjectContextTool(BaseTool):
+    """
+    Tool to retrieve the project content most relevant to a query.
+
+    Searches the project's semantic index (conversation messages, screenplay
+    scenes and resources), so agents can pull the top matches instead of
+    reading whole documents into the prompt.
+    """
+
+    DEFAULT_TOP_K = 5
+    MAX_TOP_K = 20
+
+    def __init__(self):
+        super().__init__(
+            name="search_project_context",
+            description="Search the project's conversations, screenplay scenes and resources by meaning"
+        )
+
+    def metadata(self, lang: str = "en_US") -> ToolMetadata:
+        """Get metadata for the search_project_context tool."""
+        if lang == "zh_CN":
+            return ToolMetadata(
+                name=self.name,
+                description="按语义检索当前项目的对话、剧本场景和素材，返回最相关的内容片段",
+                parameters=[
+                    ToolParameter(
+                        name="query",
+                        description="要查找的内容描述",
+                        param_type="string",
+                        required=True
+                    ),
+                    ToolParameter(
+                        name="top_k",
+                        description="返回结果的最大数量（默认 5，最多 20）",
+                        param_type="number",
+                        required=False,
+                        default=self.DEFAULT_TOP_K
+                    ),
+                    ToolParameter(
+                        name="sources",
+                        description="限定检索范围：conversation、scene、resource 中的一个或多个",
+                        param_type="array",
+                        required=False,
+                        default=None
+                    ),
+                ],
+                return_description="返回按相关度排序的结果列表，每项包含 source、title、text 和 score"
+            )
+        else:
+            return ToolMetadata(
+                name=self.name,
+                description="Search the current project's conversations, screenplay scenes and resources "
+                            "by meaning and return the most relevant passages",
+                parameters=[
+                    ToolParameter(
+                        name="query",
+                        description="Description of the content to find",
+                        param_type="string",
+                        required=True
+                    ),
+                    ToolParameter(
+                        name="top_k",
+                        description="Maximum number of results (default 5, at most 20)",
+                        param_type="number",
+                        required=False,
+                        default=self.DEFAULT_TOP_K
+                    ),
+                    ToolParameter(
+                        name="sources",
+                        description="Restrict the search to one or more of: conversation, scene, resource",
+                        param_type="array",
+                        required=False,
+                        default=None
+                    ),
+                ],
+                return_description="Returns the results ordered by relevance, each with source, title, text and score"
+            )
+
+    async def execute(
+        self,
+        parameters: Dict[str, Any],
+        context: Optional["ToolContext"] = None,
+        project_name: str = "",
+        react_type: str = "",
+        run_id: str = "",
+        step_id: int = 0,
+    ) -> AsyncGenerator["AgentEvent", None]:
+        """
+        Search the project's semantic index.
+
+        Args:
+            parameters: query, and optionally top_k and sources
+            context: ToolContext containing workspace and project info
+            project_name: Project name for event tracking
+            react_type: React type for event tracking
+            run_id: Run ID for event tracking
+            step_id: Step ID for event tracking
+
+        Yields:
+            ReactEvent objects with the search results
+        """
+        query = (parameters.get("query") or "").strip()
+        if not query:
+            yield self._create_event(
+                "error", project_name, react_type, run_id, step_id,
+                error="Parameter 'query' is required"
+            )
+            return
+
+        workspace = context.workspace if context else None
+        project = workspace.get_project() if workspace else None
+        if not project:
+            yield self._create_event(
+                "error", project_name, react_type, run_id, step_id,
+                error="Project not available in context"
+            )
+            return
+
+        top_k = max(1, min(int(parameters.get("top_k") or self.DEFAULT_TOP_K), self.MAX_TOP_K))
+        sources = parameters.get("sources")
+        if isinstance(sources, str):
+            sources = [sources]
+
+        llm_service = context.get("llm_service")
+        if llm_service is None:
+            from agent.llm.llm_service import LlmService
+            llm_service = LlmService(workspace)
+
+        yield self._create_event(
+            "tool_progress", project_name, react_type, run_id, step_id,
+            progress="Searching the project index"
+        )
+
+        from agent.retrieval import semantic_index_service
+        index = semantic_index_service.get_index(project, llm_service)
+        results = await index.search(query, top_k=top_k, sources=sources)
+
+        yield self._create_event(
+            "tool_end",
+            project_name,
+            react_type,
+            run_id,
+            step_id,
+            ok=True,
+            result=[
+                {
+                    "source": r["source"],
+                    "title": r["title"],
+                    "text": r["text"],
+                    "score": round(r["score"], 3),
+                }
+                for r in results
+            ]
+        )
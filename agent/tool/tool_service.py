@@ -1,11 +1,8 @@
-import sys
-import runpy
-import io
-import contextlib
-from contextlib import contextmanager
+import asyncio
 from pathlib import Path
 from typing import Any, Dict, List, Optional, TYPE_CHECKING, AsyncGenerator
-from .base_tool import BaseTool, ToolMetadata
+from .base_tool import NO_TIMEOUT, BaseTool, ToolMetadata
+from .script_runner import ScriptRunner, script_runner
 from .tool_context import ToolContext
 
 if TYPE_CHECKING:
@@ -18,8 +15,10 @@ class ToolService:
     Provides interfaces for executing scripts and individual tools.
     """
 
-    def __init__(self):
+    def __init__(self, runner: Optional[ScriptRunner] = None):
         self.tools: Dict[str, BaseTool] = {}
+        # Scripts run in worker processes, off the event loop
+        self.script_runner = runner or script_runner
         self._register_system_tools()
 
     def _register_system_tools(self):
@@ -41,27 +40,43 @@ class ToolService:
             # If system tools are not available, continue without registering them
             pass
 
-    @contextmanager
-    def _sys_path_manager(self, project_root: str):
-        """Context manager to temporarily add project root to sys.path."""
-        original_path = sys.path.copy()
-        if project_root not in sys.path:
-            sys.path.insert(0, project_root)
-        try:
-            yield
-        finally:
-            sys.path[:] = original_path
-
-    @contextmanager
-    def _sys_argv_manager(self, new_argv: list):
-        """Context manager to temporarily modify sys.argv."""
-        import sys
-        original_argv = sys.argv[:]
-        sys.argv = new_argv if new_argv is not None else ['']
-        try:
-            yield
-        finally:
-            sys.argv[:] = original_argv
+    @staticmethod
+    def _script_context(context: Optional[ToolContext]) -> Dict[str, Any]:
+        """Picklable ToolContext data for the script's ``tool_context``."""
+        if context is None:
+            return {}
+        workspace = context.workspace
+        return {
+            "workspace": getattr(workspace, "workspace_path", workspace if isinstance(workspace, str) else None),
+            "project_name": context.project_name,
+        }
+
+    def _script_tool_caller(
+        self,
+        context: Optional[ToolContext],
+        project_name: str,
+        react_type: str,
+        run_id: str,
+        step_id: int,
+    ):
+        """Create the coroutine function that runs a script's ``execute_tool`` calls."""
+        async def call_tool(script_tool_name: str, parameters: Dict[str, Any]):
+            async for event in self.execute_tool(
+                script_tool_name,
+                parameters,
+                context,
+                project_name,
+                react_type,
+                run_id,
+                step_id,
+            ):
+                if event.event_type == "tool_end":
+                    return event.payload.get("result")
+                elif event.event_type == "error":
+                    raise RuntimeError(event.payload.get("error", "Unknown error"))
+            return None
+
+        return call_tool
 
     def _find_project_root(self, start_path: Path) -> Path:
         """
@@ -206,6 +221,101 @@ class ToolService:
                 error=str(e)
             )
 
+    async def execute_tools(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        context: Optional[ToolContext] = None,
+        timeout: Optional[float] = None,
+        project_name: str = "",
+        react_type: str = "",
+        run_id: str = "",
+        step_id: int = 0,
+    ) -> AsyncGenerator[Any, None]:
+        """
+        Execute several tool calls concurrently.
+
+        Events of all calls are yielded as they happen; each carries the
+        ``call_id`` of its call in the payload, and every call ends with exactly
+        one tool_end or error event. Callers that need a deterministic order
+        collect the results by ``call_id``.
+
+        Args:
+            tool_calls: Calls as dicts with "call_id", "tool_name" and "parameters"
+            context: Optional ToolContext object containing workspace and project info
+            timeout: Seconds a call may run, unless the tool defines its own timeout
+                (None: no limit; tools with BaseTool.timeout = NO_TIMEOUT are never limited)
+            project_name: Project name for event tracking
+            react_type: React type for event tracking
+            run_id: Run ID for event tracking
+            step_id: Step ID for event tracking
+
+        Yields:
+            ReactEvent objects with types: tool_start, tool_progress, tool_end, error
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        call_done = object()
+
+        async def run_call(call: Dict[str, Any]):
+            call_id = call["call_id"]
+            tool_name = call["tool_name"]
+            tool = self.tools.get(tool_name)
+            call_timeout = getattr(tool, "timeout", None) or timeout
+            if call_timeout == NO_TIMEOUT:
+                call_timeout = None
+            finished = False
+
+            def tagged(event):
+                event.payload["call_id"] = call_id
+                return event
+
+            async def pump():
+                nonlocal finished
+                events = self.execute_tool(
+                    tool_name, call.get("parameters") or {}, context,
+                    project_name=project_name, react_type=react_type, run_id=run_id, step_id=step_id,
+                )
+                try:
+                    async for event in events:
+                        finished = event.event_type in ("tool_end", "error")
+                        await queue.put(tagged(event))
+                        if finished:
+                            break
+                finally:
+                    await events.aclose()
+
+            try:
+                await asyncio.wait_for(pump(), call_timeout)
+                if not finished:
+                    await queue.put(tagged(self._create_tool_event(
+                        "tool_end", tool_name, project_name, react_type, run_id, step_id, result=None
+                    )))
+            except asyncio.TimeoutError:
+                await queue.put(tagged(self._create_tool_event(
+                    "error", tool_name, project_name, react_type, run_id, step_id,
+                    error=f"Tool '{tool_name}' timed out after {call_timeout}s"
+                )))
+            except Exception as e:
+                if not finished:
+                    await queue.put(tagged(self._create_tool_event(
+                        "error", tool_name, project_name, react_type, run_id, step_id, error=str(e)
+                    )))
+            finally:
+                await queue.put(call_done)
+
+        tasks = [asyncio.ensure_future(run_call(call)) for call in tool_calls]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is call_done:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
     async def execute_script(
         self,
         script_path: str,
@@ -219,6 +329,9 @@ class ToolService:
         """
         Execute a script that can call various tools.
 
+        The script runs in a worker process of the script runner, so the event
+        loop keeps running and several scripts can run at once; its
+        ``execute_tool`` calls are run here, on the caller's event loop.
         Returns the script execution result (captured stdout).
 
         Args:
@@ -233,86 +346,17 @@ class ToolService:
         Returns:
             The script execution result (captured stdout), or raises an exception on error
         """
-        # Define the execute_tool function that will be available in the script
-        # Note: Scripts get a simplified sync interface for backward compatibility
-        def script_execute_tool(script_tool_name: str, parameters: Dict[str, Any]):
-            """Synchronous execute_tool wrapper for script execution.
-
-            This function is called from synchronous scripts and needs to
-            properly handle the async execute_tool method.
-            """
-            import asyncio
-            import concurrent.futures
-
-            async def _collect_result():
-                """Collect the final result from execute_tool events."""
-                result = None
-                async for event in self.execute_tool(
-                    script_tool_name,
-                    parameters,
-                    context,
-                    project_name,
-                    react_type,
-                    run_id,
-                    step_id,
-                ):
-                    if event.event_type == "tool_end":
-                        result = event.payload.get("result")
-                        return result
-                    elif event.event_type == "error":
-                        error_msg = event.payload.get("error", "Unknown error")
-                        raise RuntimeError(error_msg)
-                return result
-
-            # Get the current event loop (if any)
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # We're in an async context - we need to run the coroutine
-                    # Use a more robust approach: run in a separate thread with its own loop
-                    def run_in_new_loop():
-                        new_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(new_loop)
-                        try:
-                            return new_loop.run_until_complete(_collect_result())
-                        finally:
-                            new_loop.close()
-
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                        future = executor.submit(run_in_new_loop)
-                        return future.result(timeout=30)  # 30 second timeout
-                else:
-                    # No loop running, safe to use asyncio.run
-                    return asyncio.run(_collect_result())
-            except RuntimeError:
-                # No event loop exists, create one
-                return asyncio.run(_collect_result())
-
-        # Prepare globals for the script execution
-        script_globals = {
-            '__builtins__': __builtins__,
-            'execute_tool': script_execute_tool,
-            'tool_context': context,
-        }
-
-        # Determine project root directory - look for typical project markers
         script_dir = Path(script_path).parent
         project_root = self._find_project_root(script_dir)
 
-        # Execute the script using runpy.run_path with the context managers
         try:
-            # Capture stdout during script execution
-            captured_output = io.StringIO()
-
-            with self._sys_path_manager(str(project_root)), self._sys_argv_manager(argv), \
-                 contextlib.redirect_stdout(captured_output):
-                # Run the script with the prepared globals
-                runpy.run_path(script_path, init_globals=script_globals, run_name="__main__")
-
-            # Get the captured output and return it
-            output = captured_output.getvalue()
-            return output.rstrip() if output else None
-
+            return await self.script_runner.run(
+                script_path,
+                argv,
+                str(project_root),
+                self._script_context(context),
+                self._script_tool_caller(context, project_name, react_type, run_id, step_id),
+            )
         except SyntaxError as e:
             raise ValueError(f"Syntax error in script: {str(e)}")
         except FileNotFoundError:
@@ -352,76 +396,20 @@ class ToolService:
         import tempfile
         import os
 
-        # Define execute_tool function for the script
-        def script_execute_tool(script_tool_name: str, parameters: Dict[str, Any]):
-            """Synchronous execute_tool wrapper for script execution."""
-            import asyncio
-            import concurrent.futures
-
-            async def _collect_result():
-                """Collect the final result from execute_tool events."""
-                result = None
-                async for event in self.execute_tool(
-                    script_tool_name,
-                    parameters,
-                    context,
-                    project_name,
-                    react_type,
-                    run_id,
-                    step_id,
-                ):
-                    if event.event_type == "tool_end":
-                        result = event.payload.get("result")
-                        return result
-                    elif event.event_type == "error":
-                        error_msg = event.payload.get("error", "Unknown error")
-                        raise RuntimeError(error_msg)
-                return result
-
-            # Get the current event loop (if any)
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # We're in an async context - run in a separate thread with its own loop
-                    def run_in_new_loop():
-                        new_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(new_loop)
-                        try:
-                            return new_loop.run_until_complete(_collect_result())
-                        finally:
-                            new_loop.close()
-
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                        future = executor.submit(run_in_new_loop)
-                        return future.result(timeout=30)  # 30 second timeout
-                else:
-                    # No loop running, safe to use asyncio.run
-                    return asyncio.run(_collect_result())
-            except RuntimeError:
-                # No event loop exists, create one
-                return asyncio.run(_collect_result())
-
-        script_globals = {
-            '__builtins__': __builtins__,
-            'execute_tool': script_execute_tool,
-            'tool_context': context,
-        }
-
         # Create temp file and execute
         with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
             temp_script_path = f.name
             f.write(script_content)
 
         try:
-            captured_output = io.StringIO()
             project_root = self._find_project_root(Path.cwd())
-
-            with self._sys_path_manager(str(project_root)), self._sys_argv_manager(argv), \
-                 contextlib.redirect_stdout(captured_output):
-                runpy.run_path(temp_script_path, init_globals=script_globals, run_name="__main__")
-
-            output = captured_output.getvalue()
-            return output.rstrip() if output else None
+            return await self.script_runner.run(
+                temp_script_path,
+                argv,
+                str(project_root),
+                self._script_context(context),
+                self._script_tool_caller(context, project_name, react_type, run_id, step_id),
+            )
 
         except SyntaxError as e:
             raise ValueError(f"Syntax error: {str(e)}")
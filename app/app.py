@@ -315,6 +315,17 @@ class App():
         logger.info("="*80)
         logger.info("Application shutting down, cleaning up resources...")
         logger.info("="*80)
+        try:
+            # Save pending project.yml changes of all loaded projects
+            logger.info("Flushing project configurations...")
+            for project in list(self.workspace.project_manager.projects.values()) + [self.workspace.project]:
+                project.flush()
+            logger.info("Project configurations flushed")
+        except Exception as e:
+            logger.error(f"Error flushing project configurations: {e}")
+            logger.error("Full stack trace:")
+            logger.error(traceback.format_exc())
+
         try:
             # Shutdown the layer composition task manager
             logger.info("Shutting down LayerComposeTaskManager...")
@@ -0,0 +1,334 @@
+"""
+Content-addressed cache for layer composition outputs.
+
+A composition is identified by a hash of the ordered descriptors of the
+layers that take part in it (file content hash, type, position, size and
+visibility). When a layer stack is composed again - e.g. after toggling a
+layer off and on, or after an undo - the cached image.png / video.mp4 are
+hard-linked (or copied) into the timeline item instead of re-rendering.
+
+Each project has its own cache under ``<project>/cache/compose`` with an LRU
+size budget and persistent hit/miss counters. Lookups only update counters
+and access times, so their index writes are batched (see ``SAVE_DELAY``).
+"""
+import os
+import json
+import atexit
+import shutil
+import hashlib
+import logging
+import threading
+import time
+from typing import Optional, List, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the composition output for the same inputs changes
+COMPOSE_CACHE_VERSION = 1
+
+_OUTPUT_NAMES = ("image.png", "video.mp4")
+
+
+class _ContentHasher:
+    """Memoized file content hashing keyed by path + mtime + size."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def hash_file(self, path: str) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            digest = self._hashes.get(key)
+        if digest is not None:
+            return digest
+
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+
+        with self._lock:
+            if len(self._hashes) >= self.max_entries:
+                self._hashes.clear()
+            self._hashes[key] = digest
+        return digest
+
+
+_content_hasher = _ContentHasher()
+
+
+def hash_file_content(path: str) -> Optional[str]:
+    """
+    Get the sha256 of a file's content, memoized by path, mtime and size.
+
+    Returns:
+        str: Hex digest, or None if the file does not exist
+    """
+    return _content_hasher.hash_file(path)
+
+
+def compute_compose_key(layers: List[Any]) -> Optional[str]:
+    """
+    Compute the cache key of an ordered (bottom-to-top) list of layers.
+
+    Args:
+        layers: Layers that take part in the composition, bottom to top
+
+    Returns:
+        str: Hex digest identifying the composition, or None if a layer file is missing
+    """
+    descriptors = []
+    for layer in layers:
+        layer_path = layer.get_layer_path()
+        content_hash = _content_hasher.hash_file(layer_path) if layer_path else None
+        if content_hash is None:
+            return None
+        descriptors.append({
+            "content": content_hash,
+            "type": layer.type.value,
+            "x": layer.x,
+            "y": layer.y,
+            "width": layer.width,
+            "height": layer.height,
+            "visible": layer.visible,
+        })
+    payload = json.dumps({"version": COMPOSE_CACHE_VERSION, "layers": descriptors}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _link_or_copy(src: str, dst: str):
+    """Hard-link ``src`` to ``dst`` (replacing dst), falling back to a copy."""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def detach_output(path: str):
+    """
+    Remove ``path`` if it shares its inode with a cache entry.
+
+    Composition outputs restored from the cache are hard links; they must be
+    unlinked before being rewritten in place, otherwise the cache entry would
+    be modified as well.
+    """
+    try:
+        if os.stat(path).st_nlink > 1:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+class ComposeCache:
+    """LRU cache of composition outputs for one project."""
+
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+    INDEX_FILE = "index.json"
+    # Seconds during which lookups are batched into a single index write
+    SAVE_DELAY = 2.0
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, self.INDEX_FILE)
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._save_timer: Optional[threading.Timer] = None
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    # ==================== Index persistence ====================
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._entries = data.get("entries", {})
+            self._hits = data.get("hits", 0)
+            self._misses = data.get("misses", 0)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load compose cache index {self.index_path}: {e}")
+            self._entries = {}
+
+    def _save_index(self):
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
+        temp_path = self.index_path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"entries": self._entries, "hits": self._hits, "misses": self._misses}, f)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Failed to save compose cache index {self.index_path}: {e}")
+
+    def _schedule_save(self):
+        """Save the index after ``SAVE_DELAY``, batching the changes made meanwhile."""
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Write pending index changes (counters, access times) immediately."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_index()
+
+    # ==================== Lookup / store ====================
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _is_valid(self, key: str, entry: Dict[str, Any]) -> bool:
+        """Check that the entry files still exist and were not modified in place."""
+        for name, meta in entry.get("files", {}).items():
+            try:
+                st = os.stat(os.path.join(self._entry_dir(key), name))
+            except OSError:
+                return False
+            if st.st_size != meta.get("size") or st.st_mtime_ns != meta.get("mtime_ns"):
+                return False
+        return bool(entry.get("files"))
+
+    def restore(self, key: Optional[str], output_dir: str) -> bool:
+        """
+        Restore cached outputs for ``key`` into ``output_dir``.
+
+        Returns:
+            bool: True on a cache hit, False on a miss
+        """
+        if not key:
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_valid(key, entry):
+                logger.info(f"Dropping invalid compose cache entry {key[:12]}")
+                self._remove_entry(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                self._schedule_save()
+                return False
+            try:
+                for name in entry["files"]:
+                    _link_or_copy(os.path.join(self._entry_dir(key), name), os.path.join(output_dir, name))
+            except OSError as e:
+                logger.warning(f"Failed to restore compose cache entry {key[:12]}: {e}")
+                self._misses += 1
+                self._schedule_save()
+                return False
+            entry["last_access"] = time.time()
+            self._hits += 1
+            self._schedule_save()
+        logger.info(f"Compose cache hit {key[:12]} -> {output_dir}")
+        return True
+
+    def store(self, key: Optional[str], output_dir: str) -> bool:
+        """
+        Store the composition outputs found in ``output_dir`` under ``key``.
+
+        Returns:
+            bool: True if the outputs were stored
+        """
+        if not key:
+            return False
+        sources = {name: os.path.join(output_dir, name) for name in _OUTPUT_NAMES}
+        if not all(os.path.exists(path) for path in sources.values()):
+            return False
+
+        with self._lock:
+            entry_dir = self._entry_dir(key)
+            os.makedirs(entry_dir, exist_ok=True)
+            files = {}
+            try:
+                for name, src in sources.items():
+                    dst = os.path.join(entry_dir, name)
+                    _link_or_copy(src, dst)
+                    st = os.stat(dst)
+                    files[name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            except OSError as e:
+                logger.warning(f"Failed to store compose cache entry {key[:12]}: {e}")
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                return False
+            self._entries[key] = {
+                "files": files,
+                "size": sum(f["size"] for f in files.values()),
+                "last_access": time.time(),
+            }
+            self._evict()
+            self._save_index()
+        return True
+
+    def _remove_entry(self, key: str):
+        self._entries.pop(key, None)
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def _evict(self):
+        total = sum(e.get("size", 0) for e in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k].get("last_access", 0)):
+            if total <= self.max_bytes or len(self._entries) <= 1:
+                break
+            total -= self._entries[key].get("size", 0)
+            self._remove_entry(key)
+
+    def clear(self):
+        """Remove all cached entries (counters are kept)."""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove_entry(key)
+            self._save_index()
+
+    # ==================== Stats ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and size information for display."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+                "entries": len(self._entries),
+                "size_bytes": sum(e.get("size", 0) for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Per-project instances
+_compose_caches: Dict[str, ComposeCache] = {}
+_compose_caches_lock = threading.Lock()
+
+
+@atexit.register
+def _flush_compose_caches():
+    with _compose_caches_lock:
+        caches = list(_compose_caches.values())
+    for cache in caches:
+        cache.flush()
+
+
+def get_compose_cache(project_path: str) -> ComposeCache:
+    """Get the composition cache of a project"""
+    cache_dir = os.path.join(os.path.abspath(project_path), "cache", "compose")
+    with _compose_caches_lock:
+        cache = _compose_caches.get(cache_dir)
+        if cache is None:
+            cache = ComposeCache(cache_dir)
+            _compose_caches[cache_dir] = cache
+        return cache
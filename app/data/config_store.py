@@ -0,0 +1,237 @@
+"""
+Write-behind persistence for YAML configuration files (project.yml).
+
+Changes are made to the in-memory config dict and marked dirty; a
+background thread writes the file at most once per ``delay`` seconds, so a
+burst of updates (e.g. adding many timeline items) costs one write instead
+of one full rewrite per update. Writes go to a temporary file that replaces
+the config atomically; a write that fails with an I/O error keeps the
+changes dirty and is retried with an increasing delay, while a config that
+cannot be serialized is logged and not retried. ``flush()`` writes pending changes immediately and
+must be called before the config is abandoned (project switch, shutdown);
+an atexit hook flushes the stores still open as a last resort.
+"""
+import os
+import copy
+import time
+import atexit
+import logging
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import yaml
+
+from utils.yaml_utils import load_yaml
+
+logger = logging.getLogger(__name__)
+
+# Seconds between the first unsaved change and the write
+DEFAULT_WRITE_DELAY = 0.5
+
+# Longest delay between the retries of a failed write
+MAX_RETRY_DELAY = 30.0
+
+# Seconds an idle writer thread waits for changes before exiting
+WRITER_IDLE_SECONDS = 10.0
+
+
+class ConfigStore:
+    """
+    In-memory YAML config with dirty tracking and coalesced background writes.
+
+    Mutate ``config`` while holding ``lock`` and call ``mark_dirty()``
+    afterwards. The writer thread snapshots the config under the same lock.
+    """
+
+    def __init__(self, path: str, config: Optional[Dict[str, Any]] = None, delay: float = DEFAULT_WRITE_DELAY):
+        """
+        Args:
+            path: Path of the YAML file
+            config: Initial config (default: loaded from ``path``)
+            delay: Seconds between the first unsaved change and the write
+        """
+        self.path = path
+        self.config: Dict[str, Any] = config if config is not None else (load_yaml(path) or {})
+        self.delay = delay
+        # Guards mutations of self.config against the writer's snapshot
+        self.lock = threading.RLock()
+        self.writes = 0
+
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._dirty_generation = 0
+        self._written_generation = 0
+        self._due: Optional[float] = None
+        # Delay before retrying a failed write, doubled after every failure
+        self._retry_delay = 0.0
+        self._batch_depth = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        _open_stores.add(self)
+
+    @property
+    def dirty(self) -> bool:
+        """Whether the config has changes not written yet"""
+        with self._cond:
+            return self._dirty_generation != self._written_generation
+
+    def mark_dirty(self):
+        """Record a change; it is written within ``delay`` seconds (after the outermost batch)."""
+        with self._cond:
+            self._dirty_generation += 1
+            if not self._batch_depth:
+                self._schedule()
+
+    def _schedule(self, delay: Optional[float] = None):
+        """Schedule a write (called with self._cond held)."""
+        if self._closed:
+            return
+        if self._due is None:
+            self._due = time.monotonic() + (self.delay if delay is None else delay)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"ConfigStore-{os.path.basename(self.path)}",
+                                            daemon=True)
+            self._thread.start()
+        self._cond.notify()
+
+    @contextmanager
+    def batch(self):
+        """
+        Group changes: nothing is scheduled until the outermost batch exits,
+        then all of them are written together.
+        """
+        with self._cond:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._cond:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._dirty_generation != self._written_generation:
+                    self._schedule()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._due is None:
+                        # Idle writers exit; the next change starts a new one
+                        if not self._cond.wait(WRITER_IDLE_SECONDS) and self._due is None:
+                            self._thread = None
+                            return
+                    elif self._due > time.monotonic():
+                        self._cond.wait(self._due - time.monotonic())
+                    else:
+                        break
+                if self._closed:
+                    self._thread = None
+                    return
+                self._due = None
+            self._write()
+
+    def _write(self) -> bool:
+        """Write the config if it changed since the last write."""
+        with self._write_lock:
+            with self._cond:
+                generation = self._dirty_generation
+                if generation == self._written_generation:
+                    return True
+            with self.lock:
+                snapshot = copy.deepcopy(self.config)
+            try:
+                written = self._write_file(snapshot)
+            except yaml.YAMLError as e:
+                # Retrying cannot help: drop this write, the next change writes again
+                logger.error(f"Could not serialize {self.path}, changes not saved: {e}")
+                with self._cond:
+                    self._written_generation = generation
+                    self._retry_delay = 0.0
+                return False
+            if not written:
+                with self._cond:
+                    # The changes stay dirty; try again later
+                    self._retry_delay = min(MAX_RETRY_DELAY, max(self.delay, self._retry_delay * 2))
+                    self._due = None
+                    self._schedule(self._retry_delay)
+                return False
+            with self._cond:
+                self._written_generation = generation
+                self._retry_delay = 0.0
+            self.writes += 1
+            return True
+
+    def _write_file(self, data: Dict[str, Any]) -> bool:
+        """
+        Write the config file atomically.
+
+        Returns:
+            False if the write failed with an I/O error (worth retrying)
+
+        Raises:
+            yaml.YAMLError: The config cannot be serialized
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, temp_name = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+        except OSError as e:
+            logger.error(f"Could not save {self.path}: {e}")
+            return False
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                yaml.safe_dump(data, f, encoding='utf-8', allow_unicode=True)
+            os.replace(temp_name, self.path)
+            return True
+        except OSError as e:
+            logger.error(f"Could not save {self.path}: {e}")
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            return False
+        except yaml.YAMLError:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+
+    def flush(self) -> bool:
+        """
+        Write pending changes now.
+
+        Returns:
+            True if the file is up to date
+        """
+        with self._cond:
+            self._due = None
+        return self._write()
+
+    def close(self, flush: bool = True):
+        """
+        Stop the writer thread.
+
+        Args:
+            flush: Write pending changes first (False discards them, e.g. when the file is deleted)
+        """
+        if flush:
+            self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        _open_stores.discard(self)
+
+
+_open_stores: "weakref.WeakSet[ConfigStore]" = weakref.WeakSet()
+
+
+def _flush_open_stores():
+    for store in list(_open_stores):
+        if not os.path.isdir(os.path.dirname(os.path.abspath(store.path))):
+            # The project was deleted
+            continue
+        try:
+            store.flush()
+        except Exception as e:
+            logger.error(f"Could not flush {store.path}: {e}")
+
+
+atexit.register(_flush_open_stores)
@@ -3,7 +3,10 @@ import asyncio
 import logging
 import subprocess
 import threading
+import time
 import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import Optional, Callable, List, Tuple
 from blinker import signal
@@ -11,6 +14,10 @@ import cv2
 import numpy as np
 import shutil
 
+from app.data.compose_cache import ComposeCache, compute_compose_key, detach_output, get_compose_cache
+from app.data.layer_compositor import get_layer_compositor
+from utils.progress_utils import Progress
+
 logger = logging.getLogger(__name__)
 
 class LayerType(Enum):
@@ -322,6 +329,7 @@ class LayerManager:
             for file_path in layer_files:
                 try:
                     os.remove(file_path)
+                    get_layer_compositor().pixel_cache.invalidate(file_path)
                     logger.info(f"Deleted layer file: {file_path}")
                 except OSError as e:
                     logger.error(f"Error deleting layer file {file_path}: {e}")
@@ -434,96 +442,17 @@ class LayerManager:
         """
         将多个可见图层的图片绘制到一个图片文件中
 
+        Layers are blended on premultiplied float32 buffers by the shared
+        LayerCompositor: decoded pixels are cached by path + mtime, only the
+        dirty region of a previously composed output is recomputed, and layers
+        that are partly off-canvas are clipped to the canvas.
+
         Args:
             layer_image_paths: 包含图层和图像路径的元组列表 [(layer, image_path), ...]
             output_path: 输出图像文件路径
             canvas_size: 画布尺寸 (width, height)
         """
-        # 创建一个透明背景的画布 (RGBA)
-        canvas = np.zeros((canvas_size[1], canvas_size[0], 4), dtype=np.uint8)
-        # Set alpha channel to 0 (fully transparent)
-        canvas[:, :, 3] = 0
-
-        # 按照图层顺序从下到上绘制图层
-        for layer, image_path in layer_image_paths:
-            if not os.path.exists(image_path):
-                continue
-
-            # 跳过不可见图层
-            if not layer.visible:
-                continue
-
-            # 读取图层图像
-            layer_image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
-            if layer_image is None:
-                continue
-
-            # Ensure image has 4 channels (RGBA)
-            if len(layer_image.shape) == 2:
-                # Grayscale - convert to RGBA
-                layer_image = cv2.cvtColor(layer_image, cv2.COLOR_GRAY2BGR)
-                alpha = np.ones((layer_image.shape[0], layer_image.shape[1], 1), dtype=np.uint8) * 255
-                layer_image = np.concatenate([layer_image, alpha], axis=2)
-            elif layer_image.shape[2] == 3:
-                # RGB - add alpha channel (fully opaque)
-                alpha = np.ones((layer_image.shape[0], layer_image.shape[1], 1), dtype=np.uint8) * 255
-                layer_image = np.concatenate([layer_image, alpha], axis=2)
-            elif layer_image.shape[2] == 4:
-                # Already RGBA
-                pass
-
-            # 调整图层图像大小以匹配图层指定的尺寸
-            if layer.width > 0 and layer.height > 0:
-                layer_image = cv2.resize(layer_image, (layer.width, layer.height))
-            else:
-                layer.height, layer.width = layer_image.shape[:2]
-
-            # 确保图层在画布范围内
-            if (0 <= layer.x < canvas_size[0] and 0 <= layer.y < canvas_size[1] and
-                    layer.x + layer.width <= canvas_size[0] and layer.y + layer.height <= canvas_size[1] and
-                    layer.width > 0 and layer.height > 0):
-
-                # 提取RGBA通道
-                b, g, r, a = cv2.split(layer_image)
-                layer_rgb = cv2.merge([b, g, r])
-                alpha = a.astype(float) / 255.0
-
-                # 提取画布上对应区域
-                canvas_region = canvas[layer.y:layer.y + layer.height, layer.x:layer.x + layer.width]
-                canvas_b, canvas_g, canvas_r, canvas_a = cv2.split(canvas_region)
-                canvas_rgb = cv2.merge([canvas_b, canvas_g, canvas_r])
-                canvas_alpha = canvas_a.astype(float) / 255.0
-
-                # Alpha compositing: result = foreground * alpha_fg + background * alpha_bg * (1 - alpha_fg)
-                # New alpha: alpha_out = alpha_fg + alpha_bg * (1 - alpha_fg)
-                alpha_out = alpha + canvas_alpha * (1 - alpha)
-                
-                # Avoid division by zero
-                alpha_out_safe = np.where(alpha_out > 0, alpha_out, 1)
-                
-                # Composite RGB channels
-                for c in range(3):
-                    if c == 0:
-                        fg = layer_rgb[:, :, c].astype(float)
-                        bg = canvas_rgb[:, :, c].astype(float)
-                    elif c == 1:
-                        fg = layer_rgb[:, :, c].astype(float)
-                        bg = canvas_rgb[:, :, c].astype(float)
-                    else:
-                        fg = layer_rgb[:, :, c].astype(float)
-                        bg = canvas_rgb[:, :, c].astype(float)
-                    
-                    # Composite: (fg * alpha_fg + bg * alpha_bg * (1 - alpha_fg)) / alpha_out
-                    composite = (fg * alpha + bg * canvas_alpha * (1 - alpha)) / alpha_out_safe
-                    canvas_region[:, :, c] = composite.astype(np.uint8)
-                
-                # Set output alpha
-                canvas_region[:, :, 3] = (alpha_out * 255).astype(np.uint8)
-                
-                canvas[layer.y:layer.y + layer.height, layer.x:layer.x + layer.width] = canvas_region
-
-        # 保存最终合成的图像 (with alpha channel)
-        cv2.imwrite(output_path, canvas, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+        get_layer_compositor().composite_to_file(layer_image_paths, output_path, canvas_size)
 
     async def compose_layers(self) -> str:
         """
@@ -535,28 +464,141 @@ class LayerManager:
         It can also be called manually when needed.
         
         Returns:
-            str: Task ID for tracking the composition task
+            str: Task ID for tracking the composition task, or None if the outputs
+                were restored from the composition cache
         """
         if self.timeline_item is None:
             raise ValueError("LayerManager has not loaded timeline_item yet. Call load_layers() first.")
         
-        # Submit task to the global composition task manager
         task_manager = get_compose_task_manager()
-        task_id = await task_manager.submit_compose_task(self)
+        
+        # An unchanged layer stack that was composed before is restored from the
+        # composition cache without queueing a task. Only done when no task for
+        # this manager is queued or running, so an older result can't land later.
+        cache_key = None
+        if not task_manager.is_busy(self):
+            probe = LayerComposeTask(self, "compose_cache_probe")
+            loop = asyncio.get_running_loop()
+            cache_key = await loop.run_in_executor(None, probe.compute_cache_key)
+            if probe.restore_from_cache(cache_key):
+                logger.info(f"Layer composition for timeline item {self.timeline_item.index} restored from cache")
+                return None
+        
+        # Submit task to the global composition task manager
+        task_id = await task_manager.submit_compose_task(self, known_miss_key=cache_key)
 
         logger.info(f"Layer composition task {task_id} submitted for timeline item {self.timeline_item.index}")
         return task_id
 
 
+class ComposeProgress(Progress):
+    """Progress of a composition task, published on its timeline's compose_progress signal"""
+    
+    def __init__(self, timeline_item):
+        super().__init__()
+        self.timeline_item = timeline_item
+    
+    def on_progress(self, percent: int, logs: str):
+        super().on_progress(percent, logs)
+        timeline = self.timeline_item.timeline
+        timeline.compose_progress.send(timeline, timeline_item=self.timeline_item, percent=percent, logs=logs)
+    
+    @staticmethod
+    def for_layer_manager(layer_manager: 'LayerManager') -> Optional['ComposeProgress']:
+        """Progress for the layer manager's timeline item, or None if its timeline has no compose_progress signal"""
+        timeline_item = getattr(layer_manager, 'timeline_item', None)
+        timeline = getattr(timeline_item, 'timeline', None)
+        if timeline is None or not hasattr(timeline, 'compose_progress'):
+            return None
+        return ComposeProgress(timeline_item)
+
+
 class LayerComposeTask:
     """Layer composition task"""
     
-    def __init__(self, layer_manager: 'LayerManager', task_id: str):
+    # Single filter_complex pass: decode once, encode once, poster frame included
+    VIDEO_COMPOSE_MODE_FFMPEG = "ffmpeg"
+    # Per-frame OpenCV blending followed by an H.264 re-encode
+    VIDEO_COMPOSE_MODE_OPENCV = "opencv"
+    
+    def __init__(self, layer_manager: 'LayerManager', task_id: str,
+                 video_compose_mode: str = VIDEO_COMPOSE_MODE_FFMPEG, progress: Optional[Progress] = None):
         self.layer_manager = layer_manager
         self.task_id = task_id
+        self.video_compose_mode = video_compose_mode
+        self.progress = progress
         self.output_dir = layer_manager.timeline_item.get_item_path()
         self.output_png = os.path.join(self.output_dir, "image.png")
         self.output_mp4 = os.path.join(self.output_dir, "video.mp4")
+        # Cache key already looked up (and missed) before the task was queued
+        self.known_miss_key = None
+    
+    @staticmethod
+    def select_layers_to_compose(all_layers: List['Layer']) -> Tuple[List['Layer'], bool]:
+        """Select the layers that contribute to the composition.
+        
+        Walks the layers from top to bottom, keeping visible layers whose file
+        exists and stopping at the first video layer (videos are not transparent).
+        
+        Returns:
+            Tuple of (layers bottom-to-top, whether a video layer is included)
+        """
+        layers_to_compose = []
+        has_video = False
+        
+        for layer in reversed(all_layers):
+            if not layer.visible:
+                continue
+            
+            # Check if layer file exists before adding to composition list
+            layer_path = layer.get_layer_path()
+            if not layer_path or not os.path.exists(layer_path):
+                logger.warning(f"Layer {layer.id} file not found: {layer_path}, skipping")
+                continue
+            
+            layers_to_compose.append(layer)
+            
+            # Stop at video layer (videos are not transparent)
+            if layer.type == LayerType.VIDEO:
+                has_video = True
+                break
+        
+        # Reverse to get bottom-to-top order for composition
+        layers_to_compose.reverse()
+        return layers_to_compose, has_video
+    
+    def _get_compose_cache(self) -> Optional[ComposeCache]:
+        """Get the composition cache of the project owning this timeline item"""
+        try:
+            project_path = self.layer_manager.timeline_item.timeline.project.project_path
+        except AttributeError:
+            return None
+        if not project_path:
+            return None
+        return get_compose_cache(project_path)
+    
+    def compute_cache_key(self) -> Optional[str]:
+        """Compute the composition cache key of the current layer stack (hashes layer files)"""
+        layers_to_compose, _ = self.select_layers_to_compose(self.layer_manager.get_layers())
+        if not layers_to_compose:
+            return None
+        return compute_compose_key(layers_to_compose)
+    
+    def restore_from_cache(self, cache_key: Optional[str]) -> bool:
+        """Restore image.png / video.mp4 from the composition cache.
+        
+        Fires the timeline_changed signal on a hit.
+        
+        Returns:
+            bool: True if the outputs were restored from the cache
+        """
+        compose_cache = self._get_compose_cache()
+        if compose_cache is None or not cache_key:
+            return False
+        if not compose_cache.restore(cache_key, self.output_dir):
+            return False
+        self._fire_timeline_changed_signal()
+        return True
     
     async def execute(self):
         """Execute the composition task"""
@@ -570,36 +612,23 @@ class LayerComposeTask:
                 logger.warning("No layers to compose")
                 return
             
-            # Reverse to get top-to-bottom order
-            top_to_bottom_layers = list(reversed(all_layers))
-            
-            # Find visible layers to compose (stop at first video layer)
-            layers_to_compose = []
-            has_video = False
-            
-            for layer in top_to_bottom_layers:
-                if not layer.visible:
-                    continue
-                
-                # Check if layer file exists before adding to composition list
-                layer_path = layer.get_layer_path()
-                if not layer_path or not os.path.exists(layer_path):
-                    logger.warning(f"Layer {layer.id} file not found: {layer_path}, skipping")
-                    continue
-                
-                layers_to_compose.append(layer)
-                
-                # Stop at video layer (videos are not transparent)
-                if layer.type == LayerType.VIDEO:
-                    has_video = True
-                    break
+            layers_to_compose, has_video = self.select_layers_to_compose(all_layers)
             
             if not layers_to_compose:
                 logger.warning("No visible layers to compose")
                 return
             
-            # Reverse to get bottom-to-top order for composition
-            layers_to_compose.reverse()
+            # Skip rendering entirely if this exact layer stack was composed before
+            compose_cache = self._get_compose_cache()
+            cache_key = compute_compose_key(layers_to_compose) if compose_cache else None
+            if cache_key and cache_key != self.known_miss_key and compose_cache.restore(cache_key, self.output_dir):
+                logger.info(f"Layer composition task {self.task_id} restored from composition cache")
+                self._fire_timeline_changed_signal()
+                return
+            
+            # Outputs restored from the cache are hard links, never rewrite them in place
+            detach_output(self.output_png)
+            detach_output(self.output_mp4)
             
             logger.info(f"Composing {len(layers_to_compose)} layers (has_video: {has_video})")
             
@@ -611,6 +640,9 @@ class LayerComposeTask:
             
             logger.info(f"Layer composition task {self.task_id} completed successfully")
             
+            if cache_key:
+                compose_cache.store(cache_key, self.output_dir)
+            
             # Fire timeline_changed signal after composition completes and image.png is created
             self._fire_timeline_changed_signal()
             
@@ -626,6 +658,14 @@ class LayerComposeTask:
             except Exception as fallback_error:
                 logger.error(f"Failed to create placeholder outputs: {fallback_error}")
     
+    def _report_progress(self, percent: int, logs: str = ""):
+        """Forward composition progress to the attached Progress, if any"""
+        if self.progress is not None:
+            try:
+                self.progress.on_progress(percent, logs)
+            except Exception as e:
+                logger.warning(f"Failed to report composition progress: {e}")
+    
     def _create_placeholder_outputs(self):
         """Create placeholder output files if composition failed"""
         import cv2
@@ -746,7 +786,6 @@ class LayerComposeTask:
             return
         
         # Get video properties - validate video file
-        import cv2
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             logger.warning(f"Failed to open video: {video_path}, falling back to image composition")
@@ -770,11 +809,26 @@ class LayerComposeTask:
         
         # If no image layers, just copy the video
         if not image_layers:
-            import shutil
             shutil.copy2(video_path, self.output_mp4)
             await self._extract_first_frame()
+            self._report_progress(100, "Video copied")
             return
         
+        if self.video_compose_mode == self.VIDEO_COMPOSE_MODE_FFMPEG:
+            if await self._compose_with_video_ffmpeg(video_path, image_layers, width, height,
+                                                     duration=frame_count / fps):
+                return
+            logger.warning("Single-pass FFmpeg composition failed, falling back to OpenCV composition")
+        
+        await self._compose_with_video_opencv(video_path, image_layers, fps, width, height, frame_count)
+    
+    async def _compose_with_video_opencv(self, video_path: str, image_layers: List['Layer'],
+                                         fps: float, width: int, height: int, frame_count: int):
+        """Compose video with image overlays frame by frame using OpenCV.
+        
+        Frames are blended in Python and written with the mp4v codec, then
+        re-encoded to H.264. Used when the single-pass FFmpeg graph fails.
+        """
         # Prepare overlay images with alpha channel
         overlay_data = []
         for img_layer in image_layers:
@@ -816,11 +870,17 @@ class LayerComposeTask:
         out = cv2.VideoWriter(temp_output, fourcc, fps, (width, height))
         
         if not out.isOpened():
-            logger.warning("VideoWriter failed to open, using ffmpeg overlay instead")
             cap.release()
             out.release()
-            # Fall back to ffmpeg-based composition
-            await self._compose_with_video_ffmpeg(video_path, image_layers, width, height)
+            if self.video_compose_mode != self.VIDEO_COMPOSE_MODE_FFMPEG:
+                logger.warning("VideoWriter failed to open, using ffmpeg overlay instead")
+                if await self._compose_with_video_ffmpeg(video_path, image_layers, width, height,
+                                                         duration=frame_count / fps):
+                    return
+            # Fallback: just copy the video without overlays
+            logger.warning("Falling back to copying video without overlays")
+            shutil.copy2(video_path, self.output_mp4)
+            await self._extract_first_frame()
             return
         
         frame_idx = 0
@@ -859,6 +919,9 @@ class LayerComposeTask:
             
             out.write(frame)
             frame_idx += 1
+            if frame_count > 0:
+                # Blending is the first half of the work, the H.264 re-encode the second
+                self._report_progress(min(frame_idx * 50 // frame_count, 50), f"Blended frame {frame_idx}/{frame_count}")
         
         cap.release()
         out.release()
@@ -882,21 +945,57 @@ class LayerComposeTask:
         
         # Extract first frame as output.png
         await self._extract_first_frame()
+        self._report_progress(100, "Video composition completed")
         
         # Clean up temp file
         if os.path.exists(temp_output):
             os.remove(temp_output)
     
-    async def _compose_with_video_ffmpeg(self, video_path: str, image_layers: List['Layer'], width: int, height: int):
-        """Compose video with image overlays using FFmpeg directly"""
-        from utils.ffmpeg_utils import run_command
+    @staticmethod
+    def _build_overlay_filter_complex(image_layers: List['Layer']) -> str:
+        """Build the filter_complex graph that overlays image layers on input 0.
+        
+        Input ``i + 1`` is the image of ``image_layers[i]``; layers are given
+        bottom to top, so the chain order is the z-order. Each image is scaled
+        to its layer size and overlaid with its alpha channel at the layer
+        position (parts outside the frame are clipped by the overlay filter).
+        The result is split into ``[v]`` (yuv420p, for encoding) and
+        ``[poster]`` (for the first-frame image).
+        """
+        filter_parts = []
+        current_stream = '0:v'
         
-        if not image_layers:
-            # Just copy the video
-            import shutil
-            shutil.copy2(video_path, self.output_mp4)
-            await self._extract_first_frame()
-            return
+        for i, img_layer in enumerate(image_layers):
+            overlay_index = i + 1  # Input index in ffmpeg (0 is video, 1+ are images)
+            
+            chain = []
+            if img_layer.width > 0 and img_layer.height > 0:
+                chain.append(f'scale={img_layer.width}:{img_layer.height}')
+            chain.append('format=rgba')
+            filter_parts.append(f'[{overlay_index}:v]{",".join(chain)}[ov{i}]')
+            
+            filter_parts.append(
+                f'[{current_stream}][ov{i}]overlay=x={img_layer.x}:y={img_layer.y}:format=auto[tmp{i}]'
+            )
+            current_stream = f'tmp{i}'
+        
+        filter_parts.append(f'[{current_stream}]split=2[vmain][poster]')
+        filter_parts.append('[vmain]format=yuv420p[v]')
+        return ';'.join(filter_parts)
+    
+    async def _compose_with_video_ffmpeg(self, video_path: str, image_layers: List['Layer'], width: int, height: int,
+                                         duration: Optional[float] = None) -> bool:
+        """Compose video with image overlays in a single FFmpeg pass.
+        
+        The video is decoded once, every image layer is overlaid by one
+        filter_complex graph, the result is encoded once to H.264 and the
+        poster frame (image.png) is written by the same invocation. Progress
+        is parsed from ffmpeg's ``-progress`` output.
+        
+        Returns:
+            bool: True if the composition succeeded
+        """
+        from utils.ffmpeg_utils import run_command_with_progress
         
         # Filter valid image layers and build inputs
         valid_layers = []
@@ -908,77 +1007,53 @@ class LayerComposeTask:
         if not valid_layers:
             # No valid overlays, just copy
             logger.warning("No valid image layers found for overlay, copying video")
-            import shutil
             shutil.copy2(video_path, self.output_mp4)
             await self._extract_first_frame()
-            return
-        
-        # Build FFmpeg filter_complex for overlays
-        # Start with the video as input [0:v]
-        filter_parts = []
-        current_stream = '0:v'
-        
-        for i, img_layer in enumerate(valid_layers):
-            overlay_index = i + 1  # Input index in ffmpeg (0 is video, 1+ are images)
-            output_stream = f'tmp{i}'
-            
-            # Position for overlay
-            x, y = img_layer.x, img_layer.y
-            
-            # Create overlay filter
-            if i == len(valid_layers) - 1:
-                # Last overlay outputs to final stream
-                filter_parts.append(f'[{current_stream}][{overlay_index}:v]overlay={x}:{y}[v]')
-            else:
-                filter_parts.append(f'[{current_stream}][{overlay_index}:v]overlay={x}:{y}[{output_stream}]')
-                current_stream = output_stream
+            self._report_progress(100, "Video copied")
+            return True
         
         # Build command
-        cmd = ['ffmpeg', '-i', video_path]
+        cmd = ['ffmpeg', '-y', '-i', video_path]
         
         # Add image inputs (only valid ones)
         for img_layer in valid_layers:
-            img_path = img_layer.get_layer_path()
-            cmd.extend(['-i', img_path])
+            cmd.extend(['-i', img_layer.get_layer_path()])
         
-        filter_complex = ';'.join(filter_parts)
         cmd.extend([
-            '-filter_complex', filter_complex,
+            '-filter_complex', self._build_overlay_filter_complex(valid_layers),
+            # Output 1: the composed video
             '-map', '[v]',
             '-map', '0:a?',  # Copy audio if present
             '-c:v', 'libx264',
             '-c:a', 'copy',
-            '-pix_fmt', 'yuv420p',
-            '-y',
-            self.output_mp4
+            self.output_mp4,
+            # Output 2: the poster frame
+            '-map', '[poster]',
+            '-frames:v', '1',
+            '-update', '1',
+            self.output_png
         ])
         
         logger.info(f"FFmpeg overlay command: {' '.join(cmd)}")
         
+        def on_progress(fraction, fields):
+            self._report_progress(int(fraction * 100), f"Encoding {fields.get('out_time', '')}".strip())
+        
         try:
-            result = await run_command(cmd)
+            result = await run_command_with_progress(cmd, duration=duration, progress_callback=on_progress)
             if result.returncode != 0:
                 stderr_output = result.stderr.decode() if result.stderr else 'No error output'
                 logger.error(f"FFmpeg overlay failed (returncode={result.returncode}): {stderr_output}")
-                # Fallback: just copy the video without overlays
-                logger.warning("Falling back to copying video without overlays")
-                import shutil
-                shutil.copy2(video_path, self.output_mp4)
-                await self._extract_first_frame()
-                return
+                return False
         except Exception as e:
             logger.error(f"Exception during FFmpeg overlay: {e}")
             logger.error("Full stack trace:")
             logger.error(traceback.format_exc())
-            # Fallback: just copy the video
-            logger.warning("Falling back to copying video without overlays due to exception")
-            import shutil
-            shutil.copy2(video_path, self.output_mp4)
-            await self._extract_first_frame()
-            return
+            return False
         
-        # Extract first frame
-        await self._extract_first_frame()
+        if not os.path.exists(self.output_png):
+            await self._extract_first_frame()
+        return True
     
     async def _extract_first_frame(self):
         """Extract first frame from output.mp4 as output.png"""
@@ -1031,13 +1106,47 @@ class LayerComposeTask:
             logger.warning(f"Failed to fire timeline_changed signal: {e}")
 
 
+class _LatencyStats:
+    """Rolling latency statistics (seconds) over the most recent samples."""
+    
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def add(self, value: float):
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+    
+    def to_dict(self) -> dict:
+        recent = sorted(self._samples)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "count": self.count,
+            "avg": (self.total / self.count) if self.count else 0.0,
+            "p95": p95,
+            "max": self.max,
+        }
+
+
 class LayerComposeTaskManager:
-    """Manages layer composition tasks with queueing.
+    """Schedules layer composition tasks on background worker pools.
     
-    Uses a single background worker thread to execute heavy composition tasks
-    sequentially without blocking the UI main thread.
+    Image-only compositions run on a pool sized by CPU count, compositions
+    that include a video layer (ffmpeg-bound) have their own, smaller
+    concurrency limit. Tasks of different timeline items run in parallel,
+    while tasks of the same LayerManager never overlap: a new request
+    replaces the pending one (only the latest state matters) and waits for
+    a running one to finish. Pending tasks of the timeline item currently
+    on screen are started first, the rest in submission order.
     """
     
+    KIND_IMAGE = "image"
+    KIND_VIDEO = "video"
+    
     _instance = None
     
     def __new__(cls):
@@ -1047,237 +1156,208 @@ class LayerComposeTaskManager:
     
     def __init__(self):
         if not hasattr(self, '_initialized'):
-            self._task_queue = []  # Queue of pending tasks
-            self._current_worker = None  # Single active BackgroundWorker
+            cpu_count = os.cpu_count() or 2
+            self._limits = {
+                self.KIND_IMAGE: max(1, cpu_count),
+                self.KIND_VIDEO: max(1, cpu_count // 4),
+            }
+            self._executors = {}
+            self._lock = threading.RLock()
+            self._pending = {}  # manager_id -> latest pending LayerComposeTask
+            self._running = {}  # manager_id -> running LayerComposeTask
             self._task_counter = 0
+            self._submit_seq = 0
+            self._coalesced_count = 0
+            self._completed_count = 0
+            self._failed_count = 0
+            self._wait_latency = _LatencyStats()
+            self._run_latency = _LatencyStats()
             self._initialized = True
             self._shutdown = False  # Flag to indicate shutdown in progress
     
+    def configure(self, max_image_workers: Optional[int] = None, max_video_workers: Optional[int] = None):
+        """Set the concurrency limits of the image-only and video composition pools."""
+        with self._lock:
+            if max_image_workers is not None:
+                self._limits[self.KIND_IMAGE] = max(1, int(max_image_workers))
+            if max_video_workers is not None:
+                self._limits[self.KIND_VIDEO] = max(1, int(max_video_workers))
+            # Executors are sized on creation, recreate them lazily with the new limits
+            for executor in self._executors.values():
+                executor.shutdown(wait=False)
+            self._executors = {}
+        self._dispatch()
+    
     def _get_layer_manager_id(self, layer_manager: 'LayerManager') -> str:
         """Get unique ID for layer manager"""
         if layer_manager.timeline_item:
             return f"timeline_{layer_manager.timeline_item.index}"
         return str(id(layer_manager))
     
-    async def submit_compose_task(self, layer_manager: 'LayerManager') -> str:
+    def _get_executor(self, kind: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(kind)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=self._limits[kind],
+                                          thread_name_prefix=f"layer-compose-{kind}")
+            self._executors[kind] = executor
+        return executor
+    
+    @staticmethod
+    def _classify(layer_manager: 'LayerManager') -> str:
+        """Whether the composition will include a video layer (ffmpeg-bound)"""
+        try:
+            _, has_video = LayerComposeTask.select_layers_to_compose(layer_manager.get_layers())
+        except Exception:
+            has_video = False
+        return LayerComposeTaskManager.KIND_VIDEO if has_video else LayerComposeTaskManager.KIND_IMAGE
+    
+    @staticmethod
+    def _is_on_screen(task: 'LayerComposeTask') -> bool:
+        """Whether the task's timeline item is the one currently selected"""
+        try:
+            timeline_item = task.layer_manager.timeline_item
+            return timeline_item.timeline.project.get_timeline_index() == timeline_item.index
+        except Exception:
+            return False
+    
+    def is_busy(self, layer_manager: 'LayerManager') -> bool:
+        """Whether a task for this layer manager is queued or running"""
+        manager_id = self._get_layer_manager_id(layer_manager)
+        with self._lock:
+            return manager_id in self._pending or manager_id in self._running
+    
+    async def submit_compose_task(self, layer_manager: 'LayerManager', known_miss_key: Optional[str] = None) -> str:
         """Submit a composition task for a layer manager.
         
         The task will be executed in a background thread to avoid blocking the UI.
-        Tasks are processed sequentially by a single worker.
+        A pending task for the same layer manager is replaced by the new one.
         """
         # Don't accept new tasks if shutting down
-        if hasattr(self, '_shutdown') and self._shutdown:
+        if self._shutdown:
             logger.warning("Cannot submit task: LayerComposeTaskManager is shutting down")
             return None
         
         manager_id = self._get_layer_manager_id(layer_manager)
         
-        # Generate task ID
-        self._task_counter += 1
-        task_id = f"compose_{self._task_counter}"
-        
-        # Log submission details
-        logger.info(f"Task submission: {task_id} for {manager_id}")
-        logger.debug(f"  Current thread: {threading.current_thread().name}")
-        logger.debug(f"  Queue size before: {len(self._task_queue)}")
-        logger.debug(f"  Current worker running: {self._current_worker.is_running() if self._current_worker else False}")
-        
-        # Create task
-        task = LayerComposeTask(layer_manager, task_id)
-        task.manager_id = manager_id  # Store manager_id on task
-        
-        # Remove any existing pending tasks for the same manager_id (only latest matters)
-        old_queue_size = len(self._task_queue)
-        self._task_queue = [t for t in self._task_queue if t.manager_id != manager_id]
-        replaced_count = old_queue_size - len(self._task_queue)
-        if replaced_count > 0:
-            logger.info(f"Replaced {replaced_count} pending task(s) for {manager_id}")
-        
-        # Add new task to queue
-        self._task_queue.append(task)
-        logger.info(f"Queued composition task {task_id} for {manager_id} (queue size: {len(self._task_queue)})")
-        
-        # Start processing if no worker is active
-        if self._current_worker is None or not self._current_worker.is_running():
-            logger.debug(f"Starting task processing (worker inactive)")
-            self._process_next_task()
-        else:
-            logger.debug(f"Worker already running, task will be processed when current task completes")
-        
+        with self._lock:
+            # Generate task ID
+            self._task_counter += 1
+            self._submit_seq += 1
+            task_id = f"compose_{self._task_counter}"
+            
+            # Create task
+            task = LayerComposeTask(layer_manager, task_id,
+                                    progress=ComposeProgress.for_layer_manager(layer_manager))
+            task.manager_id = manager_id  # Store manager_id on task
+            task.known_miss_key = known_miss_key
+            task.kind = self._classify(layer_manager)
+            task.submit_seq = self._submit_seq
+            task.submitted_at = time.monotonic()
+            
+            # Only the latest request per manager matters
+            if self._pending.pop(manager_id, None) is not None:
+                self._coalesced_count += 1
+                logger.info(f"Replaced pending task for {manager_id}")
+            self._pending[manager_id] = task
+            logger.info(f"Queued composition task {task_id} ({task.kind}) for {manager_id} "
+                        f"(pending: {len(self._pending)}, running: {len(self._running)})")
+        
+        self._dispatch()
         return task_id
     
-    def _process_next_task(self):
-        """Process the next task in the queue."""
-        if not self._task_queue:
-            logger.debug("No tasks in queue to process")
-            return
-        
-        # Safety check: ensure no worker is currently running
-        if self._current_worker is not None and self._current_worker.is_running():
-            logger.warning("Cannot start next task: current worker still running")
-            logger.warning("Rescheduling task processing in 500ms...")
-            try:
-                from PySide6.QtCore import QTimer
-                QTimer.singleShot(500, self._process_next_task)
-            except ImportError:
-                pass
-            return
-        
-        # Get next task
-        task = self._task_queue.pop(0)
-        logger.info(f"Starting composition task {task.task_id} for {task.manager_id}")
-        logger.debug(f"Remaining tasks in queue: {len(self._task_queue)}")
-        
-        # Start the task in background
-        self._start_qt_background_task(task)
-
+    def _dispatch(self):
+        """Start pending tasks while their pool has free slots."""
+        with self._lock:
+            if self._shutdown:
+                return
+            running_by_kind = {kind: 0 for kind in self._limits}
+            for task in self._running.values():
+                running_by_kind[task.kind] += 1
+            
+            # Item on screen first, then submission order
+            candidates = sorted(
+                (t for m, t in self._pending.items() if m not in self._running),
+                key=lambda t: (0 if self._is_on_screen(t) else 1, t.submit_seq)
+            )
+            for task in candidates:
+                if running_by_kind[task.kind] >= self._limits[task.kind]:
+                    continue
+                running_by_kind[task.kind] += 1
+                del self._pending[task.manager_id]
+                self._running[task.manager_id] = task
+                task.started_at = time.monotonic()
+                self._wait_latency.add(task.started_at - task.submitted_at)
+                logger.info(f"Starting composition task {task.task_id} for {task.manager_id}")
+                future = self._get_executor(task.kind).submit(self._run_task, task)
+                future.add_done_callback(lambda f, t=task: self._on_task_finished(t, f))
     
-    def _start_qt_background_task(self, task: 'LayerComposeTask'):
-        """Start a composition task using Qt background worker."""
-        from app.ui.worker.worker import run_in_background
-        
-        def execute_task_sync():
-            """Wrapper to run async task in a new event loop within the background thread."""
-            import asyncio
-            # Create a new event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                # Run the async execute method
-                loop.run_until_complete(task.execute())
-            finally:
-                loop.close()
-        
-        def on_finished(result):
-            """Handle task completion and start next queued task if any."""
-            logger.info(f"Composition task {task.task_id} completed for {task.manager_id}")
-            self._on_task_finished()
-        
-        def on_error(error_msg, exception):
-            """Handle task error and start next queued task if any."""
-            logger.error(f"Composition task {task.task_id} failed: {error_msg}")
-            self._on_task_finished()
-        
-        # Run in background thread
-        worker = run_in_background(
-            task=execute_task_sync,
-            on_finished=on_finished,
-            on_error=on_error
-        )
-        
-        # Disable auto-cleanup - we'll manage cleanup ourselves
-        worker.set_auto_cleanup(False)
-        
-        self._current_worker = worker
+    @staticmethod
+    def _run_task(task: 'LayerComposeTask'):
+        """Run the async task in a new event loop within the pool thread."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(task.execute())
+        finally:
+            loop.close()
     
-    def _on_task_finished(self):
-        """Called when a task finishes. Starts next queued task if any."""
-        logger.debug("Task finished callback triggered")
-        
-        # Clean up current worker with deferred deletion
-        self._cleanup_current_worker()
-        
-        # Don't process next task if shutting down
-        if hasattr(self, '_shutdown') and self._shutdown:
-            logger.info("Skipping next task due to shutdown")
-            return
-        
-        # Process next task in queue AFTER cleanup completes
-        if self._task_queue:
-            # Use QTimer to ensure cleanup is complete before starting next task
-            # Increased delay from 50ms to 600ms to ensure worker cleanup finishes
-            try:
-                from PySide6.QtCore import QTimer
-                logger.debug(f"Scheduling next task in 600ms (queue size: {len(self._task_queue)})")
-                QTimer.singleShot(600, self._process_next_task)
-            except ImportError:
-                logger.warning("QTimer not available, processing next task immediately")
-                self._process_next_task()
+    def _on_task_finished(self, task: 'LayerComposeTask', future):
+        """Record metrics for a finished task and start the next ones."""
+        error = None if future.cancelled() else future.exception()
+        with self._lock:
+            self._running.pop(task.manager_id, None)
+            self._run_latency.add(time.monotonic() - task.started_at)
+            if error is not None:
+                self._failed_count += 1
+            else:
+                self._completed_count += 1
+        if error is not None:
+            logger.error(f"Composition task {task.task_id} failed: {error}")
         else:
-            logger.info("All composition tasks completed")
+            logger.info(f"Composition task {task.task_id} completed for {task.manager_id}")
+        self._dispatch()
     
-    def _cleanup_current_worker(self):
-        """Clean up the current worker with proper thread termination."""
-        if self._current_worker is None:
-            return
-        
-        worker = self._current_worker
-        self._current_worker = None
+    def get_metrics(self) -> dict:
+        """Get queue depth, concurrency and latency metrics of the scheduler.
         
-        logger.debug(f"Starting worker cleanup (running: {worker.is_running() if worker._thread else False})")
-        
-        # Properly stop the worker thread
-        try:
-            # First, ensure the thread is stopped
-            if worker._thread is not None:
-                thread_was_running = worker._thread.isRunning()
-                
-                if thread_was_running:
-                    logger.warning(f"Worker thread still running during cleanup, waiting for completion...")
-                    
-                # Quit the thread's event loop
-                worker._thread.quit()
-                
-                # Wait for thread to actually finish (with timeout)
-                # Increased timeout from 5s to 10s for complex compositions
-                if not worker._thread.wait(10000):  # 10 second timeout
-                    logger.error("Worker thread did not finish in time, forcing termination")
-                    worker._thread.terminate()
-                    worker._thread.wait(2000)  # Wait 2 more seconds after terminate
-                else:
-                    logger.debug(f"Worker thread stopped gracefully (was running: {thread_was_running})")
-            
-            # Use QTimer to defer the final deletion, allowing all Qt events to process
-            from PySide6.QtCore import QTimer
-            # Move worker to a temporary list to prevent garbage collection
-            if not hasattr(self, '_cleanup_pending'):
-                self._cleanup_pending = []
-            self._cleanup_pending.append(worker)
-            
-            def do_cleanup():
-                if worker in self._cleanup_pending:
-                    self._cleanup_pending.remove(worker)
-                    # Explicitly delete the worker's thread and executor
-                    if worker._thread is not None:
-                        worker._thread.deleteLater()
-                        worker._thread = None
-                    if worker._executor is not None:
-                        worker._executor.deleteLater()
-                        worker._executor = None
-                    logger.debug("Worker cleanup completed")
-            
-            # Increased delay from 200ms to 500ms to ensure Qt event processing
-            QTimer.singleShot(500, do_cleanup)
-        except Exception as e:
-            logger.error(f"Error during worker cleanup: {e}")
-            logger.error("Full stack trace:")
-            logger.error(traceback.format_exc())
+        Latencies are in seconds: ``queue_wait`` is the time from submission to
+        start, ``run_time`` the execution time of finished tasks.
+        """
+        with self._lock:
+            pending_by_kind = {kind: 0 for kind in self._limits}
+            for task in self._pending.values():
+                pending_by_kind[task.kind] += 1
+            running_by_kind = {kind: 0 for kind in self._limits}
+            for task in self._running.values():
+                running_by_kind[task.kind] += 1
+            return {
+                "queue_depth": len(self._pending),
+                "pending": pending_by_kind,
+                "running": running_by_kind,
+                "limits": dict(self._limits),
+                "completed": self._completed_count,
+                "failed": self._failed_count,
+                "coalesced": self._coalesced_count,
+                "queue_wait": self._wait_latency.to_dict(),
+                "run_time": self._run_latency.to_dict(),
+            }
     
     def shutdown(self):
         """Shutdown the task manager and clean up all resources.
         
-        Should be called when the application is closing.
+        Should be called when the application is closing. Pending tasks are
+        dropped; running tasks are left to finish in their threads.
         """
         logger.info("Shutting down LayerComposeTaskManager")
-        self._shutdown = True
-        
-        # Clear pending tasks
-        self._task_queue.clear()
-        
-        # Clean up current worker
-        self._cleanup_current_worker()
-        
-        # Clean up any pending cleanup workers
-        if hasattr(self, '_cleanup_pending'):
-            for worker in self._cleanup_pending:
-                try:
-                    if worker._thread is not None:
-                        worker._thread.quit()
-                        worker._thread.wait(2000)
-                        worker._thread.deleteLater()
-                except Exception as e:
-                    logger.error(f"Error cleaning up pending worker: {e}")
-            self._cleanup_pending.clear()
+        with self._lock:
+            self._shutdown = True
+            # Clear pending tasks
+            self._pending.clear()
+            executors = list(self._executors.values())
+            self._executors = {}
+        
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         logger.info("LayerComposeTaskManager shutdown complete")
 
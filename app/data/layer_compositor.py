@@ -0,0 +1,306 @@
+"""
+Vectorized layer compositor.
+
+Composites image layers on premultiplied float32 RGBA buffers in a single
+vectorized pass over all channels. Decoded layer pixels are cached by
+path + mtime so unchanged layers are never re-read from disk, only the
+dirty region of the canvas is recomputed between consecutive compositions
+of the same output, and layers that are partly off-canvas are clipped
+instead of skipped.
+"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Tuple, Iterable
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (x, y, width, height)
+Rect = Tuple[int, int, int, int]
+
+_INV_255 = np.float32(1.0 / 255.0)
+
+
+def intersect_rects(a: Rect, b: Rect) -> Optional[Rect]:
+    """Return the intersection of two rects, or None if they don't overlap."""
+    x0 = max(a[0], b[0])
+    y0 = max(a[1], b[1])
+    x1 = min(a[0] + a[2], b[0] + b[2])
+    y1 = min(a[1] + a[3], b[1] + b[3])
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+def union_rects(rects: Iterable[Optional[Rect]]) -> Optional[Rect]:
+    """Return the bounding box of all given rects (None entries are ignored)."""
+    rects = [r for r in rects if r is not None]
+    if not rects:
+        return None
+    x0 = min(r[0] for r in rects)
+    y0 = min(r[1] for r in rects)
+    x1 = max(r[0] + r[2] for r in rects)
+    y1 = max(r[1] + r[3] for r in rects)
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+def to_premultiplied(image: np.ndarray) -> np.ndarray:
+    """Convert a uint8 gray/BGR/BGRA image to a premultiplied float32 BGRA buffer."""
+    if image.ndim == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGRA)
+    elif image.shape[2] == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+    buf = image.astype(np.float32)
+    alpha = buf[..., 3] * _INV_255
+    # One multiply over all four channels: (b*a, g*a, r*a, a) / 255
+    scale = cv2.merge([alpha, alpha, alpha, np.ones_like(alpha)])
+    cv2.multiply(buf, scale, dst=buf, scale=float(_INV_255))
+    return buf
+
+
+def from_premultiplied(buf: np.ndarray) -> np.ndarray:
+    """Convert a premultiplied float32 BGRA buffer back to straight-alpha uint8 BGRA."""
+    b, g, r, a = cv2.split(buf)
+    inv_alpha = np.divide(np.float32(255.0), a, out=np.zeros_like(a), where=a > 0)
+    # cv2.multiply rounds and saturates when writing to CV_8U
+    channels = [cv2.multiply(c, inv_alpha, dtype=cv2.CV_8U) for c in (b, g, r)]
+    channels.append(cv2.multiply(a, 255.0, dtype=cv2.CV_8U))
+    return cv2.merge(channels)
+
+
+class LayerPixelCache:
+    """LRU cache of decoded, resized, premultiplied layer pixels.
+
+    Entries are keyed by ``(path, mtime_ns, size, width, height)`` so a
+    layer file that is rewritten on disk is transparently re-decoded, and
+    the cache is bounded by a byte budget.
+    """
+
+    def __init__(self, max_bytes: int = 1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _file_key(path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    def get(self, path: str, width: int = 0, height: int = 0) -> Optional[np.ndarray]:
+        """Return the premultiplied buffer for ``path`` resized to ``width`` x ``height``.
+
+        A non-positive width or height keeps the image's natural size.
+        Returns None if the file is missing or cannot be decoded.
+        """
+        file_key = self._file_key(path)
+        if file_key is None:
+            return None
+        key = file_key + (max(width, 0), max(height, 0))
+
+        with self._lock:
+            buf = self._entries.get(key)
+            if buf is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return buf
+            self.misses += 1
+
+        image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if image is None:
+            return None
+        if image.dtype == np.uint16:
+            image = (image >> 8).astype(np.uint8)
+        buf = to_premultiplied(image)
+        if width > 0 and height > 0 and (buf.shape[1], buf.shape[0]) != (width, height):
+            # Resizing premultiplied pixels avoids dark fringes around transparent edges
+            buf = cv2.resize(buf, (width, height), interpolation=cv2.INTER_LINEAR)
+        buf.setflags(write=False)
+
+        with self._lock:
+            # Drop stale versions of the same file
+            stale = [k for k in self._entries if k[0] == key[0] and k[1:3] != key[1:3]]
+            for k in stale:
+                self._bytes -= self._entries.pop(k).nbytes
+            if key not in self._entries:
+                self._entries[key] = buf
+                self._bytes += buf.nbytes
+            self._evict()
+        return buf
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.nbytes
+
+    def invalidate(self, path: Optional[str] = None):
+        """Drop cached pixels for ``path``, or everything if no path is given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            abs_path = os.path.abspath(path)
+            for k in [k for k in self._entries if k[0] == abs_path]:
+                self._bytes -= self._entries.pop(k).nbytes
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Placement:
+    """A layer resolved to a source buffer and a canvas rect."""
+
+    __slots__ = ("buffer", "rect", "signature")
+
+    def __init__(self, buffer: np.ndarray, rect: Rect, signature: tuple):
+        self.buffer = buffer
+        self.rect = rect
+        self.signature = signature
+
+
+class LayerCompositor:
+    """Composites layer images onto a transparent canvas.
+
+    The compositor remembers the last result for each output path. When the
+    same output is recomposed with the same canvas size and layer count, only
+    the union of the rects of layers that changed is recomputed.
+    """
+
+    def __init__(self, pixel_cache: Optional[LayerPixelCache] = None, max_remembered_outputs: int = 8):
+        self.pixel_cache = pixel_cache or LayerPixelCache()
+        self.max_remembered_outputs = max_remembered_outputs
+        self._previous: "OrderedDict[str, Tuple[Tuple[int, int], List[tuple], np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _resolve(self, layer, image_path: str) -> Optional[_Placement]:
+        if not layer.visible:
+            return None
+        buf = self.pixel_cache.get(image_path, layer.width, layer.height)
+        if buf is None:
+            return None
+        if layer.width <= 0 or layer.height <= 0:
+            layer.height, layer.width = buf.shape[:2]
+        rect = (int(layer.x), int(layer.y), int(layer.width), int(layer.height))
+        file_key = LayerPixelCache._file_key(image_path)
+        return _Placement(buf, rect, (file_key, rect))
+
+    @staticmethod
+    def _blend_region(canvas: np.ndarray, placements: List[_Placement], region: Rect):
+        """Composite all placements into ``canvas`` restricted to ``region``.
+
+        ``canvas`` is a premultiplied float32 buffer covering exactly ``region``.
+        """
+        rx, ry = region[0], region[1]
+        first = True
+        for p in placements:
+            clip = intersect_rects(p.rect, region)
+            if clip is None:
+                continue
+            cx, cy, cw, ch = clip
+            src = p.buffer[cy - p.rect[1]:cy - p.rect[1] + ch, cx - p.rect[0]:cx - p.rect[0] + cw]
+            dst = canvas[cy - ry:cy - ry + ch, cx - rx:cx - rx + cw]
+            if first:
+                # The canvas is still transparent, "over" reduces to a copy
+                dst[...] = src
+                first = False
+                continue
+            # Premultiplied "over": dst = src + dst * (1 - src_alpha), all channels at once
+            dst *= 1.0 - src[..., 3:4]
+            dst += src
+
+    def composite(self, layer_image_paths: List[Tuple[object, str]],
+                  canvas_size: Tuple[int, int], output_key: Optional[str] = None) -> np.ndarray:
+        """Composite layers bottom-to-top and return a straight-alpha uint8 BGRA image.
+
+        Args:
+            layer_image_paths: ``[(layer, image_path), ...]`` from bottom to top
+            canvas_size: Canvas size as ``(width, height)``
+            output_key: Identifier of the output (usually its path). When given,
+                the previous result for this key is reused and only the dirty
+                region is recomposited.
+        """
+        canvas_w, canvas_h = canvas_size
+        canvas_rect = (0, 0, canvas_w, canvas_h)
+
+        placements = []
+        for layer, image_path in layer_image_paths:
+            if not os.path.exists(image_path):
+                continue
+            placement = self._resolve(layer, image_path)
+            if placement is not None and placement.rect[2] > 0 and placement.rect[3] > 0:
+                placements.append(placement)
+        signatures = [p.signature for p in placements]
+
+        previous = None
+        if output_key is not None:
+            with self._lock:
+                previous = self._previous.get(output_key)
+
+        dirty = canvas_rect
+        result = None
+        if previous is not None and previous[0] == (canvas_w, canvas_h) \
+                and len(previous[1]) == len(signatures):
+            changed = [(old, new) for old, new in zip(previous[1], signatures) if old != new]
+            dirty = union_rects([old[1] for old, _ in changed] + [new[1] for _, new in changed])
+            dirty = intersect_rects(dirty, canvas_rect) if dirty is not None else None
+            result = previous[2].copy()
+
+        if result is None:
+            result = np.zeros((canvas_h, canvas_w, 4), dtype=np.uint8)
+
+        if dirty is not None:
+            dx, dy, dw, dh = dirty
+            region = np.zeros((dh, dw, 4), dtype=np.float32)
+            self._blend_region(region, placements, dirty)
+            result[dy:dy + dh, dx:dx + dw] = from_premultiplied(region)
+
+        if output_key is not None:
+            # The remembered result is shared with the caller, keep it immutable
+            result.setflags(write=False)
+            with self._lock:
+                self._previous[output_key] = ((canvas_w, canvas_h), signatures, result)
+                self._previous.move_to_end(output_key)
+                while len(self._previous) > self.max_remembered_outputs:
+                    self._previous.popitem(last=False)
+        return result
+
+    def composite_to_file(self, layer_image_paths: List[Tuple[object, str]], output_path: str,
+                          canvas_size: Tuple[int, int], output_key: Optional[str] = None) -> np.ndarray:
+        """Composite layers and write the result as a PNG with alpha channel."""
+        result = self.composite(layer_image_paths, canvas_size, output_key=output_key or output_path)
+        cv2.imwrite(output_path, result, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+        return result
+
+    def forget(self, output_key: Optional[str] = None):
+        """Forget the remembered result for ``output_key`` (or all outputs)."""
+        with self._lock:
+            if output_key is None:
+                self._previous.clear()
+            else:
+                self._previous.pop(output_key, None)
+
+
+# Global instance
+_layer_compositor = None
+
+
+def get_layer_compositor() -> LayerCompositor:
+    """Get global layer compositor instance"""
+    global _layer_compositor
+    if _layer_compositor is None:
+        _layer_compositor = LayerCompositor()
+    return _layer_compositor
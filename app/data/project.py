@@ -14,10 +14,11 @@ from typing import List, Dict, Any
 from datetime import datetime
 
 from blinker import signal
-from PySide6.QtCore import QTimer
 
 from app.data.task import ProjectTaskManager, TimelineItemTaskManager, TaskResult
 from app.data.timeline import Timeline
+from app.data.timeline_time_index import TimelineTimeIndex
+from app.data.config_store import ConfigStore
 from app.data.drawing import Drawing
 from app.data.resource import ResourceManager
 from app.data.character import CharacterManager
@@ -54,7 +55,11 @@ class Project:
         self.workspace = workspace
         self.project_path = project_path
         self.project_name = project_name
-        self.config = load_yaml(os.path.join(self.project_path, "project.yml")) or {}
+        # project.yml is written behind: changes are coalesced and saved on a background thread
+        self.config_store = ConfigStore(os.path.join(self.project_path, "project.yml"))
+        self.config = self.config_store.config
+        # Prefix sums of item durations, rebuilt after a duration or item count change
+        self._time_index: Optional[TimelineTimeIndex] = None
 
         # Initialize Timeline first (needed by task manager)
         self.timeline = Timeline(self.workspace, self, os.path.join(self.project_path, 'timeline'))
@@ -75,13 +80,6 @@ class Project:
         if load_data:
             # Trigger loading of actor data to ensure it's available immediately
             self.character_manager.list_characters()
-        
-        # Debounced save mechanism for high-frequency updates
-        self._pending_save = False
-        self._save_timer = QTimer()
-        self._save_timer.setSingleShot(True)
-        self._save_timer.setInterval(500)
-        self._save_timer.timeout.connect(self._flush_config)
 
     # ==================== Task-related methods (delegate to ProjectTaskManager) ====================
 
@@ -260,13 +258,12 @@ class Project:
             return False
 
         position = round(position, 3)
-        self.config['timeline_position'] = position
+        with self.config_store.lock:
+            self.config['timeline_position'] = position
+        self.config_store.mark_dirty()
 
         if flush:
-            self._flush_config()
-        else:
-            self._pending_save = True
-            self._save_timer.start()
+            self.flush()
 
         self.timeline_position.send(position)
         return True
@@ -286,10 +283,12 @@ class Project:
 
     def set_item_duration(self, item_index: int, duration: float):
         """Set duration for a specific timeline item"""
-        if 'timeline_item_durations' not in self.config:
-            self.config['timeline_item_durations'] = {}
-        self.config['timeline_item_durations'][str(item_index)] = duration
-        save_yaml(os.path.join(self.project_path, "project.yml"), self.config)
+        with self.config_store.lock:
+            if 'timeline_item_durations' not in self.config:
+                self.config['timeline_item_durations'] = {}
+            self.config['timeline_item_durations'][str(item_index)] = duration
+        self._time_index = None
+        self.config_store.mark_dirty()
 
     def has_item_duration(self, item_index: int) -> bool:
         """Check if duration is set for a specific timeline item"""
@@ -297,37 +296,72 @@ class Project:
         return str(item_index) in item_durations
 
     def calculate_timeline_duration(self) -> float:
-        """Calculate total timeline duration by summing all item durations"""
+        """
+        Calculate total timeline duration by summing all item durations.
+
+        Only the durations set in the project config are counted (unlike the
+        time index, which gives items without a duration the 1s default).
+        """
         item_durations = self.config.get('timeline_item_durations', {})
         return sum(item_durations.values())
 
+    def get_time_index(self) -> TimelineTimeIndex:
+        """
+        Get the start times of the timeline items.
+
+        The index is cached and rebuilt only after an item duration or the
+        item count changed, so position lookups cost O(log n).
+        """
+        item_count = self.timeline.get_item_count()
+        if self._time_index is None or self._time_index.item_count != item_count:
+            self._time_index = TimelineTimeIndex(
+                [self.get_item_duration(i) for i in range(1, item_count + 1)]
+            )
+        return self._time_index
+
     # ==================== Config management ====================
 
     def get_config(self) -> dict:
         """Get the project configuration"""
         return self.config
 
-    def _flush_config(self):
-        """Flush pending config changes to disk"""
-        if self._pending_save:
-            save_yaml(os.path.join(self.project_path, "project.yml"), self.config)
-            self._pending_save = False
-
     def update_config(self, key: str, value: Any, debounced: bool = False):
         """
         Update a configuration value.
 
+        The change is written to project.yml in the background, together
+        with the other changes made within the write delay.
+
         Args:
             key: Configuration key
             value: Configuration value
-            debounced: Whether to use debounced save
+            debounced: Kept for compatibility; every change is written behind
         """
-        self.config[key] = value
-        if debounced:
-            self._pending_save = True
-            self._save_timer.start()
-        else:
-            save_yaml(os.path.join(self.project_path, "project.yml"), self.config)
+        with self.config_store.lock:
+            self.config[key] = value
+        self.config_store.mark_dirty()
+
+    def batch_update(self):
+        """
+        Context manager grouping config changes into a single write.
+
+        Example:
+            with project.batch_update():
+                for _ in range(count):
+                    timeline.add_item()
+        """
+        return self.config_store.batch()
+
+    def flush(self) -> bool:
+        """
+        Write pending config changes to project.yml now.
+
+        Call before the project is closed or switched.
+
+        Returns:
+            True if project.yml is up to date
+        """
+        return self.config_store.flush()
 
     # ==================== Resource accessors ====================
 
@@ -351,9 +385,13 @@ class Project:
         """Create a conversation in this project."""
         return self.conversation_manager.create_conversation(self.project_path, title)
 
-    def get_conversation(self, conversation_id: str):
-        """Get a conversation from this project."""
-        return self.conversation_manager.get_conversation(self.project_path, conversation_id)
+    def get_conversation(self, conversation_id: str, limit: Optional[int] = None):
+        """Get a conversation (or only its last ``limit`` messages) from this project."""
+        return self.conversation_manager.get_conversation(self.project_path, conversation_id, limit)
+
+    def get_conversation_messages(self, conversation_id: str, limit: int, before: Optional[int] = None):
+        """Get a page of messages of a conversation in this project."""
+        return self.conversation_manager.get_messages(self.project_path, conversation_id, limit, before)
 
     def save_conversation(self, conversation):
         """Save a conversation in this project."""
@@ -599,6 +637,7 @@ class ProjectManager:
         
         project = self.projects[project_name]
         project_path = project.project_path
+        project.config_store.close(flush=False)
 
         del self.projects[project_name]
 
@@ -0,0 +1,296 @@
+"""
+Persistent cache of rendered export segments.
+
+Each timeline item is exported as a normalized segment (see
+app.data.timeline_export) identified by a hash of its source media, duration,
+frame rate, resolution and codec settings. The segments are kept under
+``<project>/cache/export_segments`` with an index recording their size,
+modification time and last use, so re-exporting a timeline only renders the
+items whose inputs changed. The cache has an LRU size budget and can be
+checked from the command line:
+
+    python -m app.data.segment_cache validate <project_path> [--deep]
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import subprocess
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_EXTENSION = ".mp4"
+TEMP_SUFFIX = ".tmp" + SEGMENT_EXTENSION
+
+
+class SegmentCache:
+    """LRU cache of rendered export segments for one project."""
+
+    DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, self.INDEX_FILE)
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._hits = 0
+        self._misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    # ==================== Index persistence ====================
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._entries = data.get("entries", {})
+            self._hits = data.get("hits", 0)
+            self._misses = data.get("misses", 0)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load segment cache index {self.index_path}: {e}")
+            self._entries = {}
+
+    def _save_index(self):
+        temp_path = self.index_path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"entries": self._entries, "hits": self._hits, "misses": self._misses}, f)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Failed to save segment cache index {self.index_path}: {e}")
+
+    # ==================== Lookup / store ====================
+
+    def segment_path(self, key: str) -> str:
+        """Path of the segment stored under ``key``"""
+        return os.path.join(self.cache_dir, key + SEGMENT_EXTENSION)
+
+    def temp_path(self, key: str) -> str:
+        """Path to render the segment of ``key`` to before storing it"""
+        return os.path.join(self.cache_dir, key + TEMP_SUFFIX)
+
+    def _is_valid(self, key: str, entry: Dict[str, Any]) -> bool:
+        """Check that the segment still exists and was not modified."""
+        try:
+            st = os.stat(self.segment_path(key))
+        except OSError:
+            return False
+        return st.st_size == entry.get("size") and st.st_mtime_ns == entry.get("mtime_ns")
+
+    def lookup(self, key: Optional[str]) -> Optional[str]:
+        """
+        Get the segment stored under ``key``.
+
+        Returns:
+            str: Path of the segment on a hit, None on a miss
+        """
+        if not key:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_valid(key, entry):
+                logger.info(f"Dropping invalid export segment {key[:12]}")
+                self._remove_entry(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            entry["last_access"] = time.time()
+            self._hits += 1
+        return self.segment_path(key)
+
+    def store(self, key: str, rendered_path: str) -> Optional[str]:
+        """
+        Move a rendered segment into the cache under ``key``.
+
+        Args:
+            key: Segment key
+            rendered_path: Rendered file, usually ``temp_path(key)``
+
+        Returns:
+            str: Path of the stored segment, or None on failure
+        """
+        path = self.segment_path(key)
+        with self._lock:
+            try:
+                os.replace(rendered_path, path)
+                st = os.stat(path)
+            except OSError as e:
+                logger.warning(f"Failed to store export segment {key[:12]}: {e}")
+                return None
+            self._entries[key] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "last_access": time.time(),
+            }
+            self._save_index()
+        return path
+
+    def _remove_entry(self, key: str):
+        self._entries.pop(key, None)
+        try:
+            os.remove(self.segment_path(key))
+        except OSError:
+            pass
+
+    def trim(self, keep: Iterable[str] = ()):
+        """
+        Evict the least recently used segments until the cache fits its budget.
+
+        Args:
+            keep: Keys that must not be evicted (the segments of the running export)
+        """
+        keep = set(keep)
+        with self._lock:
+            total = sum(e.get("size", 0) for e in self._entries.values())
+            for key in sorted(self._entries, key=lambda k: self._entries[k].get("last_access", 0)):
+                if total <= self.max_bytes:
+                    break
+                if key in keep:
+                    continue
+                total -= self._entries[key].get("size", 0)
+                self._remove_entry(key)
+            self._save_index()
+
+    def clear(self):
+        """Remove all cached segments (counters are kept)."""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove_entry(key)
+            self._save_index()
+
+    # ==================== Validation ====================
+
+    def validate(self, deep: bool = False) -> Dict[str, int]:
+        """
+        Check the cache against the files on disk and repair it.
+
+        Entries whose segment is missing or was modified are dropped, and
+        files that are not in the index (orphans, leftovers of interrupted
+        renders) are deleted. With ``deep``, every segment is also read with
+        ffprobe and dropped if it cannot be parsed.
+
+        Args:
+            deep: Probe every segment with ffprobe (skipped if ffprobe is not installed)
+
+        Returns:
+            dict: Counts of checked entries and of what was removed
+        """
+        from utils.ffmpeg_utils import check_ffprobe
+
+        report = {"checked": 0, "missing": 0, "modified": 0, "corrupt": 0, "orphans": 0}
+        probe = deep and check_ffprobe()
+        if deep and not probe:
+            logger.warning("ffprobe is not available, skipping the deep segment check")
+
+        with self._lock:
+            for key in list(self._entries):
+                report["checked"] += 1
+                path = self.segment_path(key)
+                if not os.path.exists(path):
+                    report["missing"] += 1
+                    self._remove_entry(key)
+                elif not self._is_valid(key, self._entries[key]):
+                    report["modified"] += 1
+                    self._remove_entry(key)
+                elif probe and not _probe_segment(path):
+                    report["corrupt"] += 1
+                    self._remove_entry(key)
+
+            indexed = {self.INDEX_FILE} | {key + SEGMENT_EXTENSION for key in self._entries}
+            for name in os.listdir(self.cache_dir):
+                if name in indexed or not os.path.isfile(os.path.join(self.cache_dir, name)):
+                    continue
+                report["orphans"] += 1
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError as e:
+                    logger.warning(f"Failed to remove {name} from the segment cache: {e}")
+            self._save_index()
+        return report
+
+    # ==================== Stats ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and size information for display."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+                "entries": len(self._entries),
+                "size_bytes": sum(e.get("size", 0) for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _probe_segment(path: str) -> bool:
+    """Check that ffprobe can read the duration of a segment."""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    if result.returncode != 0:
+        return False
+    try:
+        return float(result.stdout.decode().strip()) > 0
+    except ValueError:
+        return False
+
+
+# Per-project instances
+_segment_caches: Dict[str, SegmentCache] = {}
+_segment_caches_lock = threading.Lock()
+
+
+def get_segment_cache(project_path: str) -> SegmentCache:
+    """Get the export segment cache of a project"""
+    cache_dir = os.path.join(os.path.abspath(project_path), "cache", "export_segments")
+    with _segment_caches_lock:
+        cache = _segment_caches.get(cache_dir)
+        if cache is None:
+            cache = SegmentCache(cache_dir)
+            _segment_caches[cache_dir] = cache
+        return cache
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the export segment cache of a project")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    validate_parser = subparsers.add_parser("validate", help="Drop missing, modified and orphaned segments")
+    validate_parser.add_argument("project_path")
+    validate_parser.add_argument("--deep", action="store_true", help="Also check every segment with ffprobe")
+    stats_parser = subparsers.add_parser("stats", help="Show the cache size and hit rate")
+    stats_parser.add_argument("project_path")
+    clear_parser = subparsers.add_parser("clear", help="Remove all cached segments")
+    clear_parser.add_argument("project_path")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.project_path):
+        print(f"Project directory does not exist: {args.project_path}", file=sys.stderr)
+        return 1
+    cache = get_segment_cache(args.project_path)
+    if args.command == "validate":
+        report = cache.validate(deep=args.deep)
+        print(", ".join(f"{name}: {count}" for name, count in report.items()))
+        return 0
+    if args.command == "clear":
+        cache.clear()
+    stats = cache.get_stats()
+    print(f"entries: {stats['entries']}, size: {stats['size_bytes'] / (1024 * 1024):.1f} MiB "
+          f"of {stats['max_bytes'] / (1024 * 1024):.0f} MiB, hit rate: {stats['hit_rate']:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@ from PySide6.QtGui import QPixmap, Qt
 
 from app.data.task import TaskResult, TimelineItemTaskManager
 from app.data.layer import LayerManager, LayerType
+from app.data.compose_cache import detach_output
 
 from blinker import signal
 
@@ -102,6 +103,8 @@ class TimelineItem:
             return
         
         # Copy the video file directly to the timeline item's video path
+        # (unlink first: video.mp4 may be hard-linked into the composition cache)
+        detach_output(self.video_path)
         shutil.copy2(video_path, self.video_path)
         
         # Get the layer manager and register the video as a new layer
@@ -234,12 +237,14 @@ class Timeline:
     timeline_switch = signal("timeline_switch")
     layer_changed = signal("layer_changed")
     timeline_changed = signal("timeline_changed")
+    compose_progress = signal("compose_progress")
 
     def __init__(self, workspace, project, timelinePath:str):
         self.workspace = workspace
         self.project = project
         self.time_line_path = timelinePath
         self._item_cache = {}  # Cache for TimelineItem instances to prevent duplicate signal connections
+        self.item_count = 0
         try:
             p = Path(self.time_line_path)
             if not p.exists():
@@ -284,6 +289,10 @@ class Timeline:
         """Connect to timeline_changed signal (fired when timeline item composition completes)"""
         self.timeline_changed.connect(func)
 
+    def connect_compose_progress(self, func):
+        """Connect to compose_progress signal (fired from the composition thread with percent and logs)"""
+        self.compose_progress.connect(func)
+
     def get_item_count(self):
         return self.item_count
 
@@ -293,6 +302,10 @@ class Timeline:
             self._item_cache[index] = TimelineItem(self, self.time_line_path, index, self.layer_changed)
         return self._item_cache[index]
 
+    def get_item_image_path(self, index: int) -> str:
+        """Path of an item's image, without loading the item"""
+        return os.path.join(self.time_line_path, str(index), "image.png")
+
     def get_current_item(self):
         """Get the current timeline item (returns None if no valid item exists)"""
         current_index = self.project.get_timeline_index()
@@ -336,12 +349,14 @@ class Timeline:
         os.makedirs(new_item_path, exist_ok=True)
         self.add_image(new_index)
         self.refresh_count()  # Update the count
-        # 修复：使用get方法提供默认值，避免KeyError
-        num = self.project.config.get('timeline_size', 0)
-        self.project.update_config('timeline_size',num+1)
-        # 注意：我们不自动更新 timeline_index，它应该保持为用户当前选择的索引
-        # Update total timeline duration after adding new item
-        self._update_timeline_duration()
+        # The config changes below are saved to project.yml in one write
+        with self.project.batch_update():
+            # 修复：使用get方法提供默认值，避免KeyError
+            num = self.project.config.get('timeline_size', 0)
+            self.project.update_config('timeline_size',num+1)
+            # 注意：我们不自动更新 timeline_index，它应该保持为用户当前选择的索引
+            # Update total timeline duration after adding new item
+            self._update_timeline_duration()
         return new_index
 
     def add_image(self, new_index):
@@ -0,0 +1,290 @@
+"""
+Segment-based timeline export.
+
+Every timeline item is first normalized into an intermediate segment with the
+item's duration and a common resolution, frame rate, codec and audio layout.
+Segments are rendered in parallel (one ffmpeg process per CPU core) and kept
+in the project's segment cache (app.data.segment_cache), keyed by a hash of
+the source content and the render settings, so exporting again only
+re-renders the items that changed. Since all segments share the same
+parameters, the output video is produced by a single concat pass that copies
+the streams.
+"""
+import os
+import json
+import shutil
+import hashlib
+import asyncio
+import logging
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.data.compose_cache import hash_file_content
+from app.data.segment_cache import SegmentCache
+from utils.ffmpeg_utils import normalize_to_segment, merge_videos
+
+logger = logging.getLogger(__name__)
+
+# Bump when the segment output for the same inputs changes
+SEGMENT_FORMAT_VERSION = 1
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
+
+# Used when the size of the first item cannot be read (portrait 9:16)
+DEFAULT_RESOLUTION = (720, 1280)
+
+
+@dataclass
+class ExportSettings:
+    """Parameters shared by all the segments of an export."""
+    fps: int = 30
+    width: int = DEFAULT_RESOLUTION[0]
+    height: int = DEFAULT_RESOLUTION[1]
+    codec: str = 'libx264'
+    preset: str = 'veryfast'
+    crf: int = 18
+    audio_rate: int = 48000
+
+
+@dataclass
+class ExportSegment:
+    """One timeline item to be rendered as a normalized segment."""
+    index: int
+    source_path: str
+    is_image: bool
+    duration: float
+    key: Optional[str] = None
+    path: Optional[str] = None
+
+
+def select_item_source(item) -> Optional[Tuple[str, bool]]:
+    """
+    Pick the media of a timeline item, preferring the video over the image.
+
+    Returns:
+        tuple: (path, is_image), or None if the item has no media
+    """
+    video_path = item.get_video_path()
+    if video_path and os.path.exists(video_path):
+        return video_path, False
+    image_path = item.get_image_path()
+    if image_path and os.path.exists(image_path):
+        return image_path, True
+    return None
+
+
+def _media_size(path: str) -> Optional[Tuple[int, int]]:
+    """Read the frame size of an image or video without decoding it fully."""
+    if path.lower().endswith(IMAGE_EXTENSIONS):
+        from PySide6.QtGui import QImageReader
+        size = QImageReader(path).size()
+        if size.isValid():
+            return size.width(), size.height()
+        return None
+    try:
+        import cv2
+        capture = cv2.VideoCapture(path)
+        try:
+            width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        finally:
+            capture.release()
+    except Exception as e:
+        logger.warning(f"Could not read video size of {path}: {e}")
+        return None
+    return (width, height) if width > 0 and height > 0 else None
+
+
+def detect_resolution(timeline_items) -> Tuple[int, int]:
+    """
+    Get the export resolution from the first item with readable media.
+
+    Returns:
+        tuple: (width, height), rounded down to even numbers as required by yuv420p
+    """
+    for item in timeline_items:
+        for path in (item.get_image_path(), item.get_video_path()):
+            if path and os.path.exists(path):
+                size = _media_size(path)
+                if size:
+                    width, height = size
+                    return max(2, width - width % 2), max(2, height - height % 2)
+    return DEFAULT_RESOLUTION
+
+
+def compute_segment_key(source_path: str, duration: float, settings: ExportSettings) -> Optional[str]:
+    """
+    Compute the cache key of a segment.
+
+    Args:
+        source_path: Source image or video
+        duration: Segment duration in seconds
+        settings: Export settings
+
+    Returns:
+        str: Hex digest, or None if the source does not exist
+    """
+    content_hash = hash_file_content(source_path)
+    if content_hash is None:
+        return None
+    payload = json.dumps({
+        "version": SEGMENT_FORMAT_VERSION,
+        "content": content_hash,
+        "duration": round(float(duration), 3),
+        "settings": asdict(settings),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TimelineExporter:
+    """Renders timeline items into segments and joins them into videos."""
+
+    def __init__(self, cache: SegmentCache, settings: ExportSettings, max_workers: Optional[int] = None):
+        """
+        Args:
+            cache: Cache keeping the segments between exports
+            settings: Parameters shared by all the segments
+            max_workers: Number of segments rendered at once (default: CPU count)
+        """
+        self.cache = cache
+        self.settings = settings
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+
+    def plan(self, timeline_items, durations: Dict[int, float]) -> List[ExportSegment]:
+        """
+        Build the segments of the timeline items that have media.
+
+        Items without media or with a zero duration are left out (and logged).
+
+        Args:
+            timeline_items: Timeline items in order
+            durations: Duration of each item by timeline index (default 1s)
+
+        Returns:
+            list: Segments in timeline order
+        """
+        segments = []
+        skipped = []
+        for item in timeline_items:
+            source = select_item_source(item)
+            duration = durations.get(item.index, 1.0)
+            if source is None or duration <= 0:
+                skipped.append(item.index)
+                continue
+            source_path, is_image = source
+            segments.append(ExportSegment(
+                index=item.index,
+                source_path=source_path,
+                is_image=is_image,
+                duration=duration,
+                key=compute_segment_key(source_path, duration, self.settings),
+            ))
+        if skipped:
+            logger.warning(f"Not exporting timeline items without media or duration: {skipped}")
+        return segments
+
+    async def render_segments(self, segments: List[ExportSegment],
+                              progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+        """
+        Fill in the segment paths, rendering the segments that are not cached.
+
+        Args:
+            segments: Segments from ``plan``
+            progress_callback: Called with (completed, total) after each segment
+
+        Returns:
+            bool: True if every segment is available
+        """
+        total = len(segments)
+        completed = 0
+        # Items with the same key (e.g. duplicated shots) share one render
+        pending: Dict[str, List[ExportSegment]] = {}
+        for segment in segments:
+            if segment.key is None:
+                logger.error(f"Cannot read the media of timeline item {segment.index}")
+                return False
+            if segment.key in pending:
+                pending[segment.key].append(segment)
+                continue
+            segment.path = self.cache.lookup(segment.key)
+            if segment.path:
+                completed += 1
+            else:
+                pending[segment.key] = [segment]
+        if progress_callback and completed:
+            progress_callback(completed, total)
+
+        if pending:
+            logger.info(f"Rendering {len(pending)} of {total} export segments, "
+                        f"{completed} reused from the cache")
+            workers = min(self.max_workers, len(pending))
+            # Split the cores between the concurrent encoders
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            semaphore = asyncio.Semaphore(workers)
+
+            async def render(shared: List[ExportSegment]) -> bool:
+                nonlocal completed
+                async with semaphore:
+                    path = await self._render(shared[0], threads)
+                if path is None:
+                    return False
+                for segment in shared:
+                    segment.path = path
+                completed += len(shared)
+                if progress_callback:
+                    progress_callback(completed, total)
+                return True
+
+            results = await asyncio.gather(*(render(shared) for shared in pending.values()))
+            if not all(results):
+                return False
+
+        # Evict old segments now that the ones of this export are stored
+        self.cache.trim(keep={segment.key for segment in segments})
+        return True
+
+    async def _render(self, segment: ExportSegment, threads: int) -> Optional[str]:
+        # Render next to the cache entry, so an interrupted export never leaves a truncated segment
+        temp_path = self.cache.temp_path(segment.key)
+        ok = await normalize_to_segment(
+            segment.source_path, temp_path, segment.duration,
+            fps=self.settings.fps,
+            width=self.settings.width,
+            height=self.settings.height,
+            is_image=segment.is_image,
+            codec=self.settings.codec,
+            preset=self.settings.preset,
+            crf=self.settings.crf,
+            audio_rate=self.settings.audio_rate,
+            threads=threads,
+        )
+        if not ok:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            logger.error(f"Failed to render timeline item {segment.index}")
+            return None
+        return self.cache.store(segment.key, temp_path)
+
+    async def write_video(self, segments: List[ExportSegment], output_path: str) -> bool:
+        """
+        Join rendered segments into ``output_path``.
+
+        Args:
+            segments: Rendered segments in order
+            output_path: Output video path
+
+        Returns:
+            bool: True on success
+        """
+        if not segments:
+            return False
+        if len(segments) == 1:
+            try:
+                shutil.copyfile(segments[0].path, output_path)
+                return True
+            except OSError as e:
+                logger.error(f"Failed to copy segment to {output_path}: {e}")
+                return False
+        # Segments share all encoding parameters, so the streams can be copied
+        return await merge_videos([segment.path for segment in segments], output_path, codec='copy')
+
@@ -0,0 +1,59 @@
+"""
+Timeline time index.
+
+Prefix sums of the timeline item durations, so the start time of an item
+is an array lookup and the item at a playback position is a bisect,
+instead of summing durations item by item on every mouse move or
+playback tick. The project keeps one index and rebuilds it when an item
+duration or the item count changes.
+"""
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Sequence, Tuple
+
+
+class TimelineTimeIndex:
+    """Start times of the timeline items (items are 1-indexed)."""
+
+    def __init__(self, durations: Sequence[float]):
+        """
+        Args:
+            durations: Duration in seconds of items 1..n
+        """
+        self.durations = [float(d) for d in durations]
+        # starts[i] is the start of item i + 1; starts[n] is the total duration
+        self.starts = list(accumulate(self.durations, initial=0.0))
+
+    @property
+    def item_count(self) -> int:
+        return len(self.durations)
+
+    @property
+    def total_duration(self) -> float:
+        return self.starts[-1]
+
+    def get_item_start(self, index: int) -> float:
+        """Start time of item ``index`` (index n + 1 gives the total duration)."""
+        return self.starts[index - 1]
+
+    def get_item_duration(self, index: int) -> float:
+        """Duration of item ``index``."""
+        return self.durations[index - 1]
+
+    def locate(self, position: float) -> Tuple[int, float]:
+        """
+        Find the item playing at a position.
+
+        Args:
+            position: Timeline position in seconds
+
+        Returns:
+            (item index, offset in seconds within the item); positions before
+            the start map to item 1 and positions past the end to the last
+            item. (0, 0.0) if there are no items.
+        """
+        if not self.durations:
+            return 0, 0.0
+        slot = bisect_right(self.starts, position, 0, len(self.durations)) - 1
+        slot = max(slot, 0)
+        return slot + 1, position - self.starts[slot]
@@ -153,6 +153,10 @@ class Workspace():
 
     def switch_project(self, project_name: str):
         """切换到指定项目"""
+        # Save pending project.yml changes of the current project
+        if self.project is not None:
+            self.project.flush()
+
         # 更新项目路径和名称
         self.project_name = project_name
         # Update project path to be inside the projects subdirectory
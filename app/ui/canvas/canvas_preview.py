@@ -371,23 +371,16 @@ class CanvasPreview(QWidget):
             # Loop back to start
             position = position % total_duration
         
-        # Iterate through items to find the one containing this position
-        accumulated_time = 0.0
-        item_count = timeline.get_item_count()
+        # Bisect the item start times to find the one containing this position
+        time_index = project.get_time_index()
+        item_count = time_index.item_count
         
-        for i in range(1, item_count + 1):
-            item_duration = project.get_item_duration(i)
-            
-            if position < accumulated_time + item_duration:
-                # Found the item
-                item_offset = position - accumulated_time
-                return (i, item_offset)
-            
-            accumulated_time += item_duration
+        if item_count > 0 and position < time_index.total_duration:
+            return time_index.locate(position)
         
         # Position is beyond all items, return last item
         if item_count > 0:
-            last_item_duration = project.get_item_duration(item_count)
+            last_item_duration = time_index.get_item_duration(item_count)
             return (item_count, last_item_duration)
         
         return (None, None)
@@ -436,11 +429,8 @@ class CanvasPreview(QWidget):
         # Update current item tracking
         self._current_item_index = item_index
         
-        # Calculate start time of this item
-        accumulated_time = 0.0
-        for i in range(1, item_index):
-            accumulated_time += project.get_item_duration(i)
-        self._current_item_start_time = accumulated_time
+        # Start time of this item
+        self._current_item_start_time = project.get_time_index().get_item_start(item_index)
         
         # Emit item changed signal
         self.item_changed.emit(item_index)
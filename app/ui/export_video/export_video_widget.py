@@ -17,7 +17,9 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from app.ui.base_widget import BaseWidget
 from utils.i18n_utils import tr, translation_manager
 
-from utils.ffmpeg_utils import images_to_video, merge_videos, check_ffmpeg, ensure_ffmpeg
+from utils.ffmpeg_utils import check_ffmpeg, ensure_ffmpeg
+from app.data.timeline_export import ExportSettings, TimelineExporter, detect_resolution
+from app.data.segment_cache import get_segment_cache
 
 
 class ExportWorkerSignals(QObject):
@@ -61,9 +63,6 @@ class ExportWorker(QRunnable):
         import asyncio
         # Run the async function in a new event loop
         try:
-            # Import here to avoid circular imports
-            from utils.ffmpeg_utils import images_to_video, merge_videos, ensure_ffmpeg
-
             # Create a new event loop for this thread
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
@@ -78,7 +77,7 @@ class ExportWorker(QRunnable):
     async def _async_run(self):
         """Internal async run method"""
         # Import here to avoid circular imports
-        from utils.ffmpeg_utils import images_to_video, merge_videos, ensure_ffmpeg
+        from utils.ffmpeg_utils import ensure_ffmpeg
 
         # Ensure FFmpeg is available
         if not await ensure_ffmpeg():
@@ -92,153 +91,93 @@ class ExportWorker(QRunnable):
         output_dir = self.export_params['output_dir']
         fps = self.export_params['fps']
 
+        width, height = detect_resolution(timeline_items)
+        exporter = TimelineExporter(self.export_params['segment_cache'],
+                                    ExportSettings(fps=fps, width=width, height=height))
+
+        # Every mode renders the same normalized segments, in parallel
+        segments = exporter.plan(timeline_items, self.export_params['item_durations'])
+        if not segments:
+            self.signals.error.emit("No media items found to export.")
+            return
+        if not await exporter.render_segments(segments, self._on_segment_rendered):
+            self.signals.error.emit("Failed to render timeline items.")
+            return
+
         if export_mode == 'all_as_one':
             # Export all items as a single video
-            await self._export_all_as_one(timeline_items, output_dir, fps)
+            success = await self._export_all_as_one(exporter, segments, output_dir)
         elif export_mode == 'grouped':
             # Export in groups of N items
-            await self._export_grouped(timeline_items, items_per_video, output_dir, fps)
+            success = await self._export_grouped(exporter, segments, timeline_items, items_per_video, output_dir)
         elif export_mode == 'individual':
             # Export each item as a separate video
-            await self._export_individual(timeline_items, output_dir, fps)
+            success = await self._export_individual(exporter, segments, output_dir)
+        else:
+            success = True
 
-        self.signals.finished.emit()
+        if success:
+            self.signals.progress.emit(100)
+            self.signals.finished.emit()
 
-    async def _export_all_as_one(self, timeline_items, output_dir, fps):
-        """Export all timeline items as a single video"""
-        # Collect all media paths, prioritizing video over image for each item
-        all_media_paths = []
-        for item in timeline_items:
-            # Prioritize video over image for each timeline item
-            video_path = item.get_video_path()
-            image_path = item.get_image_path()
-
-            # If video exists and is valid, use it
-            if video_path and os.path.exists(video_path):
-                all_media_paths.append(video_path)
-            # If video doesn't exist but image does, use the image (to be converted)
-            elif image_path and os.path.exists(image_path):
-                all_media_paths.append(image_path)
-            # If neither exists, skip this item (don't add anything to the list)
-
-        if not all_media_paths:
-            self.signals.error.emit("No media items found to export.")
-            return
+    def _on_segment_rendered(self, completed, total):
+        """Rendering the segments covers the first 90% of the progress"""
+        self.signals.progress.emit(int(completed / total * 90))
 
+    async def _export_all_as_one(self, exporter, segments, output_dir):
+        """Export all timeline items as a single video"""
         base_output_path = os.path.join(output_dir, "timeline_export_all.mp4")
         output_path = self._get_unique_filename(base_output_path)
 
-        # If all items are images, convert to video
-        image_extensions = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
-        all_images = all(path.lower().endswith(image_extensions) for path in all_media_paths)
-
-        if all_images:
-            success = await images_to_video(all_media_paths, output_path, duration_per_image=1.0, fps=fps)
-        else:
-            # Some are images, some are videos - need to handle differently
-            # For now, just merge videos if they exist
-            video_paths = [p for p in all_media_paths if not p.lower().endswith(image_extensions)]
-            if video_paths:
-                success = await merge_videos(video_paths, output_path)
-            else:
-                success = await images_to_video(all_media_paths, output_path, duration_per_image=1.0, fps=fps)
-
-        if not success:
+        if not await exporter.write_video(segments, output_path):
             self.signals.error.emit("Failed to create video from timeline items.")
+            return False
+        return True
 
-    async def _export_grouped(self, timeline_items, items_per_video, output_dir, fps):
+    async def _export_grouped(self, exporter, segments, timeline_items, items_per_video, output_dir):
         """Export timeline items in groups of N"""
-        # Group timeline items
+        # Group the timeline items as selected, then use the segments of the items that have media
         groups = []
         for i in range(0, len(timeline_items), items_per_video):
-            group = timeline_items[i:i + items_per_video]
-            groups.append(group)
+            groups.append(timeline_items[i:i + items_per_video])
 
+        segments_by_index = {segment.index: segment for segment in segments}
         total_groups = len(groups)
 
         for idx, group in enumerate(groups):
-            # Collect media paths for this group, prioritizing video over image for each item
-            group_media_paths = []
-            for item in group:
-                # Prioritize video over image for each timeline item
-                video_path = item.get_video_path()
-                image_path = item.get_image_path()
-
-                # If video exists and is valid, use it
-                if video_path and os.path.exists(video_path):
-                    group_media_paths.append(video_path)
-                # If video doesn't exist but image does, use the image (to be converted)
-                elif image_path and os.path.exists(image_path):
-                    group_media_paths.append(image_path)
-                # If neither exists, skip this item (don't add anything to the list)
-
-            if not group_media_paths:
+            group_segments = [segments_by_index[item.index] for item in group if item.index in segments_by_index]
+            if not group_segments:
                 continue
 
             base_output_path = os.path.join(output_dir, f"timeline_group_{idx + 1:03d}.mp4")
             output_path = self._get_unique_filename(base_output_path)
 
-            # Determine if all are images
-            image_extensions = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
-            all_images = all(path.lower().endswith(image_extensions) for path in group_media_paths)
-
-            if all_images:
-                success = await images_to_video(group_media_paths, output_path, duration_per_image=1.0, fps=fps)
-            else:
-                video_paths = [p for p in group_media_paths if not p.lower().endswith(image_extensions)]
-                if video_paths:
-                    success = await merge_videos(video_paths, output_path)
-                else:
-                    success = await images_to_video(group_media_paths, output_path, duration_per_image=1.0, fps=fps)
-
-            if not success:
+            if not await exporter.write_video(group_segments, output_path):
                 self.signals.error.emit(f"Failed to create video for group {idx + 1}")
-                return
+                return False
 
             # Update progress
-            progress = int((idx + 1) / total_groups * 100)
+            progress = 90 + int((idx + 1) / total_groups * 10)
             self.signals.progress.emit(progress)
+        return True
 
-    async def _export_individual(self, timeline_items, output_dir, fps):
+    async def _export_individual(self, exporter, segments, output_dir):
         """Export each timeline item as a separate video"""
-        total_items = len(timeline_items)
-
-        for idx, item in enumerate(timeline_items):
-            media_path = None
-            video_path = item.get_video_path()
-            image_path = item.get_image_path()
-
-            # Prioritize video over image for each timeline item
-            # If video exists and is valid, use it
-            if video_path and os.path.exists(video_path):
-                media_path = video_path
-            # If video doesn't exist but image does, use the image (to be converted)
-            elif image_path and os.path.exists(image_path):
-                media_path = image_path
-            # If neither exists, skip this item
-            else:
-                continue  # Skip this timeline item if neither video nor image exists
-
-            # For images, create a short video; for videos, copy or process
-            if media_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-                base_output_path = os.path.join(output_dir, f"item_{item.get_timeline_index():03d}.mp4")
-                output_path = self._get_unique_filename(base_output_path)
-                success = await images_to_video([media_path], output_path, duration_per_image=2.0, fps=fps)
-            else:
-                # For existing videos, we could copy or process them
-                # For now, just copy the video to the output directory with new naming
-                base_output_path = os.path.join(output_dir, f"item_{item.get_timeline_index():03d}_video.mp4")
-                output_path = self._get_unique_filename(base_output_path)
-                # This would require a video copy function - using merge_videos with single video
-                success = await merge_videos([media_path], output_path, codec='copy')
-
-            if not success:
-                self.signals.error.emit(f"Failed to process item {idx + 1}")
-                return
+        total_items = len(segments)
+
+        for idx, segment in enumerate(segments):
+            suffix = "" if segment.is_image else "_video"
+            base_output_path = os.path.join(output_dir, f"item_{segment.index:03d}{suffix}.mp4")
+            output_path = self._get_unique_filename(base_output_path)
+
+            if not await exporter.write_video([segment], output_path):
+                self.signals.error.emit(f"Failed to process item {segment.index}")
+                return False
 
             # Update progress
-            progress = int((idx + 1) / total_items * 100)
+            progress = 90 + int((idx + 1) / total_items * 10)
             self.signals.progress.emit(progress)
+        return True
 
 class ExportVideoWidget(BaseWidget):
     """
@@ -735,6 +674,9 @@ class ExportVideoWidget(BaseWidget):
         
         # Save the last export directory
         project = self.workspace.get_project()
+        export_params['item_durations'] = {item.index: project.get_item_duration(item.index)
+                                           for item in timeline_items}
+        export_params['segment_cache'] = get_segment_cache(project.project_path)
         project.update_config('last_export_dir', output_dir)
         
         # Store the export directory to use after export finishes
@@ -0,0 +1,224 @@
+"""
+Thumbnail cache for timeline cards.
+
+Card thumbnails are decoded and scaled on a background thread pool, never
+on the GUI thread, and written as small WebP (or JPEG) files under
+``<project>/cache/thumbnails``. A thumbnail file is keyed by the source
+image path, its mtime and size, so a changed image is rendered again and
+an unchanged one is only read back from the cache. A bounded in-memory
+LRU of ready QPixmaps keeps memory flat regardless of timeline length.
+"""
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, Signal
+from PySide6.QtGui import QImage, QImageReader, QImageWriter, QPixmap
+
+logger = logging.getLogger(__name__)
+
+# Size of the card image (VideoTimelineCard)
+THUMBNAIL_SIZE = QSize(90, 160)
+THUMBNAIL_QUALITY = 80
+
+# Ready thumbnails kept in memory (about 56 KB each)
+DEFAULT_MEMORY_ENTRIES = 256
+
+# Background threads decoding source images
+DEFAULT_WORKERS = 2
+
+_ThumbnailKey = Tuple[str, int, int]
+
+
+def _thumbnail_format() -> str:
+    formats = {bytes(f).decode() for f in QImageWriter.supportedImageFormats()}
+    return "webp" if "webp" in formats else "jpg"
+
+
+class _ThumbnailJob(QRunnable):
+    """Renders (or reads back) one thumbnail on the thread pool."""
+
+    def __init__(self, cache: 'ThumbnailCache', source_path: str, key: _ThumbnailKey):
+        super().__init__()
+        self.cache = cache
+        self.source_path = source_path
+        self.key = key
+
+    def run(self):
+        image = None
+        try:
+            image = self.cache.load_or_render(self.key)
+        except Exception as e:
+            logger.warning(f"Could not create thumbnail of {self.source_path}: {e}")
+        self.cache._rendered.emit(self.source_path, self.key, image)
+
+
+class ThumbnailCache(QObject):
+    """
+    Per-project cache of timeline card thumbnails.
+
+    ``request()`` is called on the GUI thread; it returns the thumbnail when
+    it is in memory, otherwise it schedules it and ``thumbnail_ready`` is
+    emitted (on the GUI thread) once it is available.
+    """
+
+    # source_path, thumbnail
+    thumbnail_ready = Signal(str, QPixmap)
+
+    # Emitted from the pool threads: source_path, key, QImage or None
+    _rendered = Signal(str, object, object)
+
+    def __init__(
+        self,
+        cache_dir: str,
+        size: QSize = THUMBNAIL_SIZE,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        thread_pool: Optional[QThreadPool] = None,
+    ):
+        """
+        Args:
+            cache_dir: Directory of the thumbnail files
+            size: Thumbnail size
+            max_memory_entries: Thumbnails kept in memory
+            thread_pool: Pool rendering thumbnails (default: a shared pool of DEFAULT_WORKERS threads)
+        """
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.size = QSize(size)
+        self.max_memory_entries = max_memory_entries
+        self.thread_pool = thread_pool or _get_thread_pool()
+        self.image_format = _thumbnail_format()
+        # source path -> (key, pixmap), least recently used first
+        self._memory: "OrderedDict[str, Tuple[_ThumbnailKey, QPixmap]]" = OrderedDict()
+        self._pending: Set[_ThumbnailKey] = set()
+        self._rendered.connect(self._on_rendered)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def source_key(source_path: str) -> Optional[_ThumbnailKey]:
+        """Cache key of a source image, or None if it does not exist."""
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            return None
+        return os.path.abspath(source_path), st.st_mtime_ns, st.st_size
+
+    def _file_prefix(self, key: _ThumbnailKey) -> str:
+        return hashlib.sha1(key[0].encode('utf-8')).hexdigest()[:20]
+
+    def thumbnail_path(self, key: _ThumbnailKey) -> str:
+        """Path of the thumbnail file of a source key."""
+        _, mtime_ns, size = key
+        return os.path.join(self.cache_dir, f"{self._file_prefix(key)}_{mtime_ns:x}_{size:x}.{self.image_format}")
+
+    def request(self, source_path: str) -> Optional[QPixmap]:
+        """
+        Get the thumbnail of an image.
+
+        Args:
+            source_path: Path of the full-size image
+
+        Returns:
+            The thumbnail if it is in memory; otherwise None, and
+            ``thumbnail_ready`` is emitted when it has been loaded
+        """
+        key = self.source_key(source_path)
+        if key is None:
+            return None
+
+        cached = self._memory.get(source_path)
+        if cached is not None and cached[0] == key:
+            self._memory.move_to_end(source_path)
+            return cached[1]
+
+        if key not in self._pending:
+            self._pending.add(key)
+            self.thread_pool.start(_ThumbnailJob(self, source_path, key))
+        return None
+
+    def load_or_render(self, key: _ThumbnailKey) -> Optional[QImage]:
+        """
+        Read the thumbnail file of a key, rendering it first if needed.
+
+        Runs on a pool thread.
+
+        Returns:
+            The thumbnail image, or None if the source cannot be decoded
+        """
+        path = self.thumbnail_path(key)
+        if os.path.exists(path):
+            image = QImage(path)
+            if not image.isNull():
+                return image
+
+        reader = QImageReader(key[0])
+        reader.setAutoTransform(True)
+        source = reader.read()
+        if source.isNull():
+            logger.warning(f"Could not decode {key[0]}: {reader.errorString()}")
+            return None
+        image = source.scaled(self.size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        if image.save(temp_path, self.image_format, THUMBNAIL_QUALITY):
+            os.replace(temp_path, path)
+            self._remove_stale(key, path)
+        else:
+            logger.warning(f"Could not write thumbnail {path}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return image
+
+    def _remove_stale(self, key: _ThumbnailKey, current_path: str):
+        """Remove thumbnails of former versions of the same source."""
+        prefix = f"{self._file_prefix(key)}_"
+        current_name = os.path.basename(current_path)
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and name != current_name and not name.endswith('.tmp'):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def _on_rendered(self, source_path: str, key: _ThumbnailKey, image: Optional[QImage]):
+        self._pending.discard(key)
+        if image is None or image.isNull():
+            return
+        # QPixmap may only be created on the GUI thread
+        pixmap = QPixmap.fromImage(image)
+        self._memory[source_path] = (key, pixmap)
+        self._memory.move_to_end(source_path)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+        self.thumbnail_ready.emit(source_path, pixmap)
+
+    def clear_memory(self):
+        """Drop the thumbnails held in memory."""
+        self._memory.clear()
+
+
+_thread_pool: Optional[QThreadPool] = None
+
+# Per-project instances
+_thumbnail_caches: Dict[str, ThumbnailCache] = {}
+
+
+def _get_thread_pool() -> QThreadPool:
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setMaxThreadCount(DEFAULT_WORKERS)
+    return _thread_pool
+
+
+def get_thumbnail_cache(project_path: str) -> ThumbnailCache:
+    """Get the thumbnail cache of a project"""
+    cache_dir = os.path.join(os.path.abspath(project_path), "cache", "thumbnails")
+    cache = _thumbnail_caches.get(cache_dir)
+    if cache is None:
+        cache = ThumbnailCache(cache_dir)
+        _thumbnail_caches[cache_dir] = cache
+    return cache
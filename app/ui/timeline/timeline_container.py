@@ -223,8 +223,8 @@ class TimelineContainer(BaseWidget):
         self.workspace = workspace
         # Timeline card dimensions (from HoverZoomFrame)
         self.card_width = 90  # Fixed width of each card
-        self.card_spacing = 5  # Spacing between cards (from timeline_layout.setSpacing(5))
-        self.content_margin_left = 5  # Left margin from timeline_layout.setContentsMargins(5, 5, 5, 5)
+        self.card_spacing = 5  # Spacing between cards (VideoTimeline.card_spacing)
+        self.content_margin_left = 5  # Left margin of the first card (VideoTimeline.content_margin)
         # Create the timeline widget
         self.video_timeline = VideoTimeline(self, workspace)
         self.subtitle_timeline = SubtitleTimeline(self, workspace)
@@ -275,6 +275,8 @@ class TimelineContainer(BaseWidget):
         # Install event filter to intercept mouse clicks from child widgets
         self.installEventFilter(self)
         self._install_event_filters_recursively(self.video_timeline)
+        # Cards created later by the virtualized video strip
+        self.video_timeline.card_created.connect(self._install_event_filters_recursively)
         if self.subtitle_timeline:
             self._install_event_filters_recursively(self.subtitle_timeline)
         if self.voice_timeline:
@@ -391,10 +393,7 @@ class TimelineContainer(BaseWidget):
             int: The minimum width for all timeline content widgets
         """
         # Get card count from video timeline
-        if not hasattr(self.video_timeline, 'cards'):
-            return 800  # Default minimum width
-        
-        card_count = len(self.video_timeline.cards)
+        card_count = self.video_timeline.get_card_count()
         if card_count == 0:
             return 800  # Default minimum width
         
@@ -491,6 +490,9 @@ class TimelineContainer(BaseWidget):
     def calculate_timeline_position(self, mouse_x: int) -> Tuple[float, int]:
         """
         Calculate the playback position in seconds and card number based on mouse X coordinate.
+
+        Cards have a fixed width, so the card under the mouse is found by
+        division and its start time read from the project's time index.
         
         Args:
             mouse_x: Mouse X coordinate in the container
@@ -499,12 +501,13 @@ class TimelineContainer(BaseWidget):
             tuple[float, int]: (Playback position in seconds with millisecond precision, Card number/index)
                               Card number is 1-indexed. Returns 0 if before first card or no cards exist.
         """
-        # Get the timeline widget's cards
+        # Get the timeline widget's card count
         timeline = self.video_timeline
-        if not hasattr(timeline, 'cards') or not timeline.cards:
+        card_count = timeline.get_card_count()
+        if not card_count:
             return 0.0, 0
         
-        # Get the workspace and project to access timeline items
+        # Get the workspace and project to access item durations
         workspace = timeline.workspace
         if not workspace:
             return 0.0, 0
@@ -512,10 +515,6 @@ class TimelineContainer(BaseWidget):
         project = workspace.get_project()
         if not project:
             return 0.0, 0
-            
-        timeline_data = project.get_timeline()
-        if not timeline_data:
-            return 0.0, 0
         
         # Account for scroll position
         scroll_area = timeline.scroll_area
@@ -527,47 +526,29 @@ class TimelineContainer(BaseWidget):
         # If mouse is before the first card, position is 0
         if adjusted_x < 0:
             return 0.0, 0
-        
-        # Calculate which card the mouse is over and position within that card
-        accumulated_time = 0.0
-        current_x = 0
-        
-        for i, card in enumerate(timeline.cards):
-            card_index = i + 1  # Cards are 1-indexed
-            
-            # Get duration for this card directly from project
-            try:
-                item_duration = project.get_item_duration(card_index)
-            except Exception as e:
-                logger.error(f"Error getting duration for card {card_index}: {e}")
-                item_duration = 1.0  # Default to 1 second if error
-            
-            # Calculate card boundaries
-            card_start_x = current_x
-            card_end_x = current_x + self.card_width
-            
-            # Check if mouse is within this card
-            if adjusted_x >= card_start_x and adjusted_x < card_end_x:
-                # Calculate position within the card
-                position_in_card = adjusted_x - card_start_x
-                # Calculate time fraction within this card
-                time_fraction = position_in_card / self.card_width
-                # Calculate absolute time position
-                position_in_seconds = accumulated_time + (time_fraction * item_duration)
-                # Round to millisecond precision (3 decimal places)
-                return round(position_in_seconds, 3), card_index
-            
-            # Move to next card
-            accumulated_time += item_duration
-            current_x = card_end_x + self.card_spacing
-        
+
+        time_index = project.get_time_index()
+        card_stride = self.card_width + self.card_spacing
+        card_index = int(adjusted_x // card_stride) + 1  # Cards are 1-indexed
+
         # If mouse is after all cards, return the total duration and last card index
-        last_card_index = len(timeline.cards)
-        return round(accumulated_time, 3), last_card_index
+        if card_index > min(card_count, time_index.item_count):
+            return round(time_index.total_duration, 3), card_count
+
+        # Position within the card (the gap after a card counts as its end)
+        position_in_card = min(adjusted_x - (card_index - 1) * card_stride, self.card_width)
+        time_fraction = position_in_card / self.card_width
+        position_in_seconds = (time_index.get_item_start(card_index)
+                               + time_fraction * time_index.get_item_duration(card_index))
+        # Round to millisecond precision (3 decimal places)
+        return round(position_in_seconds, 3), card_index
     
     def calculate_timeline_x(self, timeline_position: float) -> Tuple[int, int]:
         """
         Calculate the X coordinate and card number based on timeline position in seconds (reverse of calculate_timeline_position).
+
+        The card playing at the position is found by bisecting the project's
+        time index.
         
         Args:
             timeline_position: Playback position in seconds
@@ -576,12 +557,13 @@ class TimelineContainer(BaseWidget):
             tuple[int, int]: (X coordinate in the container, Card number/index)
                             Card number is 1-indexed. Returns 0 if before first card or no cards exist.
         """
-        # Get the timeline widget's cards
+        # Get the timeline widget's card count
         timeline = self.video_timeline
-        if not hasattr(timeline, 'cards') or not timeline.cards:
+        card_count = timeline.get_card_count()
+        if not card_count:
             return self.content_margin_left, 0
         
-        # Get the workspace and project to access timeline items
+        # Get the workspace and project to access item durations
         workspace = timeline.workspace
         if not workspace:
             return self.content_margin_left, 0
@@ -589,55 +571,27 @@ class TimelineContainer(BaseWidget):
         project = workspace.get_project()
         if not project:
             return self.content_margin_left, 0
-            
-        timeline_data = project.get_timeline()
-        if not timeline_data:
-            return self.content_margin_left, 0
         
         # If position is negative or zero, return the start position
         if timeline_position <= 0:
             return self.content_margin_left, 0
-        
-        # Calculate which card the position falls into
-        accumulated_time = 0.0
-        current_x = 0
-        
-        for i, card in enumerate(timeline.cards):
-            card_index = i + 1  # Cards are 1-indexed
-            
-            # Get duration for this card directly from project
-            try:
-                item_duration = project.get_item_duration(card_index)
-            except Exception as e:
-                logger.error(f"Error getting duration for card {card_index}: {e}")
-                item_duration = 1.0  # Default to 1 second if error
-            
-            # Calculate card boundaries in time
-            card_start_time = accumulated_time
-            card_end_time = accumulated_time + item_duration
-            
-            # Check if position falls within this card's time range
-            if timeline_position >= card_start_time and timeline_position < card_end_time:
-                # Calculate time offset within this card
-                time_in_card = timeline_position - card_start_time
-                # Calculate position fraction within this card
-                time_fraction = time_in_card / item_duration if item_duration > 0 else 0
-                # Calculate X position within the card
-                position_in_card = time_fraction * self.card_width
-                # Calculate absolute X position (before adjusting for scroll)
-                adjusted_x = current_x + position_in_card
-                # Convert to container coordinate (add margin, no scroll adjustment for display)
-                container_x = adjusted_x + self.content_margin_left
-                return int(container_x), card_index
-            
-            # Move to next card
-            accumulated_time += item_duration
-            current_x += self.card_width + self.card_spacing
-        
+
+        time_index = project.get_time_index()
+        card_stride = self.card_width + self.card_spacing
+        item_count = min(card_count, time_index.item_count)
+
         # If position is after all cards, return the position at the end and last card index
-        final_x = current_x + self.content_margin_left
-        last_card_index = len(timeline.cards)
-        return int(final_x), last_card_index
+        if timeline_position >= time_index.get_item_start(item_count + 1):
+            final_x = item_count * card_stride + self.content_margin_left
+            return int(final_x), card_count
+
+        card_index, time_in_card = time_index.locate(timeline_position)
+        item_duration = time_index.get_item_duration(card_index)
+        # Calculate position fraction within this card
+        time_fraction = time_in_card / item_duration if item_duration > 0 else 0
+        # Convert to container coordinate (add margin, no scroll adjustment for display)
+        container_x = (card_index - 1) * card_stride + time_fraction * self.card_width + self.content_margin_left
+        return int(container_x), card_index
 
     def _update_divider_positions(self):
         """Update divider line positions based on component heights"""
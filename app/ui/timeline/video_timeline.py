@@ -1,10 +1,12 @@
 import sys
 import logging
+from typing import Dict, List, Tuple
+
 from PySide6.QtWidgets import (
-    QApplication, QWidget, QHBoxLayout,
+    QApplication, QWidget,
     QLabel, QVBoxLayout, QFrame, QSizePolicy
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QEvent, Signal
 from PySide6.QtGui import QKeyEvent, QPixmap
 
 from app.data.timeline import TimelineItem
@@ -12,7 +14,7 @@ from app.data.workspace import Workspace
 from app.ui.base_widget import BaseWidget, BaseTaskWidget
 from app.ui.timeline.video_timeline_scroll import VideoTimelineScroll
 from app.ui.timeline.video_timeline_card import VideoTimelineCard
-from utils import qt_utils
+from app.ui.timeline.thumbnail_cache import get_thumbnail_cache
 from utils.i18n_utils import tr, translation_manager
 
 logger = logging.getLogger(__name__)
@@ -69,13 +71,35 @@ class AddCardFrame(QFrame):
 
 
 class VideoTimeline(BaseTaskWidget):
-    """左右滑动的卡片式时间线主窗口"""
+    """
+    左右滑动的卡片式时间线主窗口
+
+    The strip is virtualized: only the cards in or near the viewport exist
+    as widgets, placed at fixed positions in the content widget and reused
+    while scrolling. Card images come from the project's ThumbnailCache,
+    which renders them off the GUI thread.
+    """
+
+    # Emitted with each newly created card widget
+    card_created = Signal(object)
+    # Composition progress (timeline index, percent), re-emitted on the GUI thread
+    compose_progress_changed = Signal(int, int)
+
+    # Cards kept on each side of the viewport
+    OVERSCAN_CARDS = 4
+
     def __init__(self,parent:QWidget,workspace:Workspace):
         super().__init__(workspace)
         self.setWindowTitle(tr("TimeLine"))
         self.resize(parent.width(), parent.height())
         self.setContentsMargins(0, 0, 0, 0)  # Remove widget margins, use layout margins instead
         self.selected_card_index = None  # 跟踪当前选中的卡片索引
+
+        # Card geometry (cards are 90x160, 5px apart, 5px from the content edges)
+        self.card_width = 90
+        self.card_height = 160
+        self.card_spacing = 5
+        self.content_margin = 5
         
         # Set fixed height to accommodate cards (160px) + layout margins (5px top + 5px bottom)
         self.setFixedHeight(170)
@@ -90,60 +114,57 @@ class VideoTimeline(BaseTaskWidget):
                 background-color: #1e1f22;
             }}
         """)
-        # ------------------- 创建内容容器和布局 -------------------
+        # ------------------- 创建内容容器 -------------------
+        # Cards are positioned by _update_visible_cards, not by a layout
         self.content_widget = BaseWidget(workspace)
         self.content_widget.setStyleSheet(f"""
             QWidget {{
                 background-color: #1e1f22;
             }}
         """)
-        self.timeline_layout = QHBoxLayout(self.content_widget)
-        self.timeline_layout.setContentsMargins(5, 5, 5, 5) # 左右留出边距，方便滑动
-        self.timeline_layout.setSpacing(5) # 卡片之间的间距
         # 将内容容器放入滚动区域
         self.scroll_area.setWidget(self.content_widget)
 
-        # ------------------- 添加一些示例卡片 -------------------
-        timeline = workspace.get_project().get_timeline()
-        timeline_item_count = timeline.get_item_count()
-        self.cards = []
-        for i in range(timeline_item_count):  # 创建 10 个示例卡片
-            index = i+1
-            timeline_item = timeline.get_item(index)
-            snapshot_image = timeline_item.get_image()
-            title = f"# {i+1}"
-            card = VideoTimelineCard(self, title, snapshot_image, index)
-            self.timeline_layout.addWidget(card)
-            self.cards.append(card)
+        # Visible cards by timeline index, and hidden cards ready for reuse
+        self.cards: Dict[int, VideoTimelineCard] = {}
+        self._card_pool: List[VideoTimelineCard] = []
+        # Images shown instead of the item's image.png (e.g. a finished task's result)
+        self._image_overrides: Dict[int, str] = {}
+        # Composition progress by timeline index, for items still composing
+        self._compose_progress: Dict[int, int] = {}
+
+        # Add the "Add Card" button after the last card
+        self.add_card_button = AddCardFrame(self)
+        self.add_card_button.setParent(self.content_widget)
+        self.add_card_button.show()
+
+        project = workspace.get_project()
+        timeline = project.get_timeline()
+        self.item_count = timeline.get_item_count()
+        self.thumbnail_cache = get_thumbnail_cache(project.project_path)
+        self.thumbnail_cache.thumbnail_ready.connect(self._on_thumbnail_ready)
         
         # Set the timeline to the current index from project config instead of always jumping to 1
-        current_index = workspace.get_project().get_timeline_index()
-        if 1 <= current_index <= timeline_item_count:
+        current_index = project.get_timeline_index()
+        if 1 <= current_index <= self.item_count:
             timeline.set_item_index(current_index)
             self.selected_card_index = current_index
-            # 设置当前选中的卡片为选中状态
-            if self.cards:
-                self.cards[current_index - 1].set_selected(True)
         else:
             # If current index is out of bounds, default to 1
             timeline.set_item_index(1)
             self.selected_card_index = 1
-            if self.cards:
-                self.cards[0].set_selected(True)
-        # Add the "Add Card" button at the end
-        self.add_card_button = AddCardFrame(self)
-        self.timeline_layout.addWidget(self.add_card_button)
-        
-        self.timeline_layout.addStretch()
+
+        self._update_content_width()
+        self._update_visible_cards()
+
         # ------------------- 主窗口布局 -------------------
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0,0,0,0)
         main_layout.addWidget(self.scroll_area)
 
-        # 可选：添加一些说明
-        # info_label = QLabel("提示：鼠标拖动或使用左右方向键滑动时间线")
-        # info_label.setAlignment(Qt.AlignCenter)
-        # main_layout.addWidget(info_label)
+        # Create and recycle cards as the strip scrolls or resizes
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self._update_visible_cards)
+        self.scroll_area.viewport().installEventFilter(self)
 
         # 聚焦以接收键盘事件
         self.scroll_area.setFocusPolicy(Qt.StrongFocus)
@@ -158,12 +179,96 @@ class VideoTimeline(BaseTaskWidget):
         # Connect timeline changed signal to update card images when composition completes
         timeline.connect_timeline_changed(self.on_timeline_changed)
 
+        # Composition progress arrives on the composer's thread, show it on the GUI thread
+        self.compose_progress_changed.connect(self._on_compose_progress_changed)
+        timeline.connect_compose_progress(self.on_compose_progress)
+
     def retranslateUi(self):
         """更新所有UI文本当语言变化时"""
         self.setWindowTitle(tr("TimeLine"))
         # Update Add Card button label
         if hasattr(self, 'add_card_button') and self.add_card_button:
             self.add_card_button.title_label.setText(tr("Add Card"))
+
+    def get_card_count(self) -> int:
+        """Number of cards in the timeline (visible or not)"""
+        return self.item_count
+
+    def get_card_x(self, index: int) -> int:
+        """X coordinate of a card in the content widget"""
+        return self.content_margin + (index - 1) * (self.card_width + self.card_spacing)
+
+    def _update_content_width(self):
+        """Size the content widget for all cards and move the Add Card button after the last one"""
+        add_button_x = self.get_card_x(self.item_count + 1)
+        self.add_card_button.move(add_button_x, self.content_margin)
+        self.content_widget.setMinimumWidth(add_button_x + self.card_width + self.content_margin)
+
+    def _visible_range(self) -> Tuple[int, int]:
+        """First and last card index to keep as widgets"""
+        stride = self.card_width + self.card_spacing
+        left = self.scroll_area.horizontalScrollBar().value() - self.content_margin
+        right = left + self.scroll_area.viewport().width()
+        first = max(1, left // stride + 1 - self.OVERSCAN_CARDS)
+        last = min(self.item_count, right // stride + 1 + self.OVERSCAN_CARDS)
+        return first, last
+
+    def _update_visible_cards(self, *args):
+        """Create the cards entering the viewport and recycle the ones that left it"""
+        first, last = self._visible_range()
+        for index in [i for i in self.cards if i < first or i > last]:
+            card = self.cards.pop(index)
+            card.hide()
+            self._card_pool.append(card)
+
+        for index in range(first, last + 1):
+            if index not in self.cards:
+                self._show_card(index)
+
+    def _show_card(self, index: int):
+        title = f"# {index}"
+        if self._card_pool:
+            card = self._card_pool.pop()
+            card.set_index(index, title)
+        else:
+            card = VideoTimelineCard(self.content_widget, title, None, index)
+            self.card_created.emit(card)
+        card.set_selected(index == self.selected_card_index)
+        card.move(self.get_card_x(index), self.content_margin)
+        card.setImage(self.thumbnail_cache.request(self._get_card_image_path(index)))
+        card.set_progress(self._compose_progress.get(index))
+        card.show()
+        self.cards[index] = card
+
+    def _get_card_image_path(self, index: int) -> str:
+        if index in self._image_overrides:
+            return self._image_overrides[index]
+        return self.workspace.get_project().get_timeline().get_item_image_path(index)
+
+    def _refresh_card_image(self, index: int):
+        """Show the current image of a card, keeping the old one until the new thumbnail is ready"""
+        card = self.cards.get(index)
+        if card is not None:
+            pixmap = self.thumbnail_cache.request(self._get_card_image_path(index))
+            if pixmap is not None:
+                card.setImage(pixmap)
+
+    def _on_thumbnail_ready(self, source_path: str, pixmap: QPixmap):
+        for index, card in self.cards.items():
+            if self._get_card_image_path(index) == source_path:
+                card.setImage(pixmap)
+
+    def _set_selected_index(self, index):
+        if self.selected_card_index in self.cards:
+            self.cards[self.selected_card_index].set_selected(False)
+        self.selected_card_index = index
+        if index in self.cards:
+            self.cards[index].set_selected(True)
+
+    def eventFilter(self, watched, event):
+        if watched is self.scroll_area.viewport() and event.type() == QEvent.Type.Resize:
+            self._update_visible_cards()
+        return super().eventFilter(watched, event)
     
     def keyPressEvent(self, event: QKeyEvent):
         """重写键盘事件，支持左右方向键滑动"""
@@ -185,11 +290,10 @@ class VideoTimeline(BaseTaskWidget):
 
     def on_task_finished(self, result):
         timeline_index = result.get_timeline_index()
-        card = self.cards[timeline_index-1]
         image_path = result.get_image_path()
         if image_path is not None:
-            original_pixmap= QPixmap(image_path)
-            card.setImage(original_pixmap)
+            self._image_overrides[timeline_index] = image_path
+            self._refresh_card_image(timeline_index)
         return
     
     def add_new_card(self):
@@ -197,21 +301,9 @@ class VideoTimeline(BaseTaskWidget):
         try:
             timeline = self.workspace.get_project().get_timeline()
             new_index = timeline.add_item()
-            self.timeline_layout.removeWidget(self.add_card_button)
-            qt_utils.remove_last_stretch(self.timeline_layout)
-            # 修复：使用新索引获取时间线项，然后获取图像
-            new_timeline_item = timeline.get_item(new_index)
-            snapshot_image = new_timeline_item.get_image()
-            title = f"# {new_index}"
-            new_card = VideoTimelineCard(self, title, snapshot_image, new_index)
-            
-            # Add the new card
-            self.timeline_layout.addWidget(new_card)
-            self.cards.append(new_card)
-            
-            # Re-add the add button and stretch
-            self.timeline_layout.addWidget(self.add_card_button)
-            self.timeline_layout.addStretch()
+            self.item_count = max(timeline.get_item_count(), new_index)
+            self._update_content_width()
+            self._update_visible_cards()
             
             # Update the timeline index to the newly created card
             timeline.set_item_index(new_index)
@@ -233,74 +325,71 @@ class VideoTimeline(BaseTaskWidget):
         """Handle timeline switch to update card images"""
         # Update the image for the card corresponding to the switched timeline item
         index = item.get_index()
-        if 1 <= index <= len(self.cards):
-            # Load the new image and update the card
-            pixmap = item.get_image()
-            self.cards[index-1].setImage(pixmap)
+        self._image_overrides.pop(index, None)
+        self._refresh_card_image(index)
 
-        # 取消之前选中卡片的选中状态
-        if self.selected_card_index is not None and 1 <= self.selected_card_index <= len(self.cards):
-            self.cards[self.selected_card_index - 1].set_selected(False)
-
-        # 设置新选中的卡片
-        self.selected_card_index = index
-        if 1 <= index <= len(self.cards):
-            self.cards[index - 1].set_selected(True)
+        # 取消之前选中卡片的选中状态，设置新选中的卡片
+        self._set_selected_index(index)
     
     def on_timeline_changed(self, timeline, timeline_item: TimelineItem):
         """Handle timeline changed signal (fired when composition completes)"""
         # Update the card image for the timeline item that just completed composition
         index = timeline_item.get_index()
-        if 1 <= index <= len(self.cards):
-            # Reload the image (image.png has been updated)
-            pixmap = timeline_item.get_image()
-            self.cards[index - 1].setImage(pixmap)
+        self._image_overrides.pop(index, None)
+        self._compose_progress.pop(index, None)
+        if index in self.cards:
+            self.cards[index].set_progress(None)
+            # image.png has been updated: its new mtime selects a new thumbnail
+            self._refresh_card_image(index)
             logger.info(f"Updated timeline card {index} after composition")
     
+    def on_compose_progress(self, timeline, timeline_item: TimelineItem, percent: int, logs: str = ""):
+        """Handle compose_progress signal (fired from the composition thread)"""
+        self.compose_progress_changed.emit(timeline_item.get_index(), int(percent))
+
+    def _on_compose_progress_changed(self, index: int, percent: int):
+        if percent >= 100:
+            self._compose_progress.pop(index, None)
+        else:
+            self._compose_progress[index] = percent
+        card = self.cards.get(index)
+        if card is not None:
+            card.set_progress(percent)
+
     def on_project_switched(self, project_name):
         """处理项目切换"""
-        # 清除现有的卡片
-        for card in self.cards:
-            self.timeline_layout.removeWidget(card)
-            card.deleteLater()
+        # 回收现有的卡片
+        for card in self.cards.values():
+            card.hide()
+            self._card_pool.append(card)
         self.cards.clear()
-        
-        # 移除添加卡片按钮和占位符
-        self.timeline_layout.removeWidget(self.add_card_button)
-        qt_utils.remove_last_stretch(self.timeline_layout)
+        self._image_overrides.clear()
+        self._compose_progress.clear()
+
+        # 切换到新项目的缩略图缓存
+        project = self.workspace.get_project()
+        self.thumbnail_cache.thumbnail_ready.disconnect(self._on_thumbnail_ready)
+        self.thumbnail_cache = get_thumbnail_cache(project.project_path)
+        self.thumbnail_cache.thumbnail_ready.connect(self._on_thumbnail_ready)
         
         # 重新加载新项目的时间线卡片
-        timeline = self.workspace.get_project().get_timeline()
-        timeline_item_count = timeline.get_item_count()
-        
-        for i in range(timeline_item_count):
-            index = i + 1
-            timeline_item = timeline.get_item(index)
-            snapshot_image = timeline_item.get_image()
-            title = f"# {index}"
-            card = VideoTimelineCard(self, title, snapshot_image, index)
-            self.timeline_layout.addWidget(card)
-            self.cards.append(card)
-        
-        # 重新添加"添加卡片"按钮和占位符
-        self.timeline_layout.addWidget(self.add_card_button)
-        self.timeline_layout.addStretch()
-        
-        # Update unified scroll range for all timelines
-        if hasattr(self.parent(), 'update_unified_scroll_range'):
-            self.parent().update_unified_scroll_range()
+        timeline = project.get_timeline()
+        self.item_count = timeline.get_item_count()
         
         # 重置选中状态
         self.selected_card_index = None
-        current_index = self.workspace.get_project().get_timeline_index()
-        if 1 <= current_index <= timeline_item_count:
+        current_index = project.get_timeline_index()
+        if 1 <= current_index <= self.item_count:
             timeline.set_item_index(current_index)
             self.selected_card_index = current_index
-            if self.cards:
-                self.cards[current_index - 1].set_selected(True)
         else:
             # 如果当前索引超出范围，默认为1
             timeline.set_item_index(1)
             self.selected_card_index = 1
-            if self.cards:
-                self.cards[0].set_selected(True)
\ No newline at end of file
+
+        self._update_content_width()
+        self._update_visible_cards()
+        
+        # Update unified scroll range for all timelines
+        if hasattr(self.parent(), 'update_unified_scroll_range'):
+            self.parent().update_unified_scroll_range()
@@ -3,7 +3,7 @@ import logging
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFrame,
     QLabel, QGraphicsDropShadowEffect, QSizePolicy, QPushButton, QScrollArea, QGridLayout,
-    QMenu
+    QMenu, QProgressBar
 )
 from PySide6.QtGui import QPixmap, QColor, QPalette, QPainter, QFont, QAction
 from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, QPoint, QTimer, Property, QSize
@@ -17,6 +17,13 @@ class VideoTimelineCard(QFrame):
     """
 
     def __init__(self, parent, content_text, snapshot:QPixmap, index):
+        """
+        Args:
+            parent: Parent widget
+            content_text: Card title, shown until the snapshot is available
+            snapshot: Card image, or None while its thumbnail is loading
+            index: Timeline item index (1-based)
+        """
         super().__init__(parent)
         self.parent = parent
         self.index = index
@@ -34,13 +41,13 @@ class VideoTimelineCard(QFrame):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)  # Remove margins so image fills the frame
 
+        self.content_text = content_text
         self.content_label = QLabel(content_text)
         # Enable transparency support and remove any borders from the label
         # Add border-radius to match the outer frame's rounded corners
         self.content_label.setStyleSheet("QLabel { background-color: transparent; border: none; border-radius: 8px; }")
         self.content_label.setScaledContents(True)  # Enable scaled contents for proper clipping
-        scaled_image = snapshot.scaled(QSize(90, 160), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
-        self.content_label.setPixmap(scaled_image)
+        self.setImage(snapshot)
         self.content_label.setAlignment(Qt.AlignCenter)
         self.content_label.setWordWrap(True)
         font = self.content_label.font()
@@ -69,6 +76,25 @@ class VideoTimelineCard(QFrame):
         self.menu_button.setParent(self)
         self.menu_button.move(self.width() - self.menu_button.width() - 5, 5)
 
+        # Composition progress bar along the bottom edge (hidden when idle)
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedSize(self.width() - 16, 4)
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                background-color: rgba(0, 0, 0, 0.5);
+                border: none;
+                border-radius: 2px;
+            }
+            QProgressBar::chunk {
+                background-color: #4080ff;
+                border-radius: 2px;
+            }
+        """)
+        self.progress_bar.move(8, self.height() - self.progress_bar.height() - 8)
+        self.progress_bar.hide()
+
         # --- 状态 ---
         self._is_hovered = False
         self._is_selected = False
@@ -148,8 +174,29 @@ class VideoTimelineCard(QFrame):
         self.content_label.setText(text)
 
     def setImage(self,snapshot:QPixmap):
-        scaled_image = snapshot.scaled(QSize(90, 160), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
-        self.content_label.setPixmap(scaled_image)
+        if snapshot is None or snapshot.isNull():
+            # No image yet: show the title
+            self.content_label.setText(self.content_text)
+            return
+        if snapshot.size() != QSize(90, 160):
+            snapshot = snapshot.scaled(QSize(90, 160), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+        self.content_label.setPixmap(snapshot)
+
+    def set_progress(self, percent):
+        """Show composition progress; the bar hides once it reaches 100"""
+        if percent is None or percent >= 100:
+            self.progress_bar.hide()
+            return
+        self.progress_bar.setValue(max(0, int(percent)))
+        self.progress_bar.show()
+
+    def set_index(self, index, content_text):
+        """Reuse the card for another timeline item"""
+        self.index = index
+        self.content_text = content_text
+        self.set_hovered(False)
+        self.set_progress(None)
+        self.setImage(None)
 
     def show_context_menu(self, event):
         """显示上下文菜单"""
@@ -8,7 +8,7 @@ Supports both web-based access and local in-app calls with streaming.
 from __future__ import annotations
 from typing import AsyncIterator, Union, Optional
 
-from server.api.types import FilmetoTask, TaskProgress, TaskResult, ValidationError
+from server.api.types import FilmetoTask, ResourceInput, TaskProgress, TaskResult, ValidationError
 
 
 class FilmetoApi:
@@ -96,7 +96,40 @@ class FilmetoApi:
         """
         return task.validate()
     
-    async def get_task_status(self, task_id: str) -> dict:
+    def submit_task(self, task: FilmetoTask) -> dict:
+        """
+        Start executing a task in the background.
+
+        Args:
+            task: Task to execute
+
+        Returns:
+            Task status dictionary
+
+        Example:
+            ```python
+            api = FilmetoApi()
+            status = api.submit_task(task)
+            async for event in api.watch_task(status["task_id"]):
+                print(event["type"], event["data"])
+            ```
+        """
+        return self.service.submit_task(task).to_dict()
+
+    def watch_task(self, task_id: str, last_event_id: int = 0) -> AsyncIterator[dict]:
+        """
+        Stream the events of a background task, resuming after last_event_id.
+
+        Args:
+            task_id: Task identifier
+            last_event_id: Id of the last event already received
+
+        Returns:
+            Async iterator of event dictionaries (id, type, timestamp, data)
+        """
+        return self.service.watch_task(task_id, last_event_id)
+    
+    async def get_task_status(self, task_id: str) -> Optional[dict]:
         """
         Get current status of a task.
         
@@ -104,7 +137,7 @@ class FilmetoApi:
             task_id: Task identifier
             
         Returns:
-            Task status dictionary
+            Task status dictionary, or None if the task is unknown
             
         Example:
             ```python
@@ -115,6 +148,45 @@ class FilmetoApi:
         """
         return await self.service.get_task_status(task_id)
     
+    async def upload_resource(self, chunks: AsyncIterator[bytes], mime_type: str) -> ResourceInput:
+        """
+        Upload binary data for use as a task resource.
+
+        The data is streamed into the resource cache; the returned reference
+        replaces inline base64 data in FilmetoTask.resources.
+
+        Args:
+            chunks: Async iterator of data chunks
+            mime_type: MIME type of the data
+
+        Returns:
+            LOCAL_PATH ResourceInput referencing the cached file
+
+        Example:
+            ```python
+            api = FilmetoApi()
+            resource = await api.upload_resource(read_chunks("input.png"), "image/png")
+            task = FilmetoTask(..., resources=[resource])
+            ```
+        """
+        return await self.service.upload_resource(chunks, mime_type)
+    
+    def get_plugin_pool_stats(self) -> dict:
+        """
+        Get plugin process pool statistics.
+
+        Returns:
+            Dictionary of plugin name -> pool statistics
+
+        Example:
+            ```python
+            api = FilmetoApi()
+            for name, stats in api.get_plugin_pool_stats().items():
+                print(f"{name}: {stats['utilisation']:.0%} busy, cold start {stats['cold_start']['avg']:.1f}s")
+            ```
+        """
+        return self.service.get_plugin_pool_stats()
+    
     def list_tools(self) -> list[dict]:
         """
         List all available tools.
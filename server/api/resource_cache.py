@@ -0,0 +1,315 @@
+"""
+Resource Cache
+
+Size-bounded LRU cache for downloaded and decoded resources.
+
+The cache keeps an in-memory index of its files (size, last access) built
+once from the cache directory, evicts the least recently used files when
+the byte budget is exceeded, collapses concurrent requests for the same
+key into a single producer run (single-flight) and writes files
+atomically through a temporary file and rename. Files in use by a task
+are pinned and never evicted.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TEMP_PREFIX = ".partial-"
+# Temporary files untouched for longer were left by an interrupted write;
+# younger ones may still be written by another process sharing the directory
+STALE_TEMP_SECONDS = 3600
+
+
+class ResourceCache:
+    """LRU file cache with single-flight population."""
+
+    DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2GB
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize resource cache.
+
+        Args:
+            cache_dir: Directory holding the cached files
+            max_bytes: Total size budget of the cache
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # key (file name) -> {"size": int, "last_access": float}, least recently used first
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._size_bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # key -> number of holders; pinned files are not evicted
+        self._pins: Dict[str, int] = {}
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "bytes_written": 0,
+            "bytes_served": 0,
+        }
+        self._load_index()
+
+    def _load_index(self):
+        """Index the files already in the cache directory (oldest access first)."""
+        files = []
+        stale_before = time.time() - STALE_TEMP_SECONDS
+        for path in self.cache_dir.iterdir():
+            if not path.is_file():
+                continue
+            st = path.stat()
+            if path.name.startswith(TEMP_PREFIX):
+                if st.st_mtime < stale_before:
+                    # Left over by an interrupted write
+                    path.unlink(missing_ok=True)
+                continue
+            files.append((max(st.st_atime, st.st_mtime), path.name, st.st_size))
+        for last_access, name, size in sorted(files):
+            self._entries[name] = {"size": size, "last_access": last_access}
+            self._size_bytes += size
+        self._evict()
+
+    # ==================== Lookup ====================
+
+    def path_for(self, key: str) -> Path:
+        """Path of the cache file for ``key``"""
+        return self.cache_dir / key
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """
+        Get the cached file for ``key`` and mark it as recently used.
+
+        Returns:
+            Path of the cached file, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        path = self.path_for(key)
+        if not path.exists():
+            # Deleted behind our back
+            self._drop(key)
+            return None
+        entry["last_access"] = time.time()
+        self._entries.move_to_end(key)
+        return path
+
+    async def get_or_create(self, key: str, producer: Callable[[Path], Awaitable[Any]]) -> Path:
+        """
+        Get the cached file for ``key``, producing it on a miss.
+
+        Concurrent calls for the same key share one producer run.
+
+        Args:
+            key: Cache key (used as the file name)
+            producer: Coroutine function writing the content to the given temporary path
+
+        Returns:
+            Path of the cached file
+
+        Raises:
+            Whatever the producer raises
+        """
+        while True:
+            path = self.lookup(key)
+            if path is not None:
+                self._metrics["hits"] += 1
+                self._metrics["bytes_served"] += self._entries[key]["size"]
+                return path
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self._metrics["coalesced"] += 1
+            try:
+                await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The producing request was cancelled; take over
+                self._metrics["coalesced"] -= 1
+                continue
+            # Other tasks ran meanwhile and may have evicted the file again
+            path = self.lookup(key)
+            if path is not None:
+                return path
+            self._metrics["coalesced"] -= 1
+
+        self._metrics["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            path = await self._produce(key, producer)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Avoid "exception was never retrieved" warnings when nobody else waits
+            future.exception()
+            raise
+        else:
+            future.set_result(path)
+            return path
+        finally:
+            self._inflight.pop(key, None)
+
+    def pin(self, path: Path) -> bool:
+        """
+        Protect a cached file from eviction until unpin() is called.
+
+        Pin the path returned by get_or_create()/adopt() before the next
+        await, so that no other task can evict it in between.
+
+        Returns:
+            bool: True if ``path`` is a cache entry (other files are ignored)
+        """
+        key = self._key_of(path)
+        if key is None:
+            return False
+        self._pins[key] = self._pins.get(key, 0) + 1
+        return True
+
+    def unpin(self, path: Path):
+        """Release a pin taken with pin(), evicting if the cache is over budget."""
+        key = self._key_of(path)
+        if key is None or key not in self._pins:
+            return
+        self._pins[key] -= 1
+        if self._pins[key] <= 0:
+            del self._pins[key]
+            self._evict()
+
+    def _key_of(self, path: Path) -> Optional[str]:
+        path = Path(path)
+        if path.parent.resolve() != self.cache_dir.resolve() or path.name not in self._entries:
+            return None
+        return path.name
+
+    async def put_bytes(self, key: str, data: bytes) -> Path:
+        """Store ``data`` under ``key`` (atomically), reusing an existing entry."""
+        async def write(temp_path: Path):
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+        return await self.get_or_create(key, write)
+
+    def new_temp_path(self) -> Path:
+        """Create an empty temporary file inside the cache directory."""
+        fd, temp_name = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=str(self.cache_dir))
+        os.close(fd)
+        return Path(temp_name)
+
+    def adopt(self, key: str, temp_path: Path) -> Path:
+        """
+        Move a file written to new_temp_path() into the cache under ``key``.
+
+        If ``key`` is already cached the temporary file is discarded.
+
+        Returns:
+            Path of the cached file
+        """
+        path = self.lookup(key)
+        if path is not None:
+            temp_path.unlink(missing_ok=True)
+            self._metrics["hits"] += 1
+            self._metrics["bytes_served"] += self._entries[key]["size"]
+            return path
+        size = temp_path.stat().st_size
+        final_path = self.path_for(key)
+        os.replace(temp_path, final_path)
+        self._metrics["misses"] += 1
+        self._metrics["bytes_written"] += size
+        self._add(key, size)
+        return final_path
+
+    async def _produce(self, key: str, producer) -> Path:
+        temp_path = self.new_temp_path()
+        try:
+            await producer(temp_path)
+            size = temp_path.stat().st_size
+            final_path = self.path_for(key)
+            os.replace(temp_path, final_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        self._add(key, size)
+        self._metrics["bytes_written"] += size
+        return final_path
+
+    # ==================== Index maintenance ====================
+
+    def _add(self, key: str, size: int):
+        if key in self._entries:
+            self._size_bytes -= self._entries[key]["size"]
+        self._entries[key] = {"size": size, "last_access": time.time()}
+        self._entries.move_to_end(key)
+        self._size_bytes += size
+        self._evict(keep=key)
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size_bytes -= entry["size"]
+
+    def _evict(self, keep: Optional[str] = None):
+        """Delete least recently used files until the cache fits its budget."""
+        for key in list(self._entries):
+            if self._size_bytes <= self.max_bytes:
+                break
+            if key == keep or key in self._inflight or key in self._pins:
+                continue
+            self._remove(key)
+            self._metrics["evictions"] += 1
+
+    def _remove(self, key: str):
+        self._drop(key)
+        try:
+            self.path_for(key).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Failed to delete cache file {key}: {e}")
+
+    def cleanup(self, max_age_hours: float = 24) -> int:
+        """
+        Remove files not accessed for ``max_age_hours``.
+
+        Returns:
+            Number of removed files
+        """
+        cutoff = time.time() - max_age_hours * 3600
+        stale = [key for key, entry in self._entries.items()
+                 if entry["last_access"] < cutoff and key not in self._pins]
+        for key in stale:
+            self._remove(key)
+        return len(stale)
+
+    # ==================== Metrics ====================
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached files"""
+        return self._size_bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/byte counters and the current cache size."""
+        lookups = self._metrics["hits"] + self._metrics["misses"] + self._metrics["coalesced"]
+        stats = dict(self._metrics)
+        stats.update({
+            "hit_rate": ((self._metrics["hits"] + self._metrics["coalesced"]) / lookups) if lookups else 0.0,
+            "entries": len(self._entries),
+            "size_bytes": self._size_bytes,
+            "max_bytes": self.max_bytes,
+        })
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -8,28 +8,44 @@ Handles processing of different resource input types:
 """
 
 import os
+import re
 import base64
+import binascii
 import hashlib
 import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
 import aiohttp
 import asyncio
 
 from server.api.types import ResourceInput, ResourceType, ResourceProcessingError
+from server.api.resource_cache import ResourceCache
+
+_WHITESPACE = re.compile(r"\s")
 
 
 class ResourceProcessor:
     """
     Processor for handling different types of resource inputs.
+
+    Downloaded and decoded resources are kept in a size-bounded LRU
+    ResourceCache; downloads share one pooled HTTP session.
     """
+
+    # Connection pool of the shared HTTP session
+    MAX_CONNECTIONS = 32
+    MAX_CONNECTIONS_PER_HOST = 8
+    DOWNLOAD_TIMEOUT = 300  # seconds
+    # Base64 characters decoded per step (a multiple of 4)
+    BASE64_CHUNK_CHARS = 4 * 256 * 1024
     
-    def __init__(self, cache_dir: Optional[str] = None):
+    def __init__(self, cache_dir: Optional[str] = None, max_cache_bytes: int = ResourceCache.DEFAULT_MAX_BYTES):
         """
         Initialize resource processor.
         
         Args:
             cache_dir: Directory for caching downloaded/decoded resources
+            max_cache_bytes: Size budget of the cache directory
         """
         if cache_dir:
             self.cache_dir = Path(cache_dir)
@@ -42,11 +58,40 @@ class ResourceProcessor:
         self.max_image_size = 50 * 1024 * 1024  # 50MB
         self.max_video_size = 500 * 1024 * 1024  # 500MB
         self.max_audio_size = 100 * 1024 * 1024  # 100MB
+
+        self.cache = ResourceCache(str(self.cache_dir), max_cache_bytes)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session of the current event loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.MAX_CONNECTIONS,
+                limit_per_host=self.MAX_CONNECTIONS_PER_HOST
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.DOWNLOAD_TIMEOUT)
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
     
     async def process_resource(self, resource: ResourceInput) -> str:
         """
         Process resource and return local file path.
         
+        A returned file from the cache is pinned (not evicted) until
+        release_resource() is called with the path.
+        
         Args:
             resource: Resource input to process
             
@@ -57,16 +102,27 @@ class ResourceProcessor:
             ResourceProcessingError: If processing fails
         """
         if resource.type == ResourceType.LOCAL_PATH:
-            return await self._process_local_path(resource)
+            path = await self._process_local_path(resource)
         elif resource.type == ResourceType.REMOTE_URL:
-            return await self._process_remote_url(resource)
+            path = await self._process_remote_url(resource)
         elif resource.type == ResourceType.BASE64:
-            return await self._process_base64(resource)
+            path = await self._process_base64(resource)
         else:
             raise ResourceProcessingError(
                 f"Unsupported resource type: {resource.type}",
                 {"type": resource.type}
             )
+        self.cache.pin(Path(path))
+        return path
+
+    def release_resource(self, path: str):
+        """
+        Release a path returned by process_resource() once it is no longer used.
+        
+        Args:
+            path: Local file path from process_resource()
+        """
+        self.cache.unpin(Path(path))
     
     async def _process_local_path(self, resource: ResourceInput) -> str:
         """
@@ -110,42 +166,40 @@ class ResourceProcessor:
         
         # Get file extension from mime type
         ext = self._get_extension_from_mime(resource.mime_type)
-        cache_file = self.cache_dir / f"{url_hash}{ext}"
-        
-        # Return cached file if exists
-        if cache_file.exists():
-            print(f"Using cached file for URL: {url}")
-            return str(cache_file)
+        cache_key = f"{url_hash}{ext}"
+
+        async def download(temp_path):
+            print(f"Downloading from URL: {url}")
+            async with self._get_session().get(url) as response:
+                if response.status != 200:
+                    raise ResourceProcessingError(
+                        f"Failed to download file: HTTP {response.status}",
+                        {"url": url, "status": response.status}
+                    )
+                
+                # Check content length
+                content_length = response.headers.get('Content-Length')
+                if content_length:
+                    self._validate_file_size(int(content_length), resource.mime_type)
+                
+                # Download to the temporary cache file
+                total_size = 0
+                with open(temp_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        f.write(chunk)
+                        total_size += len(chunk)
+                        
+                        # Check size during download
+                        self._validate_file_size(total_size, resource.mime_type)
+            print(f"Downloaded {total_size} bytes for {url}")
         
-        # Download file
-        print(f"Downloading from URL: {url}")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=300)) as response:
-                    if response.status != 200:
-                        raise ResourceProcessingError(
-                            f"Failed to download file: HTTP {response.status}",
-                            {"url": url, "status": response.status}
-                        )
-                    
-                    # Check content length
-                    content_length = response.headers.get('Content-Length')
-                    if content_length:
-                        self._validate_file_size(int(content_length), resource.mime_type)
-                    
-                    # Download to cache file
-                    total_size = 0
-                    with open(cache_file, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                            total_size += len(chunk)
-                            
-                            # Check size during download
-                            self._validate_file_size(total_size, resource.mime_type)
-            
-            print(f"Downloaded {total_size} bytes to {cache_file}")
+            # Concurrent requests for the same URL share one download
+            cache_file = await self.cache.get_or_create(cache_key, download)
             return str(cache_file)
             
+        except ResourceProcessingError:
+            raise
         except asyncio.TimeoutError:
             raise ResourceProcessingError(
                 f"Download timeout for URL: {url}",
@@ -157,9 +211,6 @@ class ResourceProcessor:
                 {"url": url, "error": str(e)}
             )
         except Exception as e:
-            # Clean up partial download
-            if cache_file.exists():
-                cache_file.unlink()
             raise ResourceProcessingError(
                 f"Failed to download file: {str(e)}",
                 {"url": url, "error": str(e)}
@@ -168,48 +219,91 @@ class ResourceProcessor:
     async def _process_base64(self, resource: ResourceInput) -> str:
         """
         Decode base64 data and save to file.
+
+        The data is decoded in chunks straight into the cache file, so the
+        decoded payload is never held in memory as a whole.
         """
         base64_data = resource.data
         
-        # Remove data URL prefix if present (e.g., "data:image/png;base64,")
-        if ',' in base64_data:
-            base64_data = base64_data.split(',', 1)[1]
+        # Skip data URL prefix if present (e.g., "data:image/png;base64,")
+        start = base64_data.find(',') + 1
         
-        # Decode base64
         try:
-            decoded_data = base64.b64decode(base64_data)
-        except Exception as e:
+            stored = await self.store_stream(
+                _iter_async(self._iter_base64_chunks(base64_data, start)),
+                resource.mime_type
+            )
+        except (binascii.Error, ValueError) as e:
             raise ResourceProcessingError(
                 f"Failed to decode base64 data: {str(e)}",
                 {"error": str(e)}
             )
-        
-        # Validate size
-        self._validate_file_size(len(decoded_data), resource.mime_type)
-        
-        # Create cache file
-        data_hash = hashlib.md5(decoded_data).hexdigest()
-        ext = self._get_extension_from_mime(resource.mime_type)
-        cache_file = self.cache_dir / f"{data_hash}{ext}"
-        
-        # Return cached file if exists
-        if cache_file.exists():
-            print(f"Using cached base64 data")
-            return str(cache_file)
-        
-        # Save to file
-        try:
-            with open(cache_file, 'wb') as f:
-                f.write(decoded_data)
-            
-            print(f"Decoded {len(decoded_data)} bytes to {cache_file}")
-            return str(cache_file)
-            
+        except ResourceProcessingError:
+            raise
         except Exception as e:
             raise ResourceProcessingError(
                 f"Failed to save decoded data: {str(e)}",
                 {"error": str(e)}
             )
+        
+        return stored.data
+
+    def _iter_base64_chunks(self, data: str, start: int = 0) -> Iterator[bytes]:
+        """Decode ``data[start:]`` piecewise, ignoring embedded whitespace."""
+        carry = ""
+        for offset in range(start, len(data), self.BASE64_CHUNK_CHARS):
+            piece = data[offset:offset + self.BASE64_CHUNK_CHARS]
+            if _WHITESPACE.search(piece):
+                # Drop line breaks and other whitespace so that pieces stay 4-aligned
+                piece = "".join(piece.split())
+            piece = carry + piece
+            usable = len(piece) - len(piece) % 4
+            carry = piece[usable:]
+            if usable:
+                yield base64.b64decode(piece[:usable], validate=True)
+        if carry:
+            raise ValueError("Incorrect base64 padding")
+
+    async def store_stream(self, chunks: AsyncIterator[bytes], mime_type: str) -> ResourceInput:
+        """
+        Stream binary data into the cache.
+
+        Used for uploaded files and decoded base64 payloads: the data is
+        written chunk by chunk to a temporary file, hashed on the way and
+        renamed to its content-addressed cache name.
+
+        Args:
+            chunks: Async iterator of data chunks
+            mime_type: MIME type of the data
+
+        Returns:
+            LOCAL_PATH ResourceInput referencing the cached file
+
+        Raises:
+            ResourceProcessingError: If the data exceeds the size limit
+        """
+        temp_path = self.cache.new_temp_path()
+        digest = hashlib.md5()
+        size = 0
+        try:
+            with open(temp_path, 'wb') as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    self._validate_file_size(size, mime_type)
+                    digest.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        
+        ext = self._get_extension_from_mime(mime_type)
+        cache_file = self.cache.adopt(f"{digest.hexdigest()}{ext}", temp_path)
+        return ResourceInput(
+            type=ResourceType.LOCAL_PATH,
+            data=str(cache_file),
+            mime_type=mime_type,
+            metadata={"size": size, "md5": digest.hexdigest()}
+        )
     
     def _validate_file_size(self, size: int, mime_type: str):
         """
@@ -263,35 +357,32 @@ class ResourceProcessor:
     
     def cleanup_cache(self, max_age_hours: int = 24):
         """
-        Clean up old cached files.
+        Clean up cached files not used for a while.
         
         Args:
-            max_age_hours: Maximum age of cached files in hours
+            max_age_hours: Maximum time since last access in hours
         """
-        import time
-        
-        current_time = time.time()
-        max_age_seconds = max_age_hours * 3600
-        
-        deleted_count = 0
-        for cache_file in self.cache_dir.iterdir():
-            if cache_file.is_file():
-                file_age = current_time - cache_file.stat().st_mtime
-                if file_age > max_age_seconds:
-                    try:
-                        cache_file.unlink()
-                        deleted_count += 1
-                    except Exception as e:
-                        print(f"Failed to delete cache file {cache_file}: {e}")
-        
+        deleted_count = self.cache.cleanup(max_age_hours)
         print(f"Cleaned up {deleted_count} cached files")
     
     def get_cache_size(self) -> int:
         """
         Get total size of cached files in bytes.
         """
-        total_size = 0
-        for cache_file in self.cache_dir.iterdir():
-            if cache_file.is_file():
-                total_size += cache_file.stat().st_size
-        return total_size
+        return self.cache.size_bytes
+
+    def get_cache_stats(self) -> dict:
+        """
+        Get cache hit/miss/byte metrics.
+
+        Returns:
+            Dictionary with hits, misses, coalesced, evictions, bytes_written,
+            bytes_served, hit_rate, entries, size_bytes and max_bytes
+        """
+        return self.cache.get_stats()
+
+
+async def _iter_async(iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Adapt a synchronous chunk iterator to store_stream()"""
+    for chunk in iterator:
+        yield chunk
@@ -7,16 +7,19 @@ Provides REST endpoints and Server-Sent Events for streaming.
 
 import json
 import asyncio
-from typing import Optional
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from typing import AsyncIterator, Dict, List, Optional
+
+import multipart
+from multipart.exceptions import FormParserError
+from multipart.multipart import parse_options_header
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Request
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
 from server.api.filmeto_api import FilmetoApi
 from server.api.types import (
-    FilmetoTask, TaskProgress, TaskResult, ToolType, ResourceInput,
-    ValidationError, PluginNotFoundError, PluginExecutionError, TimeoutError as TaskTimeoutError
+    FilmetoTask, ToolType, ResourceInput, ResourceProcessingError, ValidationError
 )
 
 
@@ -161,6 +164,150 @@ async def get_plugins_by_tool(tool_name: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/v1/plugins/pool")
+async def get_plugin_pool_stats():
+    """
+    Get plugin process pool statistics.
+    
+    Returns:
+        Pool size, utilisation and cold-start latency per plugin
+    """
+    try:
+        return filmeto_api.get_plugin_pool_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class _MultipartFileStream:
+    """
+    Incremental parser for the ``file`` field of a multipart upload.
+
+    Unlike ``request.form()``, which spools the whole upload to a temporary
+    file first, the file data is yielded while the request body arrives.
+    """
+
+    def __init__(self, request: Request, field_name: str = "file"):
+        _, params = parse_options_header(request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise HTTPException(status_code=400, detail="Missing boundary in multipart upload")
+        self._body = request.stream().__aiter__()
+        self._field_name = field_name.encode()
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file = False
+        self._file_found = False
+        self._file_done = False
+        self._data: List[bytes] = []
+        self.content_type: Optional[str] = None
+        self._parser = multipart.MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if not self._file_found and options.get(b"name") == self._field_name and b"filename" in options:
+            self._file_found = self._in_file = True
+            self.content_type = self._headers.get(b"content-type", b"").decode("latin-1") or None
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self._data.append(data[start:end])
+
+    def _on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self._file_done = True
+
+    async def _feed(self) -> bool:
+        """Parse the next chunk of the request body; False once it is exhausted."""
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            return False
+        try:
+            self._parser.write(chunk)
+        except FormParserError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid multipart upload: {e}")
+        return True
+
+    async def open(self):
+        """Read the body up to the start of the file data."""
+        while not self._file_found:
+            if not await self._feed():
+                raise HTTPException(status_code=400, detail="Missing 'file' form field")
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Yield the file data as it is parsed."""
+        while True:
+            if self._data:
+                data, self._data = b"".join(self._data), []
+                yield data
+            if self._file_done:
+                return
+            if not await self._feed():
+                raise HTTPException(status_code=400, detail="Incomplete multipart upload")
+
+
+@app.post("/api/v1/resources")
+async def upload_resource(request: Request, mime_type: Optional[str] = None):
+    """
+    Upload a binary resource for use in tasks.
+    
+    Accepts either a raw request body (MIME type from the ``mime_type``
+    query parameter or the Content-Type header) or a multipart form with a
+    ``file`` field. The data is streamed to the resource cache instead of
+    being base64-encoded into the task JSON.
+    
+    Args:
+        request: Incoming request
+        mime_type: MIME type of the resource (optional)
+    
+    Returns:
+        Resource dictionary to use in TaskRequest.resources
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        upload = _MultipartFileStream(request)
+        await upload.open()
+        mime_type = mime_type or upload.content_type or "application/octet-stream"
+        chunks = upload.chunks()
+    else:
+        mime_type = mime_type or content_type.split(";")[0].strip() or "application/octet-stream"
+        chunks = request.stream()
+    
+    try:
+        resource = await filmeto_api.upload_resource(chunks, mime_type)
+    except HTTPException:
+        raise
+    except ResourceProcessingError as e:
+        raise HTTPException(status_code=413, detail=e.message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return resource.to_dict()
+
+
 @app.post("/api/v1/tasks", response_model=TaskResponse)
 async def create_task(task_request: TaskRequest, background_tasks: BackgroundTasks):
     """
@@ -188,21 +335,45 @@ async def create_task(task_request: TaskRequest, background_tasks: BackgroundTas
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        # Note: Task execution should be done via streaming endpoint
-        # This endpoint just validates and returns task_id
+        # Execute in the background; progress is recorded in the task registry
+        status = filmeto_api.submit_task(task)
         
         return TaskResponse(
             task_id=task.task_id,
-            status="created",
-            message="Task created successfully. Use /api/v1/tasks/{task_id}/stream to execute."
+            status=status["status"],
+            message=f"Task started. Use /api/v1/tasks/{task.task_id}/stream to follow progress."
         )
         
+    except HTTPException:
+        raise
     except ValidationError as e:
         raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _format_sse_event(event: dict) -> str:
+    """Format a task registry event as an SSE message with its id"""
+    data = dict(event["data"])
+    data['_type'] = event["type"]
+    return f"id: {event['id']}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _task_event_stream(task_id: str, last_event_id: int = 0):
+    """SSE generator following a task's recorded events"""
+    try:
+        async for event in filmeto_api.watch_task(task_id, last_event_id):
+            yield _format_sse_event(event)
+    except Exception as e:
+        error_data = {
+            "_type": "error",
+            "code": "INTERNAL_ERROR",
+            "message": str(e),
+            "details": {}
+        }
+        yield f"data: {json.dumps(error_data)}\n\n"
+
+
 @app.post("/api/v1/tasks/execute")
 async def execute_task_stream(task_request: TaskRequest):
     """
@@ -245,63 +416,12 @@ async def execute_task_stream(task_request: TaskRequest):
             metadata=task_request.metadata
         )
         
-        # Create event generator
-        async def event_generator():
-            try:
-                async for update in filmeto_api.execute_task_stream(task):
-                    if isinstance(update, TaskProgress):
-                        # Send progress update
-                        data = update.to_dict()
-                        data['_type'] = 'progress'
-                        yield f"data: {json.dumps(data)}\n\n"
-                    elif isinstance(update, TaskResult):
-                        # Send final result
-                        data = update.to_dict()
-                        data['_type'] = 'result'
-                        yield f"data: {json.dumps(data)}\n\n"
-            except ValidationError as e:
-                error_data = {
-                    "_type": "error",
-                    "code": e.code,
-                    "message": e.message,
-                    "details": e.details
-                }
-                yield f"data: {json.dumps(error_data)}\n\n"
-            except PluginNotFoundError as e:
-                error_data = {
-                    "_type": "error",
-                    "code": e.code,
-                    "message": e.message,
-                    "details": e.details
-                }
-                yield f"data: {json.dumps(error_data)}\n\n"
-            except PluginExecutionError as e:
-                error_data = {
-                    "_type": "error",
-                    "code": e.code,
-                    "message": e.message,
-                    "details": e.details
-                }
-                yield f"data: {json.dumps(error_data)}\n\n"
-            except TaskTimeoutError as e:
-                error_data = {
-                    "_type": "error",
-                    "code": e.code,
-                    "message": e.message,
-                    "details": e.details
-                }
-                yield f"data: {json.dumps(error_data)}\n\n"
-            except Exception as e:
-                error_data = {
-                    "_type": "error",
-                    "code": "INTERNAL_ERROR",
-                    "message": str(e),
-                    "details": {}
-                }
-                yield f"data: {json.dumps(error_data)}\n\n"
+        # Execute in the background: a client disconnecting does not stop
+        # the task, and it can reconnect to /api/v1/tasks/{task_id}/stream
+        filmeto_api.submit_task(task)
         
         return StreamingResponse(
-            event_generator(),
+            _task_event_stream(task.task_id),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -327,9 +447,47 @@ async def get_task_status(task_id: str):
     """
     try:
         status = await filmeto_api.get_task_status(task_id)
-        return status
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Task '{task_id}' not found")
+    return status
+
+
+@app.get("/api/v1/tasks/{task_id}/stream")
+async def stream_task(task_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Follow a task with Server-Sent Events.
+    
+    Replays the recorded progress updates and then streams new ones until
+    the result. Reconnecting clients send the standard ``Last-Event-ID``
+    header to resume where they left off. Any number of clients may watch
+    the same task.
+    
+    Args:
+        task_id: Task identifier
+        last_event_id: Id of the last event the client received
+    
+    Returns:
+        StreamingResponse with SSE data
+    """
+    if await filmeto_api.get_task_status(task_id) is None:
+        raise HTTPException(status_code=404, detail=f"Task '{task_id}' not found")
+    
+    try:
+        resume_after = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID header")
+    
+    return StreamingResponse(
+        _task_event_stream(task_id, resume_after),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Disable buffering in nginx
+        }
+    )
 
 
 if __name__ == "__main__":
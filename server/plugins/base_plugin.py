@@ -5,9 +5,13 @@ Base class for all server-side plugins.
 Handles JSON-RPC communication via stdin/stdout.
 """
 
+import os
 import sys
 import json
+import mmap
 import asyncio
+import threading
+import contextvars
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Callable, Optional, List
 from datetime import datetime
@@ -23,16 +27,39 @@ class ToolConfig:
         self.parameters = parameters  # List of parameter definitions
 
 
+# Each execute_task request runs in its own asyncio task, hence its own context
+_current_task_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "filmeto_plugin_task_id", default=None
+)
+
+
 class BaseServerPlugin(ABC):
     """
     Base class for server plugins.
 
     Plugins communicate with the service layer via JSON-RPC over stdin/stdout.
+    Requests are read without blocking the event loop and handled
+    concurrently; at most ``max_concurrency`` execute_task requests run at
+    the same time (declared as ``execution.max_concurrency`` in plugin.yml).
     """
 
     def __init__(self):
         """Initialize the plugin"""
-        self.current_task_id: Optional[str] = None
+        self.max_concurrency = self._get_max_concurrency()
+        self._write_lock = threading.Lock()
+
+    @property
+    def current_task_id(self) -> Optional[str]:
+        """Id of the task being executed by the calling coroutine (None outside a task)."""
+        return _current_task_id.get()
+
+    @staticmethod
+    def _get_max_concurrency() -> int:
+        """Concurrency limit passed by the host process (defaults to 1)."""
+        try:
+            return max(1, int(os.environ.get("FILMETO_PLUGIN_MAX_CONCURRENCY", "1")))
+        except ValueError:
+            return 1
 
     @abstractmethod
     async def execute_task(
@@ -167,6 +194,24 @@ class BaseServerPlugin(ABC):
         }
         self._write_message(progress_message)
     
+    def map_resource(self, resource: Any) -> mmap.mmap:
+        """
+        Memory-map an input resource read-only.
+        
+        Resources reach plugins as local file references (uploads and
+        base64 payloads are stored in the server's resource cache), so large
+        inputs can be read without copying them through the JSON-RPC pipe.
+        
+        Args:
+            resource: Resource dictionary from the task or a file path
+        
+        Returns:
+            Read-only memory map of the file (close it when done)
+        """
+        path = resource["data"] if isinstance(resource, dict) else resource
+        with open(path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
     def report_heartbeat(self, task_id: str):
         """
         Report heartbeat to keep connection alive.
@@ -194,8 +239,10 @@ class BaseServerPlugin(ABC):
         """
         try:
             json_str = json.dumps(message)
-            sys.stdout.write(json_str + '\n')
-            sys.stdout.flush()
+            # Tasks may report progress from executor threads
+            with self._write_lock:
+                sys.stdout.write(json_str + '\n')
+                sys.stdout.flush()
         except Exception as e:
             sys.stderr.write(f"Error writing message: {e}\n")
             sys.stderr.flush()
@@ -233,7 +280,7 @@ class BaseServerPlugin(ABC):
             JSON-RPC response
         """
         task_id = params.get("task_id")
-        self.current_task_id = task_id
+        token = _current_task_id.set(task_id)
         
         try:
             # Report started
@@ -270,7 +317,7 @@ class BaseServerPlugin(ABC):
                 "id": request_id
             }
         finally:
-            self.current_task_id = None
+            _current_task_id.reset(token)
     
     async def _handle_get_info(self, request_id: int) -> Dict[str, Any]:
         """
@@ -355,22 +402,41 @@ class BaseServerPlugin(ABC):
         This is the entry point for the plugin process.
         """
         async def main_loop():
+            loop = asyncio.get_running_loop()
+            task_slots = asyncio.Semaphore(self.max_concurrency)
+            in_flight = set()
+
+            async def handle_task_request(request):
+                async with task_slots:
+                    await self._handle_request(request)
+
             # Send initial ready message
             ready_message = {
                 "jsonrpc": "2.0",
                 "method": "ready",
-                "params": self.get_plugin_info()
+                "params": dict(self.get_plugin_info(), max_concurrency=self.max_concurrency)
             }
             self._write_message(ready_message)
             
-            # Process requests
+            # Process requests; stdin is read in a worker thread so that
+            # running tasks keep making progress while we wait for input
             while True:
-                request = self._read_message()
+                request = await loop.run_in_executor(None, self._read_message)
                 if request is None:
                     # EOF or error, exit
                     break
-                
-                await self._handle_request(request)
+
+                if request.get("method") == "execute_task":
+                    handler = handle_task_request(request)
+                else:
+                    # ping / get_info are answered immediately, even mid-task
+                    handler = self._handle_request(request)
+                job = asyncio.create_task(handler)
+                in_flight.add(job)
+                job.add_done_callback(in_flight.discard)
+
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
         
         # Run event loop
         try:
@@ -381,4 +447,3 @@ class BaseServerPlugin(ABC):
             sys.stderr.write(f"Plugin error: {e}\n")
             import traceback
             traceback.print_exc(file=sys.stderr)
-
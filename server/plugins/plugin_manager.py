@@ -9,11 +9,15 @@ import os
 import sys
 import json
 import yaml
+import time
 import asyncio
+import itertools
 import subprocess
 import logging
+from collections import deque
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Optional, Any, AsyncIterator, List
+from typing import Dict, Optional, Any, AsyncIterator, List, Iterable
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -49,8 +53,16 @@ class PluginInfo:
 class PluginProcess:
     """
     Manages a single plugin process and communication.
+
+    Requests are multiplexed over the plugin's stdin/stdout: every request
+    gets a unique JSON-RPC id and a reader task routes responses (by id) and
+    progress/heartbeat notifications (by task_id) to the request waiting for
+    them. Up to ``max_concurrency`` tasks may be in flight at once.
     """
-    
+
+    DEFAULT_MAX_CONCURRENCY = 1
+    MAX_CONCURRENCY_ENV = "FILMETO_PLUGIN_MAX_CONCURRENCY"
+
     def __init__(self, plugin_info: PluginInfo):
         """
         Initialize plugin process manager.
@@ -62,6 +74,28 @@ class PluginProcess:
         self.process: Optional[asyncio.subprocess.Process] = None
         self.is_ready = False
         self.heartbeat_task: Optional[asyncio.Task] = None
+        self.max_concurrency = get_max_concurrency(plugin_info.config)
+        self._request_ids = itertools.count(1)
+        # request id -> queue receiving every message of that request
+        self._pending: Dict[int, asyncio.Queue] = {}
+        # task id -> request id, used to route progress notifications
+        self._task_requests: Dict[str, int] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Pool bookkeeping
+        self.leases = 0
+        self.tasks_completed = 0
+        self.retiring = False
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the process is running and accepting requests"""
+        return self.is_ready and self.process is not None and self.process.returncode is None
+
+    @property
+    def in_flight(self) -> int:
+        """Number of tasks currently executing in the plugin process"""
+        return len(self._task_requests)
     
     async def start(self):
         """
@@ -79,6 +113,9 @@ class PluginProcess:
         try:
             # Determine Python executable
             python_exe = sys.executable
+
+            env = os.environ.copy()
+            env[self.MAX_CONCURRENCY_ENV] = str(self.max_concurrency)
             
             # Start process
             self.process = await asyncio.create_subprocess_exec(
@@ -87,7 +124,8 @@ class PluginProcess:
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                cwd=str(self.plugin_info.plugin_path)
+                cwd=str(self.plugin_info.plugin_path),
+                env=env
             )
             
             # Wait for ready message
@@ -100,7 +138,10 @@ class PluginProcess:
                 
                 if ready_msg and ready_msg.get("method") == "ready":
                     self.is_ready = True
-                    logger.info(f"Plugin {self.plugin_info.name} is ready")
+                    self._slots = asyncio.Semaphore(self.max_concurrency)
+                    self._reader_task = asyncio.create_task(self._route_messages())
+                    logger.info(f"Plugin {self.plugin_info.name} is ready "
+                                f"(max_concurrency={self.max_concurrency})")
                 else:
                     raise PluginExecutionError(
                         f"Plugin {self.plugin_info.name} did not send ready message",
@@ -114,62 +155,128 @@ class PluginProcess:
                     {"plugin": self.plugin_info.name, "timeout": ready_timeout}
                 )
             
+        except asyncio.CancelledError:
+            await self.stop()
+            raise
         except Exception as e:
             await self.stop()
             raise PluginExecutionError(
                 f"Failed to start plugin {self.plugin_info.name}: {str(e)}",
                 {"plugin": self.plugin_info.name, "error": str(e)}
             )
+
+    async def run_task(self, task: FilmetoTask) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a task, waiting for a free concurrency slot first.
+
+        Args:
+            task: Task to execute
+
+        Yields:
+            Message dictionaries (progress, heartbeat, final result)
+        """
+        if not self.is_ready or self._slots is None:
+            raise PluginExecutionError(
+                f"Plugin {self.plugin_info.name} is not ready",
+                {"plugin": self.plugin_info.name}
+            )
+
+        async with self._slots:
+            request_id = await self.send_task(task)
+            async for message in self.receive_messages(request_id):
+                yield message
     
-    async def send_task(self, task: FilmetoTask):
+    async def send_task(self, task: FilmetoTask) -> int:
         """
         Send task to plugin.
         
         Args:
             task: Task to execute
+
+        Returns:
+            JSON-RPC request id to pass to receive_messages()
         """
         if not self.is_ready:
             raise PluginExecutionError(
                 f"Plugin {self.plugin_info.name} is not ready",
                 {"plugin": self.plugin_info.name}
             )
-        
+
+        request_id = self._register_request()
+        self._task_requests[task.task_id] = request_id
         request = {
             "jsonrpc": "2.0",
             "method": "execute_task",
             "params": task.to_dict(),
-            "id": 1
+            "id": request_id
         }
-        
-        await self._write_message(request)
+
+        try:
+            await self._write_message(request)
+        except Exception:
+            self._release_request(request_id)
+            raise
+        return request_id
     
-    async def receive_messages(self) -> AsyncIterator[Dict[str, Any]]:
+    async def receive_messages(self, request_id: int) -> AsyncIterator[Dict[str, Any]]:
         """
-        Receive messages from plugin.
+        Receive messages belonging to one request.
         
+        Args:
+            request_id: Id returned by send_task()
+
         Yields:
             Message dictionaries (progress, result, heartbeat)
         """
-        while True:
-            try:
-                message = await self._read_message()
+        queue = self._pending.get(request_id)
+        if queue is None:
+            return
+
+        try:
+            while True:
+                message = await queue.get()
                 if message is None:
-                    # Process ended or error
+                    # Process ended
                     break
-                
+
                 yield message
-                
-                # Check if this is the final result
-                if message.get("result") and "status" in message.get("result", {}):
+
+                # The response carrying our id is the final message
+                if message.get("id") == request_id:
                     break
-                    
-            except Exception as e:
-                logger.error(f"Error receiving message from plugin: {e}")
-                break
+        finally:
+            self._release_request(request_id)
     
+    async def call(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Send a request that is answered by a single response.
+
+        Args:
+            method: JSON-RPC method
+            params: Method parameters
+            timeout: Seconds to wait for the response
+
+        Returns:
+            The response message, or None if the plugin exited
+        """
+        request_id = self._register_request()
+        try:
+            await self._write_message({
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or {},
+                "id": request_id
+            })
+            return await asyncio.wait_for(self._pending[request_id].get(), timeout=timeout)
+        finally:
+            self._release_request(request_id)
+
     async def ping(self) -> bool:
         """
         Ping the plugin to check if it's alive.
+
+        Safe to call while tasks are running: the pong is routed by its id.
         
         Returns:
             True if plugin responds, False otherwise
@@ -178,21 +285,9 @@ class PluginProcess:
             return False
         
         try:
-            request = {
-                "jsonrpc": "2.0",
-                "method": "ping",
-                "params": {},
-                "id": 999
-            }
-            
-            await self._write_message(request)
-            
-            # Wait for response with timeout
-            response = await asyncio.wait_for(self._read_message(), timeout=5.0)
-            
-            return response and response.get("result", {}).get("status") == "pong"
-            
-        except:
+            response = await self.call("ping", timeout=5.0)
+            return bool(response) and response.get("result", {}).get("status") == "pong"
+        except Exception:
             return False
     
     async def stop(self):
@@ -209,8 +304,58 @@ class PluginProcess:
                 logger.error(f"Error stopping plugin: {e}")
             
             self.process = None
+
+        if self._reader_task and not self._reader_task.done():
+            self._reader_task.cancel()
+        self._reader_task = None
+        self._fail_pending()
         
         self.is_ready = False
+
+    def _register_request(self) -> int:
+        request_id = next(self._request_ids)
+        self._pending[request_id] = asyncio.Queue()
+        return request_id
+
+    def _release_request(self, request_id: int):
+        self._pending.pop(request_id, None)
+        for task_id, rid in list(self._task_requests.items()):
+            if rid == request_id:
+                del self._task_requests[task_id]
+
+    def _fail_pending(self):
+        """Wake up every waiting request with the end-of-stream marker."""
+        for queue in self._pending.values():
+            queue.put_nowait(None)
+
+    async def _route_messages(self):
+        """Read plugin output and dispatch each message to its request."""
+        try:
+            while True:
+                message = await self._read_message()
+                if message is None:
+                    break
+                self._dispatch(message)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error receiving message from plugin {self.plugin_info.name}: {e}")
+        finally:
+            self.is_ready = False
+            self._fail_pending()
+
+    def _dispatch(self, message: Dict[str, Any]):
+        request_id = message.get("id")
+        if request_id is None:
+            # Notification (progress / heartbeat), routed by task id
+            task_id = message.get("params", {}).get("task_id")
+            request_id = self._task_requests.get(task_id)
+
+        queue = self._pending.get(request_id)
+        if queue is None:
+            logger.debug(f"Dropping unrouted message from plugin {self.plugin_info.name}: {message.get('method')}")
+            return
+        queue.put_nowait(message)
     
     async def _write_message(self, message: Dict[str, Any]):
         """Write JSON message to plugin stdin"""
@@ -234,27 +379,362 @@ class PluginProcess:
         """Read JSON message from plugin stdout"""
         if not self.process or not self.process.stdout:
             return None
-        
-        try:
-            line = await self.process.stdout.readline()
-            if not line:
+
+        while True:
+            try:
+                line = await self.process.stdout.readline()
+                if not line:
+                    return None
+
+                return json.loads(line.decode().strip())
+            except json.JSONDecodeError as e:
+                # Skip stray non-protocol output instead of ending the stream
+                logger.error(f"Error parsing JSON from plugin: {e}")
+            except Exception as e:
+                logger.error(f"Error reading from plugin: {e}")
                 return None
-            
-            return json.loads(line.decode().strip())
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing JSON from plugin: {e}")
+    
+    def __repr__(self) -> str:
+        return f"PluginProcess({self.plugin_info.name}, ready={self.is_ready}, in_flight={self.in_flight})"
+
+
+def get_max_concurrency(config: Dict[str, Any]) -> int:
+    """
+    Get the number of concurrent tasks declared in a plugin manifest.
+
+    Read from ``execution.max_concurrency`` (or a top-level ``max_concurrency``).
+    """
+    value = config.get("execution", {}).get("max_concurrency", config.get("max_concurrency"))
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return PluginProcess.DEFAULT_MAX_CONCURRENCY
+
+
+def get_process_rss(pid: int) -> Optional[int]:
+    """
+    Get the resident set size of a process in bytes.
+
+    Uses psutil when it is installed, /proc otherwise.
+
+    Returns:
+        RSS in bytes, or None if it cannot be determined
+    """
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        return None
+
+    try:
+        with open(f"/proc/{pid}/statm", 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+@dataclass
+class PluginPoolConfig:
+    """Process pool settings from the ``pool`` section of plugin.yml"""
+    min_size: int = 1
+    max_size: int = 1
+    max_tasks_per_process: int = 0  # 0 = never recycle by task count
+    max_rss_mb: int = 0  # 0 = no memory limit
+    health_check_interval: float = 30.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'PluginPoolConfig':
+        pool = config.get("pool", {}) or {}
+        defaults = cls()
+        try:
+            min_size = max(0, int(pool.get("min_size", defaults.min_size)))
+            pool_config = cls(
+                min_size=min_size,
+                max_size=max(1, min_size, int(pool.get("max_size", max(defaults.max_size, min_size)))),
+                max_tasks_per_process=max(0, int(pool.get("max_tasks_per_process", defaults.max_tasks_per_process))),
+                max_rss_mb=max(0, int(pool.get("max_rss_mb", defaults.max_rss_mb))),
+                health_check_interval=float(pool.get("health_check_interval", defaults.health_check_interval)),
+            )
+        except (TypeError, ValueError) as e:
+            logger.error(f"Invalid pool config for plugin {config.get('name')}: {e}")
+            return defaults
+        return pool_config
+
+
+class PluginPool:
+    """
+    Pool of processes running the same plugin.
+
+    Keeps ``min_size`` warm processes, grows up to ``max_size`` when every
+    process is saturated, recycles processes after ``max_tasks_per_process``
+    tasks or above ``max_rss_mb`` and drops processes failing a health ping.
+    """
+
+    COLD_START_HISTORY = 100
+
+    def __init__(self, plugin_info: PluginInfo, process_factory=PluginProcess):
+        """
+        Initialize plugin pool.
+
+        Args:
+            plugin_info: Plugin metadata
+            process_factory: Callable creating a PluginProcess from plugin_info
+        """
+        self.plugin_info = plugin_info
+        self.config = PluginPoolConfig.from_config(plugin_info.config)
+        self._process_factory = process_factory
+        self._processes: List[PluginProcess] = []
+        self._starting = 0
+        self._changed = asyncio.Condition()
+        self._health_task: Optional[asyncio.Task] = None
+        self._background: set = set()
+        self._closed = False
+        # Metrics
+        self._cold_starts = deque(maxlen=self.COLD_START_HISTORY)
+        self._cold_start_count = 0
+        self._recycled = 0
+        self._health_failures = 0
+        self._tasks_completed = 0
+        self._peak_leases = 0
+
+    @property
+    def size(self) -> int:
+        """Number of live processes (including ones being retired)"""
+        return len(self._processes)
+
+    # ==================== Leasing ====================
+
+    async def acquire(self) -> PluginProcess:
+        """
+        Get a process with a free concurrency slot, starting one if needed.
+
+        Raises:
+            PluginExecutionError: If a new process fails to start
+        """
+        self._ensure_health_checks()
+        while True:
+            async with self._changed:
+                self._drop_dead()
+                process = self._pick()
+                if process is not None:
+                    process.leases += 1
+                    self._peak_leases = max(self._peak_leases, self._total_leases())
+                    return process
+                if self.size + self._starting >= self.config.max_size:
+                    await self._changed.wait()
+                    continue
+            await self._spawn()
+
+    async def release(self, process: PluginProcess, task_completed: bool = True):
+        """
+        Return a process obtained from acquire().
+
+        Args:
+            process: The leased process
+            task_completed: Whether a task ran under the lease (counts towards
+                ``max_tasks_per_process`` and the stats)
+        """
+        async with self._changed:
+            process.leases = max(0, process.leases - 1)
+            if task_completed:
+                process.tasks_completed += 1
+                self._tasks_completed += 1
+            if not process.retiring and self._should_recycle(process):
+                process.retiring = True
+                self._recycled += 1
+            if process.retiring and process.leases == 0:
+                self._remove(process)
+            self._changed.notify_all()
+        self._spawn_in_background(self.ensure_min_size())
+
+    @asynccontextmanager
+    async def lease(self):
+        """Context manager around acquire() / release()."""
+        process = await self.acquire()
+        try:
+            yield process
+        finally:
+            await self.release(process)
+
+    def _pick(self) -> Optional[PluginProcess]:
+        candidates = [
+            p for p in self._processes
+            if p.is_alive and not p.retiring and p.leases < p.max_concurrency
+        ]
+        if not candidates:
             return None
+        return min(candidates, key=lambda p: p.leases)
+
+    def _total_leases(self) -> int:
+        return sum(p.leases for p in self._processes)
+
+    # ==================== Lifecycle ====================
+
+    async def _spawn(self) -> PluginProcess:
+        """Start a new process and add it to the pool (cold start)."""
+        self._starting += 1
+        start = time.perf_counter()
+        try:
+            process = self._process_factory(self.plugin_info)
+            await process.start()
+        except Exception:
+            async with self._changed:
+                self._starting -= 1
+                self._changed.notify_all()
+            raise
+        elapsed = time.perf_counter() - start
+        async with self._changed:
+            self._starting -= 1
+            self._cold_starts.append(elapsed)
+            self._cold_start_count += 1
+            if self._closed:
+                self._spawn_in_background(process.stop())
+            else:
+                self._processes.append(process)
+            self._changed.notify_all()
+        logger.info(f"Started {self.plugin_info.name} process in {elapsed:.2f}s (pool size {self.size})")
+        return process
+
+    async def ensure_min_size(self):
+        """Start processes until ``min_size`` warm processes are available."""
+        while not self._closed:
+            warm = sum(1 for p in self._processes if p.is_alive and not p.retiring)
+            if warm + self._starting >= self.config.min_size or self.size + self._starting >= self.config.max_size:
+                return
+            try:
+                await self._spawn()
+            except Exception as e:
+                logger.error(f"Failed to pre-start plugin {self.plugin_info.name}: {e}")
+                return
+
+    async def warm_up(self):
+        """Start the warm spares and the periodic health checks."""
+        self._ensure_health_checks()
+        await self.ensure_min_size()
+
+    async def health_check(self):
+        """
+        Ping every process; retire the ones not answering or over the RSS limit.
+
+        Pings are multiplexed with running tasks, so busy processes are
+        checked too.
+        """
+        for process in list(self._processes):
+            if process.retiring:
+                continue
+            healthy = await process.ping()
+            if not healthy:
+                self._health_failures += 1
+                logger.warning(f"Plugin {self.plugin_info.name} process failed health check")
+            async with self._changed:
+                if not healthy:
+                    process.retiring = True
+                elif self._should_recycle(process):
+                    process.retiring = True
+                    self._recycled += 1
+                if process.retiring and process.leases == 0:
+                    self._remove(process)
+                self._changed.notify_all()
+        await self.ensure_min_size()
+
+    async def _health_loop(self):
+        try:
+            while not self._closed:
+                await asyncio.sleep(self.config.health_check_interval)
+                await self.health_check()
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
-            logger.error(f"Error reading from plugin: {e}")
-            return None
-    
+            logger.error(f"Health check loop of plugin {self.plugin_info.name} failed: {e}")
+
+    def _ensure_health_checks(self):
+        if self._closed or self.config.health_check_interval <= 0:
+            return
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    def _should_recycle(self, process: PluginProcess) -> bool:
+        if not process.is_alive:
+            return True
+        if self.config.max_tasks_per_process and process.tasks_completed >= self.config.max_tasks_per_process:
+            logger.info(f"Recycling {self.plugin_info.name} process after {process.tasks_completed} tasks")
+            return True
+        if self.config.max_rss_mb and process.process is not None:
+            rss = get_process_rss(process.process.pid)
+            if rss is not None and rss > self.config.max_rss_mb * 1024 * 1024:
+                logger.info(f"Recycling {self.plugin_info.name} process using {rss // (1024 * 1024)} MB")
+                return True
+        return False
+
+    def _drop_dead(self):
+        for process in list(self._processes):
+            if not process.is_alive and process.leases == 0:
+                self._remove(process)
+
+    def _remove(self, process: PluginProcess):
+        """Take a process out of the pool and stop it in the background."""
+        if process in self._processes:
+            self._processes.remove(process)
+            self._spawn_in_background(process.stop())
+
+    def _spawn_in_background(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def close(self):
+        """Stop every process of the pool."""
+        self._closed = True
+        if self._health_task and not self._health_task.done():
+            self._health_task.cancel()
+        self._health_task = None
+        processes, self._processes = self._processes, []
+        for process in processes:
+            await process.stop()
+        if self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+
+    # ==================== Metrics ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool size, utilisation and cold-start latency."""
+        capacity = sum(p.max_concurrency for p in self._processes if p.is_alive and not p.retiring)
+        leases = self._total_leases()
+        cold_starts = list(self._cold_starts)
+        return {
+            "size": self.size,
+            "starting": self._starting,
+            "min_size": self.config.min_size,
+            "max_size": self.config.max_size,
+            "busy": sum(1 for p in self._processes if p.leases > 0),
+            "in_flight": leases,
+            "capacity": capacity,
+            "utilisation": (leases / capacity) if capacity else 0.0,
+            "peak_in_flight": self._peak_leases,
+            "tasks_completed": self._tasks_completed,
+            "recycled": self._recycled,
+            "health_failures": self._health_failures,
+            "cold_start": {
+                "count": self._cold_start_count,
+                "last": cold_starts[-1] if cold_starts else 0.0,
+                "avg": (sum(cold_starts) / len(cold_starts)) if cold_starts else 0.0,
+                "max": max(cold_starts) if cold_starts else 0.0,
+            },
+        }
+
     def __repr__(self) -> str:
-        return f"PluginProcess({self.plugin_info.name}, ready={self.is_ready})"
+        return f"PluginPool({self.plugin_info.name}, size={self.size}, in_flight={self._total_leases()})"
 
 
 class PluginManager:
     """
     Manages multiple plugin processes.
+
+    Each plugin runs in a PluginPool; use lease() to borrow a process for
+    the duration of a task.
     """
     
     def __init__(self, plugins_dir: Optional[str] = None):
@@ -270,8 +750,10 @@ class PluginManager:
             # Default to server/plugins directory
             self.plugins_dir = Path(__file__).parent
         
-        self.plugins: Dict[str, PluginProcess] = {}
+        self.pools: Dict[str, PluginPool] = {}
         self.plugin_infos: Dict[str, PluginInfo] = {}
+        self._warm_up_task: Optional[asyncio.Task] = None
+        self._deferred_warm_up: Optional[set] = None
     
     def discover_plugins(self):
         """
@@ -359,9 +841,45 @@ class PluginManager:
             except Exception as e:
                 logger.error(f"❌ Failed to load plugin config {plugin_dir.name}: {e}")
     
+    def get_pool(self, plugin_name: str) -> PluginPool:
+        """
+        Get the process pool of a plugin.
+
+        Args:
+            plugin_name: Name of the plugin
+
+        Raises:
+            PluginNotFoundError: If plugin not found
+        """
+        pool = self.pools.get(plugin_name)
+        if pool is None:
+            if plugin_name not in self.plugin_infos:
+                raise PluginNotFoundError(plugin_name)
+            pool = PluginPool(self.plugin_infos[plugin_name])
+            self.pools[plugin_name] = pool
+        return pool
+
+    @asynccontextmanager
+    async def lease(self, plugin_name: str):
+        """
+        Borrow a plugin process with a free concurrency slot.
+
+        Args:
+            plugin_name: Name of the plugin
+
+        Raises:
+            PluginNotFoundError: If plugin not found
+            PluginExecutionError: If a plugin process fails to start
+        """
+        self._start_deferred_warm_up()
+        async with self.get_pool(plugin_name).lease() as plugin:
+            yield plugin
+
     async def get_plugin(self, plugin_name: str) -> PluginProcess:
         """
-        Get or start a plugin process.
+        Get a running process of a plugin, starting one if needed.
+
+        The process is not reserved; use lease() to run tasks.
         
         Args:
             plugin_name: Name of the plugin
@@ -373,44 +891,67 @@ class PluginManager:
             PluginNotFoundError: If plugin not found
             PluginExecutionError: If plugin fails to start
         """
-        # Check if plugin is already running
-        if plugin_name in self.plugins:
-            plugin = self.plugins[plugin_name]
-            # Check if still alive
-            if plugin.process and plugin.process.returncode is None:
-                return plugin
-            else:
-                # Process died, remove it
-                del self.plugins[plugin_name]
-        
-        # Get plugin info
-        if plugin_name not in self.plugin_infos:
-            raise PluginNotFoundError(plugin_name)
-        
-        plugin_info = self.plugin_infos[plugin_name]
-        
-        # Create and start plugin process
-        plugin = PluginProcess(plugin_info)
-        await plugin.start()
-        
-        self.plugins[plugin_name] = plugin
+        pool = self.get_pool(plugin_name)
+        plugin = await pool.acquire()
+        # Only a lookup: no task ran, so it must not count towards recycling
+        await pool.release(plugin, task_completed=False)
         return plugin
+
+    async def warm_up(self, plugin_names: Optional[Iterable[str]] = None):
+        """
+        Pre-start the warm spares of the given plugins (all by default).
+
+        Args:
+            plugin_names: Names of the plugins to warm up
+        """
+        names = [name for name in (plugin_names or self.plugin_infos) if name in self.plugin_infos]
+        await asyncio.gather(*(self.get_pool(name).warm_up() for name in names), return_exceptions=True)
+
+    def start_warm_up(self, plugin_names: Optional[Iterable[str]] = None):
+        """
+        Warm up plugins in the background.
+
+        Without a running event loop the warm-up is deferred to the first lease().
+        """
+        names = set(plugin_names) if plugin_names is not None else set(self.plugin_infos)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._deferred_warm_up = (self._deferred_warm_up or set()) | names
+            return
+        self._warm_up_task = asyncio.create_task(self.warm_up(names))
+
+    def _start_deferred_warm_up(self):
+        if self._deferred_warm_up:
+            names, self._deferred_warm_up = self._deferred_warm_up, None
+            self.start_warm_up(names)
+
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get utilisation and cold-start statistics of every plugin pool.
+
+        Returns:
+            Dictionary of plugin name -> pool statistics
+        """
+        return {name: pool.get_stats() for name, pool in self.pools.items()}
     
     async def stop_plugin(self, plugin_name: str):
         """
-        Stop a plugin process.
+        Stop every process of a plugin.
         
         Args:
             plugin_name: Name of the plugin
         """
-        if plugin_name in self.plugins:
-            await self.plugins[plugin_name].stop()
-            del self.plugins[plugin_name]
+        pool = self.pools.pop(plugin_name, None)
+        if pool is not None:
+            await pool.close()
             logger.info(f"Stopped plugin: {plugin_name}")
     
     async def stop_all_plugins(self):
         """Stop all running plugins"""
-        for plugin_name in list(self.plugins.keys()):
+        if self._warm_up_task and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+        for plugin_name in list(self.pools.keys()):
             await self.stop_plugin(plugin_name)
     
     def list_plugins(self) -> list[PluginInfo]:
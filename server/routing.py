@@ -0,0 +1,285 @@
+"""
+Routing Strategies
+
+Load- and latency-aware ordering of the servers a routing rule can send a
+task to, per-server runtime statistics and a circuit breaker that takes
+failing servers out of rotation.
+
+A rule's candidates are its ``server_name`` followed by its
+``fallback_servers``; the rule's ``strategy`` decides which one is tried
+first and in which order the others are used as fallbacks.
+"""
+
+import bisect
+import hashlib
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_PRIORITY = "priority"
+STRATEGY_ROUND_ROBIN = "round_robin"
+STRATEGY_LEAST_IN_FLIGHT = "least_in_flight"
+STRATEGY_EWMA_LATENCY = "ewma_latency"
+STRATEGY_CONSISTENT_HASH = "consistent_hash"
+
+# Task metadata / parameter keys identifying the project, in lookup order
+PROJECT_KEY_FIELDS = ("project_name", "project_id", "project_path")
+
+
+class CircuitBreaker:
+    """
+    Per-server circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and the
+    server is skipped. Once ``reset_timeout`` seconds have passed one trial
+    task is let through (half-open); its outcome closes or re-opens the circuit.
+    Routing tries a server waiting for its trial first, so that fallback
+    servers, which otherwise only get tasks when the others fail, are probed
+    as well.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._trial_in_flight = False
+
+    def allows(self) -> bool:
+        """Whether a task may be routed to the server right now (no side effects)."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return self._clock() - self.opened_at >= self.reset_timeout
+        return not self._trial_in_flight
+
+    @property
+    def wants_trial(self) -> bool:
+        """Whether the circuit is waiting for a half-open trial task."""
+        return self.state != self.CLOSED and self.allows()
+
+    def on_start(self):
+        if self.state == self.OPEN and self.allows():
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = True
+
+    def on_success(self):
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+        if self.state != self.CLOSED:
+            logger.info("Circuit closed after successful trial task")
+        self.state = self.CLOSED
+
+    def on_failure(self):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = self._clock()
+
+    def on_abandon(self):
+        """The task ended without an outcome (e.g. the caller stopped reading)."""
+        self._trial_in_flight = False
+
+
+class ServerStats:
+    """Runtime statistics of one server used by the routing strategies."""
+
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, name: str, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.ewma_latency: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self.breaker = breaker or CircuitBreaker()
+
+    @property
+    def is_available(self) -> bool:
+        return self.breaker.allows()
+
+    @property
+    def wants_trial(self) -> bool:
+        return self.breaker.wants_trial
+
+    def on_start(self):
+        self.in_flight += 1
+        self.breaker.on_start()
+
+    def on_success(self, latency: float):
+        self.in_flight = max(0, self.in_flight - 1)
+        self.completed += 1
+        self.last_latency = latency
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = self.EWMA_ALPHA * latency + (1 - self.EWMA_ALPHA) * self.ewma_latency
+        self.breaker.on_success()
+
+    def on_failure(self):
+        self.in_flight = max(0, self.in_flight - 1)
+        self.failed += 1
+        self.breaker.on_failure()
+
+    def on_abandon(self):
+        self.in_flight = max(0, self.in_flight - 1)
+        self.breaker.on_abandon()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "ewma_latency": self.ewma_latency,
+            "last_latency": self.last_latency,
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "circuit_trips": self.breaker.trips,
+        }
+
+
+def get_project_key(task) -> str:
+    """Get the key used to pin a task's project to a server."""
+    for key in PROJECT_KEY_FIELDS:
+        value = task.metadata.get(key) or task.parameters.get(key)
+        if value:
+            return str(value)
+    return task.task_id
+
+
+class RoutingStrategy:
+    """Orders a rule's candidate servers; the first one is tried first."""
+
+    name = STRATEGY_PRIORITY
+
+    def order(self, candidates: Sequence[Any], task, stats: Dict[str, ServerStats]) -> List[Any]:
+        """
+        Args:
+            candidates: Enabled servers in configured order (primary first)
+            task: Task being routed
+            stats: Server name -> ServerStats
+
+        Returns:
+            Candidates in the order they should be tried
+        """
+        return list(candidates)
+
+
+class RoundRobinStrategy(RoutingStrategy):
+    name = STRATEGY_ROUND_ROBIN
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def order(self, candidates, task, stats):
+        if not candidates:
+            return []
+        start = next(self._counter) % len(candidates)
+        return list(candidates[start:]) + list(candidates[:start])
+
+
+class LeastInFlightStrategy(RoutingStrategy):
+    name = STRATEGY_LEAST_IN_FLIGHT
+
+    def order(self, candidates, task, stats):
+        # sorted() is stable: ties keep the configured order
+        return sorted(candidates, key=lambda s: stats[s.name].in_flight)
+
+
+class EwmaLatencyStrategy(RoutingStrategy):
+    """
+    Prefer the server with the lowest expected completion time, i.e. its
+    EWMA latency weighted by the work already queued on it. Servers without
+    a latency sample yet are tried first so that they get one.
+    """
+
+    name = STRATEGY_EWMA_LATENCY
+
+    def order(self, candidates, task, stats):
+        def score(server):
+            server_stats = stats[server.name]
+            if server_stats.ewma_latency is None:
+                return (0, server_stats.in_flight)
+            return (1, server_stats.ewma_latency * (server_stats.in_flight + 1))
+        return sorted(candidates, key=score)
+
+
+class ConsistentHashStrategy(RoutingStrategy):
+    """
+    Pin each project to one server using a hash ring, so that a project's
+    tasks reuse the same server's warm caches. Adding or removing a server
+    only moves the projects of that server.
+    """
+
+    name = STRATEGY_CONSISTENT_HASH
+    VIRTUAL_NODES = 64
+
+    def __init__(self):
+        self._ring_key: Optional[tuple] = None
+        self._ring: List[tuple] = []
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+    def _build_ring(self, names: Sequence[str]):
+        key = tuple(sorted(names))
+        if key != self._ring_key:
+            self._ring = sorted(
+                (self._hash(f"{name}#{i}"), name)
+                for name in key for i in range(self.VIRTUAL_NODES)
+            )
+            self._ring_key = key
+
+    def order(self, candidates, task, stats):
+        if not candidates:
+            return []
+        by_name = {server.name: server for server in candidates}
+        self._build_ring(list(by_name))
+        start = bisect.bisect(self._ring, (self._hash(get_project_key(task)),))
+        ordered = []
+        # Walk the ring clockwise; later distinct servers are the fallbacks
+        for i in range(len(self._ring)):
+            name = self._ring[(start + i) % len(self._ring)][1]
+            if name not in ordered:
+                ordered.append(name)
+                if len(ordered) == len(by_name):
+                    break
+        return [by_name[name] for name in ordered]
+
+
+STRATEGIES = {
+    STRATEGY_PRIORITY: RoutingStrategy,
+    STRATEGY_ROUND_ROBIN: RoundRobinStrategy,
+    STRATEGY_LEAST_IN_FLIGHT: LeastInFlightStrategy,
+    STRATEGY_EWMA_LATENCY: EwmaLatencyStrategy,
+    STRATEGY_CONSISTENT_HASH: ConsistentHashStrategy,
+}
+
+
+def create_strategy(name: Optional[str]) -> RoutingStrategy:
+    """
+    Create a routing strategy by name.
+
+    Unknown names fall back to the priority strategy (configured order).
+    """
+    strategy_class = STRATEGIES.get(name or STRATEGY_PRIORITY)
+    if strategy_class is None:
+        logger.warning(f"Unknown routing strategy '{name}', using '{STRATEGY_PRIORITY}'")
+        strategy_class = RoutingStrategy
+    return strategy_class()
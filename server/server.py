@@ -7,17 +7,19 @@ that can generate images, videos, audio, and other storyboard materials.
 """
 
 import os
+import time
 import yaml
 import asyncio
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 
 from server.api.types import FilmetoTask, TaskProgress, TaskResult
 from server.plugins.plugin_manager import PluginManager, PluginInfo
 from server.plugins.plugin_ui_loader import PluginUILoader
+from server.routing import RoutingStrategy, ServerStats, STRATEGY_PRIORITY, create_strategy
 
 logger = logging.getLogger(__name__)
 
@@ -123,6 +125,9 @@ class RoutingRule:
         server_name: Target server name
         fallback_servers: List of fallback server names if primary fails
         enabled: Whether the rule is enabled
+        strategy: How to choose among server_name and fallback_servers
+                  (priority, round_robin, least_in_flight, ewma_latency,
+                  consistent_hash)
     """
     name: str
     server_name: str
@@ -130,6 +135,7 @@ class RoutingRule:
     conditions: Dict[str, Any] = field(default_factory=dict)
     fallback_servers: List[str] = field(default_factory=list)
     enabled: bool = True
+    strategy: str = STRATEGY_PRIORITY
     
     def matches(self, task: FilmetoTask) -> bool:
         """Check if this rule matches the given task"""
@@ -167,6 +173,7 @@ class RoutingRule:
             "server_name": self.server_name,
             "fallback_servers": self.fallback_servers,
             "enabled": self.enabled,
+            "strategy": self.strategy,
         }
     
     @classmethod
@@ -179,6 +186,7 @@ class RoutingRule:
             conditions=data.get("conditions", {}),
             fallback_servers=data.get("fallback_servers", []),
             enabled=data.get("enabled", True),
+            strategy=data.get("strategy", STRATEGY_PRIORITY),
         )
 
 
@@ -242,9 +250,6 @@ class Server:
         if not self.is_enabled:
             raise Exception(f"Server '{self.name}' is disabled")
         
-        # Get plugin
-        plugin = await self.plugin_manager.get_plugin(self.config.plugin_name)
-        
         # Inject server-specific parameters
         if self.config.parameters:
             task.metadata["server_config"] = self.config.parameters
@@ -254,12 +259,11 @@ class Server:
             task.metadata["workspace_path"] = str(self.workspace_path)
             task.metadata["server_name"] = self.config.name
         
-        # Send task to plugin
-        await plugin.send_task(task)
-        
-        # Receive and yield messages
-        async for message in plugin.receive_messages():
-            yield message
+        # Borrow a pooled plugin process, send the task and receive its
+        # messages; other tasks may be in flight on the same process
+        async with self.plugin_manager.lease(self.config.plugin_name) as plugin:
+            async for message in plugin.run_task(task):
+                yield message
     
     def __repr__(self) -> str:
         return f"Server(name={self.name}, type={self.server_type}, enabled={self.is_enabled})"
@@ -342,6 +346,10 @@ class ServerManager:
         # Routing rules
         self.routing_rules: List[RoutingRule] = []
 
+        # Runtime routing state: per-server stats and per-rule strategies
+        self.server_stats: Dict[str, ServerStats] = {}
+        self._rule_strategies: Dict[str, Tuple[str, RoutingStrategy]] = {}
+
         # Initialize
         self._ensure_directories()
         self.cleanup_old_configs()  # Clean up old configurations first
@@ -352,6 +360,10 @@ class ServerManager:
         # Store flag for deferred discovery
         self._plugin_discovery_deferred = defer_plugin_discovery
 
+        # Pre-start plugin processes of enabled servers in the background
+        if not defer_plugin_discovery:
+            self._warm_up_plugins()
+
         # Mark as initialized
         self._initialized = True
 
@@ -363,6 +375,12 @@ class ServerManager:
             if hasattr(self.plugin_manager, 'plugins_dir') and self.plugin_manager.plugins_dir:
                 self.plugin_ui_loader = PluginUILoader(self.plugin_manager.plugins_dir)
             self._plugin_discovery_deferred = False
+            self._warm_up_plugins()
+
+    def _warm_up_plugins(self):
+        """Start the warm process pools of the plugins used by enabled servers"""
+        plugin_names = {server.config.plugin_name for server in self.servers.values() if server.is_enabled}
+        self.plugin_manager.start_warm_up(plugin_names)
     
     @classmethod
     def get_instance(cls) -> Optional['ServerManager']:
@@ -640,6 +658,56 @@ class ServerManager:
         """Get all routing rules"""
         return self.routing_rules.copy()
     
+    def get_server_stats(self, name: str) -> ServerStats:
+        """Get runtime statistics (in-flight, latency, circuit state) of a server"""
+        stats = self.server_stats.get(name)
+        if stats is None:
+            stats = ServerStats(name)
+            self.server_stats[name] = stats
+        return stats
+
+    def get_routing_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get runtime statistics of every server that received tasks.
+
+        Returns:
+            Dictionary of server name -> stats dictionary
+        """
+        return {name: stats.to_dict() for name, stats in self.server_stats.items()}
+
+    def _get_rule_strategy(self, rule: RoutingRule) -> RoutingStrategy:
+        # Keyed by the configured name: an unknown name falls back to another
+        # strategy, which must still be reused (and keep its state) across tasks
+        configured, strategy = self._rule_strategies.get(rule.name, (None, None))
+        if strategy is None or configured != rule.strategy:
+            strategy = create_strategy(rule.strategy)
+            self._rule_strategies[rule.name] = (rule.strategy, strategy)
+        return strategy
+
+    def _order_rule_servers(self, rule: RoutingRule, task: FilmetoTask) -> List[Server]:
+        """
+        Get the servers of a rule in the order its strategy wants them tried,
+        skipping disabled servers and servers whose circuit is open.
+        """
+        candidates = []
+        for name in [rule.server_name] + list(rule.fallback_servers):
+            server = self.get_server(name)
+            if server and server.is_enabled and server not in candidates:
+                candidates.append(server)
+
+        stats = {server.name: self.get_server_stats(server.name) for server in candidates}
+        ordered = self._get_rule_strategy(rule).order(candidates, task, stats)
+        # A server due for its half-open trial goes first (the others remain
+        # its fallbacks), otherwise a recovered fallback would never be probed
+        ordered.sort(key=lambda server: not stats[server.name].wants_trial)
+        return [server for server in ordered if stats[server.name].is_available]
+
+    def _get_default_server(self) -> Optional[Server]:
+        default_server = self.get_server("local")
+        if default_server and default_server.is_enabled and self.get_server_stats("local").is_available:
+            return default_server
+        return None
+    
     def route_task(self, task: FilmetoTask) -> Optional[Server]:
         """
         Route a task to appropriate server based on routing rules.
@@ -653,20 +721,19 @@ class ServerManager:
         # Try each rule in priority order
         for rule in self.routing_rules:
             if rule.matches(task):
-                server = self.get_server(rule.server_name)
-                if server and server.is_enabled:
-                    return server
+                servers = self._order_rule_servers(rule, task)
+                if servers:
+                    return servers[0]
         
         # No matching rule, try default server
-        default_server = self.get_server("local")
-        if default_server and default_server.is_enabled:
-            return default_server
-        
-        return None
+        return self._get_default_server()
     
     def route_task_with_fallback(self, task: FilmetoTask) -> List[Server]:
         """
         Route a task and return list of servers including fallbacks.
+
+        The matching rule's strategy decides the order; servers whose
+        circuit breaker is open are left out.
         
         Args:
             task: Task to route
@@ -679,23 +746,13 @@ class ServerManager:
         # Find matching rule
         for rule in self.routing_rules:
             if rule.matches(task):
-                # Add primary server
-                primary = self.get_server(rule.server_name)
-                if primary and primary.is_enabled:
-                    servers.append(primary)
-                
-                # Add fallback servers
-                for fallback_name in rule.fallback_servers:
-                    fallback = self.get_server(fallback_name)
-                    if fallback and fallback.is_enabled:
-                        servers.append(fallback)
-                
+                servers = self._order_rule_servers(rule, task)
                 break
         
         # If no match, use default
         if not servers:
-            default = self.get_server("local")
-            if default and default.is_enabled:
+            default = self._get_default_server()
+            if default:
                 servers.append(default)
         
         return servers
@@ -734,23 +791,51 @@ class ServerManager:
         
         # Try each server in order
         for server in servers:
+            stats = self.get_server_stats(server.name)
+            if not stats.is_available:
+                # Its circuit opened, or another task took its trial, since routing
+                continue
+            stats.on_start()
+            started = time.monotonic()
+            latency = None
+            succeeded = None
             try:
                 print(f"🎯 Routing task {task.task_id} to server: {server.name}")
                 
-                async for message in server.execute_task(task):
-                    yield message
-                    
-                    # If we got a result, we're done
-                    if isinstance(message, dict) and "result" in message:
-                        return
+                messages = server.execute_task(task)
+                try:
+                    async for message in messages:
+                        # If we got a result, we're done
+                        if isinstance(message, dict) and "result" in message:
+                            succeeded = (message.get("result") or {}).get("status") != "error"
+                            latency = time.monotonic() - started
+                            yield message
+                            return
+
+                        yield message
+                finally:
+                    # Release the plugin process as soon as we stop reading
+                    await messages.aclose()
                 
-                # Task completed successfully
-                return
+                # Stream ended without a result (plugin exited): try the next server
+                succeeded = False
+                last_error = RuntimeError(f"Server {server.name} ended the task without a result")
+                print(f"❌ Server {server.name} failed: {last_error}")
+                continue
                 
             except Exception as e:
+                succeeded = False
                 last_error = e
                 print(f"❌ Server {server.name} failed: {e}")
                 continue
+
+            finally:
+                if succeeded:
+                    stats.on_success(latency)
+                elif succeeded is None:
+                    stats.on_abandon()
+                else:
+                    stats.on_failure()
         
         # All servers failed
         yield TaskResult(
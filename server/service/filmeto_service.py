@@ -6,16 +6,17 @@ Core service layer that manages task execution through plugins.
 
 import asyncio
 import os
-from typing import AsyncIterator, Union
+from typing import AsyncIterator, Optional, Union
 from datetime import datetime
 from pathlib import Path
 
 from server.api.types import (
-    FilmetoTask, TaskProgress, TaskResult, ProgressType,
+    FilmetoTask, TaskProgress, TaskResult, ProgressType, ResourceInput, ResourceType,
     ValidationError, PluginNotFoundError, PluginExecutionError, TimeoutError as TaskTimeoutError
 )
 from server.api.resource_processor import ResourceProcessor
 from server.plugins.plugin_manager import PluginManager
+from server.service.task_registry import TaskRegistry, TaskRecord
 
 
 class FilmetoService:
@@ -46,12 +47,12 @@ class FilmetoService:
         # Initialize components
         from server.server import ServerManager
         self.plugin_manager = PluginManager(plugins_dir)
+        # Discover plugins on initialization (before ServerManager warms up their pools)
+        self.plugin_manager.discover_plugins()
         self.server_manager = ServerManager(str(self.workspace_path), self.plugin_manager)
         self.resource_processor = ResourceProcessor(cache_dir)
+        self.task_registry = TaskRegistry(str(self.workspace_path / "tasks"))
         self.heartbeat_interval = 5  # seconds
-        
-        # Discover plugins on initialization
-        self.plugin_manager.discover_plugins()
     
     async def execute_task_stream(
         self, 
@@ -80,6 +81,7 @@ class FilmetoService:
         if not is_valid:
             raise ValidationError(error_msg, {"task_id": task.task_id})
         
+        processed_resources = []
         try:
             # Process resources
             yield TaskProgress(
@@ -89,11 +91,18 @@ class FilmetoService:
                 message="Processing resources..."
             )
             
-            processed_resources = []
             for i, resource in enumerate(task.resources):
                 try:
                     local_path = await self.resource_processor.process_resource(resource)
                     processed_resources.append(local_path)
+                    if resource.type != ResourceType.LOCAL_PATH:
+                        # Hand plugins a file reference instead of inline base64/URL data
+                        task.resources[i] = ResourceInput(
+                            type=ResourceType.LOCAL_PATH,
+                            data=local_path,
+                            mime_type=resource.mime_type,
+                            metadata={**resource.metadata, "original_type": resource.type.value}
+                        )
                     
                     # Update progress
                     percent = (i + 1) / len(task.resources) * 10  # First 10% for resources
@@ -182,6 +191,11 @@ class FilmetoService:
             )
             
             yield error_result
+        
+        finally:
+            # The cached inputs may be evicted again once the task is done
+            for local_path in processed_resources:
+                self.resource_processor.release_resource(local_path)
     
     async def _send_heartbeats(self, task_id: str, plugin):
         """
@@ -199,7 +213,35 @@ class FilmetoService:
         except asyncio.CancelledError:
             pass
     
-    async def get_task_status(self, task_id: str) -> dict:
+    def submit_task(self, task: FilmetoTask) -> TaskRecord:
+        """
+        Start executing a task in the background.
+
+        Progress and the final result are recorded in the task registry;
+        follow them with watch_task(). Must be called from a running event loop.
+
+        Args:
+            task: Task to execute
+
+        Returns:
+            Task record
+        """
+        return self.task_registry.submit(task, self.execute_task_stream)
+
+    def watch_task(self, task_id: str, last_event_id: int = 0) -> AsyncIterator[dict]:
+        """
+        Stream the recorded events of a task, resuming after last_event_id.
+
+        Args:
+            task_id: Task identifier
+            last_event_id: Id of the last event the client has seen
+
+        Yields:
+            Event dictionaries (id, type, timestamp, data)
+        """
+        return self.task_registry.watch(task_id, last_event_id)
+    
+    async def get_task_status(self, task_id: str) -> Optional[dict]:
         """
         Get current status of a task.
         
@@ -207,13 +249,49 @@ class FilmetoService:
             task_id: Task identifier
             
         Returns:
-            Task status dictionary
+            Task status dictionary, or None if the task is unknown
         """
-        # TODO: Implement task status tracking
-        return {
-            "task_id": task_id,
-            "status": "unknown"
-        }
+        return self.task_registry.get_status(task_id)
+    
+    def get_plugin_pool_stats(self) -> dict:
+        """
+        Get plugin process pool statistics.
+
+        Returns:
+            Dictionary of plugin name -> size, utilisation and cold-start latency
+        """
+        return self.plugin_manager.get_pool_stats()
+    
+    def get_routing_stats(self) -> dict:
+        """
+        Get per-server routing statistics.
+
+        Returns:
+            Dictionary of server name -> in-flight count, EWMA latency and circuit state
+        """
+        return self.server_manager.get_routing_stats()
+    
+    async def upload_resource(self, chunks: AsyncIterator[bytes], mime_type: str) -> ResourceInput:
+        """
+        Store uploaded binary data in the resource cache.
+
+        Args:
+            chunks: Async iterator of data chunks
+            mime_type: MIME type of the data
+
+        Returns:
+            LOCAL_PATH ResourceInput that can be used in task resources
+        """
+        return await self.resource_processor.store_stream(chunks, mime_type)
+    
+    def get_resource_cache_stats(self) -> dict:
+        """
+        Get resource cache statistics.
+
+        Returns:
+            Dictionary with hit/miss/byte counters and cache size
+        """
+        return self.resource_processor.get_cache_stats()
     
     def list_plugins(self) -> list:
         """
@@ -298,7 +376,9 @@ class FilmetoService:
         """
         Cleanup resources and stop all plugins.
         """
+        await self.task_registry.cancel_all()
         await self.plugin_manager.stop_all_plugins()
         self.resource_processor.cleanup_cache()
+        await self.resource_processor.close()
 
 
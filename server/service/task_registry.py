@@ -0,0 +1,348 @@
+"""
+Task Registry
+
+Tracks tasks executed in the background by FilmetoService.
+
+Every progress update and the final result of a task are appended to a
+per-task JSON Lines log (``<workspace>/tasks/<task_id>-<hash>.jsonl``) and kept in
+a bounded in-memory index. Events are numbered so that SSE clients can
+resume a stream with ``Last-Event-ID``; any number of watchers can follow
+the same task while it executes exactly once.
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from server.api.types import FilmetoTask, TaskError, TaskProgress, TaskResult
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_SUCCESS = "success"
+STATUS_ERROR = "error"
+STATUS_INTERRUPTED = "interrupted"
+
+FINISHED_STATUSES = (STATUS_SUCCESS, STATUS_ERROR, STATUS_INTERRUPTED)
+
+EVENT_PROGRESS = "progress"
+EVENT_RESULT = "result"
+EVENT_ERROR = "error"
+
+# Longer strings (e.g. inline base64 resources) are left out of the task logs
+MAX_LOGGED_STRING_LENGTH = 4096
+
+
+def _strip_large_values(value: Any) -> Any:
+    """Replace long strings in the task data with a short placeholder."""
+    if isinstance(value, str) and len(value) > MAX_LOGGED_STRING_LENGTH:
+        return f"<{len(value)} characters omitted>"
+    if isinstance(value, dict):
+        return {k: _strip_large_values(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_strip_large_values(v) for v in value]
+    return value
+
+
+class TaskRecord:
+    """State and event history of one task."""
+
+    def __init__(self, task_id: str, task_data: Optional[Dict[str, Any]] = None,
+                 created_at: Optional[str] = None):
+        self.task_id = task_id
+        self.task_data = task_data or {}
+        self.status = STATUS_PENDING
+        self.percent = 0.0
+        self.message = ""
+        self.created_at = created_at or datetime.now().isoformat()
+        self.updated_at = self.created_at
+        self.events: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Dict[str, Any]] = None
+        self._changed: Optional[asyncio.Condition] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def last_event_id(self) -> int:
+        return self.events[-1]["id"] if self.events else 0
+
+    @property
+    def changed(self) -> asyncio.Condition:
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def apply(self, event: Dict[str, Any]):
+        """Update the task state from an event."""
+        self.events.append(event)
+        self.updated_at = event.get("timestamp", self.updated_at)
+        data = event.get("data", {})
+        if event["type"] == EVENT_PROGRESS:
+            self.status = STATUS_RUNNING
+            self.percent = data.get("percent", self.percent)
+            self.message = data.get("message", self.message)
+        elif event["type"] == EVENT_RESULT:
+            self.result = data
+            self.status = STATUS_SUCCESS if data.get("status") == "success" else STATUS_ERROR
+            self.percent = 100.0
+        elif event["type"] == EVENT_ERROR:
+            self.error = data
+            self.status = STATUS_ERROR
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status dictionary returned by the API"""
+        return {
+            "task_id": self.task_id,
+            "status": self.status,
+            "percent": self.percent,
+            "message": self.message,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "last_event_id": self.last_event_id,
+            "tool_name": self.task_data.get("tool_name"),
+            "plugin_name": self.task_data.get("plugin_name"),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class TaskRegistry:
+    """
+    Registry of background tasks with an append-only on-disk log.
+
+    Finished tasks beyond ``max_tasks`` are dropped from memory (oldest first)
+    and transparently reloaded from their log when requested again.
+    """
+
+    DEFAULT_MAX_TASKS = 1000
+
+    def __init__(self, log_dir: str, max_tasks: int = DEFAULT_MAX_TASKS):
+        """
+        Initialize task registry.
+
+        Args:
+            log_dir: Directory holding the per-task event logs
+            max_tasks: Maximum number of task records kept in memory
+        """
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.max_tasks = max_tasks
+        self._records: "OrderedDict[str, TaskRecord]" = OrderedDict()
+        self._runners: Dict[str, asyncio.Task] = {}
+        # A single thread keeps the log writes off the event loop and in order
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-log")
+
+    # ==================== Execution ====================
+
+    def submit(
+        self,
+        task: FilmetoTask,
+        execute: Callable[[FilmetoTask], AsyncIterator[Any]]
+    ) -> TaskRecord:
+        """
+        Start executing a task in the background.
+
+        Submitting a task id that is already known does not start a second
+        execution; the existing record is returned.
+
+        Args:
+            task: Task to execute
+            execute: Function returning the task's TaskProgress/TaskResult stream
+
+        Returns:
+            The task record
+        """
+        existing = self.get(task.task_id)
+        if existing is not None:
+            return existing
+
+        record = TaskRecord(task.task_id, _strip_large_values(task.to_dict()))
+        # Queued before any event of the task, so the header is always the first line
+        asyncio.get_running_loop().run_in_executor(
+            self._writer, self._write_line,
+            record.task_id, {"task": record.task_data, "created_at": record.created_at}, 'w'
+        )
+        self._remember(record)
+        runner = asyncio.create_task(self._run(record, task, execute))
+        self._runners[task.task_id] = runner
+        runner.add_done_callback(lambda _: self._runners.pop(task.task_id, None))
+        return record
+
+    async def _run(self, record: TaskRecord, task: FilmetoTask, execute):
+        try:
+            async for update in execute(task):
+                if isinstance(update, TaskProgress):
+                    await self._append(record, EVENT_PROGRESS, update.to_dict())
+                elif isinstance(update, TaskResult):
+                    await self._append(record, EVENT_RESULT, update.to_dict())
+        except TaskError as e:
+            await self._append(record, EVENT_ERROR, e.to_dict())
+        except asyncio.CancelledError:
+            await self._append(record, EVENT_ERROR, {
+                "code": "CANCELLED", "message": "Task was cancelled", "details": {}
+            })
+            raise
+        except Exception as e:
+            logger.error(f"Task {record.task_id} failed: {e}")
+            await self._append(record, EVENT_ERROR, {"code": "INTERNAL_ERROR", "message": str(e), "details": {}})
+        finally:
+            if not record.is_finished:
+                await self._append(record, EVENT_ERROR, {
+                    "code": "NO_RESULT", "message": "Task ended without a result", "details": {}
+                })
+
+    async def _append(self, record: TaskRecord, event_type: str, data: Dict[str, Any]):
+        event = {
+            "id": record.last_event_id + 1,
+            "type": event_type,
+            "timestamp": datetime.now().isoformat(),
+            "data": data,
+        }
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._write_line, record.task_id, event)
+        async with record.changed:
+            record.apply(event)
+            record.changed.notify_all()
+        if record.is_finished:
+            self._trim()
+
+    async def wait(self, task_id: str) -> Optional[TaskRecord]:
+        """Wait until a task has finished."""
+        record = self.get(task_id)
+        if record is None:
+            return None
+        async with record.changed:
+            await record.changed.wait_for(lambda: record.is_finished)
+        return record
+
+    async def cancel_all(self):
+        """Cancel every running task (used at shutdown)."""
+        runners = list(self._runners.values())
+        for runner in runners:
+            runner.cancel()
+        if runners:
+            await asyncio.gather(*runners, return_exceptions=True)
+
+    # ==================== Queries ====================
+
+    def get(self, task_id: str) -> Optional[TaskRecord]:
+        """
+        Get a task record, loading it from its log if it is not in memory.
+
+        Returns:
+            TaskRecord or None if the task is unknown
+        """
+        record = self._records.get(task_id)
+        if record is not None:
+            self._records.move_to_end(task_id)
+            return record
+        record = self._load(task_id)
+        if record is not None:
+            self._remember(record)
+        return record
+
+    def get_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the status dictionary of a task, or None if unknown."""
+        record = self.get(task_id)
+        return record.to_dict() if record else None
+
+    async def watch(self, task_id: str, last_event_id: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the events of a task, starting after ``last_event_id``.
+
+        Replays the events already recorded, then follows the task until
+        it finishes. Any number of watchers may follow the same task.
+
+        Yields:
+            Event dictionaries with id, type, timestamp and data
+        """
+        record = self.get(task_id)
+        if record is None:
+            return
+        position = max(0, last_event_id)
+        while True:
+            async with record.changed:
+                await record.changed.wait_for(
+                    lambda: record.last_event_id > position or record.is_finished
+                )
+                pending = [e for e in record.events if e["id"] > position]
+                finished = record.is_finished
+            for event in pending:
+                position = event["id"]
+                yield event
+            if finished and position >= record.last_event_id:
+                return
+
+    # ==================== Persistence ====================
+
+    def _log_path(self, task_id: str) -> Path:
+        # Task ids come from clients; keep them inside the log directory and
+        # add a hash so that ids differing only in stripped characters never share a log
+        safe_id = "".join(c for c in task_id if c.isalnum() or c in "-_.")[:64]
+        digest = hashlib.sha256(task_id.encode('utf-8')).hexdigest()[:16]
+        return self.log_dir / f"{safe_id}-{digest}.jsonl"
+
+    def _write_line(self, task_id: str, data: Dict[str, Any], mode: str = 'a'):
+        try:
+            with open(self._log_path(task_id), mode, encoding='utf-8') as f:
+                f.write(json.dumps(data, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.error(f"Failed to write task log for {task_id}: {e}")
+
+    def _load(self, task_id: str) -> Optional[TaskRecord]:
+        path = self._log_path(task_id)
+        if not path.exists():
+            return None
+        record = None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        # Torn last line after a crash
+                        logger.warning(f"Skipping corrupt line in task log {path}")
+                        continue
+                    if record is None:
+                        record = TaskRecord(task_id, data.get("task"), data.get("created_at"))
+                    else:
+                        record.apply(data)
+        except OSError as e:
+            logger.error(f"Failed to read task log {path}: {e}")
+            return None
+        if record is not None and not record.is_finished and task_id not in self._runners:
+            # The process running it went away
+            record.status = STATUS_INTERRUPTED
+        return record
+
+    # ==================== Index ====================
+
+    def _remember(self, record: TaskRecord):
+        self._records[record.task_id] = record
+        self._records.move_to_end(record.task_id)
+        self._trim()
+
+    def _trim(self):
+        if len(self._records) <= self.max_tasks:
+            return
+        for task_id in list(self._records):
+            if len(self._records) <= self.max_tasks:
+                break
+            if self._records[task_id].is_finished:
+                del self._records[task_id]
+
+    def __len__(self) -> int:
+        return len(self._records)
@@ -0,0 +1,92 @@
+"""
+Benchmark: cost of ConversationManager.add_message as a conversation grows.
+
+Run with:
+    python tests/benchmarks/bench_conversation_store.py [--sizes 100 1000 5000] [--samples 50]
+
+For each conversation size it measures the average time of adding one more
+message with
+  * rewrite - the previous storage: load the whole conversation JSON,
+              append, rewrite it with indent=2 and rewrite the index
+  * append  - ConversationManager.add_message (append-only JSONL + header)
+and the time to load the last 50 messages of the conversation.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agent.chat.conversation import Conversation, ConversationManager, Message, MessageRole
+from utils.yaml_utils import load_yaml, save_yaml
+
+
+def make_message(i):
+    role = MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT
+    return Message(role=role, content=f"Message {i}: the director reviews the lighting of scene {i % 40}. " * 4,
+                   timestamp="2026-01-01T00:00:00", metadata={"sender_name": "director", "index": i})
+
+
+def rewrite_add_message(manager, project_path, conversation_id, message):
+    """add_message as implemented before the append-only store."""
+    _, conversations_path, index_path = manager._get_paths_for_project(project_path)
+    conversation_file = os.path.join(conversations_path, f"{conversation_id}.json")
+    with open(conversation_file, 'r', encoding='utf-8') as f:
+        conversation = Conversation.from_dict(json.load(f))
+    conversation.add_message(message)
+    with open(conversation_file, 'w', encoding='utf-8') as f:
+        json.dump(conversation.to_dict(), f, ensure_ascii=False, indent=2)
+    index = load_yaml(index_path)
+    for conv_info in index['conversations']:
+        if conv_info['conversation_id'] == conversation_id:
+            conv_info['updated_at'] = conversation.updated_at
+    save_yaml(index_path, index)
+
+
+def measure(size, samples):
+    manager = ConversationManager()
+    with tempfile.TemporaryDirectory() as project_path:
+        conversation = manager.create_conversation(project_path, title="Bench")
+        conversation.messages = [make_message(i) for i in range(size)]
+        manager.save_conversation(project_path, conversation)
+        conversation_id = conversation.conversation_id
+
+        started = time.perf_counter()
+        for i in range(samples):
+            manager.add_message(project_path, conversation_id, make_message(size + i))
+        append_ms = (time.perf_counter() - started) * 1000 / samples
+
+        started = time.perf_counter()
+        for _ in range(samples):
+            manager.get_conversation(project_path, conversation_id, limit=50)
+        tail_ms = (time.perf_counter() - started) * 1000 / samples
+
+        # Same conversation in the previous single-file format
+        _, conversations_path, _ = manager._get_paths_for_project(project_path)
+        legacy = manager.get_conversation(project_path, conversation_id)
+        with open(os.path.join(conversations_path, f"{conversation_id}.json"), 'w', encoding='utf-8') as f:
+            json.dump(legacy.to_dict(), f, ensure_ascii=False, indent=2)
+        started = time.perf_counter()
+        for i in range(samples):
+            rewrite_add_message(manager, project_path, conversation_id, make_message(size + samples + i))
+        rewrite_ms = (time.perf_counter() - started) * 1000 / samples
+
+    return rewrite_ms, append_ms, tail_ms
+
+
+def run(sizes, samples):
+    print(f"{'messages':>10} {'rewrite ms':>12} {'append ms':>12} {'speedup':>9} {'last 50 ms':>12}")
+    for size in sizes:
+        rewrite_ms, append_ms, tail_ms = measure(size, samples)
+        print(f"{size:>10} {rewrite_ms:>12.3f} {append_ms:>12.3f} {rewrite_ms / append_ms:>8.1f}x {tail_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--samples", type=int, default=50)
+    args = parser.parse_args()
+    run(args.sizes, args.samples)
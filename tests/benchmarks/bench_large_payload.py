@@ -0,0 +1,108 @@
+"""
+Benchmark: submission latency of large task payloads.
+
+Run with:
+    python tests/benchmarks/bench_large_payload.py [--sizes 1 10 50] [--repeat 3]
+
+For each payload size (MB) it reports the server-side time and peak Python
+memory of getting one input file ready for a plugin:
+  * legacy     - JSON body with inline base64, decoded in one piece and
+                 forwarded inline to the plugin (the previous behaviour)
+  * base64     - JSON body with inline base64, decoded in chunks into the
+                 cache and forwarded as a file reference
+  * upload     - raw binary upload streamed to the cache (POST
+                 /api/v1/resources), task forwarded with the file reference
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from server.api.resource_processor import ResourceProcessor
+from server.api.types import FilmetoTask, ResourceInput, ResourceType, ToolType
+
+CHUNK_SIZE = 1024 * 1024
+MIME_TYPE = "video/mp4"
+
+
+def _task(resources):
+    return FilmetoTask(tool_name=ToolType.IMAGE2VIDEO, plugin_name="bench",
+                       parameters={"prompt": "pan left"}, resources=resources)
+
+
+def _json_body(data):
+    encoded = base64.b64encode(data).decode()
+    return json.dumps({"resources": [{"type": "base64", "data": encoded, "mime_type": MIME_TYPE}]})
+
+
+async def legacy(body, cache_dir):
+    """The previous _process_base64 plus inline forwarding over JSON-RPC."""
+    resources = [ResourceInput.from_dict(r) for r in json.loads(body)["resources"]]
+    decoded = base64.b64decode(resources[0].data)
+    with open(os.path.join(cache_dir, "legacy.mp4"), 'wb') as f:
+        f.write(decoded)
+    return json.dumps(_task(resources).to_dict())
+
+
+async def chunked_base64(body, cache_dir):
+    resources = [ResourceInput.from_dict(r) for r in json.loads(body)["resources"]]
+    processor = ResourceProcessor(cache_dir)
+    path = await processor.process_resource(resources[0])
+    reference = ResourceInput(type=ResourceType.LOCAL_PATH, data=path, mime_type=MIME_TYPE)
+    return json.dumps(_task([reference]).to_dict())
+
+
+async def upload(data, cache_dir):
+    async def chunks():
+        view = memoryview(data)
+        for i in range(0, len(data), CHUNK_SIZE):
+            yield bytes(view[i:i + CHUNK_SIZE])
+
+    processor = ResourceProcessor(cache_dir)
+    reference = await processor.store_stream(chunks(), MIME_TYPE)
+    return json.dumps(_task([reference]).to_dict())
+
+
+def _measure(repeat, func, payload):
+    best_time = float("inf")
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            start = time.perf_counter()
+            message = asyncio.run(func(payload, cache_dir))
+            best_time = min(best_time, time.perf_counter() - start)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tracemalloc.start()
+        asyncio.run(func(payload, cache_dir))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best_time, peak, len(message)
+
+
+def run(sizes, repeat):
+    print(f"{'size':>6} {'path':<8} {'latency':>10} {'peak mem':>10} {'rpc msg':>10}")
+    for size_mb in sizes:
+        data = os.urandom(size_mb * 1024 * 1024)
+        body = _json_body(data)
+        for name, func, payload in (
+            ("legacy", legacy, body),
+            ("base64", chunked_base64, body),
+            ("upload", upload, data),
+        ):
+            latency, peak, message_size = _measure(repeat, func, payload)
+            print(f"{size_mb:>4}MB {name:<8} {latency * 1000:>8.1f}ms "
+                  f"{peak / 2 ** 20:>8.1f}MB {message_size / 2 ** 10:>8.1f}KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,128 @@
+"""
+Benchmark: vectorized LayerCompositor vs. the previous per-channel implementation.
+
+Run with:
+    python tests/benchmarks/bench_layer_compositor.py [--layers 10] [--repeat 3]
+
+For 1080p and 4K canvases it reports the time of
+  * legacy     - cv2.split/merge, float64 and a per-channel Python loop,
+                 re-reading every PNG from disk (the old composite_visible_layers)
+  * cold       - new compositor with an empty pixel cache
+  * warm       - new compositor with decoded layers cached
+  * dirty      - new compositor after moving only the top layer
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.data.layer_compositor import LayerCompositor
+
+
+class _BenchLayer:
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.visible = True
+
+
+def legacy_composite(layer_image_paths, canvas_size):
+    """The compositing loop previously found in LayerManager.composite_visible_layers."""
+    canvas = np.zeros((canvas_size[1], canvas_size[0], 4), dtype=np.uint8)
+    for layer, image_path in layer_image_paths:
+        layer_image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+        if layer_image is None:
+            continue
+        if layer_image.shape[2] == 3:
+            alpha = np.ones((layer_image.shape[0], layer_image.shape[1], 1), dtype=np.uint8) * 255
+            layer_image = np.concatenate([layer_image, alpha], axis=2)
+        if layer.width > 0 and layer.height > 0:
+            layer_image = cv2.resize(layer_image, (layer.width, layer.height))
+        if (0 <= layer.x < canvas_size[0] and 0 <= layer.y < canvas_size[1] and
+                layer.x + layer.width <= canvas_size[0] and layer.y + layer.height <= canvas_size[1]):
+            b, g, r, a = cv2.split(layer_image)
+            layer_rgb = cv2.merge([b, g, r])
+            alpha = a.astype(float) / 255.0
+            canvas_region = canvas[layer.y:layer.y + layer.height, layer.x:layer.x + layer.width]
+            canvas_b, canvas_g, canvas_r, canvas_a = cv2.split(canvas_region)
+            canvas_rgb = cv2.merge([canvas_b, canvas_g, canvas_r])
+            canvas_alpha = canvas_a.astype(float) / 255.0
+            alpha_out = alpha + canvas_alpha * (1 - alpha)
+            alpha_out_safe = np.where(alpha_out > 0, alpha_out, 1)
+            for c in range(3):
+                fg = layer_rgb[:, :, c].astype(float)
+                bg = canvas_rgb[:, :, c].astype(float)
+                composite = (fg * alpha + bg * canvas_alpha * (1 - alpha)) / alpha_out_safe
+                canvas_region[:, :, c] = composite.astype(np.uint8)
+            canvas_region[:, :, 3] = (alpha_out * 255).astype(np.uint8)
+            canvas[layer.y:layer.y + layer.height, layer.x:layer.x + layer.width] = canvas_region
+    return canvas
+
+
+def _make_layers(tmpdir, canvas_size, count):
+    rng = np.random.default_rng(0)
+    w, h = canvas_size
+    layers = []
+    for i in range(count):
+        if i == 0:
+            lw, lh, x, y = w, h, 0, 0
+        else:
+            lw, lh = w // 3, h // 3
+            x = int(rng.integers(0, w - lw))
+            y = int(rng.integers(0, h - lh))
+        image = rng.integers(0, 256, size=(lh, lw, 4), dtype=np.uint8)
+        path = os.path.join(tmpdir, f"{w}x{h}_{i}.png")
+        cv2.imwrite(path, image, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        layers.append((_BenchLayer(x, y, lw, lh), path))
+    return layers
+
+
+def _best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(layer_count, repeat):
+    print(f"{'canvas':>10} {'layers':>6} {'legacy':>10} {'cold':>10} {'warm':>10} {'dirty':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for label, canvas_size in (("1080p", (1920, 1080)), ("4K", (3840, 2160))):
+            layers = _make_layers(tmpdir, canvas_size, layer_count)
+
+            legacy = _best_of(repeat, lambda: legacy_composite(layers, canvas_size))
+            cold = _best_of(repeat, lambda: LayerCompositor().composite(layers, canvas_size))
+
+            compositor = LayerCompositor()
+            compositor.composite(layers, canvas_size)
+            warm = _best_of(repeat, lambda: compositor.composite(layers, canvas_size))
+
+            top = layers[-1][0]
+
+            def move_top():
+                top.x = (top.x + 7) % (canvas_size[0] - top.width)
+                compositor.composite(layers, canvas_size, output_key="bench")
+
+            compositor.composite(layers, canvas_size, output_key="bench")
+            dirty = _best_of(repeat, move_top)
+
+            print(f"{label:>10} {layer_count:>6} {legacy * 1000:>8.1f}ms {cold * 1000:>8.1f}ms "
+                  f"{warm * 1000:>8.1f}ms {dirty * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--layers", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.layers, args.repeat)
@@ -0,0 +1,107 @@
+"""
+Benchmark: cost of one plan task status transition as plans grow.
+
+Run with:
+    python tests/benchmarks/bench_plan_journal.py [--tasks 10 100 1000] [--transitions 2500]
+
+For each plan size it reports the average time per transition of
+  * legacy     - YAML snapshot of the whole instance written synchronously
+                 on every transition (the previous _save_plan_instance;
+                 sampled over at most 20 transitions)
+  * caller     - journaled PlanService: time spent in mark_task_* by the
+                 caller (event loop), writes queued to the writer thread
+  * total      - journaled PlanService including waiting for the writes
+                 (journal appends plus periodic compaction) to finish
+
+The journal is compacted every max(64, 2 * tasks) events, so use more
+transitions than twice the largest plan to include compaction in "total".
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agent.plan.journal import write_snapshot
+from agent.plan.models import Plan, PlanTask, TaskStatus
+from agent.plan.service import PlanService
+
+
+def _service(workspace):
+    PlanService._instance = None
+    service = PlanService()
+    service.set_workspace(SimpleNamespace(workspace_path=str(workspace)))
+    return service
+
+
+def _instance(service, task_count):
+    tasks = [PlanTask(id=f"t{i}", name=f"Task {i}", description="Write the scene " * 5, title="screenwriter",
+                      parameters={"scene": i}) for i in range(task_count)]
+    plan = Plan(id="plan", project_name="bench", name="Bench", description="", tasks=tasks)
+    service._save_plan(plan)
+    instance = service.create_plan_instance(plan)
+    service.start_plan_execution(instance)
+    service.flush()
+    return instance
+
+
+def legacy_save(path, plan_instance):
+    """The previous _save_plan_instance: asdict + YAML dump of every task, synchronously."""
+    data = asdict(plan_instance)
+    data['project_id'] = data.pop('project_name')
+    for key in ('created_at', 'started_at', 'completed_at'):
+        data[key] = data[key].isoformat() if data[key] else None
+    data['status'] = data['status'].value
+    data['tasks'] = []
+    for task in plan_instance.tasks:
+        task_dict = asdict(task)
+        for key in ('created_at', 'started_at', 'completed_at'):
+            task_dict[key] = task_dict[key].isoformat() if task_dict[key] else None
+        task_dict['status'] = task.status.value
+        data['tasks'].append(task_dict)
+    write_snapshot(path, data)
+
+
+def _transitions(instance, count):
+    for i in range(count):
+        task = instance.tasks[i % len(instance.tasks)]
+        yield task, TaskStatus.RUNNING if i % 2 == 0 else TaskStatus.READY
+
+
+def run(task_counts, transitions):
+    print(f"{'tasks':>6} {'legacy':>12} {'caller':>12} {'total':>12}")
+    for task_count in task_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            service = _service(Path(tmp) / "workspace")
+            instance = _instance(service, task_count)
+            path = service._get_plan_instance_path("bench", "plan", instance.instance_id)
+
+            legacy_count = min(transitions, 20)
+            start = time.perf_counter()
+            for task, status in _transitions(instance, legacy_count):
+                task.status = status
+                legacy_save(path, instance)
+            legacy = (time.perf_counter() - start) / legacy_count
+
+            start = time.perf_counter()
+            for task, status in _transitions(instance, transitions):
+                service._update_task_status(instance, task.id, status)
+            caller = (time.perf_counter() - start) / transitions
+            service.flush()
+            total = (time.perf_counter() - start) / transitions
+
+        print(f"{task_count:>6} {legacy * 1e3:>10.3f}ms {caller * 1e3:>10.3f}ms {total * 1e3:>10.3f}ms")
+    PlanService._instance = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--transitions", type=int, default=2500)
+    args = parser.parse_args()
+    run(args.tasks, args.transitions)
@@ -0,0 +1,119 @@
+"""
+Benchmark: prompt tokens sent per step over a long ReAct run.
+
+Run with:
+    python tests/benchmarks/bench_react_context.py [--steps 50] [--observation-chars 6000] [--budget 16000]
+
+A scripted LLM asks for a tool call on every step and each tool call returns
+an observation of the given size, so the conversation grows by one
+assistant message and one observation per step. It reports the prompt
+tokens of the request at a few steps and over the whole run for
+  * unbounded - no effective budget (the previous behaviour)
+  * budget    - ReactContext compaction at the given token budget
+and how often the prompt prefix was rendered.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agent.react import React
+from agent.react.context import ReactContext
+
+
+class ScriptedLlmService:
+    """Streams a tool action for every request and records prompt sizes."""
+    default_model = "gpt-4o-mini"
+    temperature = 0.7
+
+    def __init__(self):
+        self.step = 0
+
+    def validate_config(self):
+        return True
+
+    async def acompletion(self, **kwargs):
+        self.step += 1
+        action = json.dumps({"type": "tool", "thinking": f"Read scene {self.step}",
+                             "tool_name": "read_scene", "tool_args": {"scene": self.step}})
+
+        async def stream():
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=action))])
+        return stream()
+
+    @staticmethod
+    def extract_delta(chunk):
+        return chunk.choices[0].delta.content
+
+
+class BenchReact(React):
+    """React whose tool returns a large, fixed-size observation."""
+    observation_chars = 6000
+
+    async def _execute_tools(self, calls):
+        for call in calls:
+            line = f"Scene {call.tool_args['scene']}: INT. STUDIO - NIGHT. The director reviews the take. "
+            yield call, {"result": (line * (self.observation_chars // len(line) + 1))[:self.observation_chars]}
+
+
+def run_once(steps, budget):
+    with tempfile.TemporaryDirectory() as tmp:
+        react = BenchReact(
+            workspace=SimpleNamespace(get_path=lambda: tmp),
+            project_name="bench",
+            react_type="bench",
+            build_prompt_function=lambda question: f"You are a screenwriter. {question}",
+            llm_service=ScriptedLlmService(),
+            max_steps=steps,
+            checkpoint_interval=steps,
+            max_context_tokens=budget,
+        )
+        tokens_per_step = []
+        original_prepare = react.context.prepare
+
+        def prepare(messages):
+            tokens_per_step.append(original_prepare(messages))
+            return tokens_per_step[-1]
+        react.context.prepare = prepare
+
+        async def drive():
+            async for _ in react.chat_stream("Read every scene."):
+                pass
+        asyncio.run(drive())
+        return tokens_per_step, react.context.compactions
+
+
+def run(steps, observation_chars, budget):
+    BenchReact.observation_chars = observation_chars
+    rendered = []
+    original = ReactContext._format_tools
+    ReactContext._format_tools = staticmethod(lambda *args: rendered.append(1) or original(*args))
+    try:
+        results = {
+            "unbounded": run_once(steps, 10 ** 9),
+            "budget": run_once(steps, budget),
+        }
+    finally:
+        ReactContext._format_tools = staticmethod(original)
+
+    marks = sorted({1, 10, 25, steps} & set(range(1, steps + 1)))
+    print(f"{'mode':>10} " + " ".join(f"{'step ' + str(m):>10}" for m in marks)
+          + f" {'max':>10} {'total':>12} {'compactions':>12}")
+    for mode, (tokens, compactions) in results.items():
+        print(f"{mode:>10} " + " ".join(f"{tokens[m - 1]:>10}" for m in marks)
+              + f" {max(tokens):>10} {sum(tokens):>12} {compactions:>12}")
+    print(f"prompt prefix rendered {len(rendered)} time(s) for {len(results)} runs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--observation-chars", type=int, default=6000)
+    parser.add_argument("--budget", type=int, default=16000)
+    args = parser.parse_args()
+    run(args.steps, args.observation_chars, args.budget)
@@ -0,0 +1,132 @@
+"""
+Benchmark: timeline position <-> card lookups while scrubbing.
+
+Run with:
+    python tests/benchmarks/bench_timeline_time_index.py [--sizes 100 1000 10000] [--events 2000]
+
+For each timeline size it measures the average cost of one scrubbing event
+(mouse X -> position, and position -> X / card for the playback cursor) with
+  * scan  - the previous lookup: walk the cards summing
+            project.get_item_duration(i) (a dict lookup with string keys)
+  * index - TimelineTimeIndex: card by division, start time from the
+            prefix sums, and a bisect for position -> card
+and the cost of the total duration (summing the durations vs the prefix sums).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.data.timeline_time_index import TimelineTimeIndex
+
+CARD_WIDTH = 90
+CARD_SPACING = 5
+
+
+class DurationConfig:
+    """The duration accessors of Project, over its config dict."""
+
+    def __init__(self, count):
+        rng = random.Random(count)
+        self.config = {'timeline_item_durations': {str(i): round(rng.uniform(0.5, 8.0), 2)
+                                                   for i in range(1, count + 1)}}
+
+    def get_item_duration(self, item_index):
+        return self.config.get('timeline_item_durations', {}).get(str(item_index), 1.0)
+
+    def sum_durations(self):
+        return sum(self.config.get('timeline_item_durations', {}).values())
+
+
+def scan_position(project, count, x):
+    accumulated_time = 0.0
+    current_x = 0
+    for card_index in range(1, count + 1):
+        item_duration = project.get_item_duration(card_index)
+        if current_x <= x < current_x + CARD_WIDTH:
+            return accumulated_time + (x - current_x) / CARD_WIDTH * item_duration, card_index
+        accumulated_time += item_duration
+        current_x += CARD_WIDTH + CARD_SPACING
+    return accumulated_time, count
+
+
+def scan_x(project, count, position):
+    accumulated_time = 0.0
+    current_x = 0
+    for card_index in range(1, count + 1):
+        item_duration = project.get_item_duration(card_index)
+        if accumulated_time <= position < accumulated_time + item_duration:
+            return int(current_x + (position - accumulated_time) / item_duration * CARD_WIDTH), card_index
+        accumulated_time += item_duration
+        current_x += CARD_WIDTH + CARD_SPACING
+    return int(current_x), count
+
+
+def index_position(index, x):
+    card_index = int(x // (CARD_WIDTH + CARD_SPACING)) + 1
+    if card_index > index.item_count:
+        return index.total_duration, index.item_count
+    position_in_card = min(x - (card_index - 1) * (CARD_WIDTH + CARD_SPACING), CARD_WIDTH)
+    return (index.get_item_start(card_index)
+            + position_in_card / CARD_WIDTH * index.get_item_duration(card_index)), card_index
+
+
+def index_x(index, position):
+    if position >= index.total_duration:
+        return index.item_count * (CARD_WIDTH + CARD_SPACING), index.item_count
+    card_index, time_in_card = index.locate(position)
+    return int((card_index - 1) * (CARD_WIDTH + CARD_SPACING)
+               + time_in_card / index.get_item_duration(card_index) * CARD_WIDTH), card_index
+
+
+def timed(func, args_list):
+    started = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return (time.perf_counter() - started) * 1e6 / len(args_list)
+
+
+def measure(count, events):
+    project = DurationConfig(count)
+    index = TimelineTimeIndex([project.get_item_duration(i) for i in range(1, count + 1)])
+    rng = random.Random(0)
+    xs = [rng.uniform(0, count * (CARD_WIDTH + CARD_SPACING)) for _ in range(events)]
+    positions = [rng.uniform(0, index.total_duration) for _ in range(events)]
+
+    # Both lookups agree
+    for x, position in zip(xs[:200], positions[:200]):
+        assert scan_x(project, count, position)[1] == index_x(index, position)[1]
+        if (x % (CARD_WIDTH + CARD_SPACING)) < CARD_WIDTH:
+            assert abs(scan_position(project, count, x)[0] - index_position(index, x)[0]) < 1e-6
+
+    return {
+        "scan": timed(lambda x, p: (scan_position(project, count, x), scan_x(project, count, p)),
+                      list(zip(xs, positions))),
+        "index": timed(lambda x, p: (index_position(index, x), index_x(index, p)),
+                       list(zip(xs, positions))),
+        "total_sum": timed(project.sum_durations, [()] * 200),
+        "total_index": timed(lambda: index.total_duration, [()] * 200),
+        "build": timed(lambda: TimelineTimeIndex([project.get_item_duration(i) for i in range(1, count + 1)]),
+                       [()] * 20),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'items':>7} {'scan us/event':>14} {'index us/event':>15} {'speedup':>8} "
+          f"{'sum us':>8} {'total us':>9} {'rebuild us':>11}")
+    for count in args.sizes:
+        r = measure(count, args.events)
+        print(f"{count:>7} {r['scan']:>14.1f} {r['index']:>15.2f} {r['scan'] / r['index']:>7.0f}x "
+              f"{r['total_sum']:>8.1f} {r['total_index']:>9.2f} {r['build']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Tests for ReAct prompt prefix caching and context compaction."""
+from agent.react.context import ReactContext, COMPACTED_MARKER
+from agent.tool.tool_service import ToolService
+
+
+def _step(i, size=2000):
+    return [
+        {"role": "assistant", "content": f'{{"type": "tool", "tool_name": "read", "tool_args": {{"i": {i}}}}}'},
+        {"role": "user", "content": f"Observation: {'x' * size} {i}"},
+    ]
+
+
+def _messages(steps, size=2000):
+    messages = [{"role": "user", "content": "prompt"}]
+    for i in range(steps):
+        messages.extend(_step(i, size))
+    return messages
+
+
+class TestPromptPrefix:
+    """Test cases for the memoized prompt prefix."""
+
+    def test_prefix_is_rendered_once_per_tool_set_and_language(self, monkeypatch):
+        ReactContext.clear_prefix_cache()
+        calls = []
+        original = ReactContext._format_tools
+        monkeypatch.setattr(ReactContext, "_format_tools",
+                            staticmethod(lambda *args: calls.append(args[1]) or original(*args)))
+        tool_service = ToolService()
+        names = tool_service.get_available_tools()[:2]
+
+        first = ReactContext.get_prompt_prefix(tool_service, names, "en_US")
+        assert ReactContext.get_prompt_prefix(tool_service, names, "en_US") is first
+        assert all(f"### {name}" in first for name in names)
+        ReactContext.get_prompt_prefix(tool_service, names, "zh_CN")
+        ReactContext.get_prompt_prefix(tool_service, names[:1], "en_US")
+        assert len(calls) == 3
+
+
+class TestCompaction:
+    """Test cases for token-budget compaction."""
+
+    def test_under_budget_is_untouched(self):
+        context = ReactContext(max_tokens=100000)
+        messages = _messages(5)
+        snapshot = [dict(m) for m in messages]
+        context.prepare(messages)
+        assert messages == snapshot and context.compactions == 0
+
+    def test_old_observations_are_truncated_first(self):
+        context = ReactContext(max_tokens=3000, keep_recent_steps=2, observation_chars=100)
+        messages = _messages(6)
+        tokens = context.prepare(messages)
+
+        assert len(messages) == 13 and tokens <= context.target_tokens
+        assert context.compactions == 1
+        assert messages[0]["content"] == "prompt"
+        assert messages[2]["content"].endswith(COMPACTED_MARKER)
+        # The most recent steps are kept intact
+        assert messages[-1]["content"].endswith("x 5") and messages[-3]["content"].endswith("x 4")
+
+    def test_old_steps_are_dropped_but_user_messages_kept(self):
+        # Observations are short enough that truncating them does not help
+        context = ReactContext(max_tokens=1200, keep_recent_steps=1, observation_chars=2000)
+        messages = _messages(3, size=1500)
+        messages.insert(3, {"role": "user", "content": "Also check the ending."})
+        messages.extend(_step(3, size=1500))
+        context.prepare(messages)
+
+        contents = [m["content"] for m in messages]
+        assert contents[0] == "prompt"
+        assert contents[1].startswith("[") and "earlier messages were removed" in contents[1]
+        assert "Also check the ending." in contents
+        assert contents[-1].endswith("x 3")
+        assert context.total_tokens(messages) <= context.target_tokens
+
+        # A later compaction keeps a single, updated marker
+        messages.extend(_step(4, size=1500))
+        context.prepare(messages)
+        markers = [m for m in messages if "earlier messages were removed" in m["content"]]
+        assert len(markers) == 1 and messages[1] is markers[0]
@@ -0,0 +1,137 @@
+"""Tests for streamed LLM responses in the React loop."""
+import asyncio
+from types import SimpleNamespace
+
+from agent.react import React, AgentEventType
+from agent.react.json_utils import IncrementalJsonParser
+
+
+class MockWorkspace:
+    """Mock workspace for testing."""
+    def __init__(self, path):
+        self.path = path
+
+    def get_path(self):
+        return self.path
+
+
+def _chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class StreamingLlmService:
+    """LLM service double that streams pre-defined response pieces."""
+    default_model = "test-model"
+    temperature = 0.7
+
+    def __init__(self, pieces, fail_after=None):
+        self.pieces = pieces
+        self.fail_after = fail_after
+        self.sent = 0
+        self.closed = False
+        self.calls = []
+
+    def validate_config(self):
+        return True
+
+    async def acompletion(self, **kwargs):
+        self.calls.append(kwargs)
+        service = self
+
+        class Stream:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                if service.sent == service.fail_after:
+                    raise ConnectionError("stream reset")
+                if service.sent >= len(service.pieces):
+                    raise StopAsyncIteration
+                service.sent += 1
+                return _chunk(service.pieces[service.sent - 1])
+
+            async def aclose(self):
+                service.closed = True
+        return Stream()
+
+    @staticmethod
+    def extract_delta(chunk):
+        return chunk.choices[0].delta.content or ""
+
+
+def _react(tmp_path, pieces, fail_after=None):
+    return React(
+        workspace=MockWorkspace(str(tmp_path)),
+        project_name="test_project",
+        react_type="test_type",
+        build_prompt_function=lambda question: question,
+        llm_service=StreamingLlmService(pieces, fail_after),
+        max_steps=3,
+    )
+
+
+async def _collect(react, message):
+    return [event async for event in react.chat_stream(message)]
+
+
+class TestIncrementalJsonParser:
+    """Test cases for IncrementalJsonParser."""
+
+    def test_object_split_across_pieces(self):
+        parser = IncrementalJsonParser()
+        assert parser.feed('Sure: {"type": "tool", ') is None
+        assert parser.feed('"tool_args": {"a": 1') is None
+        assert parser.feed('}}\n```') == {"type": "tool", "tool_args": {"a": 1}}
+
+    def test_braces_and_escapes_inside_strings(self):
+        parser = IncrementalJsonParser()
+        pieces = ['{"final": "a } b { \\"', 'quoted\\" }', '"}']
+        results = [parser.feed(piece) for piece in pieces]
+        assert results == [None, None, {"final": 'a } b { "quoted" }'}]
+
+    def test_invalid_object_is_skipped(self):
+        parser = IncrementalJsonParser()
+        assert parser.feed("{not json} then ") is None
+        assert parser.feed('{"type": "final"}') == {"type": "final"}
+
+
+class TestReactStreaming:
+    """Test cases for the streamed ReAct loop."""
+
+    def test_stream_closed_after_action(self, tmp_path):
+        pieces = ['{"type": "final", ', '"final": "done"', '}', "\nTrailing text", " never read"]
+        react = _react(tmp_path, pieces)
+        events = asyncio.run(_collect(react, "hello"))
+
+        assert react.llm_service.sent == 3 and react.llm_service.closed
+        assert react.llm_service.calls[0]["stream"] is True
+
+        output = next(e for e in events if e.event_type == AgentEventType.LLM_OUTPUT)
+        assert output.payload["content"] == "".join(pieces[:3])
+        assert events[-1].event_type == AgentEventType.FINAL
+        assert events[-1].payload["final_response"] == "done"
+
+    def test_example_objects_do_not_end_the_stream(self, tmp_path):
+        pieces = ['I will call it with {"path": "a.txt"}. ', '{"type": "final", "final": "ok"}']
+        react = _react(tmp_path, pieces)
+        events = asyncio.run(_collect(react, "hello"))
+        assert react.llm_service.sent == 2
+        assert events[-1].payload["final_response"] == "ok"
+
+    def test_latency_metrics(self, tmp_path):
+        react = _react(tmp_path, ['{"type": "final", "final": "done"}'])
+        asyncio.run(_collect(react, "hello"))
+        metrics = react.get_metrics()
+        assert metrics["total_llm_calls"] == 1
+        assert 0 <= metrics["llm_time_to_first_token_ms"] <= metrics["llm_latency_ms"]
+        assert metrics["avg_llm_latency_ms"] == metrics["llm_latency_ms"]
+
+    def test_failed_stream_ends_with_error(self, tmp_path):
+        react = _react(tmp_path, ['{"type": "final", ', '"final": "done"}'], fail_after=1)
+        events = asyncio.run(_collect(react, "hello"))
+
+        assert not any(e.event_type in (AgentEventType.FINAL, AgentEventType.LLM_OUTPUT) for e in events)
+        assert events[-1].event_type == AgentEventType.ERROR
+        assert events[-1].payload["error"] == "ConnectionError: stream reset"
+        assert react.status == "FAILED"
+        assert react.llm_service.closed
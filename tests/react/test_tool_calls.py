@@ -0,0 +1,177 @@
+"""Tests for several tool calls in one ReAct step."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from agent.react import React, AgentEventType, ReactActionParser, ToolAction
+from agent.tool.base_tool import BaseTool
+
+
+class SleepTool(BaseTool):
+    """Tool that sleeps for parameters["seconds"] and echoes parameters["text"]."""
+
+    def __init__(self, name="sleep"):
+        super().__init__(name=name, description="Sleeps, then echoes text")
+
+    async def execute(self, parameters, context=None, project_name="", react_type="", run_id="", step_id=0):
+        yield self._create_event("tool_progress", project_name, react_type, run_id, step_id, progress="sleeping")
+        await asyncio.sleep(parameters.get("seconds", 0))
+        yield self._create_event("tool_end", project_name, react_type, run_id, step_id, result=parameters.get("text"))
+
+
+class ScriptedLlmService:
+    """Streams one scripted response per request."""
+    default_model = "test-model"
+    temperature = 0.7
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def validate_config(self):
+        return True
+
+    async def acompletion(self, **kwargs):
+        content = self.responses.pop(0)
+
+        async def stream():
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+        return stream()
+
+    @staticmethod
+    def extract_delta(chunk):
+        return chunk.choices[0].delta.content
+
+
+def _calls(*calls):
+    return [{"call_id": f"c{i}", "tool_name": name, "parameters": params} for i, (name, params) in enumerate(calls)]
+
+
+async def _collect(generator):
+    return [item async for item in generator]
+
+
+class TestParser:
+    """Test cases for parsing tool call lists."""
+
+    def test_parse_tool_calls(self):
+        action = ReactActionParser.parse(
+            '{"type": "tool", "thinking": "read both", "tool_calls": ['
+            '{"tool_name": "read", "tool_args": {"scene": 1}}, {"name": "read", "arguments": {"scene": 2}}]}'
+        )
+        assert isinstance(action, ToolAction)
+        assert [(c.tool_name, c.tool_args) for c in action.get_tool_calls()] == [
+            ("read", {"scene": 1}), ("read", {"scene": 2})]
+        assert action.tool_name == "read" and action.thinking == "read both"
+
+    def test_single_call_is_one_tool_call(self):
+        action = ReactActionParser.parse('{"type": "tool", "tool_name": "read", "tool_args": {"scene": 1}}')
+        assert [(c.tool_name, c.tool_args) for c in action.get_tool_calls()] == [("read", {"scene": 1})]
+
+
+class TestExecuteTools:
+    """Test cases for ToolService.execute_tools."""
+
+    def _service(self, react_tmp):
+        service = React(
+            workspace=SimpleNamespace(get_path=lambda: str(react_tmp)),
+            project_name="p", react_type="t", build_prompt_function=lambda q: q,
+            llm_service=ScriptedLlmService([]),
+        ).tool_service
+        service.register_tool(SleepTool())
+        return service
+
+    def test_calls_run_concurrently_and_are_tagged(self, tmp_path):
+        service = self._service(tmp_path)
+        start = time.perf_counter()
+        events = asyncio.run(_collect(service.execute_tools(
+            _calls(("sleep", {"seconds": 0.3, "text": "a"}), ("sleep", {"seconds": 0.3, "text": "b"}),
+                   ("sleep", {"seconds": 0.3, "text": "c"})))))
+        assert time.perf_counter() - start < 0.8
+
+        ends = {e.payload["call_id"]: e.payload["result"] for e in events if e.event_type == "tool_end"}
+        assert ends == {"c0": "a", "c1": "b", "c2": "c"}
+        assert all("call_id" in e.payload for e in events)
+
+    def test_timeouts_and_unknown_tools_end_their_call_only(self, tmp_path):
+        service = self._service(tmp_path)
+        events = asyncio.run(_collect(service.execute_tools(
+            _calls(("sleep", {"seconds": 5, "text": "slow"}), ("missing", {}), ("sleep", {"text": "fast"})),
+            timeout=0.2)))
+        terminal = {e.payload["call_id"]: e for e in events if e.event_type in ("tool_end", "error")}
+        assert len(terminal) == 3
+        assert terminal["c0"].event_type == "error" and "timed out" in terminal["c0"].payload["error"]
+        assert terminal["c1"].event_type == "error" and "not found" in terminal["c1"].payload["error"]
+        assert terminal["c2"].payload["result"] == "fast"
+
+    def test_long_skill_is_not_cut_off(self, tmp_path, monkeypatch):
+        import agent.skill.skill_service as skill_service_module
+        from agent.event.agent_event import AgentEventType as EventType
+        from agent.tool.system.execute_skill import ExecuteSkillTool
+
+        class SlowSkillService:
+            def __init__(self, workspace):
+                pass
+
+            def get_skill(self, name):
+                return SimpleNamespace(name=name)
+
+            async def chat_stream(self, **kwargs):
+                # A nested ReAct run outlasting the caller's timeout
+                await asyncio.sleep(0.3)
+                yield SimpleNamespace(event_type=EventType.FINAL, payload={"final_response": "storyboard ready"})
+
+        monkeypatch.setattr(skill_service_module, "SkillService", SlowSkillService)
+        service = self._service(tmp_path)
+        service.register_tool(ExecuteSkillTool())
+        context = SimpleNamespace(workspace=object(), project_name="p")
+        events = asyncio.run(_collect(service.execute_tools(
+            _calls(("execute_skill", {"skill_name": "storyboard", "message": "go"}),
+                   ("sleep", {"seconds": 5})),
+            context=context, timeout=0.1)))
+
+        terminal = {e.payload["call_id"]: e for e in events if e.event_type in ("tool_end", "error")}
+        assert terminal["c0"].event_type == "tool_end"
+        assert terminal["c0"].payload["result"] == "storyboard ready"
+        # Other tools keep the caller's timeout
+        assert terminal["c1"].event_type == "error" and "timed out" in terminal["c1"].payload["error"]
+
+    def test_react_tools_have_no_default_timeout(self, tmp_path):
+        react = React(
+            workspace=SimpleNamespace(get_path=lambda: str(tmp_path)),
+            project_name="p", react_type="t", build_prompt_function=lambda q: q,
+            llm_service=ScriptedLlmService([]),
+        )
+        assert react.tool_timeout is None
+
+
+class TestReactToolCalls:
+    """Test cases for a ReAct step with several tool calls."""
+
+    def test_step_with_several_calls(self, tmp_path):
+        react = React(
+            workspace=SimpleNamespace(get_path=lambda: str(tmp_path)),
+            project_name="p", react_type="t", build_prompt_function=lambda q: q,
+            llm_service=ScriptedLlmService([
+                '{"type": "tool", "tool_calls": ['
+                '{"tool_name": "sleep", "tool_args": {"seconds": 0.2, "text": "slow"}},'
+                '{"tool_name": "sleep", "tool_args": {"seconds": 0, "text": "fast"}}]}',
+                '{"type": "final", "final": "done"}',
+            ]),
+            max_steps=3,
+        )
+        react.tool_service.register_tool(SleepTool())
+
+        async def run():
+            return [event async for event in react.chat_stream("read")]
+        events = asyncio.run(run())
+
+        starts = [e.payload for e in events if e.event_type == AgentEventType.TOOL_START]
+        ends = [e.payload for e in events if e.event_type == AgentEventType.TOOL_END]
+        assert [p["call_id"] for p in starts] == ["call_0_0", "call_0_1"]
+        # The fast call finishes first, but observations keep the call order
+        assert [p["result"] for p in ends] == ["fast", "slow"]
+        assert {p["call_id"] for p in ends} == {"call_0_0", "call_0_1"}
+        observation = react.messages[2]["content"]
+        assert observation.index("slow") < observation.index("fast")
+        assert react.get_metrics()["total_tool_calls"] == 2
+        assert events[-1].event_type == AgentEventType.FINAL
@@ -0,0 +1,166 @@
+"""Unit tests for the content-addressed composition cache."""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.compose_cache import ComposeCache, compute_compose_key, detach_output
+from app.data.layer import LayerType
+
+
+class _FakeLayer:
+    def __init__(self, path, x=0, y=0, width=10, height=10, visible=True, layer_type=LayerType.IMAGE):
+        self.path = path
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.visible = visible
+        self.type = layer_type
+
+    def get_layer_path(self):
+        return self.path
+
+
+def _write(path, data: bytes):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+class TestComposeKey:
+
+    @pytest.fixture
+    def temp_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield tmpdir
+
+    def test_key_is_stable_for_same_stack(self, temp_dir):
+        a = _write(os.path.join(temp_dir, "1.png"), b"aaa")
+        b = _write(os.path.join(temp_dir, "2.png"), b"bbb")
+
+        key1 = compute_compose_key([_FakeLayer(a), _FakeLayer(b, x=5)])
+        key2 = compute_compose_key([_FakeLayer(a), _FakeLayer(b, x=5)])
+
+        assert key1 == key2
+
+    def test_key_depends_on_order_position_and_content(self, temp_dir):
+        a = _write(os.path.join(temp_dir, "1.png"), b"aaa")
+        b = _write(os.path.join(temp_dir, "2.png"), b"bbb")
+        base = compute_compose_key([_FakeLayer(a), _FakeLayer(b)])
+
+        assert compute_compose_key([_FakeLayer(b), _FakeLayer(a)]) != base
+        assert compute_compose_key([_FakeLayer(a), _FakeLayer(b, y=1)]) != base
+
+        _write(b, b"changed")
+        os.utime(b, ns=(0, os.stat(b).st_mtime_ns + 1_000_000))
+        assert compute_compose_key([_FakeLayer(a), _FakeLayer(b)]) != base
+
+    def test_key_is_none_for_missing_file(self, temp_dir):
+        assert compute_compose_key([_FakeLayer(os.path.join(temp_dir, "missing.png"))]) is None
+
+
+class TestComposeCache:
+
+    @pytest.fixture
+    def temp_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield tmpdir
+
+    def _make_outputs(self, output_dir, content=b"x" * 100):
+        os.makedirs(output_dir, exist_ok=True)
+        _write(os.path.join(output_dir, "image.png"), content)
+        _write(os.path.join(output_dir, "video.mp4"), content)
+
+    def test_store_and_restore(self, temp_dir):
+        cache = ComposeCache(os.path.join(temp_dir, "cache"))
+        item_dir = os.path.join(temp_dir, "item")
+        self._make_outputs(item_dir, b"composed")
+
+        assert not cache.restore("k1", item_dir)
+        assert cache.store("k1", item_dir)
+
+        # Outputs get replaced by a different composition, then the old stack comes back
+        detach_output(os.path.join(item_dir, "image.png"))
+        detach_output(os.path.join(item_dir, "video.mp4"))
+        self._make_outputs(item_dir, b"other")
+        assert cache.restore("k1", item_dir)
+
+        with open(os.path.join(item_dir, "image.png"), 'rb') as f:
+            assert f.read() == b"composed"
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+        assert stats["hit_rate"] == pytest.approx(0.5)
+
+    def test_store_requires_both_outputs(self, temp_dir):
+        cache = ComposeCache(os.path.join(temp_dir, "cache"))
+        item_dir = os.path.join(temp_dir, "item")
+        os.makedirs(item_dir)
+        _write(os.path.join(item_dir, "image.png"), b"only image")
+
+        assert not cache.store("k1", item_dir)
+
+    def test_in_place_modification_invalidates_entry(self, temp_dir):
+        cache = ComposeCache(os.path.join(temp_dir, "cache"))
+        item_dir = os.path.join(temp_dir, "item")
+        self._make_outputs(item_dir)
+        cache.store("k1", item_dir)
+
+        # Writing through the hard link changes the cached file as well
+        with open(os.path.join(item_dir, "video.mp4"), 'ab') as f:
+            f.write(b"more")
+
+        assert not cache.restore("k1", item_dir)
+        assert cache.get_stats()["entries"] == 0
+
+    def test_lru_eviction_respects_budget(self, temp_dir):
+        cache = ComposeCache(os.path.join(temp_dir, "cache"), max_bytes=450)
+        for i in range(3):
+            item_dir = os.path.join(temp_dir, f"item{i}")
+            self._make_outputs(item_dir)
+            cache.store(f"k{i}", item_dir)
+            if i == 1:
+                # Touch k0 so k1 becomes the least recently used entry
+                assert cache.restore("k0", os.path.join(temp_dir, "item0"))
+
+        assert cache.get_stats()["entries"] == 2
+        assert cache.get_stats()["size_bytes"] <= 450
+        assert not os.path.exists(os.path.join(temp_dir, "cache", "k1"))
+        assert os.path.exists(os.path.join(temp_dir, "cache", "k0"))
+
+    def test_index_and_counters_persist(self, temp_dir):
+        cache_dir = os.path.join(temp_dir, "cache")
+        item_dir = os.path.join(temp_dir, "item")
+        self._make_outputs(item_dir)
+        cache = ComposeCache(cache_dir)
+        cache.store("k1", item_dir)
+        cache.restore("k1", item_dir)
+        cache.flush()
+
+        reloaded = ComposeCache(cache_dir)
+
+        assert reloaded.get_stats()["entries"] == 1
+        assert reloaded.get_stats()["hits"] == 1
+        assert reloaded.restore("k1", item_dir)
+
+    def test_lookups_batch_index_writes(self, temp_dir):
+        cache_dir = os.path.join(temp_dir, "cache")
+        item_dir = os.path.join(temp_dir, "item")
+        self._make_outputs(item_dir)
+        cache = ComposeCache(cache_dir)
+        cache.store("k1", item_dir)
+        index_mtime = os.stat(cache.index_path).st_mtime_ns
+
+        for _ in range(5):
+            assert cache.restore("k1", item_dir)
+            assert not cache.restore("missing", item_dir)
+
+        # Nothing is written until the delay expires or the cache is flushed
+        assert os.stat(cache.index_path).st_mtime_ns == index_mtime
+        assert ComposeCache(cache_dir).get_stats()["hits"] == 0
+        cache.flush()
+        stats = ComposeCache(cache_dir).get_stats()
+        assert (stats["hits"], stats["misses"]) == (5, 5)
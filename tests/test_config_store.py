@@ -0,0 +1,167 @@
+"""
+Tests for the write-behind project.yml persistence (app.data.config_store).
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from app.data.config_store import ConfigStore
+from utils.yaml_utils import load_yaml, save_yaml
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_changes_are_coalesced_into_one_write():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "project.yml")
+        save_yaml(path, {"project_name": "demo"})
+        store = ConfigStore(path, delay=0.1)
+        assert store.config == {"project_name": "demo"}
+
+        for i in range(200):
+            with store.lock:
+                store.config["timeline_position"] = i
+            store.mark_dirty()
+        assert store.dirty
+        assert store.writes == 0
+
+        assert wait_until(lambda: not store.dirty)
+        assert store.writes == 1
+        assert load_yaml(path) == {"project_name": "demo", "timeline_position": 199}
+        assert os.listdir(tmp) == ["project.yml"]
+        store.close()
+
+
+def test_batch_and_flush():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "project.yml")
+        store = ConfigStore(path, config={}, delay=0.01)
+
+        with store.batch():
+            with store.batch():
+                store.config["a"] = 1
+                store.mark_dirty()
+            time.sleep(0.05)
+            # Nothing is written while the outer batch is open
+            assert not os.path.exists(path)
+            store.config["b"] = 2
+            store.mark_dirty()
+        assert wait_until(lambda: not store.dirty)
+        assert store.writes == 1
+        assert load_yaml(path) == {"a": 1, "b": 2}
+
+        store.delay = 60
+        store.config["c"] = 3
+        store.mark_dirty()
+        assert store.flush()
+        assert load_yaml(path) == {"a": 1, "b": 2, "c": 3}
+        assert store.writes == 2
+        # Nothing left to write
+        assert store.flush()
+        assert store.writes == 2
+
+        store.config["d"] = 4
+        store.mark_dirty()
+        store.close(flush=False)
+        assert "d" not in load_yaml(path)
+
+
+def test_failed_write_is_retried():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "project.yml")
+        store = ConfigStore(path, config={}, delay=0.05)
+        attempts = []
+        write_file = store._write_file
+
+        def flaky_write_file(data):
+            attempts.append(time.monotonic())
+            if len(attempts) <= 3:
+                return False
+            return write_file(data)
+
+        store._write_file = flaky_write_file
+        store.config["a"] = 1
+        store.mark_dirty()
+
+        assert wait_until(lambda: not store.dirty)
+        assert len(attempts) == 4 and store.writes == 1
+        assert load_yaml(path) == {"a": 1}
+        # The delay grows after every failure
+        gaps = [b - a for a, b in zip(attempts, attempts[1:])]
+        assert gaps[2] >= 0.2 > gaps[0]
+        store.close()
+
+
+def test_unserializable_config_is_not_retried():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "project.yml")
+        store = ConfigStore(path, config={}, delay=0.05)
+        attempts = []
+        write_file = store._write_file
+
+        def counting_write_file(data):
+            attempts.append(data)
+            return write_file(data)
+
+        store._write_file = counting_write_file
+        store.config["bad"] = object()
+        store.mark_dirty()
+
+        assert wait_until(lambda: not store.dirty)
+        time.sleep(0.2)
+        assert len(attempts) == 1 and store.writes == 0
+        assert not os.path.exists(path)
+        assert [name for name in os.listdir(tmp)] == []
+
+        # The next change is written once the config is serializable again
+        del store.config["bad"]
+        store.config["a"] = 1
+        store.mark_dirty()
+        assert store.flush()
+        assert load_yaml(path) == {"a": 1}
+        store.close()
+
+
+@pytest.fixture(scope="module")
+def app():
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(sys.argv)
+
+
+def test_project_writes_behind(app):
+    from app.data.project import Project
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "timeline"))
+        save_yaml(os.path.join(tmp, "project.yml"), {"project_name": "demo", "timeline_item_durations": {}})
+        project = Project(None, tmp, "demo", load_data=False)
+        project.config_store.delay = 60
+
+        with project.batch_update():
+            for _ in range(20):
+                project.get_timeline().add_item()
+        for i in range(1, 21):
+            project.set_item_duration(i, 2.0)
+        project.update_config("timeline_index", 20)
+        assert project.config_store.writes == 0
+
+        assert project.flush()
+        assert project.config_store.writes == 1
+        config = load_yaml(os.path.join(tmp, "project.yml"))
+        assert config["timeline_size"] == 20
+        assert config["timeline_index"] == 20
+        # Written by add_item, before any item duration was set
+        assert config["timeline_duration"] == 0
+        assert len(config["timeline_item_durations"]) == 20
+        project.config_store.close()
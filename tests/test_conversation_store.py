@@ -0,0 +1,131 @@
+"""
+Tests for the append-only conversation storage.
+"""
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.chat.conversation import ConversationManager, Message, MessageRole
+from agent.chat.conversation_store import ConversationStore
+
+
+def make_message(i, role=MessageRole.USER):
+    return Message(role=role, content=f"message {i} ✓", timestamp=f"2026-01-01T00:00:{i:02d}",
+                   metadata={"index": i})
+
+
+@pytest.fixture
+def project_path():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+@pytest.fixture
+def manager():
+    return ConversationManager()
+
+
+def chats_path(project_path):
+    return os.path.join(project_path, "agent", "chats")
+
+
+def test_add_message_appends_lines(manager, project_path):
+    conversation = manager.create_conversation(project_path, title="Scene work")
+    for i in range(5):
+        assert manager.add_message(project_path, conversation.conversation_id, make_message(i))
+
+    store = ConversationStore(chats_path(project_path))
+    with open(store.messages_path(conversation.conversation_id), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line)["content"] for line in lines] == [f"message {i} ✓" for i in range(5)]
+
+    loaded = manager.get_conversation(project_path, conversation.conversation_id)
+    assert loaded.title == "Scene work"
+    assert [m.metadata["index"] for m in loaded.messages] == list(range(5))
+    assert loaded.message_offset == 0
+    assert loaded.updated_at > conversation.updated_at
+    assert manager.list_conversations(project_path)[0]["updated_at"] == loaded.updated_at
+
+    assert not manager.add_message(project_path, "conv_missing", make_message(0))
+
+
+def test_paged_reads(manager, project_path, monkeypatch):
+    # Small blocks so that lines span block boundaries
+    monkeypatch.setattr("agent.chat.conversation_store.READ_BLOCK_SIZE", 7)
+    conversation = manager.create_conversation(project_path)
+    for i in range(20):
+        manager.add_message(project_path, conversation.conversation_id, make_message(i))
+
+    tail = manager.get_conversation(project_path, conversation.conversation_id, limit=3)
+    assert [m.metadata["index"] for m in tail.messages] == [17, 18, 19]
+    assert tail.message_offset == 17
+
+    older = manager.get_messages(project_path, conversation.conversation_id, limit=5, before=tail.message_offset)
+    assert [m.metadata["index"] for m in older] == [12, 13, 14, 15, 16]
+    first = manager.get_messages(project_path, conversation.conversation_id, limit=5, before=2)
+    assert [m.metadata["index"] for m in first] == [0, 1]
+    assert manager.get_messages(project_path, conversation.conversation_id, limit=5, before=0) == []
+
+
+def test_save_partially_loaded_conversation_appends(manager, project_path):
+    conversation = manager.create_conversation(project_path)
+    for i in range(10):
+        manager.add_message(project_path, conversation.conversation_id, make_message(i))
+
+    tail = manager.get_conversation(project_path, conversation.conversation_id, limit=2)
+    tail.add_message(make_message(10, MessageRole.ASSISTANT))
+    tail.title = "Renamed"
+    manager.save_conversation(project_path, tail)
+
+    loaded = manager.get_conversation(project_path, conversation.conversation_id)
+    assert [m.metadata["index"] for m in loaded.messages] == list(range(11))
+    assert loaded.messages[-1].role == MessageRole.ASSISTANT
+    assert loaded.title == "Renamed"
+
+
+def test_uncommitted_append_is_discarded(manager, project_path):
+    conversation = manager.create_conversation(project_path)
+    manager.add_message(project_path, conversation.conversation_id, make_message(0))
+
+    # Crash after appending but before the header was updated (torn line)
+    store = ConversationStore(chats_path(project_path))
+    with open(store.messages_path(conversation.conversation_id), 'ab') as f:
+        f.write(b'{"role": "user", "content": "half')
+
+    assert len(manager.get_conversation(project_path, conversation.conversation_id).messages) == 1
+    manager.add_message(project_path, conversation.conversation_id, make_message(1))
+    loaded = manager.get_conversation(project_path, conversation.conversation_id)
+    assert [m.metadata["index"] for m in loaded.messages] == [0, 1]
+
+
+def test_legacy_conversation_is_migrated(manager, project_path):
+    conversation_id = "conv_legacy"
+    os.makedirs(chats_path(project_path))
+    legacy = {
+        "conversation_id": conversation_id,
+        "title": "Old chat",
+        "created_at": "2025-01-01T00:00:00",
+        "updated_at": "2025-01-01T00:00:00",
+        "messages": [make_message(i).to_dict() for i in range(3)],
+        "metadata": {"crew": "director"},
+    }
+    store = ConversationStore(chats_path(project_path))
+    with open(store.legacy_path(conversation_id), 'w', encoding='utf-8') as f:
+        json.dump(legacy, f, ensure_ascii=False, indent=2)
+
+    assert manager.add_message(project_path, conversation_id, make_message(3))
+
+    assert not os.path.exists(store.legacy_path(conversation_id))
+    loaded = manager.get_conversation(project_path, conversation_id)
+    assert loaded.title == "Old chat"
+    assert loaded.metadata == {"crew": "director"}
+    assert [m.metadata["index"] for m in loaded.messages] == [0, 1, 2, 3]
+
+    assert manager.delete_conversation(project_path, conversation_id)
+    assert not store.exists(conversation_id)
+    assert manager.get_conversation(project_path, conversation_id) is None
@@ -0,0 +1,210 @@
+"""Tests for the parallel LayerComposeTaskManager scheduler."""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+from blinker import Signal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.layer import LayerComposeTask, LayerComposeTaskManager
+
+
+class _FakeProject:
+    def __init__(self):
+        self.timeline_index = 0
+
+    def get_timeline_index(self):
+        return self.timeline_index
+
+
+class _FakeTimeline:
+    def __init__(self, project):
+        self.project = project
+        self.compose_progress = Signal()
+
+
+class _FakeTimelineItem:
+    def __init__(self, timeline, index, root):
+        self.timeline = timeline
+        self.index = index
+        self.item_path = os.path.join(root, str(index))
+
+    def get_item_path(self):
+        return self.item_path
+
+
+class _FakeLayerManager:
+    def __init__(self, timeline_item, kind=LayerComposeTaskManager.KIND_IMAGE):
+        self.timeline_item = timeline_item
+        self.kind = kind
+
+    def get_layers(self):
+        return []
+
+
+class _Recorder:
+    """Replaces LayerComposeTask.execute, recording order and concurrency."""
+
+    def __init__(self, duration=0.05):
+        self.duration = duration
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_active = {}
+        self.started = []
+        self.gates = {}
+
+    async def execute(self, task):
+        with self.lock:
+            self.started.append((task.manager_id, task.task_id))
+            self.active[task.kind] = self.active.get(task.kind, 0) + 1
+            self.max_active[task.kind] = max(self.max_active.get(task.kind, 0), self.active[task.kind])
+        gate = self.gates.get(task.manager_id)
+        if gate is not None:
+            await asyncio.get_running_loop().run_in_executor(None, gate.wait, 5)
+        await asyncio.sleep(self.duration)
+        with self.lock:
+            self.active[task.kind] -= 1
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    LayerComposeTaskManager._instance = None
+    manager = LayerComposeTaskManager()
+    recorder = _Recorder()
+
+    async def fake_execute(task):
+        await recorder.execute(task)
+
+    monkeypatch.setattr(LayerComposeTask, "execute", fake_execute)
+    monkeypatch.setattr(LayerComposeTaskManager, "_classify", staticmethod(lambda lm: lm.kind))
+    manager.recorder = recorder
+    yield manager
+    manager.shutdown()
+    LayerComposeTaskManager._instance = None
+
+
+@pytest.fixture
+def project():
+    return _FakeProject()
+
+
+def _managers(project, count, kind=LayerComposeTaskManager.KIND_IMAGE, first_index=1):
+    root = tempfile.mkdtemp()
+    timeline = _FakeTimeline(project)
+    return [_FakeLayerManager(_FakeTimelineItem(timeline, first_index + i, root), kind) for i in range(count)]
+
+
+def _submit(manager, layer_manager):
+    return asyncio.run(manager.submit_compose_task(layer_manager))
+
+
+def _wait_idle(manager, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        metrics = manager.get_metrics()
+        if metrics["queue_depth"] == 0 and not any(metrics["running"].values()):
+            return metrics
+        time.sleep(0.01)
+    raise AssertionError("scheduler did not become idle")
+
+
+def test_independent_items_run_in_parallel(scheduler, project):
+    scheduler.configure(max_image_workers=4)
+    for lm in _managers(project, 8):
+        _submit(scheduler, lm)
+
+    metrics = _wait_idle(scheduler)
+
+    assert metrics["completed"] == 8
+    assert scheduler.recorder.max_active["image"] == 4
+
+
+def test_video_jobs_have_separate_limit(scheduler, project):
+    scheduler.configure(max_image_workers=4, max_video_workers=1)
+    for lm in _managers(project, 3, LayerComposeTaskManager.KIND_VIDEO) + _managers(project, 3, first_index=4):
+        _submit(scheduler, lm)
+
+    _wait_idle(scheduler)
+
+    assert scheduler.recorder.max_active["video"] == 1
+    assert scheduler.recorder.max_active["image"] == 3
+
+
+def test_requests_for_same_manager_coalesce(scheduler, project):
+    lm, = _managers(project, 1)
+    gate = threading.Event()
+    scheduler.recorder.gates["timeline_1"] = gate
+
+    first = _submit(scheduler, lm)
+    _submit(scheduler, lm)
+    _submit(scheduler, lm)
+    latest = _submit(scheduler, lm)
+    assert scheduler.is_busy(lm)
+    gate.set()
+    metrics = _wait_idle(scheduler)
+
+    assert [task_id for _, task_id in scheduler.recorder.started] == [first, latest]
+    assert metrics["coalesced"] == 2
+    assert not scheduler.is_busy(lm)
+
+
+def test_on_screen_item_is_started_first(scheduler, project):
+    scheduler.configure(max_image_workers=1)
+    blocker, a, b, c = _managers(project, 4)
+    gate = threading.Event()
+    scheduler.recorder.gates["timeline_1"] = gate
+
+    _submit(scheduler, blocker)
+    _submit(scheduler, a)
+    _submit(scheduler, b)
+    _submit(scheduler, c)
+    project.timeline_index = 3
+    gate.set()
+    _wait_idle(scheduler)
+
+    order = [manager_id for manager_id, _ in scheduler.recorder.started]
+    assert order == ["timeline_1", "timeline_3", "timeline_2", "timeline_4"]
+
+
+def test_metrics_report_queue_depth_and_latency(scheduler, project):
+    scheduler.configure(max_image_workers=1)
+    managers = _managers(project, 3)
+    gate = threading.Event()
+    scheduler.recorder.gates["timeline_1"] = gate
+
+    for lm in managers:
+        _submit(scheduler, lm)
+    busy = scheduler.get_metrics()
+    gate.set()
+    idle = _wait_idle(scheduler)
+
+    assert busy["queue_depth"] == 2
+    assert busy["running"]["image"] == 1
+    assert idle["run_time"]["count"] == 3
+    assert idle["queue_wait"]["max"] > 0
+    assert idle["run_time"]["avg"] > 0
+
+
+def test_scheduled_task_reports_progress_on_timeline(scheduler, project, monkeypatch):
+    lm, = _managers(project, 1)
+    received = []
+
+    def on_progress(timeline, timeline_item, percent, logs):
+        received.append((timeline_item.index, percent, logs))
+
+    lm.timeline_item.timeline.compose_progress.connect(on_progress)
+
+    async def reporting_execute(task):
+        task._report_progress(40, "Encoding")
+        task._report_progress(100, "Video composition completed")
+
+    monkeypatch.setattr(LayerComposeTask, "execute", reporting_execute)
+    _submit(scheduler, lm)
+    _wait_idle(scheduler)
+
+    assert received == [(1, 40, "Encoding"), (1, 100, "Video composition completed")]
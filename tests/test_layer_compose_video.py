@@ -0,0 +1,127 @@
+"""Tests for the single-pass FFmpeg video composition in LayerComposeTask."""
+import asyncio
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.layer import Layer, LayerType, LayerComposeTask
+from utils.ffmpeg_utils import check_ffmpeg, parse_ffmpeg_progress_line, progress_fraction
+from utils.progress_utils import Progress
+
+
+requires_ffmpeg = pytest.mark.skipif(not check_ffmpeg(), reason="ffmpeg is not available")
+
+
+class _FakeTimelineItem:
+    def __init__(self, item_path):
+        self.index = 1
+        self.item_path = item_path
+        self.layers_path = os.path.join(item_path, "layers")
+        os.makedirs(self.layers_path, exist_ok=True)
+
+    def get_layers_path(self):
+        return self.layers_path
+
+    def get_item_path(self):
+        return self.item_path
+
+
+class _FakeLayerManager:
+    def __init__(self, timeline_item, layers):
+        self.timeline_item = timeline_item
+        self.layers = layers
+
+    def get_layers(self):
+        return self.layers
+
+
+class _RecordingProgress(Progress):
+    def __init__(self):
+        super().__init__()
+        self.history = []
+
+    def on_progress(self, percent, logs):
+        super().on_progress(percent, logs)
+        self.history.append(percent)
+
+
+def _make_item(root, width=640, height=360, frames=48):
+    item = _FakeTimelineItem(root)
+    video_layer = Layer(1, "video", LayerType.VIDEO, x=0, y=0, width=width, height=height, timeline_item=item)
+    writer = cv2.VideoWriter(video_layer.get_layer_path(), cv2.VideoWriter_fourcc(*'mp4v'), 24.0, (width, height))
+    for i in range(frames):
+        writer.write(np.full((height, width, 3), i * 4 % 255, dtype=np.uint8))
+    writer.release()
+
+    overlay_layer = Layer(2, "overlay", LayerType.IMAGE, x=40, y=30, width=200, height=100, timeline_item=item)
+    overlay = np.zeros((50, 100, 4), dtype=np.uint8)
+    overlay[..., 2] = 255
+    overlay[..., 3] = 200
+    cv2.imwrite(overlay_layer.get_layer_path(), overlay)
+    return item, [video_layer, overlay_layer]
+
+
+def test_build_overlay_filter_complex_orders_layers_bottom_to_top():
+    item = _FakeTimelineItem(tempfile.mkdtemp())
+    layers = [
+        Layer(2, "a", LayerType.IMAGE, x=10, y=20, width=100, height=50, timeline_item=item),
+        Layer(3, "b", LayerType.IMAGE, x=-5, y=0, width=0, height=0, timeline_item=item),
+    ]
+
+    graph = LayerComposeTask._build_overlay_filter_complex(layers)
+
+    assert graph.split(';') == [
+        '[1:v]scale=100:50,format=rgba[ov0]',
+        '[0:v][ov0]overlay=x=10:y=20:format=auto[tmp0]',
+        '[2:v]format=rgba[ov1]',
+        '[tmp0][ov1]overlay=x=-5:y=0:format=auto[tmp1]',
+        '[tmp1]split=2[vmain][poster]',
+        '[vmain]format=yuv420p[v]',
+    ]
+
+
+def test_progress_parsing():
+    state = {}
+    assert not parse_ffmpeg_progress_line("frame=12", state)
+    assert not parse_ffmpeg_progress_line("out_time_us=500000", state)
+    assert parse_ffmpeg_progress_line("progress=continue", state)
+    assert progress_fraction(state, 2.0) == pytest.approx(0.25)
+    assert progress_fraction(state, None) is None
+    assert progress_fraction({'progress': 'end'}, None) == 1.0
+
+
+@requires_ffmpeg
+def test_single_pass_compose_writes_video_and_poster():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        item, layers = _make_item(tmpdir)
+        progress = _RecordingProgress()
+        task = LayerComposeTask(_FakeLayerManager(item, layers), "t1", progress=progress)
+
+        asyncio.run(task._compose_with_video(layers))
+
+        assert os.path.exists(task.output_mp4)
+        poster = cv2.imread(task.output_png)
+        assert poster is not None and poster.shape[:2] == (360, 640)
+        # The overlay is mostly red where it was placed, the background untouched
+        assert poster[80, 140, 2] > 150 and poster[80, 140, 0] < 100
+        assert poster[300, 600, 2] < 50
+        assert not os.path.exists(os.path.join(tmpdir, "_temp_output.mp4"))
+        assert progress.history and progress.history[-1] == 100
+
+
+@requires_ffmpeg
+def test_opencv_and_ffmpeg_modes_write_the_same_outputs():
+    for mode in (LayerComposeTask.VIDEO_COMPOSE_MODE_OPENCV, LayerComposeTask.VIDEO_COMPOSE_MODE_FFMPEG):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            item, layers = _make_item(tmpdir)
+            task = LayerComposeTask(_FakeLayerManager(item, layers), mode, video_compose_mode=mode)
+            asyncio.run(task._compose_with_video(layers))
+            assert os.path.exists(task.output_mp4)
+            poster = cv2.imread(task.output_png)
+            assert poster is not None and poster.shape[:2] == (360, 640)
@@ -0,0 +1,148 @@
+"""Unit tests for the vectorized LayerCompositor."""
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.layer_compositor import LayerCompositor, LayerPixelCache
+
+
+class _FakeLayer:
+    def __init__(self, x=0, y=0, width=0, height=0, visible=True):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.visible = visible
+
+
+def _reference_over(layers, canvas_size):
+    """Straight-alpha "over" computed per pixel in float64, used as the ground truth."""
+    w, h = canvas_size
+    rgb = np.zeros((h, w, 3), dtype=np.float64)
+    alpha = np.zeros((h, w, 1), dtype=np.float64)
+    for layer, image in layers:
+        x0, y0 = max(layer.x, 0), max(layer.y, 0)
+        x1, y1 = min(layer.x + layer.width, w), min(layer.y + layer.height, h)
+        if x1 <= x0 or y1 <= y0:
+            continue
+        src = image[y0 - layer.y:y1 - layer.y, x0 - layer.x:x1 - layer.x].astype(np.float64) / 255.0
+        fa = src[..., 3:4]
+        ba = alpha[y0:y1, x0:x1]
+        out_a = fa + ba * (1 - fa)
+        safe = np.where(out_a > 0, out_a, 1)
+        rgb[y0:y1, x0:x1] = (src[..., :3] * fa + rgb[y0:y1, x0:x1] * ba * (1 - fa)) / safe
+        alpha[y0:y1, x0:x1] = out_a
+    return np.concatenate([rgb, alpha], axis=2) * 255.0
+
+
+class TestLayerCompositor:
+
+    @pytest.fixture
+    def temp_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield tmpdir
+
+    def _write(self, temp_dir, name, image):
+        path = os.path.join(temp_dir, name)
+        cv2.imwrite(path, image)
+        return path
+
+    def _random_rgba(self, h, w, seed):
+        rng = np.random.default_rng(seed)
+        return rng.integers(0, 256, size=(h, w, 4), dtype=np.uint8)
+
+    def test_matches_reference_over(self, temp_dir):
+        bottom = self._random_rgba(40, 60, 1)
+        top = self._random_rgba(20, 30, 2)
+        layers = [
+            (_FakeLayer(0, 0, 60, 40), bottom),
+            (_FakeLayer(10, 5, 30, 20), top),
+        ]
+        paths = [(layer, self._write(temp_dir, f"{i}.png", img)) for i, (layer, img) in enumerate(layers)]
+
+        result = LayerCompositor().composite(paths, (60, 40))
+        expected = _reference_over(layers, (60, 40))
+
+        assert result.shape == (40, 60, 4)
+        assert result.dtype == np.uint8
+        # Only compare where the result is not fully transparent, color is undefined there
+        mask = expected[..., 3] > 0
+        assert np.max(np.abs(result[mask].astype(np.float64) - expected[mask])) <= 2
+
+    def test_partially_off_canvas_layer_is_clipped(self, temp_dir):
+        opaque = np.full((20, 20, 4), 255, dtype=np.uint8)
+        path = self._write(temp_dir, "1.png", opaque)
+        layer = _FakeLayer(-10, 30, 20, 20)
+
+        result = LayerCompositor().composite([(layer, path)], (40, 40))
+
+        assert np.all(result[30:40, 0:10, 3] == 255)
+        assert np.all(result[:30, :, 3] == 0)
+        assert np.all(result[:, 10:, 3] == 0)
+
+    def test_invisible_and_missing_layers_are_skipped(self, temp_dir):
+        opaque = np.full((10, 10, 4), 255, dtype=np.uint8)
+        path = self._write(temp_dir, "1.png", opaque)
+        hidden = _FakeLayer(0, 0, 10, 10, visible=False)
+        missing = _FakeLayer(0, 0, 10, 10)
+
+        result = LayerCompositor().composite(
+            [(hidden, path), (missing, os.path.join(temp_dir, "nope.png"))], (10, 10))
+
+        assert not result.any()
+
+    def test_zero_size_layer_takes_image_size(self, temp_dir):
+        path = self._write(temp_dir, "1.png", np.full((12, 8, 3), 128, dtype=np.uint8))
+        layer = _FakeLayer()
+
+        LayerCompositor().composite([(layer, path)], (20, 20))
+
+        assert (layer.width, layer.height) == (8, 12)
+
+    def test_dirty_region_recomposition_matches_full(self, temp_dir):
+        bottom = self._random_rgba(50, 50, 3)
+        top = self._random_rgba(10, 10, 4)
+        bottom_path = self._write(temp_dir, "1.png", bottom)
+        top_path = self._write(temp_dir, "2.png", top)
+        bottom_layer = _FakeLayer(0, 0, 50, 50)
+        top_layer = _FakeLayer(5, 5, 10, 10)
+
+        compositor = LayerCompositor()
+        compositor.composite([(bottom_layer, bottom_path), (top_layer, top_path)], (50, 50), output_key="out")
+        top_layer.x, top_layer.y = 30, 25
+        incremental = compositor.composite(
+            [(bottom_layer, bottom_path), (top_layer, top_path)], (50, 50), output_key="out")
+        full = LayerCompositor().composite([(bottom_layer, bottom_path), (top_layer, top_path)], (50, 50))
+
+        assert np.array_equal(incremental, full)
+
+    def test_pixel_cache_reuses_and_invalidates_on_mtime(self, temp_dir):
+        path = self._write(temp_dir, "1.png", np.zeros((4, 4, 4), dtype=np.uint8))
+        cache = LayerPixelCache()
+
+        cache.get(path)
+        cache.get(path)
+        assert cache.hits == 1 and cache.misses == 1
+
+        cv2.imwrite(path, np.full((4, 4, 4), 255, dtype=np.uint8))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        buf = cache.get(path)
+
+        assert cache.misses == 2
+        assert len(cache) == 1
+        assert np.allclose(buf, 1.0)
+
+    def test_pixel_cache_respects_byte_budget(self, temp_dir):
+        cache = LayerPixelCache(max_bytes=8 * 8 * 4 * 4)
+        for i in range(3):
+            cache.get(self._write(temp_dir, f"{i}.png", np.zeros((8, 8, 4), dtype=np.uint8)))
+
+        assert len(cache) == 1
+        assert cache.size_bytes <= cache.max_bytes
@@ -0,0 +1,192 @@
+"""
+Tests for the LlmService response cache.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+import litellm
+import pytest
+from litellm.types.utils import Delta, ModelResponseStream, StreamingChoices
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.llm.llm_service import LlmService
+from agent.llm.response_cache import LlmCacheMissError, ResponseCache
+
+MESSAGES = [{"role": "user", "content": "Describe scene 3 in one line."}]
+
+
+class FakeProvider:
+    """Stands in for litellm.acompletion / litellm.completion."""
+
+    def __init__(self, chunks=("INT. ", "HARBOR - ", "DAWN")):
+        self.chunks = list(chunks)
+        self.calls = 0
+
+    def _response(self, model):
+        return litellm.ModelResponse(
+            model=model,
+            choices=[{"index": 0, "message": {"role": "assistant", "content": "".join(self.chunks)}}],
+            usage={"prompt_tokens": 20, "completion_tokens": 5, "total_tokens": 25},
+        )
+
+    async def acompletion(self, model, messages, stream=False, **kwargs):
+        self.calls += 1
+        if not stream:
+            return self._response(model)
+
+        async def generate():
+            for chunk in self.chunks:
+                yield ModelResponseStream(model=model, choices=[StreamingChoices(delta=Delta(content=chunk))])
+        return generate()
+
+    def completion(self, model, messages, **kwargs):
+        self.calls += 1
+        return self._response(model)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = FakeProvider()
+    monkeypatch.setattr(litellm, "acompletion", provider.acompletion)
+    monkeypatch.setattr(litellm, "completion", provider.completion)
+    return provider
+
+
+def make_service(cache):
+    service = LlmService(response_cache=cache)
+    service.provider = "openai"
+    return service
+
+
+def test_fingerprint():
+    key = ResponseCache.fingerprint("gpt-4o-mini", MESSAGES, 0)
+    assert key == ResponseCache.fingerprint("gpt-4o-mini", [dict(MESSAGES[0], extra="ignored")], 0,
+                                            {"timeout": 30})
+    assert key != ResponseCache.fingerprint("gpt-4o-mini", MESSAGES, 0.5)
+    assert key != ResponseCache.fingerprint("gpt-4o", MESSAGES, 0)
+    assert key != ResponseCache.fingerprint("gpt-4o-mini", MESSAGES, 0, {"tools": [{"name": "read_scene"}]})
+
+
+def test_deterministic_requests_are_cached(provider):
+    service = make_service(ResponseCache(mode="deterministic"))
+
+    first = asyncio.run(service.acompletion(messages=list(MESSAGES), temperature=0))
+    second = asyncio.run(service.acompletion(messages=list(MESSAGES), temperature=0))
+    assert provider.calls == 1
+    assert LlmService.extract_content(second) == LlmService.extract_content(first) == "INT. HARBOR - DAWN"
+
+    # Sampled requests are not cached in deterministic mode
+    asyncio.run(service.acompletion(messages=list(MESSAGES), temperature=0.7))
+    asyncio.run(service.acompletion(messages=list(MESSAGES), temperature=0.7))
+    assert provider.calls == 3
+
+    service.completion(messages=list(MESSAGES), temperature=0)
+    assert provider.calls == 3
+
+    metrics = service.get_cache_metrics()
+    assert metrics["hits"] == 2
+    assert metrics["misses"] == 1
+    assert metrics["hit_rate"] == pytest.approx(2 / 3)
+    assert metrics["saved_prompt_tokens"] == 40
+    assert metrics["saved_completion_tokens"] == 10
+
+
+def test_stream_is_recorded_and_replayed(provider):
+    service = make_service(ResponseCache(mode="record"))
+
+    async def read(limit=None):
+        response = await service.acompletion(messages=list(MESSAGES), stream=True)
+        deltas = []
+        try:
+            async for chunk in response:
+                deltas.append(LlmService.extract_delta(chunk))
+                if limit and len(deltas) == limit:
+                    break
+        finally:
+            await response.aclose()
+        # Cache hits are plain generators without a background recording
+        recording = getattr(response, "_recording", None)
+        if recording is not None:
+            await recording
+        return deltas
+
+    # The consumer stops early; the rest of the response is recorded in the background
+    assert asyncio.run(read(limit=1)) == ["INT. "]
+    assert asyncio.run(read()) == ["INT. ", "HARBOR - ", "DAWN"]
+    assert provider.calls == 1
+
+    # A streamed response also answers non-streamed requests
+    response = asyncio.run(service.acompletion(messages=list(MESSAGES)))
+    assert LlmService.extract_content(response) == "INT. HARBOR - DAWN"
+    assert provider.calls == 1
+
+
+def test_closing_early_does_not_wait_for_the_rest_of_the_stream(monkeypatch):
+    class SlowProvider(FakeProvider):
+        async def acompletion(self, model, messages, stream=False, **kwargs):
+            async def generate():
+                for chunk in self.chunks:
+                    yield ModelResponseStream(model=model, choices=[StreamingChoices(delta=Delta(content=chunk))])
+                    await asyncio.sleep(0.2)
+            return generate()
+
+    monkeypatch.setattr(litellm, "acompletion", SlowProvider().acompletion)
+    cache = ResponseCache(mode="record")
+    service = make_service(cache)
+
+    async def scenario():
+        response = await service.acompletion(messages=list(MESSAGES), stream=True)
+        first = await response.__anext__()
+        start = asyncio.get_running_loop().time()
+        await response.aclose()
+        closed_after = asyncio.get_running_loop().time() - start
+        recorded_before = len(cache._memory)
+        await response._recording
+        return LlmService.extract_delta(first), closed_after, recorded_before
+
+    first, closed_after, recorded_before = asyncio.run(scenario())
+    assert first == "INT. "
+    assert closed_after < 0.1
+    assert recorded_before == 0
+    assert len(cache._memory) == 1
+
+
+def test_disk_tier_and_ttl(provider):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache", "llm.sqlite")
+        asyncio.run(make_service(ResponseCache(path, mode="record")).acompletion(messages=list(MESSAGES)))
+
+        cache = ResponseCache(path, mode="record", max_memory_entries=1)
+        service = make_service(cache)
+        asyncio.run(service.acompletion(messages=list(MESSAGES)))
+        assert provider.calls == 1
+        assert cache.get_metrics()["disk_hits"] == 1
+
+        # Memory LRU keeps one entry; expired disk entries are misses
+        asyncio.run(service.acompletion(messages=[{"role": "user", "content": "Another scene"}]))
+        assert len(cache._memory) == 1
+        cache._db.execute("UPDATE responses SET created_at = created_at - 3600")
+        cache.ttl_seconds = 60
+        asyncio.run(service.acompletion(messages=list(MESSAGES)))
+        assert provider.calls == 3
+        cache.close()
+
+
+def test_offline_mode(provider):
+    cache = ResponseCache(mode="offline")
+    service = make_service(cache)
+    with pytest.raises(LlmCacheMissError):
+        asyncio.run(service.acompletion(messages=list(MESSAGES)))
+    assert provider.calls == 0
+
+    recorder = make_service(ResponseCache(mode="record"))
+    asyncio.run(recorder.acompletion(messages=list(MESSAGES)))
+    key, record = next(iter(recorder.response_cache._memory.items()))
+    cache.put(key, record)
+
+    response = asyncio.run(service.acompletion(messages=list(MESSAGES)))
+    assert LlmService.extract_content(response) == "INT. HARBOR - DAWN"
+    assert provider.calls == 1
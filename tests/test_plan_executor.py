@@ -0,0 +1,154 @@
+"""Tests for the concurrent plan executor used by FilmetoAgent."""
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.event.agent_event import AgentEvent, AgentEventType
+from agent.filmeto_agent import FilmetoAgent
+from agent.plan.executor import PlanExecutor
+from agent.plan.models import PlanInstance, PlanTask, TaskStatus
+from agent.plan.service import PlanService
+
+
+def _instance(*specs):
+    """specs: (task_id, title, needs)"""
+    tasks = [PlanTask(id=i, name=i, description="", title=title, needs=list(needs)) for i, title, needs in specs]
+    return PlanInstance(plan_id="p", instance_id="i", project_name="demo", tasks=tasks)
+
+
+def _ready(instance):
+    done = {t.id for t in instance.tasks if t.status == TaskStatus.COMPLETED}
+    return [t for t in instance.tasks
+            if t.status in (TaskStatus.CREATED, TaskStatus.READY) and all(n in done for n in t.needs)]
+
+
+class _Runner:
+    """Runs tasks for a fixed duration and records the start/end order."""
+
+    def __init__(self, durations):
+        self.durations = durations
+        self.log = []
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, task):
+        task.status = TaskStatus.RUNNING
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        self.log.append(("start", task.id))
+        yield f"{task.id}:begin"
+        await asyncio.sleep(self.durations[task.id])
+        yield f"{task.id}:end"
+        self.log.append(("end", task.id))
+        self.running -= 1
+        task.status = TaskStatus.COMPLETED
+
+
+def _execute(executor, instance):
+    async def collect():
+        return [pair async for pair in executor.run(instance)]
+    start = time.perf_counter()
+    events = asyncio.run(collect())
+    return events, time.perf_counter() - start
+
+
+def test_dependents_start_as_soon_as_their_needs_are_met():
+    # a -> c, b -> d; a is fast and b is slow
+    instance = _instance(("a", "w1", []), ("b", "w2", []), ("c", "w3", ["a"]), ("d", "w4", ["b"]))
+    runner = _Runner({"a": 0.02, "b": 0.2, "c": 0.02, "d": 0.02})
+
+    events, elapsed = _execute(PlanExecutor(runner, _ready), instance)
+
+    assert runner.log.index(("start", "c")) < runner.log.index(("end", "b"))
+    # Critical path is b -> d (0.22s), not the sum of all tasks (0.26s) or of two waves
+    assert elapsed < 0.25
+    assert all(t.status == TaskStatus.COMPLETED for t in instance.tasks)
+    # Each task's events stay in order and are tagged with their task
+    for task_id in "abcd":
+        assert [e for t, e in events if t.id == task_id] == [f"{task_id}:begin", f"{task_id}:end"]
+
+
+def test_concurrency_limit_and_exclusive_keys():
+    instance = _instance(*[(f"t{i}", f"w{i}", []) for i in range(6)])
+    runner = _Runner({f"t{i}": 0.01 for i in range(6)})
+    _execute(PlanExecutor(runner, _ready, max_concurrency=2), instance)
+    assert runner.peak == 2
+
+    instance = _instance(("a", "writer", []), ("b", "writer", []), ("c", "artist", []))
+    runner = _Runner({"a": 0.01, "b": 0.01, "c": 0.01})
+    _execute(PlanExecutor(runner, _ready, exclusive_key=lambda t: t.title), instance)
+    assert runner.log.index(("end", "a")) < runner.log.index(("start", "b"))
+    assert runner.log.index(("start", "c")) < runner.log.index(("end", "a"))
+
+
+def test_errors_cancel_the_remaining_tasks():
+    instance = _instance(("a", "w1", []), ("b", "w2", []))
+    cancelled = []
+
+    async def run_task(task):
+        if task.id == "a":
+            raise RuntimeError("boom")
+        try:
+            await asyncio.sleep(1)
+            yield "never"
+        except asyncio.CancelledError:
+            cancelled.append(task.id)
+            raise
+
+    with pytest.raises(RuntimeError, match="boom"):
+        _execute(PlanExecutor(run_task, _ready), instance)
+    assert cancelled == ["b"]
+
+
+class _CrewMember:
+    def __init__(self, name, delay):
+        self.config = SimpleNamespace(name=name)
+        self.delay = delay
+
+    async def chat_stream(self, message, plan_id=None):
+        await asyncio.sleep(self.delay)
+        yield AgentEvent.final(final_response=f"{self.config.name} done", project_name="demo",
+                               react_type=self.config.name)
+
+
+@pytest.fixture
+def plan_service(tmp_path):
+    PlanService._instance = None
+    service = PlanService()
+    service.set_workspace(SimpleNamespace(workspace_path=str(tmp_path / "workspace")))
+    yield service
+    PlanService._instance = None
+
+
+def test_agent_runs_independent_crew_tasks_concurrently(plan_service, monkeypatch):
+    monkeypatch.setattr(plan_service, "_validate_and_clean_tasks", lambda tasks: tasks or [])
+    plan = plan_service.create_plan("demo", "Plan", "", tasks=[
+        PlanTask(id="script", name="Script", description="", title="screenwriter"),
+        PlanTask(id="art", name="Art", description="", title="art_director"),
+        PlanTask(id="cut", name="Cut", description="", title="editor", needs=["script", "art"]),
+    ])
+    agent = FilmetoAgent(llm_service=Mock(), crew_member_service=Mock(), plan_service=plan_service)
+    agent._crew_member_lookup = {
+        "screenwriter": _CrewMember("screenwriter", 0.1),
+        "art_director": _CrewMember("art_director", 0.1),
+        "editor": _CrewMember("editor", 0.01),
+    }
+
+    async def collect():
+        return [event async for event in agent._execute_plan_tasks(plan, "session")]
+
+    start = time.perf_counter()
+    events = asyncio.run(collect())
+    elapsed = time.perf_counter() - start
+
+    finals = [e for e in events if e.event_type == AgentEventType.FINAL]
+    assert [e.payload["task_id"] for e in finals][-1] == "cut"
+    assert {e.payload["task_id"] for e in finals} == {"script", "art", "cut"}
+    assert elapsed < 0.2
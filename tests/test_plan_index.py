@@ -0,0 +1,105 @@
+"""Tests for the plan index and plan cache in PlanService."""
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.plan import service as service_module
+from agent.plan.models import Plan, PlanStatus, PlanTask
+from agent.plan.service import PlanService
+
+
+@pytest.fixture
+def plan_service(tmp_path):
+    PlanService._instance = None
+    service = PlanService()
+    service.set_workspace(SimpleNamespace(workspace_path=str(tmp_path / "workspace")))
+    yield service
+    PlanService._instance = None
+
+
+@pytest.fixture
+def yaml_loads(monkeypatch):
+    """Count plan YAML parses."""
+    calls = []
+    real = yaml.safe_load
+
+    def counting(stream):
+        calls.append(getattr(stream, "name", None))
+        return real(stream)
+    monkeypatch.setattr(service_module.yaml, "safe_load", counting)
+    return calls
+
+
+def _save(service, plan_id, minutes, status=PlanStatus.CREATED):
+    plan = Plan(id=plan_id, project_name="demo", name=plan_id, description="",
+                tasks=[PlanTask(id="t1", name="t", description="", title="writer")],
+                created_at=datetime(2024, 1, 1) + timedelta(minutes=minutes), status=status)
+    service._save_plan(plan)
+    return plan
+
+
+def test_latest_active_plan_does_not_reparse_plans(plan_service, yaml_loads):
+    for i in range(50):
+        _save(plan_service, f"old_{i}", i, PlanStatus.COMPLETED)
+    _save(plan_service, "active", 100)
+    _save(plan_service, "newest_done", 200, PlanStatus.COMPLETED)
+    yaml_loads.clear()
+
+    for _ in range(5):
+        assert plan_service.get_last_active_plan_for_project("demo").id == "active"
+    assert yaml_loads == []
+    assert len(plan_service.get_all_plans_for_project("demo")) == 52
+
+
+def test_external_edits_are_picked_up_by_mtime(plan_service):
+    _save(plan_service, "a", 1)
+    _save(plan_service, "b", 2)
+    assert plan_service.get_last_active_plan_for_project("demo").id == "b"
+
+    plan_path = plan_service._get_flow_dir("demo", "b") / "plan.yml"
+    data = yaml.safe_load(plan_path.read_text(encoding='utf-8'))
+    data["status"] = "completed"
+    plan_path.write_text(yaml.dump(data), encoding='utf-8')
+    os.utime(plan_path, (1, 1))
+
+    assert plan_service.get_last_active_plan_for_project("demo").id == "a"
+    assert plan_service.load_plan("demo", "b").status == PlanStatus.COMPLETED
+
+
+def test_index_survives_restart_and_sees_new_plan_dirs(plan_service, tmp_path, yaml_loads):
+    for i in range(10):
+        _save(plan_service, f"p{i}", i, PlanStatus.COMPLETED)
+    plans_dir = plan_service._get_project_plans_dir("demo")
+    assert (plans_dir / "index.json").exists()
+
+    # Another process adds a plan
+    other = Plan(id="external", project_name="demo", name="x", description="", created_at=datetime(2025, 1, 1))
+    (plans_dir / "external").mkdir()
+    with open(plans_dir / "external" / "plan.yml", 'w', encoding='utf-8') as f:
+        yaml.dump({"id": "external", "project_id": "demo", "name": "x", "description": "", "tasks": [],
+                   "created_at": other.created_at.isoformat(), "status": "created", "metadata": {}}, f)
+
+    PlanService._instance = None
+    restarted = PlanService()
+    restarted.set_workspace(SimpleNamespace(workspace_path=str(tmp_path / "workspace")))
+    yaml_loads.clear()
+
+    assert restarted.get_last_active_plan_for_project("demo").id == "external"
+    # The summary of the new plan plus the plan itself; indexed plans are not parsed
+    assert len(yaml_loads) == 2
+
+
+def test_load_plan_returns_independent_copies(plan_service):
+    _save(plan_service, "a", 1)
+    plan = plan_service.load_plan("demo", "a")
+    plan.tasks.clear()
+    assert len(plan_service.load_plan("demo", "a").tasks) == 1
+
+    plan_service.update_plan("demo", "a", name="renamed")
+    assert plan_service.load_plan("demo", "a").name == "renamed"
@@ -0,0 +1,169 @@
+"""Tests for journaled plan instance persistence."""
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.plan import journal as journal_module
+from agent.plan.journal import journal_path_for
+from agent.plan.models import Plan, PlanStatus, PlanTask, TaskStatus
+from agent.plan.service import PlanService
+
+
+def _new_service(workspace):
+    PlanService._instance = None
+    service = PlanService()
+    service.set_workspace(SimpleNamespace(workspace_path=str(workspace)))
+    return service
+
+
+@pytest.fixture
+def plan_service(tmp_path):
+    yield _new_service(tmp_path / "workspace")
+    PlanService._instance = None
+
+
+def _instance(service, task_count):
+    tasks = [PlanTask(id=f"t{i}", name=f"t{i}", description="", title="writer",
+                      needs=[f"t{i - 1}"] if i else []) for i in range(task_count)]
+    plan = Plan(id="plan", project_name="demo", name="p", description="", tasks=tasks)
+    service._save_plan(plan)
+    instance = service.create_plan_instance(plan)
+    service.start_plan_execution(instance)
+    return instance
+
+
+def _paths(service, instance):
+    snapshot = service._get_plan_instance_path("demo", "plan", instance.instance_id)
+    return snapshot, journal_path_for(snapshot)
+
+
+def _statuses(instance):
+    return [t.status for t in instance.tasks]
+
+
+def test_transitions_are_journaled_and_replayed(plan_service):
+    instance = _instance(plan_service, 5)
+    plan_service.mark_task_running(instance, "t0")
+    plan_service.mark_task_completed(instance, "t0")
+    plan_service.mark_task_running(instance, "t1")
+    plan_service.mark_task_failed(instance, "t1", "crashed")  # fails the plan -> snapshot
+    plan_service.flush()
+
+    snapshot, journal = _paths(plan_service, instance)
+    assert not journal.exists()
+
+    loaded = _new_service(snapshot.parents[4]).load_plan_instance("demo", "plan", instance.instance_id)
+    assert _statuses(loaded) == _statuses(instance)
+    assert loaded.status == PlanStatus.FAILED
+    assert loaded.tasks[1].error_message == "crashed"
+
+
+def test_running_instance_is_restored_from_snapshot_and_journal(plan_service, tmp_path):
+    instance = _instance(plan_service, 5)
+    plan_service.mark_task_running(instance, "t0")
+    plan_service.mark_task_completed(instance, "t0")
+    plan_service.flush()
+
+    snapshot, journal = _paths(plan_service, instance)
+    lines = journal.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 5  # plan running, t0 ready, t0 running, t0 completed, t1 ready
+    # A crash during an append leaves a torn line behind
+    with open(journal, 'a', encoding='utf-8') as f:
+        f.write('{"seq": 6, "type": "ta')
+
+    restarted = _new_service(tmp_path / "workspace")
+    loaded = restarted.load_plan_instance("demo", "plan", instance.instance_id)
+    assert _statuses(loaded) == _statuses(instance)
+    assert loaded.status == PlanStatus.RUNNING and loaded.tasks[0].started_at == instance.tasks[0].started_at
+
+    # The restarted service continues the journal where it ended
+    restarted.mark_task_running(loaded, "t1")
+    restarted.flush()
+    loaded_again = _new_service(tmp_path / "workspace").load_plan_instance("demo", "plan", instance.instance_id)
+    assert loaded_again.tasks[1].status == TaskStatus.RUNNING
+
+
+def test_long_journal_is_compacted(plan_service, tmp_path):
+    plan_service.JOURNAL_COMPACT_MIN_EVENTS = 8
+    instance = _instance(plan_service, 3)
+    for _ in range(5):
+        plan_service.mark_task_running(instance, "t0")
+        plan_service.mark_task_running(instance, "t1")
+    plan_service.flush()
+
+    snapshot, journal = _paths(plan_service, instance)
+    # 2 start events + 10 transitions: compacted after the 8th, 4 left in the new journal
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 4
+    loaded = _new_service(tmp_path / "workspace").load_plan_instance("demo", "plan", instance.instance_id)
+    assert _statuses(loaded) == _statuses(instance)
+
+
+def test_files_are_written_off_the_calling_thread(plan_service, monkeypatch):
+    threads = set()
+    real_append = journal_module.append_event
+    real_snapshot = journal_module.write_snapshot
+
+    def append(*args):
+        threads.add(threading.current_thread().name)
+        real_append(*args)
+
+    def snapshot(*args):
+        threads.add(threading.current_thread().name)
+        real_snapshot(*args)
+    monkeypatch.setattr("agent.plan.service.append_event", append)
+    monkeypatch.setattr("agent.plan.service.write_snapshot", snapshot)
+
+    instance = _instance(plan_service, 2)
+    plan_service.mark_task_running(instance, "t0")
+    plan_service.flush()
+
+    assert threads and threading.current_thread().name not in threads
+
+
+def test_failed_write_is_reported_and_repaired(plan_service, tmp_path, monkeypatch):
+    instance = _instance(plan_service, 3)
+    plan_service.flush()
+
+    def failing_append(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr("agent.plan.service.append_event", failing_append)
+    plan_service.mark_task_running(instance, "t0")
+    with pytest.raises(journal_module.JournalWriteError, match="disk full"):
+        plan_service.flush()
+    # Reported once
+    plan_service.flush()
+
+    monkeypatch.undo()
+    # The journal lost an event, so the next transition rewrites the snapshot
+    plan_service.mark_task_completed(instance, "t0")
+    plan_service.flush()
+    snapshot, journal = _paths(plan_service, instance)
+    data = yaml.safe_load(snapshot.read_text(encoding='utf-8'))
+    assert data["tasks"][0]["status"] == TaskStatus.COMPLETED.value
+    loaded = _new_service(tmp_path / "workspace").load_plan_instance("demo", "plan", instance.instance_id)
+    assert _statuses(loaded) == _statuses(instance)
+
+
+
+def test_load_only_waits_for_its_own_instance(plan_service):
+    first = _instance(plan_service, 2)
+    second = _instance(plan_service, 2)
+    plan_service.flush()
+
+    # Hold the writer thread, then queue a transition of `first` behind it
+    release = threading.Event()
+    plan_service._journal_writer.submit("blocker", release.wait)
+    plan_service.mark_task_running(first, "t0")
+    try:
+        loaded = plan_service.load_plan_instance("demo", "plan", second.instance_id)
+        assert _statuses(loaded) == _statuses(second)
+        assert plan_service._journal_writer.has_pending(str(_paths(plan_service, first)[0]))
+    finally:
+        release.set()
+    assert plan_service.load_plan_instance("demo", "plan", first.instance_id).tasks[0].status == TaskStatus.RUNNING
@@ -3,6 +3,9 @@ Test script for the Plan Service functionality
 """
 import sys
 import os
+from types import SimpleNamespace
+
+import pytest
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -12,6 +15,17 @@ from agent.plan.models import PlanTask
 from datetime import datetime
 
 
+@pytest.fixture(autouse=True)
+def isolated_workspace(tmp_path):
+    """Write the plans of these tests under tmp_path instead of the repository's workspace/"""
+    service = plan_service_manager._plan_service
+    previous_dir = service.flow_storage_dir
+    plan_service_manager.set_workspace(SimpleNamespace(workspace_path=str(tmp_path)))
+    yield
+    service.flush()
+    service.flow_storage_dir = previous_dir
+
+
 def test_create_plan():
     """Test creating a plan using the plan service"""
     print("Testing plan creation...")
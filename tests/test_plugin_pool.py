@@ -0,0 +1,184 @@
+"""Tests for the per-plugin process pool in PluginManager."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.api.types import PluginNotFoundError
+from server.plugins.plugin_manager import PluginInfo, PluginManager, PluginPool, PluginPoolConfig
+
+
+class _FakeProcess:
+    """In-process stand-in for PluginProcess."""
+
+    def __init__(self, plugin_info):
+        self.plugin_info = plugin_info
+        self.max_concurrency = plugin_info.config.get("execution", {}).get("max_concurrency", 1)
+        self.is_alive = False
+        self.healthy = True
+        self.process = None
+        self.leases = 0
+        self.tasks_completed = 0
+        self.retiring = False
+        self.stopped = False
+
+    async def start(self):
+        await asyncio.sleep(0.01)
+        self.is_alive = True
+
+    async def ping(self):
+        return self.healthy
+
+    async def stop(self):
+        self.is_alive = False
+        self.stopped = True
+
+
+def _info(pool=None, max_concurrency=1):
+    config = {"name": "fake", "execution": {"max_concurrency": max_concurrency}, "pool": pool or {}}
+    return PluginInfo(
+        name="fake", version="1.0.0", description="", author="", tools=[], engine="",
+        plugin_path=Path("."), main_script=Path("main.py"), requirements_file=None, config=config
+    )
+
+
+def _pool(**pool_config):
+    max_concurrency = pool_config.pop("max_concurrency", 1)
+    pool_config.setdefault("health_check_interval", 0)
+    return PluginPool(_info(pool_config, max_concurrency), process_factory=_FakeProcess)
+
+
+def test_pool_config_defaults_and_bounds():
+    assert PluginPoolConfig.from_config({}) == PluginPoolConfig()
+    config = PluginPoolConfig.from_config({"pool": {"min_size": 3, "max_size": 2}})
+    assert (config.min_size, config.max_size) == (3, 3)
+    assert PluginPoolConfig.from_config({"pool": {"min_size": "x"}}) == PluginPoolConfig()
+
+
+def test_warm_up_starts_spares_and_records_cold_start():
+    async def scenario():
+        pool = _pool(min_size=2, max_size=3)
+        await pool.warm_up()
+        stats = pool.get_stats()
+        await pool.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+
+    assert stats["size"] == 2
+    assert stats["cold_start"]["count"] == 2
+    assert stats["cold_start"]["avg"] > 0
+    assert stats["utilisation"] == 0.0
+
+
+def test_pool_grows_to_max_size_then_waits():
+    async def scenario():
+        pool = _pool(min_size=0, max_size=2, max_concurrency=2)
+        leased = [await pool.acquire() for _ in range(4)]
+        full = pool.get_stats()
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.05)
+        blocked = not waiter.done()
+        await pool.release(leased[0])
+        extra = await asyncio.wait_for(waiter, 1)
+        await pool.close()
+        return leased, full, blocked, extra
+
+    leased, full, blocked, extra = asyncio.run(scenario())
+
+    assert len({id(p) for p in leased}) == 2
+    assert full["size"] == 2 and full["in_flight"] == 4
+    assert full["utilisation"] == 1.0
+    assert blocked
+    assert extra is leased[0]
+
+
+def test_process_recycled_after_max_tasks():
+    async def scenario():
+        pool = _pool(min_size=1, max_size=1, max_tasks_per_process=2)
+        first = await pool.acquire()
+        await pool.release(first)
+        second = await pool.acquire()
+        await pool.release(second)
+        await asyncio.sleep(0.05)  # replacement spare starts in the background
+        third = await pool.acquire()
+        await pool.release(third)
+        stats = pool.get_stats()
+        await pool.close()
+        return first, second, third, stats
+
+    first, second, third, stats = asyncio.run(scenario())
+
+    assert first is second
+    assert third is not first
+    assert first.stopped
+    assert stats["recycled"] == 1
+    assert stats["tasks_completed"] == 3
+
+
+def test_get_plugin_does_not_count_as_a_task(tmp_path):
+    manager = PluginManager(str(tmp_path))
+    manager.plugin_infos["fake"] = _info({"min_size": 1, "max_size": 1, "max_tasks_per_process": 2,
+                                          "health_check_interval": 0})
+
+    async def scenario():
+        manager.pools["fake"] = PluginPool(manager.plugin_infos["fake"], process_factory=_FakeProcess)
+        plugins = [await manager.get_plugin("fake") for _ in range(3)]
+        stats = manager.get_pool_stats()
+        await manager.stop_all_plugins()
+        return plugins, stats
+
+    plugins, stats = asyncio.run(scenario())
+
+    assert plugins[0] is plugins[1] is plugins[2]
+    assert plugins[0].leases == 0 and plugins[0].tasks_completed == 0
+    assert stats["fake"]["tasks_completed"] == 0
+    assert stats["fake"]["recycled"] == 0
+
+
+def test_health_check_replaces_unresponsive_process():
+    async def scenario():
+        pool = _pool(min_size=1, max_size=1)
+        await pool.warm_up()
+        bad = pool._processes[0]
+        bad.healthy = False
+        await pool.health_check()
+        replacement = pool._processes[0]
+        alive = replacement.is_alive
+        stats = pool.get_stats()
+        await pool.close()
+        return bad, replacement, alive, stats
+
+    bad, replacement, alive, stats = asyncio.run(scenario())
+
+    assert bad.stopped
+    assert replacement is not bad and alive
+    assert stats["health_failures"] == 1
+
+
+def test_manager_deferred_warm_up_and_stats(tmp_path):
+    manager = PluginManager(str(tmp_path))
+    manager.plugin_infos["fake"] = _info({"min_size": 2, "max_size": 2, "health_check_interval": 0})
+    # No event loop yet: warm-up waits for the first lease
+    manager.start_warm_up(["fake"])
+
+    async def scenario():
+        manager.pools["fake"] = PluginPool(manager.plugin_infos["fake"], process_factory=_FakeProcess)
+        async with manager.lease("fake") as plugin:
+            assert plugin.leases == 1
+        await asyncio.sleep(0.05)
+        stats = manager.get_pool_stats()
+        await manager.stop_all_plugins()
+        return stats
+
+    stats = asyncio.run(scenario())
+
+    assert stats["fake"]["size"] == 2
+    assert stats["fake"]["tasks_completed"] == 1
+    assert manager.pools == {}
+    with pytest.raises(PluginNotFoundError):
+        manager.get_pool("missing")
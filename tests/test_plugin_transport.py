@@ -0,0 +1,143 @@
+"""Tests for the multiplexed JSON-RPC transport between PluginProcess and plugins."""
+import asyncio
+import os
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.api.types import FilmetoTask, ToolType
+from server.plugins.plugin_manager import PluginInfo, PluginProcess, get_max_concurrency
+
+BASE_PLUGIN_PATH = Path(__file__).resolve().parent.parent / "server" / "plugins" / "base_plugin.py"
+
+PLUGIN_SOURCE = textwrap.dedent('''
+    import asyncio
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("base_plugin", {base_plugin!r})
+    base_plugin = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(base_plugin)
+
+
+    class SleepPlugin(base_plugin.BaseServerPlugin):
+        def get_plugin_info(self):
+            return {{"name": "sleep", "version": "1.0.0"}}
+
+        def get_supported_tools(self):
+            return [base_plugin.ToolConfig("text2image", "sleep", [])]
+
+        async def execute_task(self, task_data, progress_callback):
+            delay = task_data["parameters"]["delay"]
+            progress_callback(50, "sleeping", {{}})
+            await asyncio.sleep(delay)
+            return {{"task_id": task_data["task_id"], "status": "success",
+                     "output_files": [], "delay": delay,
+                     "current_task_id": self.current_task_id}}
+
+
+    if __name__ == "__main__":
+        SleepPlugin().run()
+''')
+
+
+def _make_plugin(root, max_concurrency):
+    plugin_dir = Path(root)
+    main_script = plugin_dir / "main.py"
+    main_script.write_text(PLUGIN_SOURCE.format(base_plugin=str(BASE_PLUGIN_PATH)))
+    config = {"name": "sleep", "startup": {"timeout": 20}, "execution": {"max_concurrency": max_concurrency}}
+    return PluginInfo(
+        name="sleep", version="1.0.0", description="", author="", tools=[], engine="",
+        plugin_path=plugin_dir, main_script=main_script, requirements_file=None, config=config
+    )
+
+
+def _task(delay):
+    return FilmetoTask(tool_name=ToolType.TEXT2IMAGE, plugin_name="sleep", parameters={"delay": delay})
+
+
+async def _collect(plugin, task):
+    return [message async for message in plugin.run_task(task)]
+
+
+def _run_plugin(max_concurrency, scenario):
+    async def main():
+        with tempfile.TemporaryDirectory() as tmpdir:
+            plugin = PluginProcess(_make_plugin(tmpdir, max_concurrency))
+            await plugin.start()
+            try:
+                return await scenario(plugin)
+            finally:
+                await plugin.stop()
+    return asyncio.run(main())
+
+
+def test_max_concurrency_from_manifest():
+    assert get_max_concurrency({"execution": {"max_concurrency": 4}}) == 4
+    assert get_max_concurrency({"max_concurrency": "2"}) == 2
+    assert get_max_concurrency({}) == 1
+    assert get_max_concurrency({"execution": {"max_concurrency": 0}}) == 1
+
+
+def test_concurrent_tasks_are_routed_to_their_requests():
+    async def scenario(plugin):
+        tasks = [_task(delay) for delay in (0.6, 0.2, 0.4)]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(_collect(plugin, task) for task in tasks))
+        return tasks, results, time.perf_counter() - start
+
+    tasks, results, elapsed = _run_plugin(3, scenario)
+
+    for task, messages in zip(tasks, results):
+        assert all(m.get("params", {}).get("task_id", task.task_id) == task.task_id for m in messages)
+        final = messages[-1]["result"]
+        assert final["task_id"] == task.task_id
+        # Still the plugin's own task after the others started meanwhile
+        assert final["current_task_id"] == task.task_id
+        assert final["status"] == "success"
+        assert [m["params"]["percent"] for m in messages[:-1]] == [0, 50, 100]
+    # Run side by side rather than back to back (0.6 + 0.2 + 0.4)
+    assert elapsed < 1.1
+
+
+def test_manifest_limit_serializes_tasks():
+    async def scenario(plugin):
+        start = time.perf_counter()
+        await asyncio.gather(*(_collect(plugin, _task(0.3)) for _ in range(3)))
+        return time.perf_counter() - start
+
+    assert _run_plugin(1, scenario) >= 0.9
+
+
+def test_ping_mid_task_does_not_corrupt_stream():
+    async def scenario(plugin):
+        task = _task(0.5)
+        running = asyncio.create_task(_collect(plugin, task))
+        await asyncio.sleep(0.1)
+        assert plugin.in_flight == 1
+        pongs = await asyncio.gather(plugin.ping(), plugin.ping())
+        messages = await running
+        return task, pongs, messages, plugin.in_flight
+
+    task, pongs, messages, in_flight = _run_plugin(2, scenario)
+
+    assert pongs == [True, True]
+    assert messages[-1]["result"]["task_id"] == task.task_id
+    assert in_flight == 0
+
+
+def test_pending_requests_end_when_plugin_exits():
+    async def scenario(plugin):
+        running = asyncio.create_task(_collect(plugin, _task(5)))
+        await asyncio.sleep(0.1)
+        plugin.process.kill()
+        return await asyncio.wait_for(running, timeout=5)
+
+    messages = _run_plugin(1, scenario)
+
+    assert all("result" not in m for m in messages)
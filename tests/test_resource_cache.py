@@ -0,0 +1,205 @@
+"""Tests for the LRU resource cache used by ResourceProcessor."""
+import asyncio
+import base64
+import os
+import sys
+import time
+
+import pytest
+from aiohttp import web
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.api.resource_cache import ResourceCache, STALE_TEMP_SECONDS, TEMP_PREFIX
+from server.api.resource_processor import ResourceProcessor
+from server.api.types import ResourceInput, ResourceType, ResourceProcessingError
+
+
+def _writer(data, delay=0.0, calls=None):
+    async def write(temp_path):
+        if calls is not None:
+            calls.append(temp_path)
+        await asyncio.sleep(delay)
+        temp_path.write_bytes(data)
+    return write
+
+
+def test_lru_eviction_under_byte_budget(tmp_path):
+    async def scenario():
+        cache = ResourceCache(str(tmp_path), max_bytes=250)
+        await cache.get_or_create("a", _writer(b"a" * 100))
+        await cache.get_or_create("b", _writer(b"b" * 100))
+        await cache.get_or_create("a", _writer(b"unused"))  # touch a
+        await cache.get_or_create("c", _writer(b"c" * 100))
+        return cache
+
+    cache = asyncio.run(scenario())
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a", "c"]
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+    assert stats["size_bytes"] == cache.size_bytes == 200
+    assert stats["bytes_written"] == 300 and stats["bytes_served"] == 100
+
+
+def test_concurrent_requests_share_one_producer(tmp_path):
+    async def scenario():
+        cache = ResourceCache(str(tmp_path))
+        calls = []
+        paths = await asyncio.gather(*(
+            cache.get_or_create("same", _writer(b"data", delay=0.05, calls=calls)) for _ in range(5)
+        ))
+        return cache, calls, paths
+
+    cache, calls, paths = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert len(set(paths)) == 1 and paths[0].read_bytes() == b"data"
+    assert cache.get_stats()["coalesced"] == 4
+
+
+def test_failed_producer_leaves_no_partial_file(tmp_path):
+    async def failing(temp_path):
+        temp_path.write_bytes(b"half")
+        raise RuntimeError("connection reset")
+
+    async def scenario():
+        cache = ResourceCache(str(tmp_path))
+        waiters = [cache.get_or_create("k", failing) for _ in range(2)]
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        return cache, results
+
+    cache, results = asyncio.run(scenario())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert list(tmp_path.iterdir()) == []
+    assert len(cache) == 0
+
+
+def test_index_is_rebuilt_from_directory(tmp_path):
+    (tmp_path / "old.png").write_bytes(b"x" * 10)
+    stale = tmp_path / f"{TEMP_PREFIX}abc"
+    stale.write_bytes(b"partial")
+    old = time.time() - STALE_TEMP_SECONDS - 60
+    os.utime(stale, (old, old))
+    # May still be written by another process using the same directory
+    (tmp_path / f"{TEMP_PREFIX}def").write_bytes(b"in progress")
+
+    cache = ResourceCache(str(tmp_path))
+
+    assert cache.lookup("old.png") is not None
+    assert cache.size_bytes == 10
+    assert not stale.exists()
+    assert (tmp_path / f"{TEMP_PREFIX}def").exists()
+
+
+def test_pinned_files_are_not_evicted(tmp_path):
+    async def scenario():
+        cache = ResourceCache(str(tmp_path), max_bytes=150)
+        a = await cache.get_or_create("a", _writer(b"a" * 100))
+        assert cache.pin(a)
+        assert not cache.pin(tmp_path / "unknown")
+        b = await cache.get_or_create("b", _writer(b"b" * 100))
+        while_pinned = sorted(p.name for p in tmp_path.iterdir())
+        cache.unpin(a)
+        after_unpin = sorted(p.name for p in tmp_path.iterdir())
+        cache.pin(b)
+        return cache, while_pinned, after_unpin
+
+    cache, while_pinned, after_unpin = asyncio.run(scenario())
+
+    # The cache stays over budget while "a" is in use, then evicts it
+    assert while_pinned == ["a", "b"]
+    assert after_unpin == ["b"]
+    assert cache.get_stats()["evictions"] == 1
+    # cleanup() skips pinned files as well
+    assert cache.cleanup(max_age_hours=-1) == 0
+    assert (tmp_path / "b").exists()
+
+
+@pytest.fixture
+def http_server():
+    """Serve /image.png slowly and count requests."""
+    state = {"requests": 0}
+
+    async def handler(request):
+        state["requests"] += 1
+        await asyncio.sleep(0.05)
+        return web.Response(body=b"\x89PNG" + b"0" * 1000, content_type="image/png")
+
+    app = web.Application()
+    app.router.add_get("/image.png", handler)
+    return app, state
+
+
+def test_processor_deduplicates_downloads(tmp_path, http_server):
+    app, state = http_server
+
+    async def scenario():
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        processor = ResourceProcessor(str(tmp_path / "cache"))
+        try:
+            resource = ResourceInput(type=ResourceType.REMOTE_URL, data=f"http://127.0.0.1:{port}/image.png",
+                                     mime_type="image/png")
+            first = await asyncio.gather(*(processor.process_resource(resource) for _ in range(4)))
+            again = await processor.process_resource(resource)
+            session = processor._get_session()
+            return first, again, session, processor.get_cache_stats()
+        finally:
+            await processor.close()
+            await runner.cleanup()
+
+    first, again, session, stats = asyncio.run(scenario())
+
+    assert state["requests"] == 1
+    assert len(set(first)) == 1 and again == first[0]
+    assert first[0].endswith(".png")
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 3, 1)
+    assert session.closed
+
+
+def test_processor_reports_http_errors(tmp_path):
+    async def missing(request):
+        return web.Response(status=404)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/missing.png", missing)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        processor = ResourceProcessor(str(tmp_path / "cache"))
+        try:
+            resource = ResourceInput(type=ResourceType.REMOTE_URL, data=f"http://127.0.0.1:{port}/missing.png",
+                                     mime_type="image/png")
+            with pytest.raises(ResourceProcessingError, match="HTTP 404"):
+                await processor.process_resource(resource)
+        finally:
+            await processor.close()
+            await runner.cleanup()
+        return processor
+
+    processor = asyncio.run(scenario())
+    assert processor.get_cache_size() == 0
+
+
+def test_processor_base64_is_cached(tmp_path):
+    async def scenario():
+        processor = ResourceProcessor(str(tmp_path))
+        data = base64.b64encode(b"hello").decode()
+        resource = ResourceInput(type=ResourceType.BASE64, data=f"data:image/png;base64,{data}", mime_type="image/png")
+        first = await processor.process_resource(resource)
+        second = await processor.process_resource(resource)
+        return first, second, processor.get_cache_stats()
+
+    first, second, stats = asyncio.run(scenario())
+
+    assert first == second
+    assert open(first, 'rb').read() == b"hello"
+    assert stats["hits"] == 1 and stats["misses"] == 1
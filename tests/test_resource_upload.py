@@ -0,0 +1,137 @@
+"""Tests for streamed resource uploads and chunked base64 decoding."""
+import asyncio
+import base64
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.api import web_api
+from server.api.resource_processor import ResourceProcessor
+from server.api.types import ResourceInput, ResourceProcessingError, ResourceType
+
+
+async def _chunks(data, size=1000):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_store_stream_returns_deduplicated_reference(tmp_path):
+    data = os.urandom(10_000)
+
+    async def scenario():
+        processor = ResourceProcessor(str(tmp_path))
+        first = await processor.store_stream(_chunks(data), "image/png")
+        second = await processor.store_stream(_chunks(data, size=333), "image/png")
+        return first, second, processor.get_cache_stats()
+
+    first, second, stats = asyncio.run(scenario())
+
+    assert first.type == ResourceType.LOCAL_PATH
+    assert first.data == second.data and first.data.endswith(".png")
+    assert open(first.data, 'rb').read() == data
+    assert first.metadata["size"] == len(data)
+    assert (stats["misses"], stats["hits"], stats["entries"]) == (1, 1, 1)
+
+
+def test_store_stream_rejects_oversized_data(tmp_path):
+    processor = ResourceProcessor(str(tmp_path))
+    processor.max_image_size = 1500
+
+    with pytest.raises(ResourceProcessingError):
+        asyncio.run(processor.store_stream(_chunks(b"x" * 3000), "image/png"))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_base64_is_decoded_in_chunks(tmp_path):
+    data = os.urandom(50_000)
+    # MIME-style line breaks must not break chunk alignment
+    encoded = base64.encodebytes(data).decode()
+    processor = ResourceProcessor(str(tmp_path))
+    processor.BASE64_CHUNK_CHARS = 4 * 1000
+
+    resource = ResourceInput(type=ResourceType.BASE64, data=encoded, mime_type="image/png")
+    path = asyncio.run(processor.process_resource(resource))
+
+    assert open(path, 'rb').read() == data
+
+
+def test_invalid_base64_is_reported(tmp_path):
+    processor = ResourceProcessor(str(tmp_path))
+    resource = ResourceInput(type=ResourceType.BASE64, data="data:image/png;base64,abc", mime_type="image/png")
+
+    with pytest.raises(ResourceProcessingError, match="decode"):
+        asyncio.run(processor.process_resource(resource))
+    assert list(tmp_path.iterdir()) == []
+
+
+class _UploadApi:
+    def __init__(self, cache_dir):
+        self.processor = ResourceProcessor(cache_dir)
+
+    async def upload_resource(self, chunks, mime_type):
+        return await self.processor.store_stream(chunks, mime_type)
+
+
+@pytest.fixture
+def post(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_api, "filmeto_api", _UploadApi(str(tmp_path)))
+
+    def post(url, **kwargs):
+        async def request():
+            # ASGITransport does not run the startup event that builds the full service
+            transport = httpx.ASGITransport(app=web_api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(url, **kwargs)
+        return asyncio.run(request())
+    return post
+
+
+def test_upload_raw_body(post):
+    data = os.urandom(5000)
+    response = post("/api/v1/resources", content=data, headers={"content-type": "image/jpeg"})
+
+    assert response.status_code == 200
+    resource = response.json()
+    assert resource["type"] == "local_path" and resource["mime_type"] == "image/jpeg"
+    assert open(resource["data"], 'rb').read() == data
+    assert ResourceInput.from_dict(resource).metadata["size"] == 5000
+
+
+def test_upload_multipart_file(post):
+    data = os.urandom(5000)
+    response = post("/api/v1/resources", files={"file": ("clip.mp4", data, "video/mp4")})
+
+    assert response.status_code == 200
+    resource = response.json()
+    assert resource["data"].endswith(".mp4")
+    assert open(resource["data"], 'rb').read() == data
+
+    missing = post("/api/v1/resources", data={"other": "x"},
+                   files={"unused": ("a.bin", b"", "application/octet-stream")})
+    assert missing.status_code == 400
+
+
+def test_upload_multipart_is_parsed_incrementally(post):
+    data = os.urandom(50_000)
+    boundary = "filmeto-boundary"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nhello\r\n"
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.png\"\r\n"
+        f"Content-Type: image/png\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+
+    response = post("/api/v1/resources", content=_chunks(body, size=7),
+                    headers={"content-type": f"multipart/form-data; boundary={boundary}"})
+
+    assert response.status_code == 200
+    resource = response.json()
+    assert resource["mime_type"] == "image/png"
+    assert open(resource["data"], 'rb').read() == data
+
+    truncated = post("/api/v1/resources", content=body[:1000],
+                     headers={"content-type": f"multipart/form-data; boundary={boundary}"})
+    assert truncated.status_code == 400
@@ -0,0 +1,168 @@
+"""
+Tests for running skill scripts in worker processes (ScriptRunner).
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.tool.base_tool import BaseTool, ToolMetadata, ToolParameter
+from agent.tool.script_runner import ScriptRunner
+from agent.tool.tool_context import ToolContext
+from agent.tool.tool_service import ToolService
+
+
+class EchoTool(BaseTool):
+    """Returns its text parameter, upper-cased."""
+
+    def __init__(self):
+        super().__init__(name="echo", description="Echo text")
+
+    def metadata(self, lang: str = "en_US") -> ToolMetadata:
+        return ToolMetadata(
+            name=self.name,
+            description=self.description,
+            parameters=[ToolParameter(name="text", description="Text", param_type="string")],
+        )
+
+    async def execute(self, parameters, context=None, project_name="", react_type="", run_id="", step_id=0):
+        await asyncio.sleep(0.01)
+        yield self._create_event(
+            "tool_end", project_name, react_type, run_id, step_id,
+            ok=True, result=f"{parameters['text'].upper()}@{context.project_name}",
+        )
+
+
+@pytest.fixture
+def runner():
+    runner = ScriptRunner(max_workers=2, cpu_seconds=2, memory_mb=512)
+    yield runner
+    runner.shutdown()
+
+
+@pytest.fixture
+def tool_service(runner):
+    service = ToolService(runner)
+    service.register_tool(EchoTool())
+    return service
+
+
+def write_script(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+def test_concurrent_scripts_have_their_own_stdout_and_argv(tool_service):
+    script = (
+        "import sys, time\n"
+        "print('start', sys.argv[1:])\n"
+        "time.sleep(0.5)\n"
+        "print('end', sys.argv[0].endswith('job.py'))\n"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_script(tmp, "job.py", script)
+
+        async def run_all():
+            return await asyncio.gather(*[tool_service.execute_script(path, [str(i)]) for i in range(2)])
+
+        started = time.monotonic()
+        outputs = asyncio.run(run_all())
+        elapsed = time.monotonic() - started
+
+    assert outputs == ["start ['0']\nend True", "start ['1']\nend True"]
+    # Both scripts slept at the same time
+    assert elapsed < 1.0 + 0.5
+
+
+def test_event_loop_keeps_running_while_script_runs(tool_service):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_script(tmp, "busy.py", "import time\ntime.sleep(0.5)\nprint('done')\n")
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.05)
+                    ticks += 1
+
+            task = asyncio.ensure_future(ticker())
+            output = await tool_service.execute_script(path)
+            task.cancel()
+            return output, ticks
+
+        output, ticks = asyncio.run(run())
+
+    assert output == "done"
+    assert ticks >= 5
+
+
+def test_script_tool_calls_run_in_main_process(tool_service):
+    script = (
+        "print(execute_tool('echo', {'text': 'hello'}))\n"
+        "print(tool_context.project_name)\n"
+        "try:\n"
+        "    execute_tool('missing', {})\n"
+        "except RuntimeError as e:\n"
+        "    print('error:', e)\n"
+    )
+    context = ToolContext(project_name="demo")
+    output = asyncio.run(tool_service.execute_script_content(script, context=context))
+
+    assert output.splitlines() == ["HELLO@demo", "demo", "error: Tool 'missing' not found"]
+
+
+def test_cpu_time_limit(runner, tool_service):
+    runner.cpu_seconds = 1
+    with pytest.raises(RuntimeError, match="CPU time limit exceeded"):
+        asyncio.run(tool_service.execute_script_content("while True:\n    pass\n"))
+
+    # The pool replaces the killed worker
+    assert asyncio.run(tool_service.execute_script_content("print('ok')")) == "ok"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="limits are not enforced on Windows")
+def test_memory_limit(runner, tool_service):
+    runner.memory_mb = 256
+    with pytest.raises(RuntimeError, match="memory limit of 256 MB exceeded"):
+        asyncio.run(tool_service.execute_script_content("data = bytearray(512 * 1024 * 1024)\n"))
+
+    # The limit only applies while a script runs
+    assert asyncio.run(tool_service.execute_script_content("print('ok')")) == "ok"
+
+
+def test_errors_are_mapped(tool_service):
+    with pytest.raises(ValueError, match="Syntax error in script"):
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(tool_service.execute_script(write_script(tmp, "bad.py", "def broken(:\n")))
+
+    with pytest.raises(FileNotFoundError, match="Script file not found"):
+        asyncio.run(tool_service.execute_script("/nonexistent/script.py"))
+
+    with pytest.raises(RuntimeError, match="Execution error: boom"):
+        asyncio.run(tool_service.execute_script_content("raise ValueError('boom')\n"))
+
+    with pytest.raises(RuntimeError, match="exit status 2"):
+        asyncio.run(tool_service.execute_script_content("import sys\nsys.exit(2)\n"))
+
+
+def test_timeout_kills_script(runner):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_script(tmp, "slow.py", "import time\ntime.sleep(10)\n")
+
+        async def never_called(name, params):
+            raise AssertionError("unexpected tool call")
+
+        started = time.monotonic()
+        with pytest.raises(RuntimeError, match="timed out"):
+            asyncio.run(runner.run(path, [], tmp, {}, never_called, timeout=0.5))
+
+    assert time.monotonic() - started < 5
@@ -0,0 +1,78 @@
+"""
+Tests for the export segment cache (app.data.segment_cache).
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.segment_cache import SegmentCache, main
+
+
+def put(cache, key, size=100):
+    with open(cache.temp_path(key), "wb") as f:
+        f.write(b"x" * size)
+    return cache.store(key, cache.temp_path(key))
+
+
+def test_lookup_store_and_persistence():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SegmentCache(tmp)
+        assert cache.lookup("a") is None
+        path = put(cache, "a")
+        assert path == cache.segment_path("a")
+        assert not os.path.exists(cache.temp_path("a"))
+        assert cache.lookup("a") == path
+
+        reopened = SegmentCache(tmp)
+        assert reopened.lookup("a") == path
+        stats = reopened.get_stats()
+        assert stats["entries"] == 1
+        assert stats["size_bytes"] == 100
+
+        # A segment modified outside the cache is dropped
+        with open(path, "ab") as f:
+            f.write(b"y")
+        assert reopened.lookup("a") is None
+        assert not os.path.exists(path)
+
+
+def test_trim_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SegmentCache(tmp, max_bytes=250)
+        for key in ("a", "b", "c"):
+            put(cache, key)
+            time.sleep(0.01)
+        cache.lookup("a")
+
+        # "b" is the least recently used, but belongs to the running export
+        cache.trim(keep={"b"})
+        assert cache.lookup("b") and cache.lookup("a")
+        assert cache.lookup("c") is None
+        assert cache.get_stats()["size_bytes"] == 200
+
+
+def test_validate_repairs_the_cache(capsys):
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache", "export_segments")
+        cache = SegmentCache(cache_dir)
+        for key in ("ok", "missing", "modified"):
+            put(cache, key)
+        os.remove(cache.segment_path("missing"))
+        with open(cache.segment_path("modified"), "ab") as f:
+            f.write(b"y")
+        with open(cache.temp_path("interrupted"), "wb") as f:
+            f.write(b"partial")
+        with open(os.path.join(cache_dir, "orphan.mp4"), "wb") as f:
+            f.write(b"orphan")
+
+        report = cache.validate()
+        assert report == {"checked": 3, "missing": 1, "modified": 1, "corrupt": 0, "orphans": 2}
+        assert sorted(os.listdir(cache_dir)) == ["index.json", "ok.mp4"]
+        assert cache.validate()["orphans"] == 0
+
+        assert main(["validate", tmp]) == 0
+        assert "checked: 1" in capsys.readouterr().out
+        assert main(["stats", os.path.join(tmp, "nope")]) == 1
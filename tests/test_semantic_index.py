@@ -0,0 +1,248 @@
+"""
+Tests for the semantic index (agent.retrieval) and the search_project_context tool.
+"""
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent.chat.conversation import ConversationManager, Message, MessageRole
+from agent.retrieval import Embedder, NumpyVectorIndex, SemanticIndex
+from agent.tool.system import SearchProjectContextTool
+from agent.tool.tool_context import ToolContext
+from app.data.resource import ResourceManager
+from app.data.screen_play.screen_play_manager import ScreenPlayManager
+
+DIM = 64
+
+
+class FakeEmbeddingService:
+    """Bag-of-words embeddings: texts sharing words are similar."""
+    embedding_model = "fake-embedding"
+
+    def __init__(self):
+        self.batches = []
+
+    async def aembedding(self, model, input_text):
+        texts = [input_text] if isinstance(input_text, str) else input_text
+        self.batches.append(len(texts))
+        data = []
+        for i, text in enumerate(texts):
+            vector = np.zeros(DIM)
+            for word in text.lower().split():
+                word = word.strip(".,:;!?-")
+                if word:
+                    vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM] += 1
+            data.append({"object": "embedding", "index": i, "embedding": vector.tolist()})
+        return {"data": data}
+
+
+class FakeProject:
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.project_name = "demo"
+        self.conversation_manager = ConversationManager()
+        self.screenplay_manager = ScreenPlayManager(project_path)
+        self.resource_manager = ResourceManager(project_path)
+
+    def get_conversation_manager(self):
+        return self.conversation_manager
+
+    def get_screenplay_manager(self):
+        return self.screenplay_manager
+
+    def get_resource_manager(self):
+        return self.resource_manager
+
+
+@pytest.fixture
+def project():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield FakeProject(tmp)
+
+
+def make_index(project, service, batch_size=64):
+    return SemanticIndex(project, Embedder(service, batch_size=batch_size), backend="numpy")
+
+
+def test_vector_index_persists_and_reuses_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = NumpyVectorIndex(tmp)
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(300, 8)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        for i, vector in enumerate(vectors):
+            index.upsert(f"doc{i}", vector, {"source": "scene" if i % 2 else "resource"})
+        index.remove("doc5")
+        index.save()
+
+        reopened = NumpyVectorIndex(tmp)
+        assert len(reopened) == 299
+        assert isinstance(reopened._vectors, np.memmap)
+        best = reopened.search(vectors[7], top_k=3)
+        assert best[0]["doc_id"] == "doc7"
+        assert best[0]["score"] == pytest.approx(1.0, abs=1e-5)
+        assert [r["score"] for r in best] == sorted([r["score"] for r in best], reverse=True)
+        filtered = reopened.search(vectors[7], top_k=5, entry_filter=lambda e: e["source"] == "resource")
+        assert all(int(r["doc_id"][3:]) % 2 == 0 for r in filtered)
+        assert "doc5" not in [r["doc_id"] for r in reopened.search(vectors[5], top_k=300)]
+
+        # The free row is reused
+        row = reopened.upsert("new", vectors[5], {"source": "scene"})
+        assert row == 5
+
+
+def test_sync_embeds_only_changes_in_batches(project):
+    service = FakeEmbeddingService()
+    manager = project.conversation_manager
+    conversation = manager.create_conversation(project.project_path, title="Planning")
+    for i in range(5):
+        manager.add_message(project.project_path, conversation.conversation_id, Message(
+            role=MessageRole.USER, content=f"note {i} about the budget", timestamp="t"))
+    manager.add_message(project.project_path, conversation.conversation_id, Message(
+        role=MessageRole.TOOL, content="tool output", timestamp="t", tool_call_id="x"))
+    project.screenplay_manager.create_scene("scene_001", "Harbor", "The ship leaves the harbor at dawn.",
+                                            {"location": "harbor", "characters": ["Mara"]})
+    project.screenplay_manager.create_scene("scene_002", "Desert", "A caravan crosses the desert.")
+
+    index = make_index(project, service, batch_size=3)
+    assert asyncio.run(index.sync()) == 7
+    assert service.batches == [3, 3, 1]
+
+    # Nothing changed: no embedding requests
+    service.batches.clear()
+    assert asyncio.run(index.sync()) == 0
+    assert service.batches == []
+
+    # One new message, one changed scene, one deleted scene
+    manager.add_message(project.project_path, conversation.conversation_id, Message(
+        role=MessageRole.ASSISTANT, content="the budget is approved", timestamp="t"))
+    project.screenplay_manager.update_scene("scene_001", content="The ship returns to the harbor at night.")
+    project.screenplay_manager.delete_scene("scene_002")
+    assert asyncio.run(index.sync()) == 2
+    assert service.batches == [2]
+    assert "scene:scene_002" not in index.vectors
+    assert len(index.vectors) == 7
+
+    # The state survives reopening the index
+    reopened = make_index(project, service)
+    service.batches.clear()
+    assert asyncio.run(reopened.sync()) == 0
+
+
+def test_search_returns_top_k_by_source(project):
+    service = FakeEmbeddingService()
+    manager = project.conversation_manager
+    conversation = manager.create_conversation(project.project_path)
+    manager.add_message(project.project_path, conversation.conversation_id, Message(
+        role=MessageRole.USER, content="we should film the desert caravan scene at sunset", timestamp="t"))
+    project.screenplay_manager.create_scene("scene_001", "Harbor", "The ship leaves the harbor at dawn.")
+    project.screenplay_manager.create_scene("scene_002", "Desert", "A caravan crosses the desert at sunset.")
+
+    index = make_index(project, service)
+    results = asyncio.run(index.search("desert caravan sunset", top_k=2))
+    assert len(results) == 2
+    assert {r["doc_id"] for r in results} == {"scene:scene_002", f"conversation:{conversation.conversation_id}:0"}
+
+    scenes = asyncio.run(index.search("desert caravan sunset", top_k=1, sources=["scene"]))
+    assert [r["doc_id"] for r in scenes] == ["scene:scene_002"]
+    assert scenes[0]["title"] == "Desert"
+    assert "caravan" in scenes[0]["text"]
+
+    # Changing the embedding model rebuilds the index
+    service.embedding_model = "other-embedding"
+    rebuilt = SemanticIndex(project, Embedder(service), backend="numpy")
+    assert len(rebuilt.vectors) == 0
+    assert asyncio.run(rebuilt.sync()) == 3
+
+
+def test_search_project_context_tool(project):
+    from agent.retrieval import semantic_index_service
+    semantic_index_service.clear()
+    project.screenplay_manager.create_scene("scene_001", "Desert", "A caravan crosses the desert.")
+    context = ToolContext(workspace=SimpleNamespace(get_project=lambda: project), project_name="demo",
+                          llm_service=FakeEmbeddingService())
+
+    async def run(parameters):
+        return [event async for event in SearchProjectContextTool().execute(parameters, context)]
+
+    events = asyncio.run(run({"query": "caravan", "top_k": 3, "sources": "scene"}))
+    assert events[-1].event_type == "tool_end"
+    result = events[-1].payload["result"]
+    assert [r["title"] for r in result] == ["Desert"]
+    assert set(result[0]) == {"source", "title", "text", "score"}
+
+    events = asyncio.run(run({}))
+    assert events[-1].event_type == "error"
+    semantic_index_service.clear()
+
+
+class FailingEmbeddingService(FakeEmbeddingService):
+    """Fails every request after the first `ok_requests`."""
+
+    def __init__(self, ok_requests):
+        super().__init__()
+        self.ok_requests = ok_requests
+
+    async def aembedding(self, model, input_text):
+        if len(self.batches) >= self.ok_requests:
+            raise ConnectionError("embedding service unavailable")
+        return await super().aembedding(model, input_text)
+
+
+def test_interrupted_sync_keeps_embedded_batches(project):
+    for i in range(5):
+        project.screenplay_manager.create_scene(f"scene_{i:03d}", f"Scene {i}", f"Shot number {i}.")
+
+    failing = FailingEmbeddingService(ok_requests=1)
+    index = SemanticIndex(project, Embedder(failing, batch_size=2, concurrency=1), backend="numpy")
+    with pytest.raises(ConnectionError):
+        asyncio.run(index.sync())
+
+    # The first batch was saved, the next sync embeds only the rest
+    service = FakeEmbeddingService()
+    reopened = make_index(project, service)
+    assert len(reopened.vectors) == 2
+    assert asyncio.run(reopened.sync()) == 3
+    assert service.batches == [3]
+
+
+class GatedEmbeddingService(FakeEmbeddingService):
+    """Holds requests mentioning the forest until the gate opens."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = None
+
+    async def aembedding(self, model, input_text):
+        texts = [input_text] if isinstance(input_text, str) else input_text
+        if any("Forest" in text for text in texts):
+            await self.gate.wait()
+        return await super().aembedding(model, input_text)
+
+
+def test_search_answers_from_index_while_syncing(project):
+    project.screenplay_manager.create_scene("scene_001", "Harbor", "The ship leaves the harbor at dawn.")
+    service = GatedEmbeddingService()
+    index = make_index(project, service)
+    asyncio.run(index.sync())
+    project.screenplay_manager.create_scene("scene_002", "Forest", "Wolves howl in the forest.")
+
+    async def run():
+        service.gate = asyncio.Event()
+        before = await index.search("forest wolves", top_k=2)
+        service.gate.set()
+        await index._sync_task
+        after = await index.search("forest wolves", top_k=2)
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert [r["doc_id"] for r in before] == ["scene:scene_001"]
+    assert after[0]["doc_id"] == "scene:scene_002"
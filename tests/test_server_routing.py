@@ -0,0 +1,231 @@
+"""Tests for routing strategies and circuit breaking in ServerManager."""
+import asyncio
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.api.types import FilmetoTask, ToolType
+from server.plugins.plugin_manager import PluginManager
+from server.routing import CircuitBreaker, ConsistentHashStrategy, ServerStats
+from server.server import RoutingRule, ServerManager
+
+
+class _FakeConfig:
+    def __init__(self, name):
+        self.name = name
+        self.plugin_name = "fake"
+
+
+class _FakeServer:
+    def __init__(self, name, fail=False, delay=0.0):
+        self.config = _FakeConfig(name)
+        self.name = name
+        self.is_enabled = True
+        self.fail = fail
+        self.no_result = False
+        self.delay = delay
+        self.calls = 0
+
+    async def execute_task(self, task):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        if self.no_result:
+            # The plugin exited before answering
+            return
+        yield {"jsonrpc": "2.0", "result": {"task_id": task.task_id, "status": "success"}, "id": 1}
+
+
+def _task(project=None):
+    metadata = {"project_name": project} if project else {}
+    return FilmetoTask(tool_name=ToolType.TEXT2IMAGE, plugin_name="fake", parameters={}, metadata=metadata)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    ServerManager._instance = None
+    manager = ServerManager(str(tmp_path / "workspace"), PluginManager(str(tmp_path / "plugins")))
+    manager.servers = {name: _FakeServer(name) for name in ("comfy1", "comfy2", "comfy3")}
+    yield manager
+    ServerManager._instance = None
+
+
+def _use_rule(manager, strategy):
+    manager.routing_rules = [RoutingRule(
+        name="comfy", server_name="comfy1", fallback_servers=["comfy2", "comfy3"], strategy=strategy
+    )]
+
+
+def _run(manager, task):
+    async def collect():
+        return [m async for m in manager.execute_task_with_routing(task)]
+    return asyncio.run(collect())
+
+
+def test_rule_strategy_round_trips_through_dict():
+    rule = RoutingRule(name="r", server_name="a", strategy="round_robin")
+    assert RoutingRule.from_dict(rule.to_dict()).strategy == "round_robin"
+    assert RoutingRule.from_dict({"name": "r", "server_name": "a"}).strategy == "priority"
+
+
+def test_priority_keeps_configured_order(manager):
+    _use_rule(manager, "priority")
+    names = [s.name for s in manager.route_task_with_fallback(_task())]
+    assert names == ["comfy1", "comfy2", "comfy3"]
+
+
+def test_unknown_strategy_falls_back_to_priority_once(manager, caplog):
+    _use_rule(manager, "fastest")
+    with caplog.at_level("WARNING", logger="server.routing"):
+        orders = [[s.name for s in manager.route_task_with_fallback(_task())] for _ in range(3)]
+    assert orders == [["comfy1", "comfy2", "comfy3"]] * 3
+    assert len([r for r in caplog.records if "Unknown routing strategy" in r.message]) == 1
+
+    # The same strategy object is reused until the configured name changes
+    strategy = manager._get_rule_strategy(manager.routing_rules[0])
+    assert manager._get_rule_strategy(manager.routing_rules[0]) is strategy
+    _use_rule(manager, "round_robin")
+    assert manager._get_rule_strategy(manager.routing_rules[0]).name == "round_robin"
+
+
+def test_round_robin_spreads_primaries(manager):
+    _use_rule(manager, "round_robin")
+    primaries = Counter(manager.route_task(_task()).name for _ in range(9))
+    assert primaries == {"comfy1": 3, "comfy2": 3, "comfy3": 3}
+
+
+def test_least_in_flight_prefers_idle_server(manager):
+    _use_rule(manager, "least_in_flight")
+    manager.get_server_stats("comfy1").in_flight = 2
+    manager.get_server_stats("comfy2").in_flight = 1
+    names = [s.name for s in manager.route_task_with_fallback(_task())]
+    assert names == ["comfy3", "comfy2", "comfy1"]
+
+
+def test_ewma_latency_prefers_fast_server_and_probes_unknown(manager):
+    _use_rule(manager, "ewma_latency")
+    manager.get_server_stats("comfy1").on_start()
+    manager.get_server_stats("comfy1").on_success(10.0)
+    manager.get_server_stats("comfy2").on_start()
+    manager.get_server_stats("comfy2").on_success(2.0)
+    assert [s.name for s in manager.route_task_with_fallback(_task())] == ["comfy3", "comfy2", "comfy1"]
+
+    manager.get_server_stats("comfy3").on_start()
+    manager.get_server_stats("comfy3").on_success(5.0)
+    assert manager.route_task(_task()).name == "comfy2"
+
+
+def test_consistent_hash_pins_projects(manager):
+    _use_rule(manager, "consistent_hash")
+    projects = [f"project-{i}" for i in range(30)]
+    first = {p: manager.route_task(_task(p)).name for p in projects}
+    again = {p: manager.route_task(_task(p)).name for p in projects}
+
+    assert first == again
+    assert len(set(first.values())) == 3
+
+    # Removing a server only moves the projects it owned
+    manager.servers["comfy3"].is_enabled = False
+    moved = {p: manager.route_task(_task(p)).name for p in projects}
+    assert all(moved[p] == first[p] for p in projects if first[p] != "comfy3")
+
+
+def test_consistent_hash_ring_is_rebuilt_only_when_servers_change():
+    strategy = ConsistentHashStrategy()
+    strategy._build_ring(["a", "b"])
+    ring = strategy._ring
+    strategy._build_ring(["b", "a"])
+    assert strategy._ring is ring
+
+
+def test_execution_tracks_latency_and_in_flight(manager):
+    _use_rule(manager, "priority")
+    manager.servers["comfy1"].delay = 0.02
+
+    messages = _run(manager, _task())
+
+    assert messages[-1]["result"]["status"] == "success"
+    stats = manager.get_routing_stats()["comfy1"]
+    assert stats["completed"] == 1 and stats["in_flight"] == 0
+    assert stats["ewma_latency"] >= 0.02
+
+
+def test_failing_server_trips_circuit_and_leaves_rotation(manager):
+    _use_rule(manager, "priority")
+    manager.servers["comfy1"].fail = True
+
+    for _ in range(3):
+        assert _run(manager, _task())[-1]["result"]["status"] == "success"
+
+    assert manager.servers["comfy1"].calls == 3
+    assert manager.get_routing_stats()["comfy1"]["circuit"] == "open"
+
+    _run(manager, _task())
+    assert manager.servers["comfy1"].calls == 3
+    assert [s.name for s in manager.route_task_with_fallback(_task())] == ["comfy2", "comfy3"]
+
+
+def test_circuit_breaker_half_open_trial():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    stats = ServerStats("s", breaker)
+    for _ in range(2):
+        stats.on_start()
+        stats.on_failure()
+    assert not stats.is_available
+
+    now[0] = 11
+    assert stats.is_available
+    stats.on_start()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one trial task at a time
+    assert not stats.is_available
+    stats.on_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not stats.is_available
+
+    now[0] = 22
+    stats.on_start()
+    stats.on_success(1.0)
+    assert breaker.state == CircuitBreaker.CLOSED and stats.is_available
+    assert breaker.trips == 2
+
+
+def test_stream_without_result_fails_over(manager):
+    _use_rule(manager, "priority")
+    manager.servers["comfy1"].no_result = True
+
+    messages = _run(manager, _task())
+
+    assert messages[-1]["result"]["status"] == "success"
+    assert manager.servers["comfy2"].calls == 1
+    stats = manager.get_routing_stats()
+    assert stats["comfy1"]["failed"] == 1 and stats["comfy1"]["in_flight"] == 0
+    assert stats["comfy2"]["completed"] == 1
+
+
+def test_recovered_fallback_gets_a_half_open_trial(manager):
+    _use_rule(manager, "priority")
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    manager.server_stats["comfy2"] = ServerStats("comfy2", breaker)
+    manager.servers["comfy1"].fail = True
+    manager.servers["comfy2"].fail = True
+    _run(manager, _task())
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # The primary is healthy again, so the fallback would never be reached
+    manager.servers["comfy1"].fail = False
+    manager.servers["comfy2"].fail = False
+    manager.get_server_stats("comfy1").on_success(0.1)
+    assert [s.name for s in manager.route_task_with_fallback(_task())] == ["comfy1", "comfy3"]
+
+    now[0] = 11
+    assert [s.name for s in manager.route_task_with_fallback(_task())] == ["comfy2", "comfy1", "comfy3"]
+    assert _run(manager, _task())[-1]["result"]["status"] == "success"
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert [s.name for s in manager.route_task_with_fallback(_task())] == ["comfy1", "comfy2", "comfy3"]
@@ -0,0 +1,160 @@
+"""Tests for the persistent task registry behind /api/v1/tasks."""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.api.types import (
+    FilmetoTask, ProgressType, ResourceInput, ResourceType, TaskProgress, TaskResult, ToolType, ValidationError
+)
+from server.service.task_registry import TaskRegistry
+
+
+def _task():
+    return FilmetoTask(tool_name=ToolType.TEXT2IMAGE, plugin_name="fake", parameters={"prompt": "cat"})
+
+
+class _FakeExecution:
+    """Counts executions and emits progress steps gated by an event."""
+
+    def __init__(self, steps=3, fail_with=None):
+        self.steps = steps
+        self.fail_with = fail_with
+        self.calls = 0
+        self.release = None
+
+    async def __call__(self, task):
+        self.calls += 1
+        for i in range(self.steps):
+            if self.release is not None and i == 1:
+                await self.release.wait()
+            yield TaskProgress(task_id=task.task_id, type=ProgressType.PROGRESS, percent=i * 30, message=f"step {i}")
+        if self.fail_with:
+            raise self.fail_with
+        yield TaskResult(task_id=task.task_id, status="success", output_files=["/tmp/out.png"])
+
+
+async def _collect(registry, task_id, last_event_id=0):
+    return [event async for event in registry.watch(task_id, last_event_id)]
+
+
+def test_task_runs_once_and_records_status(tmp_path):
+    async def scenario():
+        registry = TaskRegistry(str(tmp_path))
+        execution = _FakeExecution()
+        task = _task()
+        registry.submit(task, execution)
+        registry.submit(task, execution)
+        await registry.wait(task.task_id)
+        return execution.calls, registry.get_status(task.task_id)
+
+    calls, status = asyncio.run(scenario())
+
+    assert calls == 1
+    assert status["status"] == "success"
+    assert status["percent"] == 100.0
+    assert status["last_event_id"] == 4
+    assert status["result"]["output_files"] == ["/tmp/out.png"]
+
+
+def test_many_watchers_and_resume_after_last_event_id(tmp_path):
+    async def scenario():
+        registry = TaskRegistry(str(tmp_path))
+        execution = _FakeExecution()
+        execution.release = asyncio.Event()
+        task = _task()
+        registry.submit(task, execution)
+        watchers = [asyncio.create_task(_collect(registry, task.task_id)) for _ in range(3)]
+        resumed = asyncio.create_task(_collect(registry, task.task_id, last_event_id=2))
+        await asyncio.sleep(0.01)
+        execution.release.set()
+        return await asyncio.gather(*watchers), await resumed
+
+    watchers, resumed = asyncio.run(scenario())
+
+    for events in watchers:
+        assert [e["id"] for e in events] == [1, 2, 3, 4]
+        assert events[-1]["type"] == "result"
+    assert [e["id"] for e in resumed] == [3, 4]
+
+
+def test_errors_are_recorded(tmp_path):
+    async def scenario():
+        registry = TaskRegistry(str(tmp_path))
+        task = _task()
+        registry.submit(task, _FakeExecution(steps=1, fail_with=ValidationError("bad prompt")))
+        await registry.wait(task.task_id)
+        return await _collect(registry, task.task_id), registry.get_status(task.task_id)
+
+    events, status = asyncio.run(scenario())
+
+    assert events[-1]["type"] == "error"
+    assert events[-1]["data"]["code"] == "VALIDATION_ERROR"
+    assert status["status"] == "error"
+    assert status["error"]["message"] == "bad prompt"
+
+
+def test_evicted_and_restarted_tasks_reload_from_log(tmp_path):
+    async def run_tasks():
+        registry = TaskRegistry(str(tmp_path), max_tasks=2)
+        tasks = [_task() for _ in range(3)]
+        for task in tasks:
+            registry.submit(task, _FakeExecution())
+            await registry.wait(task.task_id)
+        in_memory = len(registry)
+        replay = await _collect(registry, tasks[0].task_id, last_event_id=3)
+        return tasks, in_memory, replay
+
+    tasks, in_memory, replay = asyncio.run(run_tasks())
+
+    assert in_memory == 2
+    assert [e["type"] for e in replay] == ["result"]
+
+    # A new registry (e.g. after a server restart) reads the logs back
+    restarted = TaskRegistry(str(tmp_path))
+    status = restarted.get_status(tasks[1].task_id)
+    assert status["status"] == "success" and status["last_event_id"] == 4
+    assert restarted.get_status("missing") is None
+
+
+def test_unfinished_task_is_interrupted_after_restart(tmp_path):
+    async def scenario():
+        registry = TaskRegistry(str(tmp_path))
+        task = _task()
+        registry.submit(task, _FakeExecution())
+        await registry.wait(task.task_id)
+        return task
+
+    task = asyncio.run(scenario())
+    # Simulate a crash mid-task: the log stops after the first progress event
+    log_path = TaskRegistry(str(tmp_path))._log_path(task.task_id)
+    lines = log_path.read_text(encoding='utf-8').splitlines(keepends=True)
+    log_path.write_text("".join(lines[:2]) + '{"id": 2, "ty', encoding='utf-8')
+
+    status = TaskRegistry(str(tmp_path)).get_status(task.task_id)
+    assert status["status"] == "interrupted"
+    assert status["last_event_id"] == 1
+
+
+def test_log_names_are_unique_and_large_inputs_are_not_logged(tmp_path):
+    registry = TaskRegistry(str(tmp_path))
+    assert registry._log_path("a/b") != registry._log_path("ab")
+    assert registry._log_path("../x").parent == tmp_path
+
+    async def scenario():
+        task = _task()
+        task.resources.append(ResourceInput(type=ResourceType.BASE64, data="A" * 100000, mime_type="image/png"))
+        registry.submit(task, _FakeExecution())
+        await registry.wait(task.task_id)
+        return task
+
+    task = asyncio.run(scenario())
+
+    log_text = registry._log_path(task.task_id).read_text(encoding='utf-8')
+    assert "A" * 100 not in log_text
+    assert "100000 characters omitted" in log_text
+    status = TaskRegistry(str(tmp_path)).get_status(task.task_id)
+    assert status["status"] == "success" and status["tool_name"] == task.tool_name
@@ -0,0 +1,162 @@
+"""
+Tests for the segment-based timeline export (app.data.timeline_export).
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtGui import QImage, QColor
+
+from app.data.timeline_export import (
+    ExportSettings, TimelineExporter, compute_segment_key, detect_resolution, DEFAULT_RESOLUTION
+)
+from app.data.segment_cache import SegmentCache
+from utils.ffmpeg_utils import check_ffmpeg
+
+
+class FakeItem:
+    """The media accessors of TimelineItem."""
+
+    def __init__(self, root, index):
+        self.index = index
+        item_path = os.path.join(root, str(index))
+        os.makedirs(item_path, exist_ok=True)
+        self.image_path = os.path.join(item_path, "image.png")
+        self.video_path = os.path.join(item_path, "video.mp4")
+
+    def get_image_path(self):
+        return self.image_path
+
+    def get_video_path(self):
+        return self.video_path
+
+
+def write_image(path, width=64, height=36, color="red"):
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor(color))
+    assert image.save(path)
+
+
+def test_plan_keys_and_resolution(caplog):
+    with tempfile.TemporaryDirectory() as tmp:
+        items = [FakeItem(tmp, i) for i in (1, 2, 3)]
+        write_image(items[0].image_path, 101, 57)
+        write_image(items[2].image_path, color="blue")
+        exporter = TimelineExporter(SegmentCache(os.path.join(tmp, "segments")), ExportSettings(fps=24))
+
+        assert detect_resolution(items) == (100, 56)
+        assert detect_resolution([items[1]]) == DEFAULT_RESOLUTION
+
+        with caplog.at_level("WARNING"):
+            segments = exporter.plan(items, {1: 2.5, 3: 1.0})
+        # Items without media are skipped (and logged), images keep their own duration
+        assert [s.index for s in segments] == [1, 3]
+        assert "[2]" in caplog.text
+        assert [s.duration for s in segments] == [2.5, 1.0]
+        assert all(s.is_image for s in segments)
+        assert segments[0].key != segments[1].key
+
+        settings = ExportSettings(fps=24)
+        key = compute_segment_key(items[0].image_path, 2.5, settings)
+        assert key == segments[0].key
+        assert compute_segment_key(items[0].image_path, 3.0, settings) != key
+        assert compute_segment_key(items[0].image_path, 2.5, ExportSettings(fps=30)) != key
+        assert compute_segment_key(items[1].image_path, 2.5, settings) is None
+
+        # A video takes precedence over the image of the same item
+        with open(items[2].video_path, "wb") as f:
+            f.write(b"not really a video")
+        segment = exporter.plan([items[2]], {})[0]
+        assert segment.source_path == items[2].video_path
+        assert not segment.is_image
+        assert segment.duration == 1.0
+
+
+def test_cached_segments_are_not_rendered_again():
+    with tempfile.TemporaryDirectory() as tmp:
+        items = [FakeItem(tmp, i) for i in (1, 2)]
+        for item in items:
+            write_image(item.image_path)
+        cache = SegmentCache(os.path.join(tmp, "segments"))
+        exporter = TimelineExporter(cache, ExportSettings())
+        segments = exporter.plan(items, {})
+        # Identical content and duration share one segment
+        assert segments[0].key == segments[1].key
+        with open(cache.temp_path(segments[0].key), "wb") as f:
+            f.write(b"rendered")
+        cache.store(segments[0].key, cache.temp_path(segments[0].key))
+
+        progress = []
+        assert asyncio.run(exporter.render_segments(segments, lambda done, total: progress.append((done, total))))
+        assert progress == [(2, 2)]
+        assert segments[0].path == segments[1].path == cache.segment_path(segments[0].key)
+        assert cache.get_stats()["hits"] == 2
+
+
+def test_duplicated_items_are_rendered_once(monkeypatch):
+    import app.data.timeline_export as timeline_export
+
+    rendered = []
+
+    async def fake_normalize(source_path, output_path, duration, **kwargs):
+        rendered.append(output_path)
+        await asyncio.sleep(0.01)
+        with open(output_path, "wb") as f:
+            f.write(b"rendered")
+        return True
+
+    monkeypatch.setattr(timeline_export, "normalize_to_segment", fake_normalize)
+    with tempfile.TemporaryDirectory() as tmp:
+        items = [FakeItem(tmp, i) for i in (1, 2, 3)]
+        for item in items:
+            write_image(item.image_path)
+        exporter = TimelineExporter(SegmentCache(os.path.join(tmp, "segments")), ExportSettings())
+        segments = exporter.plan(items, {})
+
+        progress = []
+        assert asyncio.run(exporter.render_segments(segments, lambda done, total: progress.append((done, total))))
+        assert len(rendered) == 1
+        assert progress == [(3, 3)]
+        assert all(os.path.exists(segment.path) for segment in segments)
+
+
+@pytest.mark.skipif(not check_ffmpeg(), reason="ffmpeg is not installed")
+def test_export_mixed_items():
+    with tempfile.TemporaryDirectory() as tmp:
+        items = [FakeItem(tmp, i) for i in (1, 2, 3)]
+        write_image(items[0].image_path, color="red")
+        write_image(items[1].image_path, color="green")
+        write_image(items[2].image_path, color="blue")
+        exporter = TimelineExporter(SegmentCache(os.path.join(tmp, "segments")), ExportSettings(fps=10, width=64, height=36))
+
+        # Turn item 2 into a video item, with a different size and frame rate
+        video_exporter = TimelineExporter(SegmentCache(os.path.join(tmp, "video")), ExportSettings(fps=25, width=32, height=18))
+        video_segment = video_exporter.plan([items[1]], {2: 0.5})[0]
+        assert asyncio.run(video_exporter.render_segments([video_segment]))
+        os.replace(video_segment.path, items[1].video_path)
+
+        segments = exporter.plan(items, {1: 1.0, 2: 1.0, 3: 0.5})
+        progress = []
+        assert asyncio.run(exporter.render_segments(segments, lambda done, total: progress.append(done)))
+        assert sorted(progress) == [1, 2, 3]
+
+        output_path = os.path.join(tmp, "out.mp4")
+        assert asyncio.run(exporter.write_video(segments, output_path))
+        import cv2
+        capture = cv2.VideoCapture(output_path)
+        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        capture.release()
+        assert frames == 25
+
+        # Only the changed item is rendered again
+        write_image(items[2].image_path, color="white")
+        segments = exporter.plan(items, {1: 1.0, 2: 1.0, 3: 0.5})
+        progress = []
+        assert asyncio.run(exporter.render_segments(segments, lambda done, total: progress.append(done)))
+        assert progress == [2, 3]
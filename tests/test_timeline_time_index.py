@@ -0,0 +1,82 @@
+"""
+Tests for the timeline time index (prefix sums of item durations).
+"""
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from app.data.timeline_time_index import TimelineTimeIndex
+
+
+def scan_locate(durations, position):
+    """The linear scan the index replaces."""
+    accumulated_time = 0.0
+    for i, duration in enumerate(durations):
+        if position < accumulated_time + duration:
+            return i + 1, position - accumulated_time
+        accumulated_time += duration
+    return len(durations), position - (accumulated_time - durations[-1])
+
+
+def test_index_lookups():
+    index = TimelineTimeIndex([2.0, 0.0, 1.5, 3])
+    assert index.item_count == 4
+    assert index.total_duration == 6.5
+    assert [index.get_item_start(i) for i in range(1, 6)] == [0.0, 2.0, 2.0, 3.5, 6.5]
+    assert index.get_item_duration(3) == 1.5
+
+    assert index.locate(0) == (1, 0.0)
+    assert index.locate(1.0) == (1, 1.0)
+    # Zero-length items are never playing
+    assert index.locate(2.0) == (3, 0.0)
+    assert index.locate(4.0) == (4, 0.5)
+    assert index.locate(-1.0) == (1, -1.0)
+    assert index.locate(10.0) == (4, 6.5)
+
+    assert TimelineTimeIndex([]).locate(1.0) == (0, 0.0)
+    assert TimelineTimeIndex([]).total_duration == 0.0
+
+
+def test_index_matches_linear_scan():
+    rng = random.Random(7)
+    durations = [rng.choice([0.0, 0.5, 1.0, rng.uniform(0.1, 9.0)]) for _ in range(500)]
+    index = TimelineTimeIndex(durations)
+    for _ in range(2000):
+        position = rng.uniform(0, index.total_duration)
+        item, offset = index.locate(position)
+        expected_item, expected_offset = scan_locate(durations, position)
+        assert item == expected_item
+        assert offset == pytest.approx(expected_offset)
+
+
+def test_project_rebuilds_index_after_changes():
+    from app.data.project import Project
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in (1, 2, 3):
+            os.makedirs(os.path.join(tmp, "timeline", str(i)))
+        project = Project(None, tmp, "demo", load_data=False)
+
+        index = project.get_time_index()
+        assert index.starts == [0.0, 1.0, 2.0, 3.0]
+        assert project.get_time_index() is index
+
+        project.set_item_duration(2, 2.5)
+        assert project.get_time_index().starts == [0.0, 1.0, 3.5, 4.5]
+        # The saved total only counts the durations set explicitly
+        assert project.calculate_timeline_duration() == 2.5
+        assert project.set_timeline_position(2.5)
+        assert not project.set_timeline_position(3.0)
+
+        # A new item extends the index
+        os.makedirs(os.path.join(tmp, "timeline", "4"))
+        project.get_timeline().refresh_count()
+        assert project.get_time_index().item_count == 4
+        assert project.get_time_index().total_duration == 5.5
+        assert project.calculate_timeline_duration() == 2.5
@@ -0,0 +1,151 @@
+"""
+Tests for the virtualized video timeline strip and its thumbnail cache.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QColor, QImage
+from PySide6.QtWidgets import QApplication, QWidget
+
+from app.ui.timeline.thumbnail_cache import ThumbnailCache
+from app.ui.timeline.video_timeline import VideoTimeline
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication(sys.argv)
+
+
+def write_image(path, color="#336699", size=(720, 1280)):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    image = QImage(size[0], size[1], QImage.Format_RGB32)
+    image.fill(QColor(color))
+    image.save(path)
+
+
+def wait_for(app, condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+class FakeTimeline:
+    def __init__(self, path, count):
+        self.path = path
+        self.count = count
+        self.index = None
+
+    def get_item_count(self):
+        return self.count
+
+    def get_item_image_path(self, index):
+        return os.path.join(self.path, str(index), "image.png")
+
+    def set_item_index(self, index):
+        self.index = index
+
+    def connect_timeline_changed(self, func):
+        pass
+
+    def connect_compose_progress(self, func):
+        self.compose_progress = func
+
+    def get_item(self, index):
+        raise AssertionError("The strip must not load timeline items")
+
+
+def make_workspace(project_path, count):
+    timeline = FakeTimeline(os.path.join(project_path, "timeline"), count)
+    project = SimpleNamespace(project_path=project_path, get_timeline=lambda: timeline,
+                              get_timeline_index=lambda: 1)
+    noop = lambda func: None
+    return SimpleNamespace(
+        get_project=lambda: project,
+        connect_project_switched=noop, connect_timeline_position=noop, connect_task_create=noop,
+        connect_task_finished=noop, connect_timeline_switch=noop, connect_layer_changed=noop,
+    )
+
+
+def test_thumbnail_cache(app):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "timeline", "1", "image.png")
+        write_image(source)
+        cache = ThumbnailCache(os.path.join(tmp, "cache"))
+        ready = []
+        cache.thumbnail_ready.connect(lambda path, pixmap: ready.append((path, pixmap)))
+
+        assert cache.request(source) is None
+        assert wait_for(app, lambda: ready)
+        assert ready[0][0] == source
+        assert ready[0][1].size() == QSize(90, 160)
+        assert cache.request(source).size() == QSize(90, 160)
+        first_file = cache.thumbnail_path(cache.source_key(source))
+        assert os.path.exists(first_file)
+        assert first_file.endswith((".webp", ".jpg"))
+
+        # A changed image gets a new thumbnail and the stale one is removed
+        write_image(source, color="#aa0000")
+        os.utime(source, ns=(time.time_ns() + 10 ** 9, time.time_ns() + 10 ** 9))
+        assert cache.request(source) is None
+        assert wait_for(app, lambda: len(ready) == 2)
+        assert not os.path.exists(first_file)
+        assert os.listdir(os.path.join(tmp, "cache")) == [os.path.basename(cache.thumbnail_path(cache.source_key(source)))]
+
+        # Missing images have no thumbnail
+        assert cache.request(os.path.join(tmp, "missing.png")) is None
+
+
+def test_strip_creates_only_visible_cards(app):
+    with tempfile.TemporaryDirectory() as tmp:
+        count = 300
+        for index in (1, 2, 3, count):
+            write_image(os.path.join(tmp, "timeline", str(index), "image.png"))
+        parent = QWidget()
+        parent.resize(600, 170)
+        strip = VideoTimeline(parent, make_workspace(tmp, count))
+        strip.resize(600, 170)
+        strip.show()
+        app.processEvents()
+
+        assert strip.get_card_count() == count
+        visible = len(strip.cards)
+        assert 0 < visible <= 600 // 95 + 2 + 2 * VideoTimeline.OVERSCAN_CARDS
+        assert min(strip.cards) == 1
+        assert strip.cards[1].is_selected()
+        assert wait_for(app, lambda: not strip.cards[1].content_label.pixmap().isNull())
+
+        # Scrolling to the end reuses the same widgets
+        created = visible + len(strip._card_pool)
+        scroll_bar = strip.scroll_area.horizontalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+        app.processEvents()
+        assert count in strip.cards
+        assert 1 not in strip.cards
+        assert len(strip.cards) + len(strip._card_pool) == created
+        assert strip.cards[count].x() == strip.get_card_x(count)
+        assert wait_for(app, lambda: not strip.cards[count].content_label.pixmap().isNull())
+
+        # Composition progress from a worker thread shows on the card until it completes
+        item = SimpleNamespace(get_index=lambda: count)
+        worker = threading.Thread(target=strip.workspace.get_project().get_timeline().compose_progress,
+                                  args=(None,), kwargs=dict(timeline_item=item, percent=40, logs=""))
+        worker.start()
+        worker.join()
+        progress_bar = strip.cards[count].progress_bar
+        assert wait_for(app, lambda: not progress_bar.isHidden())
+        assert progress_bar.value() == 40
+        strip.on_compose_progress(None, timeline_item=item, percent=100)
+        assert wait_for(app, lambda: progress_bar.isHidden())
+        strip.close()
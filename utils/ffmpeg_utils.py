@@ -10,7 +10,7 @@ import shutil
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Callable, List, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -132,6 +132,107 @@ async def run_command(cmd: List[str]) -> subprocess.CompletedProcess:
         return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
 
+def parse_ffmpeg_progress_line(line: str, state: dict) -> bool:
+    """
+    Parse one ``key=value`` line of ffmpeg's ``-progress`` output into ``state``.
+    
+    Args:
+        line: A line from the progress stream
+        state: Dict accumulating the fields of the current progress block
+        
+    Returns:
+        bool: True when the line closes a progress block (``progress=continue|end``)
+    """
+    line = line.strip()
+    if '=' not in line:
+        return False
+    key, value = line.split('=', 1)
+    state[key.strip()] = value.strip()
+    return key.strip() == 'progress'
+
+
+def progress_fraction(state: dict, duration: Optional[float]) -> Optional[float]:
+    """
+    Compute the completed fraction (0.0-1.0) of an ffmpeg job from a progress block.
+    
+    Args:
+        state: Fields of the last progress block
+        duration: Expected output duration in seconds, if known
+        
+    Returns:
+        float: Completed fraction, or None if it cannot be determined
+    """
+    if state.get('progress') == 'end':
+        return 1.0
+    if not duration or duration <= 0:
+        return None
+    out_time_us = state.get('out_time_us') or state.get('out_time_ms')
+    try:
+        # out_time_ms is (despite its name) also in microseconds
+        seconds = int(out_time_us) / 1_000_000
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, min(1.0, seconds / duration))
+
+
+async def run_command_with_progress(cmd: List[str], duration: Optional[float] = None,
+                                    progress_callback: Optional[Callable[[float, dict], None]] = None
+                                    ) -> subprocess.CompletedProcess:
+    """
+    Run an ffmpeg command and report progress parsed from ``-progress pipe:1``.
+    
+    ``-progress pipe:1 -nostats`` is inserted right after the executable, so
+    ``cmd`` should be a plain ffmpeg invocation.
+    
+    Args:
+        cmd: FFmpeg command to run as a list of strings
+        duration: Expected output duration in seconds, used to compute the fraction
+        progress_callback: Called with (fraction, fields) for every progress block
+        
+    Returns:
+        CompletedProcess: Result of the command execution; stdout holds the raw progress output
+    """
+    cmd = [cmd[0], '-progress', 'pipe:1', '-nostats'] + list(cmd[1:])
+    
+    if not (hasattr(asyncio, 'create_subprocess_exec') and platform.system() != "Windows"):
+        # Fallback to synchronous execution, progress is only reported on completion
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if progress_callback and result.returncode == 0:
+            progress_callback(1.0, {'progress': 'end'})
+        return result
+    
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    
+    stdout_lines = []
+    
+    async def read_progress():
+        state = {}
+        while True:
+            raw = await process.stdout.readline()
+            if not raw:
+                break
+            line = raw.decode(errors='replace')
+            stdout_lines.append(line)
+            if parse_ffmpeg_progress_line(line, state):
+                fraction = progress_fraction(state, duration)
+                if progress_callback and fraction is not None:
+                    try:
+                        progress_callback(fraction, dict(state))
+                    except Exception as e:
+                        logger.warning(f"Progress callback failed: {e}")
+                state = {}
+    
+    _, stderr = await asyncio.gather(read_progress(), process.stderr.read())
+    await process.wait()
+    return subprocess.CompletedProcess(
+        cmd, process.returncode, ''.join(stdout_lines).encode(), stderr
+    )
+
+
 async def extract_first_frame(video_path: Union[str, Path], output_path: Union[str, Path]) -> bool:
     """
     Extract the first frame of a video and save it as an image.
@@ -421,6 +522,128 @@ async def images_to_video(image_paths: List[Union[str, Path]],
         return False
 
 
+async def probe_has_audio(media_path: Union[str, Path]) -> Optional[bool]:
+    """
+    Check whether a media file has an audio stream.
+    
+    Args:
+        media_path: Path to the media file
+        
+    Returns:
+        bool: Whether the file has audio, or None if ffprobe is not available
+    """
+    if not check_ffprobe():
+        return None
+    result = await run_command([
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'a',
+        '-show_entries', 'stream=index',
+        '-of', 'csv=p=0',
+        str(media_path)
+    ])
+    if result.returncode != 0:
+        return None
+    return bool(result.stdout.strip())
+
+
+async def normalize_to_segment(source_path: Union[str, Path],
+                               output_path: Union[str, Path],
+                               duration: float,
+                               fps: int,
+                               width: int,
+                               height: int,
+                               is_image: bool = False,
+                               codec: str = 'libx264',
+                               preset: str = 'veryfast',
+                               crf: int = 18,
+                               audio_rate: int = 48000,
+                               threads: int = 0,
+                               progress_callback: Optional[Callable[[float, dict], None]] = None) -> bool:
+    """
+    Render an image or a video clip into a normalized segment.
+    
+    Every segment gets the same resolution (letterboxed), frame rate, pixel
+    format, codec and stereo audio track (silence when the source has none),
+    so segments can be joined with the concat demuxer without re-encoding.
+    Images are held for ``duration``; videos are cut to ``duration`` and
+    padded with their last frame when shorter.
+    
+    Args:
+        source_path: Path to the source image or video
+        output_path: Path where the segment will be saved
+        duration: Segment duration in seconds
+        fps: Frames per second of the segment
+        width: Segment width in pixels
+        height: Segment height in pixels
+        is_image: Whether the source is a still image
+        codec: Video codec (default: libx264)
+        preset: Encoder preset
+        crf: Encoder constant rate factor
+        audio_rate: Audio sample rate
+        threads: Encoder threads (0 lets ffmpeg decide)
+        progress_callback: Called with (fraction, fields) while rendering
+        
+    Returns:
+        bool: True if rendering succeeds, False otherwise
+    """
+    if not check_ffmpeg():
+        logger.error("FFmpeg is not available. Please install it first.")
+        return False
+    
+    if not os.path.exists(source_path):
+        logger.error(f"Source file does not exist: {source_path}")
+        return False
+    
+    has_audio = False if is_image else await probe_has_audio(source_path)
+    # Without ffprobe, try the source audio first and fall back to silence
+    attempts = [True, False] if has_audio is None else [has_audio]
+    
+    video_filter = (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                    f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps},format=yuv420p")
+    if not is_image:
+        video_filter += ",tpad=stop_mode=clone:stop=-1"
+    
+    result = None
+    for use_source_audio in attempts:
+        cmd = ['ffmpeg']
+        if is_image:
+            cmd.extend(['-loop', '1', '-framerate', str(fps)])
+        cmd.extend(['-i', str(source_path)])
+        if not use_source_audio:
+            cmd.extend(['-f', 'lavfi', '-i', f'anullsrc=channel_layout=stereo:sample_rate={audio_rate}'])
+        cmd.extend([
+            '-map', '0:v:0',
+            '-map', '0:a:0' if use_source_audio else '1:a:0',
+            '-vf', video_filter,
+        ])
+        if use_source_audio:
+            cmd.extend(['-af', f'aresample={audio_rate},apad'])
+        cmd.extend([
+            '-t', f'{duration:.3f}',
+            '-c:v', codec,
+            '-preset', preset,
+            '-crf', str(crf),
+            '-threads', str(threads),
+            '-c:a', 'aac',
+            '-ar', str(audio_rate),
+            '-ac', '2',
+            '-y',
+            str(output_path)
+        ])
+        
+        try:
+            result = await run_command_with_progress(cmd, duration, progress_callback)
+        except Exception as e:
+            logger.error(f"Exception occurred while rendering segment {output_path}: {e}")
+            return False
+        if result.returncode == 0:
+            return True
+    
+    logger.error(f"Error rendering segment {output_path}: {result.stderr.decode(errors='replace')}")
+    return False
+
+
 # Additional utility function to validate ffmpeg and ffprobe availability with installation option
 async def ensure_ffmpeg() -> bool:
     """